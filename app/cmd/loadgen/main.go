@@ -0,0 +1,487 @@
+// loadgen은 MCP 서버에 실제와 비슷한 키워드/카테고리/좌표 요청을 섞어 보내고, 엔드포인트별 처리량과
+// p50/p95/p99 지연 시간을 JSON으로 기록합니다. 커밋마다 결과 파일을 남겨 두고 -baseline으로 비교합니다.
+//
+//	go run ./cmd/loadgen -duration 30s -concurrency 32 -mix interactive -label $(git rev-parse --short HEAD) -out bench/head.json
+//	go run ./cmd/loadgen -duration 30s -concurrency 32 -baseline bench/main.json
+package main
+
+import (
+	"bytes"
+	"context"
+	"encoding/json"
+	"flag"
+	"fmt"
+	"io"
+	"math"
+	"math/rand"
+	"net/http"
+	"net/url"
+	"os"
+	"sort"
+	"strconv"
+	"strings"
+	"sync"
+	"time"
+)
+
+// mixPresets는 자주 쓰는 트래픽 구성입니다. 값은 상대 비중입니다.
+var mixPresets = map[string]string{
+	"interactive": "keyword=35,category=15,coord2address=20,address=15,coord2regioncode=10,transcoord=5",
+	"search":      "keyword=60,category=40",
+	"geo":         "coord2address=50,coord2regioncode=30,address=20",
+}
+
+// hotspots는 좌표를 만들 때 중심으로 쓰는 지점(경도, 위도)입니다. 실제 트래픽처럼 몇몇 지역에 몰립니다.
+var hotspots = [][2]float64{
+	{126.9780, 37.5665}, // 서울시청
+	{127.0276, 37.4979}, // 강남역
+	{127.0590, 37.5118}, // 코엑스
+	{127.1112, 37.3947}, // 판교
+	{126.9236, 37.5568}, // 홍대입구
+	{129.0592, 35.1577}, // 부산 서면
+	{127.3845, 36.3504}, // 대전 시청
+}
+
+var (
+	keywordTerms = []string{
+		"카페", "스타벅스", "편의점", "약국", "주유소", "맛집", "카카오프렌즈", "은행", "병원", "헬스장",
+		"주차장", "세탁소", "꽃집", "빵집", "서점", "이마트", "올리브영", "다이소", "치과", "동물병원",
+		"PC방", "노래방", "숙소", "코인세탁", "전기차 충전소", "공영주차장", "24시 약국", "브런치", "삼겹살", "국밥",
+	}
+	categoryCodes = []string{"CE7", "CS2", "FD6", "PM9", "OL7", "BK9", "HP8", "PK6", "MT1", "SW8", "AT4", "AD5"}
+	addresses     = []string{
+		"전북 삼성동 100", "서울 중구 세종대로 110", "경기 성남시 분당구 판교역로 166", "서울 강남구 테헤란로 152",
+		"부산 부산진구 중앙대로 672", "대전 서구 둔산로 100", "서울 마포구 양화로 160", "제주 제주시 첨단로 242",
+		"서울 송파구 올림픽로 300", "인천 중구 공항로 272", "광주 서구 내방로 111", "대구 중구 공평로 88",
+	}
+)
+
+// generators는 MCP 서버 경로별 요청 쿼리를 만듭니다.
+var generators = map[string]func(*rand.Rand) (string, url.Values){
+	"keyword": func(r *rand.Rand) (string, url.Values) {
+		q := url.Values{"query": {pick(r, keywordTerms)}}
+		if r.Intn(2) == 0 {
+			x, y := near(r, 0.01)
+			q.Set("x", x)
+			q.Set("y", y)
+			q.Set("radius", strconv.Itoa(500*(1+r.Intn(10))))
+		}
+		if r.Intn(10) == 0 {
+			q.Set("max_pages", "3")
+		}
+		return "/search/keyword", q
+	},
+	"category": func(r *rand.Rand) (string, url.Values) {
+		x, y := near(r, 0.01)
+		return "/search/category", url.Values{
+			"category_group_code": {pick(r, categoryCodes)},
+			"x":                   {x},
+			"y":                   {y},
+			"radius":              {strconv.Itoa(500 * (1 + r.Intn(10)))},
+		}
+	},
+	"address": func(r *rand.Rand) (string, url.Values) {
+		return "/search/address", url.Values{"query": {pick(r, addresses)}}
+	},
+	"coord2address": func(r *rand.Rand) (string, url.Values) {
+		x, y := near(r, 0.02)
+		return "/geo/coord2address", url.Values{"x": {x}, "y": {y}}
+	},
+	"coord2regioncode": func(r *rand.Rand) (string, url.Values) {
+		x, y := near(r, 0.02)
+		return "/geo/coord2regioncode", url.Values{"x": {x}, "y": {y}}
+	},
+	"transcoord": func(r *rand.Rand) (string, url.Values) {
+		x, y := near(r, 0.02)
+		return "/geo/transcoord", url.Values{"x": {x}, "y": {y}, "input_coord": {"WGS84"}, "output_coord": {"WTM"}}
+	},
+}
+
+// pick은 앞쪽 항목이 더 자주 나오도록(지프 분포) 고릅니다. 인기 검색어가 반복되는 실제 트래픽을 흉내 냅니다.
+func pick(r *rand.Rand, items []string) string {
+	z := rand.NewZipf(r, 1.1, 1, uint64(len(items)-1))
+	return items[z.Uint64()]
+}
+
+// near는 hotspot 주변에 정규 분포로 흩어진 좌표를 만듭니다. sigma는 도 단위 표준 편차입니다.
+func near(r *rand.Rand, sigma float64) (string, string) {
+	h := hotspots[r.Intn(len(hotspots))]
+	f := func(v float64) string { return strconv.FormatFloat(v, 'f', 6, 64) }
+	return f(h[0] + r.NormFloat64()*sigma), f(h[1] + r.NormFloat64()*sigma)
+}
+
+type weighted struct {
+	name   string
+	weight int
+}
+
+func parseMix(spec string) ([]weighted, error) {
+	if preset, ok := mixPresets[spec]; ok {
+		spec = preset
+	}
+	var mix []weighted
+	for _, part := range strings.Split(spec, ",") {
+		name, w, ok := strings.Cut(strings.TrimSpace(part), "=")
+		n, err := strconv.Atoi(w)
+		if !ok || err != nil || n < 0 {
+			return nil, fmt.Errorf("invalid mix entry %q (want name=weight)", part)
+		}
+		if _, known := generators[name]; !known {
+			return nil, fmt.Errorf("unknown endpoint %q in mix", name)
+		}
+		if n > 0 {
+			mix = append(mix, weighted{name, n})
+		}
+	}
+	if len(mix) == 0 {
+		return nil, fmt.Errorf("empty mix")
+	}
+	return mix, nil
+}
+
+func choose(r *rand.Rand, mix []weighted, total int) string {
+	n := r.Intn(total)
+	for _, m := range mix {
+		if n < m.weight {
+			return m.name
+		}
+		n -= m.weight
+	}
+	return mix[len(mix)-1].name
+}
+
+// Summary는 엔드포인트 하나(또는 전체)의 결과입니다. 지연 시간은 밀리초입니다.
+type Summary struct {
+	Requests   int64            `json:"requests"`
+	Errors     int64            `json:"errors"`
+	Throughput float64          `json:"throughput_rps"`
+	P50        float64          `json:"p50_ms"`
+	P95        float64          `json:"p95_ms"`
+	P99        float64          `json:"p99_ms"`
+	Max        float64          `json:"max_ms"`
+	Mean       float64          `json:"mean_ms"`
+	Bytes      int64            `json:"bytes"`
+	Status     map[string]int64 `json:"status"`
+}
+
+// Report는 -out으로 쓰는 실행 결과입니다.
+type Report struct {
+	Label       string             `json:"label,omitempty"`
+	StartedAt   time.Time          `json:"started_at"`
+	Target      string             `json:"target"`
+	Mix         string             `json:"mix"`
+	Concurrency int                `json:"concurrency"`
+	TargetRPS   float64            `json:"target_rps"`
+	Duration    float64            `json:"duration_s"`
+	Total       Summary            `json:"total"`
+	Endpoints   map[string]Summary `json:"endpoints"`
+	Upstream    json.RawMessage    `json:"upstream,omitempty"`
+}
+
+// recorder는 워커 하나가 모은 결과입니다. 워커끼리 잠금 없이 기록하고 끝난 뒤 합칩니다.
+type recorder struct {
+	latencies map[string][]time.Duration
+	errors    map[string]int64
+	bytes     map[string]int64
+	status    map[string]map[string]int64
+}
+
+func newRecorder() *recorder {
+	return &recorder{
+		latencies: make(map[string][]time.Duration),
+		errors:    make(map[string]int64),
+		bytes:     make(map[string]int64),
+		status:    make(map[string]map[string]int64),
+	}
+}
+
+func (rec *recorder) add(route string, d time.Duration, status string, n int64, failed bool) {
+	rec.latencies[route] = append(rec.latencies[route], d)
+	rec.bytes[route] += n
+	if failed {
+		rec.errors[route]++
+	}
+	if rec.status[route] == nil {
+		rec.status[route] = make(map[string]int64)
+	}
+	rec.status[route][status]++
+}
+
+func (rec *recorder) merge(o *recorder) {
+	for route, l := range o.latencies {
+		rec.latencies[route] = append(rec.latencies[route], l...)
+		rec.errors[route] += o.errors[route]
+		rec.bytes[route] += o.bytes[route]
+		if rec.status[route] == nil {
+			rec.status[route] = make(map[string]int64)
+		}
+		for s, n := range o.status[route] {
+			rec.status[route][s] += n
+		}
+	}
+}
+
+func summarize(latencies []time.Duration, errors, bytes int64, status map[string]int64, window time.Duration) Summary {
+	sort.Slice(latencies, func(i, j int) bool { return latencies[i] < latencies[j] })
+	ms := func(d time.Duration) float64 { return math.Round(float64(d)/1e3) / 1e3 }
+	// 최근접 순위(nearest-rank) 백분위수입니다.
+	pct := func(p float64) float64 {
+		if len(latencies) == 0 {
+			return 0
+		}
+		i := int(math.Ceil(p/100*float64(len(latencies)))) - 1
+		return ms(latencies[max(i, 0)])
+	}
+	var sum time.Duration
+	for _, d := range latencies {
+		sum += d
+	}
+	s := Summary{
+		Requests:   int64(len(latencies)),
+		Errors:     errors,
+		Throughput: math.Round(float64(len(latencies))/window.Seconds()*100) / 100,
+		P50:        pct(50),
+		P95:        pct(95),
+		P99:        pct(99),
+		Bytes:      bytes,
+		Status:     status,
+	}
+	if len(latencies) > 0 {
+		s.Max = ms(latencies[len(latencies)-1])
+		s.Mean = ms(sum / time.Duration(len(latencies)))
+	}
+	return s
+}
+
+func main() {
+	target := flag.String("target", "http://127.0.0.1:8080", "MCP server base URL")
+	duration := flag.Duration("duration", 30*time.Second, "measurement window")
+	warmup := flag.Duration("warmup", 5*time.Second, "load before the measurement window that is not recorded")
+	concurrency := flag.Int("concurrency", 32, "concurrent clients")
+	rps := flag.Float64("rps", 0, "open-loop request rate (0 sends back to back from each client)")
+	mixSpec := flag.String("mix", "interactive", "traffic mix: interactive, search, geo or name=weight,...")
+	seed := flag.Int64("seed", 1, "random seed for the request stream")
+	label := flag.String("label", "", "label stored in the report (e.g. a commit hash)")
+	out := flag.String("out", "", "write the JSON report to this file (default stdout)")
+	baseline := flag.String("baseline", "", "earlier JSON report to compare against")
+	mockStats := flag.String("mock-stats", "", "mockkakao /_mock/stats URL to include upstream call counts")
+	timeout := flag.Duration("timeout", 10*time.Second, "per-request timeout")
+	gzip := flag.Bool("gzip", true, "send Accept-Encoding: gzip")
+	flag.Parse()
+
+	mix, err := parseMix(*mixSpec)
+	if err != nil {
+		fmt.Fprintln(os.Stderr, err)
+		os.Exit(2)
+	}
+	totalWeight := 0
+	for _, m := range mix {
+		totalWeight += m.weight
+	}
+	base := strings.TrimRight(*target, "/")
+
+	client := &http.Client{
+		Timeout: *timeout,
+		Transport: &http.Transport{
+			MaxIdleConns:        *concurrency * 2,
+			MaxIdleConnsPerHost: *concurrency * 2,
+			DisableCompression:  !*gzip,
+		},
+	}
+
+	startedAt := time.Now()
+	measureFrom := startedAt.Add(*warmup)
+	ctx, cancel := context.WithDeadline(context.Background(), measureFrom.Add(*duration))
+	defer cancel()
+
+	// -rps가 있으면 정해진 시각표대로 요청을 보냅니다. 지연 시간은 실제 전송 시각이 아니라 예정 시각부터 재므로
+	// 서버가 밀려 클라이언트가 늦게 보내는 경우(coordinated omission)도 지연 시간에 드러납니다.
+	var schedule chan time.Time
+	if *rps > 0 {
+		schedule = make(chan time.Time, *concurrency)
+		interval := time.Duration(float64(time.Second) / *rps)
+		go func() {
+			defer close(schedule)
+			for n := 0; ; n++ {
+				at := startedAt.Add(time.Duration(n) * interval)
+				if d := time.Until(at); d > 0 {
+					time.Sleep(d)
+				}
+				select {
+				case schedule <- at:
+				case <-ctx.Done():
+					return
+				}
+			}
+		}()
+	}
+
+	recorders := make([]*recorder, *concurrency)
+	var wg sync.WaitGroup
+	for i := range recorders {
+		rec := newRecorder()
+		recorders[i] = rec
+		r := rand.New(rand.NewSource(*seed + int64(i)))
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			var body bytes.Buffer
+			for ctx.Err() == nil {
+				start := time.Now()
+				if schedule != nil {
+					at, ok := <-schedule
+					if !ok {
+						return
+					}
+					start = at
+				}
+				name := choose(r, mix, totalWeight)
+				route, q := generators[name](r)
+				status, n, failed := send(ctx, client, base+route+"?"+q.Encode(), &body)
+				if ctx.Err() != nil {
+					return
+				}
+				if start.After(measureFrom) {
+					rec.add(route, time.Since(start), status, n, failed)
+				}
+			}
+		}()
+	}
+	fmt.Fprintf(os.Stderr, "loadgen: %s mix=%s concurrency=%d warmup=%s duration=%s\n", base, *mixSpec, *concurrency, *warmup, *duration)
+	wg.Wait()
+
+	all := newRecorder()
+	for _, rec := range recorders {
+		all.merge(rec)
+	}
+	report := Report{
+		Label:       *label,
+		StartedAt:   startedAt.UTC().Truncate(time.Second),
+		Target:      base,
+		Mix:         *mixSpec,
+		Concurrency: *concurrency,
+		TargetRPS:   *rps,
+		Duration:    duration.Seconds(),
+		Endpoints:   make(map[string]Summary),
+	}
+	var (
+		every            []time.Duration
+		errs, totalBytes int64
+		statusTotal      = make(map[string]int64)
+	)
+	for route, l := range all.latencies {
+		report.Endpoints[route] = summarize(l, all.errors[route], all.bytes[route], all.status[route], *duration)
+		every = append(every, l...)
+		errs += all.errors[route]
+		totalBytes += all.bytes[route]
+		for s, n := range all.status[route] {
+			statusTotal[s] += n
+		}
+	}
+	report.Total = summarize(every, errs, totalBytes, statusTotal, *duration)
+	if *mockStats != "" {
+		report.Upstream = fetchJSON(client, *mockStats)
+	}
+
+	printTable(os.Stderr, &report)
+	if *baseline != "" {
+		if err := compare(os.Stderr, *baseline, &report); err != nil {
+			fmt.Fprintln(os.Stderr, "baseline:", err)
+		}
+	}
+
+	data, _ := json.MarshalIndent(report, "", "  ")
+	data = append(data, '\n')
+	if *out == "" {
+		os.Stdout.Write(data)
+		return
+	}
+	if err := os.WriteFile(*out, data, 0o644); err != nil {
+		fmt.Fprintln(os.Stderr, err)
+		os.Exit(1)
+	}
+}
+
+// send는 요청 하나를 보내고 응답을 끝까지 읽습니다. 상태 코드가 200이 아니거나 SSE 스트림 안에
+// `event: error`가 있으면(페이지 단위 오류) 실패로 셉니다.
+func send(ctx context.Context, client *http.Client, target string, body *bytes.Buffer) (string, int64, bool) {
+	req, _ := http.NewRequestWithContext(ctx, http.MethodGet, target, nil)
+	resp, err := client.Do(req)
+	if err != nil {
+		return "error", 0, true
+	}
+	defer resp.Body.Close()
+	body.Reset()
+	n, err := io.Copy(body, resp.Body)
+	if err != nil {
+		return "error", n, true
+	}
+	failed := resp.StatusCode != http.StatusOK || bytes.Contains(body.Bytes(), []byte("event: error\n"))
+	return strconv.Itoa(resp.StatusCode), n, failed
+}
+
+func fetchJSON(client *http.Client, target string) json.RawMessage {
+	resp, err := client.Get(target)
+	if err != nil {
+		fmt.Fprintln(os.Stderr, "mock-stats:", err)
+		return nil
+	}
+	defer resp.Body.Close()
+	data, err := io.ReadAll(resp.Body)
+	if err != nil || !json.Valid(data) {
+		fmt.Fprintln(os.Stderr, "mock-stats: invalid response")
+		return nil
+	}
+	return data
+}
+
+func sortedRoutes(endpoints map[string]Summary) []string {
+	routes := make([]string, 0, len(endpoints))
+	for route := range endpoints {
+		routes = append(routes, route)
+	}
+	sort.Strings(routes)
+	return routes
+}
+
+func printTable(w io.Writer, r *Report) {
+	fmt.Fprintf(w, "%-24s %9s %7s %10s %9s %9s %9s\n", "endpoint", "requests", "errors", "rps", "p50 ms", "p95 ms", "p99 ms")
+	row := func(name string, s Summary) {
+		fmt.Fprintf(w, "%-24s %9d %7d %10.1f %9.2f %9.2f %9.2f\n", name, s.Requests, s.Errors, s.Throughput, s.P50, s.P95, s.P99)
+	}
+	for _, route := range sortedRoutes(r.Endpoints) {
+		row(route, r.Endpoints[route])
+	}
+	row("total", r.Total)
+}
+
+// compare는 이전 결과와 비교한 변화율을 출력합니다. 처리량은 높을수록, 지연 시간은 낮을수록 좋습니다.
+func compare(w io.Writer, path string, cur *Report) error {
+	data, err := os.ReadFile(path)
+	if err != nil {
+		return err
+	}
+	var old Report
+	if err := json.Unmarshal(data, &old); err != nil {
+		return err
+	}
+	delta := func(a, b float64) string {
+		if a == 0 {
+			return "     n/a"
+		}
+		return fmt.Sprintf("%+7.1f%%", (b-a)/a*100)
+	}
+	fmt.Fprintf(w, "\nvs %s (%s)\n", path, old.Label)
+	fmt.Fprintf(w, "%-24s %9s %9s %9s %9s\n", "endpoint", "rps", "p50", "p95", "p99")
+	row := func(name string, a, b Summary) {
+		fmt.Fprintf(w, "%-24s %9s %9s %9s %9s\n", name,
+			delta(a.Throughput, b.Throughput), delta(a.P50, b.P50), delta(a.P95, b.P95), delta(a.P99, b.P99))
+	}
+	for _, route := range sortedRoutes(cur.Endpoints) {
+		if prev, ok := old.Endpoints[route]; ok {
+			row(route, prev, cur.Endpoints[route])
+		}
+	}
+	row("total", old.Total, cur.Total)
+	return nil
+}
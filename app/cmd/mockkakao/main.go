@@ -0,0 +1,46 @@
+// mockkakao는 Kakao 로컬 API(dapi.kakao.com)를 흉내 내는 로컬 서버입니다. 실제 키 없이
+// MCP 서버를 띄워 부하 테스트를 하거나 오류 처리를 확인할 때 씁니다.
+//
+//	go run ./cmd/mockkakao -addr :9090 -latency 30ms -jitter 20ms -throttle-rate 0.01
+//	KAKAO_API_URL=http://127.0.0.1:9090 KAKAO_API_KEY=mock go run .
+package main
+
+import (
+	"flag"
+	"korean-map-mcp/internal/kakaomock"
+	"log/slog"
+	"net/http"
+	"os"
+	"strings"
+	"time"
+)
+
+func main() {
+	var cfg kakaomock.Config
+	addr := flag.String("addr", ":9090", "listen address")
+	keys := flag.String("keys", "", "comma-separated REST API keys to accept (empty accepts any key)")
+	flag.DurationVar(&cfg.Latency, "latency", 20*time.Millisecond, "base response latency")
+	flag.DurationVar(&cfg.Jitter, "jitter", 10*time.Millisecond, "extra uniform latency in [0, jitter)")
+	flag.Float64Var(&cfg.ErrorRate, "error-rate", 0, "fraction of calls answered with 500")
+	flag.Float64Var(&cfg.ThrottleRate, "throttle-rate", 0, "fraction of calls answered with 429")
+	flag.DurationVar(&cfg.RetryAfter, "retry-after", time.Second, "Retry-After sent with 429 responses (0 omits the header)")
+	flag.IntVar(&cfg.Total, "total", 0, "total_count for keyword/category searches (0 uses the fixture value)")
+	flag.Int64Var(&cfg.Seed, "seed", 1, "random seed for latency and error injection")
+	flag.Parse()
+	if *keys != "" {
+		cfg.Keys = strings.Split(*keys, ",")
+	}
+
+	slog.SetDefault(slog.New(slog.NewJSONHandler(os.Stdout, nil)))
+	srv, err := kakaomock.New(cfg)
+	if err != nil {
+		slog.Error("Failed to load fixtures", "error", err)
+		os.Exit(1)
+	}
+	slog.Info("Starting mock Kakao API", "addr", *addr, "latency", cfg.Latency, "jitter", cfg.Jitter,
+		"error_rate", cfg.ErrorRate, "throttle_rate", cfg.ThrottleRate)
+	if err := http.ListenAndServe(*addr, srv); err != nil {
+		slog.Error("Mock server stopped", "error", err)
+		os.Exit(1)
+	}
+}
@@ -0,0 +1,308 @@
+// Package kakaomock은 부하 테스트와 벤치마크에서 dapi.kakao.com 대신 쓰는 로컬 목 서버입니다.
+// 여섯 개 로컬 API 엔드포인트에 녹화해 둔 응답(fixtures/)을 돌려주고, 지연 시간, 오류율, 429 응답을
+// 설정으로 넣을 수 있습니다. 같은 Seed로 만든 서버는 같은 순서로 오류를 냅니다.
+package kakaomock
+
+import (
+	"bytes"
+	"compress/gzip"
+	"context"
+	"embed"
+	"encoding/json"
+	"fmt"
+	"math/rand"
+	"net/http"
+	"path"
+	"sort"
+	"strconv"
+	"strings"
+	"sync"
+	"time"
+)
+
+//go:embed fixtures/*.json
+var fixtureFS embed.FS
+
+// Config는 목 서버의 응답 방식입니다.
+type Config struct {
+	// Latency는 응답 전 기본 지연 시간, Jitter는 여기에 더하는 0~Jitter 사이의 균등 분포 지연입니다.
+	Latency time.Duration
+	Jitter  time.Duration
+	// ErrorRate는 500 응답 비율, ThrottleRate는 429 응답 비율입니다 (0~1).
+	ErrorRate    float64
+	ThrottleRate float64
+	// RetryAfter는 429 응답의 Retry-After 값입니다. 0이면 헤더를 보내지 않습니다.
+	RetryAfter time.Duration
+	// Keys가 있으면 이 REST API 키만 허용하고 나머지는 401로 응답합니다.
+	Keys []string
+	// Total은 키워드/카테고리 검색의 total_count입니다. 0이면 fixture 값을 씁니다.
+	Total int
+	Seed  int64
+}
+
+// kakaoMaxPageable은 Kakao가 한 질의에서 넘겨주는 최대 결과 수입니다.
+const kakaoMaxPageable = 45
+
+// required는 엔드포인트별 필수 파라미터입니다. 빠지면 Kakao처럼 400으로 응답합니다.
+var required = map[string][]string{
+	"/v2/local/search/address.json":       {"query"},
+	"/v2/local/search/keyword.json":       {"query"},
+	"/v2/local/search/category.json":      {"category_group_code"},
+	"/v2/local/geo/coord2address.json":    {"x", "y"},
+	"/v2/local/geo/coord2regioncode.json": {"x", "y"},
+	"/v2/local/geo/transcoord.json":       {"x", "y"},
+}
+
+// Server는 Kakao 로컬 API를 흉내 내는 http.Handler입니다.
+type Server struct {
+	cfg      Config
+	keys     map[string]bool
+	fixtures map[string]*fixture
+
+	mu    sync.Mutex
+	rng   *rand.Rand
+	stats map[string]map[int]int64
+
+	// pages는 (경로, page, size)별로 만들어 둔 응답 본문입니다. 목 서버가 측정 대상보다 느려지지 않도록
+	// JSON 인코딩과 gzip 압축은 처음 한 번만 합니다.
+	pages sync.Map
+}
+
+type fixture struct {
+	name   string
+	raw    []byte
+	docs   []map[string]any
+	meta   map[string]any
+	total  int
+	search bool
+}
+
+type page struct {
+	plain, gz []byte
+}
+
+// New는 fixtures를 읽어 목 서버를 만듭니다.
+func New(cfg Config) (*Server, error) {
+	s := &Server{
+		cfg:      cfg,
+		fixtures: make(map[string]*fixture),
+		rng:      rand.New(rand.NewSource(cfg.Seed)),
+		stats:    make(map[string]map[int]int64),
+	}
+	if len(cfg.Keys) > 0 {
+		s.keys = make(map[string]bool, len(cfg.Keys))
+		for _, k := range cfg.Keys {
+			s.keys[k] = true
+		}
+	}
+	for p := range required {
+		name := strings.TrimSuffix(path.Base(p), ".json")
+		data, err := fixtureFS.ReadFile("fixtures/" + name + ".json")
+		if err != nil {
+			return nil, err
+		}
+		var doc struct {
+			Documents []map[string]any `json:"documents"`
+			Meta      map[string]any   `json:"meta"`
+		}
+		if err := json.Unmarshal(data, &doc); err != nil {
+			return nil, fmt.Errorf("fixture %s: %w", name, err)
+		}
+		f := &fixture{name: name, docs: doc.Documents, meta: doc.Meta}
+		f.search = name == "keyword" || name == "category"
+		if f.search {
+			total, _ := doc.Meta["total_count"].(float64)
+			f.total = int(total)
+			if cfg.Total > 0 {
+				f.total = cfg.Total
+			}
+		} else {
+			var compact bytes.Buffer
+			if err := json.Compact(&compact, data); err != nil {
+				return nil, err
+			}
+			f.raw = compact.Bytes()
+		}
+		s.fixtures[p] = f
+	}
+	return s, nil
+}
+
+// ServeHTTP는 /v2/local/... 요청에 fixture로 응답합니다. /_mock/stats는 엔드포인트·상태 코드별 호출 수입니다.
+func (s *Server) ServeHTTP(w http.ResponseWriter, r *http.Request) {
+	if r.URL.Path == "/_mock/stats" {
+		w.Header().Set("Content-Type", "application/json")
+		json.NewEncoder(w).Encode(s.Stats())
+		return
+	}
+	f, ok := s.fixtures[r.URL.Path]
+	if !ok {
+		s.fail(w, f, http.StatusNotFound, "NotFound", "unknown path "+r.URL.Path)
+		return
+	}
+
+	auth := r.Header.Get("Authorization")
+	key, found := strings.CutPrefix(auth, "KakaoAK ")
+	if !found || key == "" || (s.keys != nil && !s.keys[key]) {
+		s.fail(w, f, http.StatusUnauthorized, "AccessDeniedError", "cannot find appkey")
+		return
+	}
+	q := r.URL.Query()
+	for _, name := range required[r.URL.Path] {
+		if q.Get(name) == "" {
+			s.fail(w, f, http.StatusBadRequest, "MissingParameter", name+" parameter required")
+			return
+		}
+	}
+
+	delay, roll := s.draw()
+	if !sleep(r.Context(), delay) {
+		return
+	}
+	switch {
+	case roll < s.cfg.ThrottleRate:
+		if s.cfg.RetryAfter > 0 {
+			w.Header().Set("Retry-After", strconv.Itoa(int((s.cfg.RetryAfter+time.Second-1)/time.Second)))
+		}
+		s.fail(w, f, http.StatusTooManyRequests, "RequestThrottled", "API limit has been exceeded.")
+		return
+	case roll < s.cfg.ThrottleRate+s.cfg.ErrorRate:
+		s.fail(w, f, http.StatusInternalServerError, "InternalServerError", "mock failure")
+		return
+	}
+
+	pageNo, size := 1, 15
+	if f.search {
+		pageNo = clamp(q.Get("page"), 1, 1, kakaoMaxPageable)
+		size = clamp(q.Get("size"), 15, 1, 15)
+	}
+	body := s.page(r.URL.Path, f, pageNo, size)
+
+	w.Header().Set("Content-Type", "application/json;charset=UTF-8")
+	data := body.plain
+	if strings.Contains(r.Header.Get("Accept-Encoding"), "gzip") {
+		w.Header().Set("Content-Encoding", "gzip")
+		data = body.gz
+	}
+	w.Header().Set("Content-Length", strconv.Itoa(len(data)))
+	s.count(f, http.StatusOK)
+	w.Write(data)
+}
+
+// draw는 이번 요청의 지연 시간과 오류 주사위 값을 고릅니다.
+func (s *Server) draw() (time.Duration, float64) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	delay := s.cfg.Latency
+	if s.cfg.Jitter > 0 {
+		delay += time.Duration(s.rng.Int63n(int64(s.cfg.Jitter)))
+	}
+	return delay, s.rng.Float64()
+}
+
+func sleep(ctx context.Context, d time.Duration) bool {
+	if d <= 0 {
+		return true
+	}
+	t := time.NewTimer(d)
+	defer t.Stop()
+	select {
+	case <-t.C:
+		return true
+	case <-ctx.Done():
+		return false
+	}
+}
+
+func clamp(v string, def, lo, hi int) int {
+	n, err := strconv.Atoi(v)
+	if err != nil {
+		return def
+	}
+	return min(max(n, lo), hi)
+}
+
+// page는 검색 엔드포인트면 fixture 문서를 돌려 가며 size개짜리 페이지를 만들고, 아니면 fixture를 그대로 씁니다.
+// 만든 문서는 id와 place_url에 결과 순번을 붙여 페이지 사이에서 겹치지 않습니다.
+func (s *Server) page(p string, f *fixture, pageNo, size int) *page {
+	key := p + "|" + strconv.Itoa(pageNo) + "|" + strconv.Itoa(size)
+	if v, ok := s.pages.Load(key); ok {
+		return v.(*page)
+	}
+	plain := f.raw
+	if f.search {
+		pageable := min(f.total, kakaoMaxPageable)
+		start, end := (pageNo-1)*size, min(pageNo*size, pageable)
+		docs := make([]map[string]any, 0, max(end-start, 0))
+		for i := start; i < end; i++ {
+			tmpl := f.docs[i%len(f.docs)]
+			doc := make(map[string]any, len(tmpl))
+			for k, v := range tmpl {
+				doc[k] = v
+			}
+			id := fmt.Sprintf("%v%02d", tmpl["id"], i)
+			doc["id"] = id
+			doc["place_url"] = "http://place.map.kakao.com/" + id
+			docs = append(docs, doc)
+		}
+		meta := make(map[string]any, len(f.meta))
+		for k, v := range f.meta {
+			meta[k] = v
+		}
+		meta["total_count"] = f.total
+		meta["pageable_count"] = pageable
+		meta["is_end"] = end >= pageable
+		plain, _ = json.Marshal(map[string]any{"documents": docs, "meta": meta})
+	}
+	var gz bytes.Buffer
+	zw := gzip.NewWriter(&gz)
+	zw.Write(plain)
+	zw.Close()
+	v, _ := s.pages.LoadOrStore(key, &page{plain: plain, gz: gz.Bytes()})
+	return v.(*page)
+}
+
+func (s *Server) fail(w http.ResponseWriter, f *fixture, status int, errType, message string) {
+	s.count(f, status)
+	body, _ := json.Marshal(map[string]string{"errorType": errType, "message": message})
+	w.Header().Set("Content-Type", "application/json;charset=UTF-8")
+	w.WriteHeader(status)
+	w.Write(body)
+}
+
+func (s *Server) count(f *fixture, status int) {
+	name := "unknown"
+	if f != nil {
+		name = f.name
+	}
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	if s.stats[name] == nil {
+		s.stats[name] = make(map[int]int64)
+	}
+	s.stats[name][status]++
+}
+
+// EndpointStats는 엔드포인트 하나가 받은 호출 수입니다.
+type EndpointStats struct {
+	Endpoint string           `json:"endpoint"`
+	Requests int64            `json:"requests"`
+	Status   map[string]int64 `json:"status"`
+}
+
+// Stats는 엔드포인트별 호출 수를 이름순으로 반환합니다.
+func (s *Server) Stats() []EndpointStats {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	out := make([]EndpointStats, 0, len(s.stats))
+	for name, byStatus := range s.stats {
+		e := EndpointStats{Endpoint: name, Status: make(map[string]int64, len(byStatus))}
+		for status, n := range byStatus {
+			e.Requests += n
+			e.Status[strconv.Itoa(status)] = n
+		}
+		out = append(out, e)
+	}
+	sort.Slice(out, func(i, j int) bool { return out[i].Endpoint < out[j].Endpoint })
+	return out
+}
@@ -0,0 +1,50 @@
+package lib
+
+import (
+	"expvar"
+	"net/http"
+	"net/http/pprof"
+	"os"
+	"runtime"
+	"sync"
+)
+
+// LoadAdminAddr는 관리용 포트 주소를 읽습니다.
+//
+//	ADMIN_ADDR   pprof, 런타임 통계, 지표를 제공할 주소 (예: 127.0.0.1:6060). 비어 있으면 관리 포트를 열지 않습니다
+func LoadAdminAddr() string {
+	return os.Getenv("ADMIN_ADDR")
+}
+
+var publishRuntime sync.Once
+
+// NewAdminMux는 관리 포트용 핸들러를 만듭니다. 프로파일링 엔드포인트는 서비스 포트에 노출되지 않도록
+// 별도 ServeMux에만 등록합니다.
+//
+//	/debug/pprof/   net/http/pprof (profile, heap, goroutine, trace 등)
+//	/debug/vars     expvar 형식의 런타임 통계 (memstats, goroutines, GOMAXPROCS)
+//	/metrics        서비스 포트와 같은 Prometheus 지표
+//	/debug/cache/export, /debug/cache/import
+//	                응답 캐시 스냅샷 내려받기/넣기. 넣기는 임의의 응답을 캐시에 쓸 수 있으므로 관리 포트에만 둡니다.
+//	/debug/keys, /debug/keys/reload
+//	                API 키 상태와 키 목록 다시 읽기
+func (h *ApiHandler) NewAdminMux() *http.ServeMux {
+	publishRuntime.Do(func() {
+		expvar.Publish("goroutines", expvar.Func(func() any { return runtime.NumGoroutine() }))
+		expvar.Publish("gomaxprocs", expvar.Func(func() any { return runtime.GOMAXPROCS(0) }))
+	})
+
+	mux := http.NewServeMux()
+	mux.HandleFunc("/debug/pprof/", pprof.Index)
+	mux.HandleFunc("/debug/pprof/cmdline", pprof.Cmdline)
+	mux.HandleFunc("/debug/pprof/profile", pprof.Profile)
+	mux.HandleFunc("/debug/pprof/symbol", pprof.Symbol)
+	mux.HandleFunc("/debug/pprof/trace", pprof.Trace)
+	mux.Handle("/debug/vars", expvar.Handler())
+	mux.HandleFunc("/metrics", h.MetricsHandler)
+	mux.HandleFunc("/debug/cache/export", h.CacheExportHandler)
+	mux.HandleFunc("/debug/cache/import", h.CacheImportHandler)
+	mux.HandleFunc("/debug/keys", h.KeyStatsHandler)
+	mux.HandleFunc("/debug/keys/reload", h.KeyReloadHandler)
+	return mux
+}
@@ -0,0 +1,210 @@
+package lib
+
+import (
+	"encoding/json"
+	"errors"
+	"fmt"
+	"log/slog"
+	"net/http"
+	"net/url"
+	"sync"
+)
+
+// batchMaxBody는 POST /batch 본문 크기 상한입니다. 항목 BATCH_MAX_ITEMS개를 담기에 충분합니다.
+const batchMaxBody = 8 << 20
+
+// BatchConfig는 일괄 조회 엔드포인트의 한도입니다.
+type BatchConfig struct {
+	MaxItems    int
+	Concurrency int
+}
+
+// LoadBatchConfig는 환경 변수에서 일괄 조회 설정을 읽습니다.
+//
+//	BATCH_MAX_ITEMS     한 요청에 담을 수 있는 최대 항목 수 (기본 10000)
+//	BATCH_CONCURRENCY   업스트림 동시 호출 수 상한 (기본 8)
+func LoadBatchConfig() BatchConfig {
+	return BatchConfig{
+		MaxItems:    envInt("BATCH_MAX_ITEMS", 10000),
+		Concurrency: max(envInt("BATCH_CONCURRENCY", 8), 1),
+	}
+}
+
+// batchItem은 일괄 조회 요청의 한 항목입니다. endpoint는 "/search/keyword" 같은
+// MCP 서버 경로 또는 "keyword" 같은 짧은 이름입니다.
+type batchItem struct {
+	Endpoint string         `json:"endpoint"`
+	Params   map[string]any `json:"params"`
+}
+
+type batchRequest struct {
+	Items       []batchItem `json:"items"`
+	Concurrency int         `json:"concurrency"`
+}
+
+// batchResult는 항목 하나의 처리 결과로, 완료되는 즉시 SSE 이벤트로 전송됩니다.
+type batchResult struct {
+	Index  int             `json:"index"`
+	Status int             `json:"status,omitempty"`
+	Cache  string          `json:"cache,omitempty"`
+	Body   json.RawMessage `json:"body,omitempty"`
+	Error  string          `json:"error,omitempty"`
+}
+
+type batchSummary struct {
+	Total     int `json:"total"`
+	Succeeded int `json:"succeeded"`
+	Failed    int `json:"failed"`
+}
+
+// ### 7. 일괄 조회
+//
+// 여러 조회를 한 번의 요청으로 받아 업스트림에 제한된 동시성으로 실행합니다.
+// 각 결과는 입력 순서와 관계없이 완료되는 즉시 `event: result` SSE 이벤트로 전송되며,
+// `index` 필드로 입력 항목을 구분합니다. 항목별 오류는 해당 이벤트의 `error`로만 전달되고
+// 나머지 항목 처리는 계속됩니다. 마지막에 `event: done` 요약 이벤트를 보냅니다.
+func (h *ApiHandler) BatchHandler(w http.ResponseWriter, r *http.Request) {
+	if r.Method != http.MethodPost {
+		w.Header().Set("Allow", http.MethodPost)
+		http.Error(w, "method not allowed", http.StatusMethodNotAllowed)
+		return
+	}
+
+	var req batchRequest
+	dec := json.NewDecoder(http.MaxBytesReader(w, r.Body, batchMaxBody))
+	dec.UseNumber()
+	if err := dec.Decode(&req); err != nil {
+		var tooLarge *http.MaxBytesError
+		if errors.As(err, &tooLarge) {
+			http.Error(w, fmt.Sprintf("batch request larger than %d bytes", batchMaxBody), http.StatusRequestEntityTooLarge)
+			return
+		}
+		http.Error(w, "invalid batch request: "+err.Error(), http.StatusBadRequest)
+		return
+	}
+	if len(req.Items) > h.Batch.MaxItems {
+		http.Error(w, fmt.Sprintf("too many items: %d > %d", len(req.Items), h.Batch.MaxItems), http.StatusRequestEntityTooLarge)
+		return
+	}
+	concurrency := h.Batch.Concurrency
+	if req.Concurrency > 0 && req.Concurrency < concurrency {
+		concurrency = req.Concurrency
+	}
+
+	setSSEHeaders(w)
+	w.WriteHeader(http.StatusOK)
+
+	results := make(chan batchResult)
+	sem := make(chan struct{}, concurrency)
+	var wg sync.WaitGroup
+	go func() {
+		for i, item := range req.Items {
+			sem <- struct{}{}
+			if r.Context().Err() != nil {
+				<-sem
+				break
+			}
+			wg.Add(1)
+			go func(i int, item batchItem) {
+				defer func() { <-sem; wg.Done() }()
+				results <- h.runBatchItem(r, i, item)
+			}(i, item)
+		}
+		wg.Wait()
+		close(results)
+	}()
+
+	summary := batchSummary{Total: len(req.Items)}
+	writeFailed := false
+	for res := range results {
+		if res.Error != "" {
+			summary.Failed++
+		} else {
+			summary.Succeeded++
+		}
+		if writeFailed {
+			continue
+		}
+		data, _ := json.Marshal(res)
+		if err := writeSSEEvent(w, "result", res.Index, data); err != nil {
+			slog.Warn("Batch client went away", "error", err)
+			writeFailed = true
+		}
+	}
+	if !writeFailed {
+		data, _ := json.Marshal(summary)
+		writeSSEEvent(w, "done", -1, data)
+	}
+}
+
+// runBatchItem은 항목 하나를 캐시/업스트림을 거쳐 조회합니다.
+func (h *ApiHandler) runBatchItem(r *http.Request, index int, item batchItem) batchResult {
+	res := batchResult{Index: index}
+	path, ok := kakaoPath(item.Endpoint)
+	if !ok {
+		res.Error = "unknown endpoint: " + item.Endpoint
+		return res
+	}
+	query := paramsQuery(item.Params)
+	proj, err := parseProjection(query)
+	if err != nil {
+		res.Status = http.StatusBadRequest
+		res.Error = err.Error()
+		return res
+	}
+	for _, name := range projectionParams {
+		query.Del(name)
+	}
+
+	if body, ok := h.localAnswer(path, query); ok {
+		res.Status = http.StatusOK
+		res.Cache = cacheLocal
+		res.Body = projectBatchBody(proj, body)
+		return res
+	}
+
+	up, cacheStatus, err := h.fetchCell(WithPriority(r.Context(), PriorityBulk), path, query)
+	if err != nil {
+		res.Status, _, _ = errorResponse(err)
+		res.Error = err.Error()
+		return res
+	}
+	res.Status = up.Status
+	res.Cache = cacheStatus
+	if up.Status == http.StatusOK && proj != nil {
+		res.Body = projectBatchBody(proj, up.Body)
+	} else if json.Valid(up.Body) {
+		res.Body = up.Body
+	} else {
+		res.Body, _ = json.Marshal(string(up.Body))
+	}
+	if up.Status != http.StatusOK {
+		res.Error = fmt.Sprintf("upstream status %d", up.Status)
+	}
+	return res
+}
+
+// paramsQuery는 JSON 객체로 받은 파라미터를 쿼리로 바꿉니다. 숫자는 json.Number 그대로, null은 생략합니다.
+func paramsQuery(params map[string]any) url.Values {
+	query := make(url.Values, len(params))
+	for k, v := range params {
+		switch v := v.(type) {
+		case string:
+			query.Set(k, v)
+		case nil:
+		default:
+			query.Set(k, fmt.Sprint(v))
+		}
+	}
+	return query
+}
+
+// projectBatchBody는 항목의 fields/limit/format을 본문에 적용합니다. 적용할 수 없으면 원본을 씁니다.
+func projectBatchBody(p *fieldProjection, body []byte) json.RawMessage {
+	if p != nil {
+		if out, err := p.project(body); err == nil {
+			return out
+		}
+	}
+	return body
+}
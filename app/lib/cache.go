@@ -0,0 +1,207 @@
+package lib
+
+import (
+	"container/list"
+	"encoding/json"
+	"net/http"
+	"net/url"
+	"strings"
+	"sync"
+	"time"
+)
+
+// CacheConfig는 응답 캐시의 용량과 엔드포인트별 TTL 설정입니다.
+// TTL이 0이면 만료되지 않고, 음수이면 해당 엔드포인트는 캐시하지 않습니다.
+type CacheConfig struct {
+	MaxBytes   int64
+	DefaultTTL time.Duration
+	TTLs       map[string]time.Duration
+}
+
+// LoadCacheConfig는 환경 변수에서 캐시 설정을 읽습니다.
+//
+//	CACHE_MAX_BYTES              캐시가 보관할 응답 본문 총 바이트 (기본 64MiB, 0이면 비활성화)
+//	CACHE_TTL_DEFAULT            TTL이 지정되지 않은 엔드포인트의 TTL (기본 10m)
+//	CACHE_TTL_ADDRESS            /search/address (기본 24h)
+//	CACHE_TTL_KEYWORD            /search/keyword (기본 5m)
+//	CACHE_TTL_CATEGORY           /search/category (기본 5m)
+//	CACHE_TTL_COORD2ADDRESS      /geo/coord2address (기본 24h)
+//	CACHE_TTL_COORD2REGIONCODE   /geo/coord2regioncode (기본 24h)
+//	CACHE_TTL_TRANSCOORD         /geo/transcoord (기본 0, 만료 없음)
+func LoadCacheConfig() CacheConfig {
+	return CacheConfig{
+		MaxBytes:   int64(envInt("CACHE_MAX_BYTES", 64<<20)),
+		DefaultTTL: envDuration("CACHE_TTL_DEFAULT", 10*time.Minute),
+		TTLs: map[string]time.Duration{
+			"/v2/local/search/address.json":       envDuration("CACHE_TTL_ADDRESS", 24*time.Hour),
+			"/v2/local/search/keyword.json":       envDuration("CACHE_TTL_KEYWORD", 5*time.Minute),
+			"/v2/local/search/category.json":      envDuration("CACHE_TTL_CATEGORY", 5*time.Minute),
+			"/v2/local/geo/coord2address.json":    envDuration("CACHE_TTL_COORD2ADDRESS", 24*time.Hour),
+			"/v2/local/geo/coord2regioncode.json": envDuration("CACHE_TTL_COORD2REGIONCODE", 24*time.Hour),
+			"/v2/local/geo/transcoord.json":       envDuration("CACHE_TTL_TRANSCOORD", 0),
+		},
+	}
+}
+
+// CacheStats는 응답 캐시의 현재 상태입니다.
+type CacheStats struct {
+	Hits      int64 `json:"hits"`
+	Misses    int64 `json:"misses"`
+	Coalesced int64 `json:"coalesced"`
+	Bypassed  int64 `json:"bypassed"`
+	Evictions int64 `json:"evictions"`
+	Entries   int   `json:"entries"`
+	Bytes     int64 `json:"bytes"`
+	MaxBytes  int64 `json:"max_bytes"`
+}
+
+type cacheEntry struct {
+	key     string
+	body    []byte
+	expires time.Time // zero이면 만료 없음
+}
+
+// ResponseCache는 바이트 예산으로 축출하는 TTL/LRU 응답 캐시입니다.
+type ResponseCache struct {
+	cfg CacheConfig
+
+	mu    sync.Mutex
+	ll    *list.List
+	items map[string]*list.Element
+	bytes int64
+	stats CacheStats
+}
+
+// NewResponseCache는 주어진 설정으로 빈 캐시를 생성합니다.
+func NewResponseCache(cfg CacheConfig) *ResponseCache {
+	return &ResponseCache{
+		cfg:   cfg,
+		ll:    list.New(),
+		items: make(map[string]*list.Element),
+	}
+}
+
+// CacheKey는 엔드포인트 경로와 정규화된 쿼리 파라미터로 캐시 키를 만듭니다.
+// 값의 앞뒤 공백을 제거하고 빈 값은 버리며, 키는 정렬된 순서로 인코딩됩니다.
+func CacheKey(path string, query url.Values) string {
+	normalized := make(url.Values, len(query))
+	for k, vs := range query {
+		for _, v := range vs {
+			v = strings.TrimSpace(v)
+			if v != "" {
+				normalized.Add(k, v)
+			}
+		}
+	}
+	return path + "?" + normalized.Encode()
+}
+
+// ttl은 경로의 TTL과 캐시 가능 여부를 반환합니다.
+func (c *ResponseCache) ttl(path string) (time.Duration, bool) {
+	if c.cfg.MaxBytes <= 0 {
+		return 0, false
+	}
+	ttl, ok := c.cfg.TTLs[path]
+	if !ok {
+		ttl = c.cfg.DefaultTTL
+	}
+	return ttl, ttl >= 0
+}
+
+// Get은 만료되지 않은 캐시 항목을 반환합니다.
+func (c *ResponseCache) Get(key string) ([]byte, bool) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	el, ok := c.items[key]
+	if !ok {
+		c.stats.Misses++
+		return nil, false
+	}
+	e := el.Value.(*cacheEntry)
+	if !e.expires.IsZero() && time.Now().After(e.expires) {
+		c.removeElement(el)
+		c.stats.Misses++
+		return nil, false
+	}
+	c.ll.MoveToFront(el)
+	c.stats.Hits++
+	return e.body, true
+}
+
+// Set은 path의 TTL로 응답 본문을 저장하고, 예산을 넘으면 오래된 항목부터 축출합니다.
+func (c *ResponseCache) Set(path, key string, body []byte) {
+	ttl, ok := c.ttl(path)
+	if !ok || int64(len(body)) > c.cfg.MaxBytes {
+		return
+	}
+	var expires time.Time
+	if ttl > 0 {
+		expires = time.Now().Add(ttl)
+	}
+
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if el, ok := c.items[key]; ok {
+		c.removeElement(el)
+	}
+	el := c.ll.PushFront(&cacheEntry{key: key, body: body, expires: expires})
+	c.items[key] = el
+	c.bytes += entrySize(key, body)
+
+	for c.bytes > c.cfg.MaxBytes {
+		oldest := c.ll.Back()
+		if oldest == nil {
+			break
+		}
+		c.removeElement(oldest)
+		c.stats.Evictions++
+	}
+}
+
+func (c *ResponseCache) removeElement(el *list.Element) {
+	e := c.ll.Remove(el).(*cacheEntry)
+	delete(c.items, e.key)
+	c.bytes -= entrySize(e.key, e.body)
+}
+
+func entrySize(key string, body []byte) int64 {
+	return int64(len(key) + len(body))
+}
+
+// Stats는 현재 캐시 통계를 반환합니다.
+func (c *ResponseCache) Stats() CacheStats {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	s := c.stats
+	s.Entries = c.ll.Len()
+	s.Bytes = c.bytes
+	s.MaxBytes = c.cfg.MaxBytes
+	return s
+}
+
+func (c *ResponseCache) countCoalesced() {
+	c.mu.Lock()
+	c.stats.Coalesced++
+	c.mu.Unlock()
+}
+
+func (c *ResponseCache) countBypassed() {
+	c.mu.Lock()
+	c.stats.Bypassed++
+	c.mu.Unlock()
+}
+
+// cacheBypassed는 클라이언트가 캐시 조회를 건너뛰도록 요청했는지 확인합니다.
+// `X-Cache-Bypass: 1` 또는 `Cache-Control: no-cache`를 지원합니다.
+func cacheBypassed(r *http.Request) bool {
+	if v := r.Header.Get("X-Cache-Bypass"); v != "" && v != "0" && !strings.EqualFold(v, "false") {
+		return true
+	}
+	return strings.Contains(strings.ToLower(r.Header.Get("Cache-Control")), "no-cache")
+}
+
+// CacheStatsHandler는 응답 캐시 통계를 JSON으로 반환합니다.
+func (h *ApiHandler) CacheStatsHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(h.Cache.Stats())
+}
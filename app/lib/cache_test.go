@@ -0,0 +1,174 @@
+package lib
+
+import (
+	"net/http"
+	"net/http/httptest"
+	"net/url"
+	"strings"
+	"sync"
+	"testing"
+	"time"
+
+	"korean-map-mcp/internal/kakaomock"
+)
+
+func TestCacheKey(t *testing.T) {
+	const path = "/v2/local/search/keyword.json"
+	a := CacheKey(path, url.Values{"query": {" 카페 "}, "page": {"2"}, "x": {""}})
+	b := CacheKey(path, url.Values{"page": {"2"}, "query": {"카페"}})
+	if a != b {
+		t.Errorf("CacheKey not normalized: %q != %q", a, b)
+	}
+	if want := path + "?page=2&query=%EC%B9%B4%ED%8E%98"; a != want {
+		t.Errorf("CacheKey = %q, want %q", a, want)
+	}
+	if CacheKey(path, url.Values{"query": {"카페"}}) == CacheKey(categorySearchPath, url.Values{"query": {"카페"}}) {
+		t.Error("CacheKey ignores the path")
+	}
+}
+
+func TestResponseCacheEviction(t *testing.T) {
+	const path = "/v2/local/search/address.json"
+	body := []byte(strings.Repeat("x", 90))
+	// 항목 하나는 키 10바이트 + 본문 90바이트 = 100바이트이므로 세 개까지 들어갑니다.
+	c := NewResponseCache(CacheConfig{MaxBytes: 300, DefaultTTL: time.Hour})
+	for _, k := range []string{"key-000001", "key-000002", "key-000003"} {
+		c.Set(path, k, body)
+	}
+	// 방금 읽은 항목은 최근에 쓴 것으로 올라가므로, 넘칠 때는 두 번째 항목이 먼저 나갑니다.
+	if _, ok := c.Get("key-000001"); !ok {
+		t.Fatal("key-000001 missing before eviction")
+	}
+	c.Set(path, "key-000004", body)
+	for k, want := range map[string]bool{"key-000001": true, "key-000002": false, "key-000003": true, "key-000004": true} {
+		if _, ok := c.Get(k); ok != want {
+			t.Errorf("Get(%s) = %v, want %v", k, ok, want)
+		}
+	}
+	if s := c.Stats(); s.Entries != 3 || s.Bytes != 300 || s.Evictions != 1 {
+		t.Errorf("stats = %+v, want 3 entries, 300 bytes, 1 eviction", s)
+	}
+
+	// 같은 키를 다시 쓰면 크기를 두 번 세지 않습니다.
+	c.Set(path, "key-000004", body)
+	if s := c.Stats(); s.Bytes != 300 || s.Evictions != 1 {
+		t.Errorf("after overwrite stats = %+v", s)
+	}
+	// 예산보다 큰 본문은 저장하지 않고 다른 항목도 밀어내지 않습니다.
+	c.Set(path, "huge", []byte(strings.Repeat("x", 301)))
+	if _, ok := c.Get("huge"); ok || c.Stats().Entries != 3 {
+		t.Error("oversized body was cached or evicted other entries")
+	}
+
+	disabled := NewResponseCache(CacheConfig{MaxBytes: 0})
+	disabled.Set(path, "k", body)
+	if _, ok := disabled.Get("k"); ok {
+		t.Error("cache with CACHE_MAX_BYTES=0 stored a body")
+	}
+}
+
+func TestResponseCacheTTL(t *testing.T) {
+	const short, forever, never = "/short", "/forever", "/never"
+	c := NewResponseCache(CacheConfig{
+		MaxBytes:   1 << 20,
+		DefaultTTL: time.Hour,
+		TTLs:       map[string]time.Duration{short: time.Millisecond, forever: 0, never: -1},
+	})
+	for _, p := range []string{short, forever, never, "/default"} {
+		c.Set(p, p, []byte(`{}`))
+	}
+	time.Sleep(20 * time.Millisecond)
+	for p, want := range map[string]bool{short: false, forever: true, never: false, "/default": true} {
+		if _, ok := c.Get(p); ok != want {
+			t.Errorf("Get(%s) after 20ms = %v, want %v", p, ok, want)
+		}
+	}
+	// 만료된 항목은 읽을 때 지워집니다.
+	if s := c.Stats(); s.Entries != 2 {
+		t.Errorf("entries = %d, want 2", s.Entries)
+	}
+}
+
+func TestCacheBypassed(t *testing.T) {
+	for _, c := range []struct {
+		header, value string
+		want          bool
+	}{
+		{"", "", false},
+		{"X-Cache-Bypass", "1", true},
+		{"X-Cache-Bypass", "0", false},
+		{"X-Cache-Bypass", "FALSE", false},
+		{"Cache-Control", "No-Cache", true},
+		{"Cache-Control", "max-age=0", false},
+	} {
+		r := httptest.NewRequest(http.MethodGet, "/search/keyword?query=a", nil)
+		if c.header != "" {
+			r.Header.Set(c.header, c.value)
+		}
+		if got := cacheBypassed(r); got != c.want {
+			t.Errorf("%s: %q -> %v, want %v", c.header, c.value, got, c.want)
+		}
+	}
+}
+
+func mockRequests(mock *kakaomock.Server, endpoint string) int64 {
+	for _, s := range mock.Stats() {
+		if s.Endpoint == endpoint {
+			return s.Requests
+		}
+	}
+	return 0
+}
+
+// TestFetchCoalesced는 같은 요청 N개가 동시에 들어오면 업스트림 호출이 한 번만 나가는지 확인합니다.
+func TestFetchCoalesced(t *testing.T) {
+	h, mock := newMockHandlerWith(t, kakaomock.Config{Latency: 100 * time.Millisecond}, "67108864")
+	serve := func(header ...string) *httptest.ResponseRecorder {
+		r := httptest.NewRequest(http.MethodGet, "/search/keyword?query=%EC%B9%B4%ED%8E%98", nil)
+		for i := 0; i+1 < len(header); i += 2 {
+			r.Header.Set(header[i], header[i+1])
+		}
+		w := httptest.NewRecorder()
+		h.KeywordHandler(w, r)
+		if w.Code != http.StatusOK {
+			t.Errorf("status = %d: %s", w.Code, w.Body)
+		}
+		return w
+	}
+
+	const n = 16
+	statuses := make(chan string, n)
+	var wg sync.WaitGroup
+	for i := 0; i < n; i++ {
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			statuses <- serve().Header().Get("X-Cache")
+		}()
+	}
+	wg.Wait()
+	close(statuses)
+	count := map[string]int{}
+	for s := range statuses {
+		count[s]++
+	}
+	if got := mockRequests(mock, "keyword"); got != 1 {
+		t.Fatalf("upstream calls = %d for %d identical requests, want 1", got, n)
+	}
+	if count[cacheMiss] != 1 || count[cacheMiss]+count[cacheCoalesced]+count[cacheHit] != n {
+		t.Errorf("X-Cache = %v, want one MISS and the rest COALESCED or HIT", count)
+	}
+
+	if got := serve().Header().Get("X-Cache"); got != cacheHit {
+		t.Errorf("X-Cache after fill = %q, want HIT", got)
+	}
+	if got := serve("Cache-Control", "no-cache").Header().Get("X-Cache"); got != cacheBypass {
+		t.Errorf("X-Cache with no-cache = %q, want BYPASS", got)
+	}
+	if got := mockRequests(mock, "keyword"); got != 2 {
+		t.Errorf("upstream calls = %d, want 2 after a bypass", got)
+	}
+	if s := h.Cache.Stats(); s.Bypassed != 1 || s.Coalesced != int64(count[cacheCoalesced]) {
+		t.Errorf("cache stats = %+v", s)
+	}
+}
@@ -0,0 +1,248 @@
+package lib
+
+import (
+	"container/list"
+	"context"
+	"encoding/json"
+	"net/http"
+	"net/url"
+	"strconv"
+	"strings"
+	"sync"
+	"time"
+)
+
+// 응답의 X-Cache 헤더 값 (셀 캐시)
+const (
+	cacheCell         = "CELL"
+	cacheCellNeighbor = "CELL-NEIGHBOR"
+)
+
+// CellEndpointConfig는 역지오코딩 엔드포인트 하나의 셀 캐시 설정입니다.
+type CellEndpointConfig struct {
+	// Precision은 geohash 글자 수입니다. 클수록 셀이 작아집니다.
+	Precision int
+	// NeighborRadius는 이웃 셀의 캐시 항목을 재사용할 수 있는 최대 거리(m)입니다. 0이면 이웃 셀을 보지 않습니다.
+	NeighborRadius float64
+	TTL            time.Duration
+}
+
+// CellCacheConfig는 좌표를 공간 셀로 양자화해 캐시하는 역지오코딩 캐시 설정입니다.
+type CellCacheConfig struct {
+	MaxEntries int
+	Endpoints  map[string]CellEndpointConfig
+}
+
+// LoadCellCacheConfig는 환경 변수에서 셀 캐시 설정을 읽습니다.
+//
+//	CELL_CACHE_MAX_ENTRIES                  보관할 최대 셀 수 (기본 200000, 0이면 비활성화)
+//	CELL_PRECISION_COORD2ADDRESS            /geo/coord2address geohash 정밀도 (기본 9, 약 4.8m)
+//	CELL_NEIGHBOR_RADIUS_COORD2ADDRESS      이웃 셀 재사용 거리(m) (기본 3)
+//	CELL_TTL_COORD2ADDRESS                  (기본 24h)
+//	CELL_PRECISION_COORD2REGIONCODE         /geo/coord2regioncode geohash 정밀도 (기본 7, 약 150m)
+//	CELL_NEIGHBOR_RADIUS_COORD2REGIONCODE   이웃 셀 재사용 거리(m) (기본 50)
+//	CELL_TTL_COORD2REGIONCODE               (기본 24h)
+func LoadCellCacheConfig() CellCacheConfig {
+	return CellCacheConfig{
+		MaxEntries: envInt("CELL_CACHE_MAX_ENTRIES", 200000),
+		Endpoints: map[string]CellEndpointConfig{
+			"/v2/local/geo/coord2address.json": {
+				Precision:      envInt("CELL_PRECISION_COORD2ADDRESS", 9),
+				NeighborRadius: float64(envInt("CELL_NEIGHBOR_RADIUS_COORD2ADDRESS", 3)),
+				TTL:            envDuration("CELL_TTL_COORD2ADDRESS", 24*time.Hour),
+			},
+			"/v2/local/geo/coord2regioncode.json": {
+				Precision:      envInt("CELL_PRECISION_COORD2REGIONCODE", 7),
+				NeighborRadius: float64(envInt("CELL_NEIGHBOR_RADIUS_COORD2REGIONCODE", 50)),
+				TTL:            envDuration("CELL_TTL_COORD2REGIONCODE", 24*time.Hour),
+			},
+		},
+	}
+}
+
+// CellCacheStats는 셀 캐시의 현재 상태입니다.
+type CellCacheStats struct {
+	Hits         int64 `json:"hits"`
+	NeighborHits int64 `json:"neighbor_hits"`
+	Misses       int64 `json:"misses"`
+	Evictions    int64 `json:"evictions"`
+	Entries      int   `json:"entries"`
+	MaxEntries   int   `json:"max_entries"`
+}
+
+// cellQuery는 셀 캐시 조회에 필요한, 요청에서 추출한 값입니다.
+type cellQuery struct {
+	scope    string // 경로 + 좌표 이외의 정규화된 파라미터
+	cell     string
+	lon, lat float64
+	cfg      CellEndpointConfig
+}
+
+type cellEntry struct {
+	key      string
+	lon, lat float64 // 이 셀에 처음 저장된 요청 좌표
+	body     []byte
+	expires  time.Time
+}
+
+// CellCache는 geohash 셀 단위로 역지오코딩 응답을 재사용하는 캐시입니다.
+// 셀 → 항목 해시 격자가 공간 인덱스 역할을 하므로 이웃 셀도 바로 찾을 수 있습니다.
+type CellCache struct {
+	cfg CellCacheConfig
+
+	mu    sync.Mutex
+	ll    *list.List
+	items map[string]*list.Element
+	stats CellCacheStats
+}
+
+// NewCellCache는 주어진 설정으로 빈 셀 캐시를 생성합니다.
+func NewCellCache(cfg CellCacheConfig) *CellCache {
+	return &CellCache{cfg: cfg, ll: list.New(), items: make(map[string]*list.Element)}
+}
+
+// query는 요청 파라미터에서 셀 캐시 조회 정보를 만듭니다. 셀 캐시 대상이 아니거나
+// 좌표를 해석할 수 없으면 false를 반환합니다. input_coord가 WGS84가 아니면 로컬에서 변환합니다.
+func (c *CellCache) query(path string, q url.Values) (cellQuery, bool) {
+	cfg, ok := c.cfg.Endpoints[path]
+	if !ok || c.cfg.MaxEntries <= 0 || cfg.Precision <= 0 {
+		return cellQuery{}, false
+	}
+	x, errX := strconv.ParseFloat(q.Get("x"), 64)
+	y, errY := strconv.ParseFloat(q.Get("y"), 64)
+	if errX != nil || errY != nil {
+		return cellQuery{}, false
+	}
+	lon, lat := x, y
+	if in := q.Get("input_coord"); in != "" && !strings.EqualFold(in, "WGS84") {
+		var err error
+		if lon, lat, err = TransformCoord(x, y, in, "WGS84"); err != nil {
+			return cellQuery{}, false
+		}
+	}
+
+	rest := make(url.Values, len(q))
+	for k, vs := range q {
+		if k != "x" && k != "y" && k != "input_coord" {
+			rest[k] = vs
+		}
+	}
+	return cellQuery{
+		scope: CacheKey(path, rest),
+		cell:  geohashEncode(lon, lat, cfg.Precision),
+		lon:   lon,
+		lat:   lat,
+		cfg:   cfg,
+	}, true
+}
+
+// Get은 같은 셀의 항목을 찾고, 없으면 NeighborRadius 안에 저장된 좌표가 있는 이웃 셀의 항목을 찾습니다.
+func (c *CellCache) Get(cq cellQuery) ([]byte, string, bool) {
+	now := time.Now()
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	if e, ok := c.lookupLocked(cq.scope+"#"+cq.cell, now); ok {
+		c.stats.Hits++
+		return e.body, cacheCell, true
+	}
+	if cq.cfg.NeighborRadius > 0 {
+		for _, n := range geohashNeighbors(cq.cell) {
+			e, ok := c.lookupLocked(cq.scope+"#"+n, now)
+			if ok && haversineMeters(cq.lon, cq.lat, e.lon, e.lat) <= cq.cfg.NeighborRadius {
+				c.stats.NeighborHits++
+				return e.body, cacheCellNeighbor, true
+			}
+		}
+	}
+	c.stats.Misses++
+	return nil, "", false
+}
+
+func (c *CellCache) lookupLocked(key string, now time.Time) (*cellEntry, bool) {
+	el, ok := c.items[key]
+	if !ok {
+		return nil, false
+	}
+	e := el.Value.(*cellEntry)
+	if !e.expires.IsZero() && now.After(e.expires) {
+		c.ll.Remove(el)
+		delete(c.items, key)
+		return nil, false
+	}
+	c.ll.MoveToFront(el)
+	return e, true
+}
+
+// Set은 셀에 응답을 저장합니다. 이미 저장된 셀은 덮어쓰지 않습니다.
+func (c *CellCache) Set(cq cellQuery, body []byte) {
+	key := cq.scope + "#" + cq.cell
+	var expires time.Time
+	if cq.cfg.TTL > 0 {
+		expires = time.Now().Add(cq.cfg.TTL)
+	}
+
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	if _, ok := c.items[key]; ok {
+		return
+	}
+	c.items[key] = c.ll.PushFront(&cellEntry{key: key, lon: cq.lon, lat: cq.lat, body: body, expires: expires})
+	for c.ll.Len() > c.cfg.MaxEntries {
+		oldest := c.ll.Back()
+		c.ll.Remove(oldest)
+		delete(c.items, oldest.Value.(*cellEntry).key)
+		c.stats.Evictions++
+	}
+}
+
+// Stats는 현재 셀 캐시 통계를 반환합니다.
+func (c *CellCache) Stats() CellCacheStats {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	s := c.stats
+	s.Entries = c.ll.Len()
+	s.MaxEntries = c.cfg.MaxEntries
+	return s
+}
+
+// proxyCellCached는 셀 캐시를 먼저 확인하고, 없으면 일반 프록시 경로로 조회한 뒤 셀에 저장합니다.
+func (h *ApiHandler) proxyCellCached(w http.ResponseWriter, r *http.Request, path string) {
+	r, err := withProjection(r)
+	if err != nil {
+		http.Error(w, err.Error(), http.StatusBadRequest)
+		return
+	}
+	if cacheBypassed(r) {
+		h.ProxyKakaoRequestStream(w, r, path)
+		return
+	}
+	res, cacheStatus, err := h.fetchCell(requestContext(r), path, r.URL.Query())
+	if err != nil {
+		h.writeError(w, err)
+		return
+	}
+	h.writeResult(w, r, res, cacheStatus)
+}
+
+// fetchCell은 셀 캐시 대상 요청이면 셀 캐시를 거쳐, 아니면 fetch로 바로 조회합니다.
+func (h *ApiHandler) fetchCell(ctx context.Context, path string, query url.Values) (*upstreamResult, string, error) {
+	cq, ok := h.Cells.query(path, query)
+	if !ok {
+		return h.fetch(ctx, path, query, false)
+	}
+	if body, status, ok := h.Cells.Get(cq); ok {
+		return &upstreamResult{Status: http.StatusOK, Body: body}, status, nil
+	}
+	res, cacheStatus, err := h.fetch(ctx, path, query, false)
+	if err == nil && res.Status == http.StatusOK {
+		h.Cells.Set(cq, res.Body)
+	}
+	return res, cacheStatus, err
+}
+
+// CellCacheStatsHandler는 셀 캐시 통계를 JSON으로 반환합니다.
+func (h *ApiHandler) CellCacheStatsHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(h.Cells.Stats())
+}
@@ -0,0 +1,64 @@
+package lib
+
+import (
+	"log/slog"
+	"os"
+	"strconv"
+	"time"
+)
+
+// envInt는 환경 변수를 정수로 읽고, 비어 있거나 잘못된 경우 기본값을 반환합니다.
+func envInt(name string, def int) int {
+	v := os.Getenv(name)
+	if v == "" {
+		return def
+	}
+	n, err := strconv.Atoi(v)
+	if err != nil {
+		slog.Warn("Invalid integer env, using default", "name", name, "value", v, "default", def)
+		return def
+	}
+	return n
+}
+
+// envDuration은 환경 변수를 time.Duration("5s", "500ms" 등)으로 읽습니다.
+func envDuration(name string, def time.Duration) time.Duration {
+	v := os.Getenv(name)
+	if v == "" {
+		return def
+	}
+	d, err := time.ParseDuration(v)
+	if err != nil {
+		slog.Warn("Invalid duration env, using default", "name", name, "value", v, "default", def)
+		return def
+	}
+	return d
+}
+
+// envBool은 환경 변수를 bool("1", "true", "false" 등)로 읽습니다.
+func envBool(name string, def bool) bool {
+	v := os.Getenv(name)
+	if v == "" {
+		return def
+	}
+	b, err := strconv.ParseBool(v)
+	if err != nil {
+		slog.Warn("Invalid bool env, using default", "name", name, "value", v, "default", def)
+		return def
+	}
+	return b
+}
+
+// envFloat는 환경 변수를 실수로 읽습니다.
+func envFloat(name string, def float64) float64 {
+	v := os.Getenv(name)
+	if v == "" {
+		return def
+	}
+	f, err := strconv.ParseFloat(v, 64)
+	if err != nil {
+		slog.Warn("Invalid float env, using default", "name", name, "value", v, "default", def)
+		return def
+	}
+	return f
+}
@@ -0,0 +1,185 @@
+package lib
+
+import (
+	"fmt"
+	"math"
+	"strings"
+)
+
+// 이 파일은 Kakao transcoord API가 지원하는 좌표계 변환을 로컬에서 계산합니다.
+// 투영식은 3차 Krüger 급수를 사용하며 한반도 범위에서 PROJ와 1 mm 이내로 일치합니다.
+// Bessel 기반 좌표계(TM, KTM, UTM, BESSEL, CONGNAMUL)는 7-파라미터 Helmert 변환으로
+// WGS84와 연결되며, Kakao가 사용하는 파라미터가 공개되어 있지 않으므로 API 결과와
+// 최대 1 m 정도 차이가 날 수 있습니다. example/langchain/kakao_proj.py와 같은 정의를 사용합니다.
+
+type ellipsoid struct {
+	a, f float64
+}
+
+var (
+	ellpsGRS80  = ellipsoid{6378137.0, 1 / 298.257222101}
+	ellpsBessel = ellipsoid{6377397.155, 1 / 299.1528128}
+)
+
+// besselToWGS84는 Bessel(Tokyo) -> WGS84 position vector Helmert 파라미터입니다.
+// (tx, ty, tz [m], rx, ry, rz [arc-second], s [ppm])
+var besselToWGS84 = [7]float64{-115.80, 474.99, 674.11, 1.16, -2.31, -1.63, 6.43}
+
+const arcsec = math.Pi / (180 * 3600)
+
+// projection은 데이텀 타원체 위의 경위도(라디안)와 좌표계 값 사이를 변환합니다.
+type projection interface {
+	forward(lon, lat float64) (x, y float64)
+	inverse(x, y float64) (lon, lat float64)
+}
+
+type geographic struct{}
+
+func (geographic) forward(lon, lat float64) (float64, float64) {
+	return lon * 180 / math.Pi, lat * 180 / math.Pi
+}
+
+func (geographic) inverse(x, y float64) (float64, float64) {
+	return x * math.Pi / 180, y * math.Pi / 180
+}
+
+// transverseMercator는 Krüger n-급수로 계산하는 횡메르카토르 투영입니다.
+type transverseMercator struct {
+	lon0, k0, x0, y0, scale float64
+	e, A, xi0               float64
+	alpha, beta, delta      [3]float64
+}
+
+func newTransverseMercator(el ellipsoid, lat0, lon0, k0, x0, y0, scale float64) *transverseMercator {
+	n := el.f / (2 - el.f)
+	n2, n3 := n*n, n*n*n
+	tm := &transverseMercator{
+		lon0:  lon0 * math.Pi / 180,
+		k0:    k0,
+		x0:    x0,
+		y0:    y0,
+		scale: scale,
+		e:     2 * math.Sqrt(n) / (1 + n),
+		A:     el.a / (1 + n) * (1 + n2/4 + n2*n2/64),
+		alpha: [3]float64{n/2 - 2*n2/3 + 5*n3/16, 13*n2/48 - 3*n3/5, 61 * n3 / 240},
+		beta:  [3]float64{n/2 - 2*n2/3 + 37*n3/96, n2/48 + n3/15, 17 * n3 / 480},
+		delta: [3]float64{2*n - 2*n2/3 - 2*n3, 7*n2/3 - 8*n3/5, 56 * n3 / 15},
+	}
+	tm.xi0, _ = tm.xiEta(lat0*math.Pi/180, 0)
+	return tm
+}
+
+func (tm *transverseMercator) xiEta(lat, dlon float64) (float64, float64) {
+	sinLat := math.Sin(lat)
+	t := math.Sinh(math.Atanh(sinLat) - tm.e*math.Atanh(tm.e*sinLat))
+	xiP := math.Atan2(t, math.Cos(dlon))
+	etaP := math.Atanh(math.Sin(dlon) / math.Sqrt(1+t*t))
+	xi, eta := xiP, etaP
+	for j, a := range tm.alpha {
+		k := float64(2 * (j + 1))
+		xi += a * math.Sin(k*xiP) * math.Cosh(k*etaP)
+		eta += a * math.Cos(k*xiP) * math.Sinh(k*etaP)
+	}
+	return xi, eta
+}
+
+func (tm *transverseMercator) forward(lon, lat float64) (float64, float64) {
+	xi, eta := tm.xiEta(lat, lon-tm.lon0)
+	x := tm.x0 + tm.k0*tm.A*eta
+	y := tm.y0 + tm.k0*tm.A*(xi-tm.xi0)
+	return x * tm.scale, y * tm.scale
+}
+
+func (tm *transverseMercator) inverse(x, y float64) (float64, float64) {
+	xi := (y/tm.scale-tm.y0)/(tm.k0*tm.A) + tm.xi0
+	eta := (x/tm.scale - tm.x0) / (tm.k0 * tm.A)
+	xiP, etaP := xi, eta
+	for j, b := range tm.beta {
+		k := float64(2 * (j + 1))
+		xiP -= b * math.Sin(k*xi) * math.Cosh(k*eta)
+		etaP -= b * math.Cos(k*xi) * math.Sinh(k*eta)
+	}
+	chi := math.Asin(math.Sin(xiP) / math.Cosh(etaP))
+	lat := chi
+	for j, d := range tm.delta {
+		lat += d * math.Sin(float64(2*(j+1))*chi)
+	}
+	lon := tm.lon0 + math.Atan2(math.Sinh(etaP), math.Cos(xiP))
+	return lon, lat
+}
+
+type coordSystem struct {
+	proj  projection
+	datum ellipsoid
+}
+
+var coordSystems = func() map[string]coordSystem {
+	tmLon0 := 127 + 10.405/3600
+	m := map[string]coordSystem{
+		"WGS84":      {geographic{}, ellpsGRS80},
+		"BESSEL":     {geographic{}, ellpsBessel},
+		"WTM":        {newTransverseMercator(ellpsGRS80, 38, 127, 1, 200000, 500000, 1), ellpsGRS80},
+		"TM":         {newTransverseMercator(ellpsBessel, 38, tmLon0, 1, 200000, 500000, 1), ellpsBessel},
+		"WKTM":       {newTransverseMercator(ellpsGRS80, 38, 128, 0.9999, 400000, 600000, 1), ellpsGRS80},
+		"KTM":        {newTransverseMercator(ellpsBessel, 38, 128, 0.9999, 400000, 600000, 1), ellpsBessel},
+		"WUTM":       {newTransverseMercator(ellpsGRS80, 38, 127.5, 0.9996, 1000000, 2000000, 1), ellpsGRS80},
+		"UTM":        {newTransverseMercator(ellpsBessel, 38, 127.5, 0.9996, 1000000, 2000000, 1), ellpsBessel},
+		"WCONGNAMUL": {newTransverseMercator(ellpsGRS80, 38, 127, 1, 200000, 500000, 2.5), ellpsGRS80},
+		"CONGNAMUL":  {newTransverseMercator(ellpsBessel, 38, tmLon0, 1, 200000, 500000, 2.5), ellpsBessel},
+	}
+	m["UTMK"] = m["WUTM"]
+	return m
+}()
+
+// TransformCoord는 Kakao 좌표계 이름(WGS84, WTM, TM, KTM, UTM, WCONGNAMUL 등) 사이에서
+// 좌표를 변환합니다. 경위도 좌표계는 경도/위도(도) 순서입니다.
+func TransformCoord(x, y float64, inputCoord, outputCoord string) (float64, float64, error) {
+	src, ok := coordSystems[strings.ToUpper(inputCoord)]
+	if !ok {
+		return 0, 0, fmt.Errorf("unsupported coordinate system: %s", inputCoord)
+	}
+	dst, ok := coordSystems[strings.ToUpper(outputCoord)]
+	if !ok {
+		return 0, 0, fmt.Errorf("unsupported coordinate system: %s", outputCoord)
+	}
+
+	lon, lat := src.proj.inverse(x, y)
+	if src.datum != dst.datum {
+		X, Y, Z := toECEF(lon, lat, src.datum)
+		X, Y, Z = helmert(X, Y, Z, besselToWGS84, src.datum == ellpsGRS80)
+		lon, lat = fromECEF(X, Y, Z, dst.datum)
+	}
+	x, y = dst.proj.forward(lon, lat)
+	return x, y, nil
+}
+
+func toECEF(lon, lat float64, el ellipsoid) (float64, float64, float64) {
+	e2 := el.f * (2 - el.f)
+	sinLat := math.Sin(lat)
+	n := el.a / math.Sqrt(1-e2*sinLat*sinLat)
+	return n * math.Cos(lat) * math.Cos(lon), n * math.Cos(lat) * math.Sin(lon), n * (1 - e2) * sinLat
+}
+
+func fromECEF(X, Y, Z float64, el ellipsoid) (float64, float64) {
+	e2 := el.f * (2 - el.f)
+	p := math.Hypot(X, Y)
+	lat := math.Atan2(Z, p*(1-e2))
+	for i := 0; i < 4; i++ {
+		sinLat := math.Sin(lat)
+		n := el.a / math.Sqrt(1-e2*sinLat*sinLat)
+		lat = math.Atan2(Z+e2*n*sinLat, p)
+	}
+	return math.Atan2(Y, X), lat
+}
+
+func helmert(X, Y, Z float64, p [7]float64, inverse bool) (float64, float64, float64) {
+	rx, ry, rz, s := p[3]*arcsec, p[4]*arcsec, p[5]*arcsec, p[6]*1e-6
+	if inverse {
+		// 회전/축척이 매우 작으므로 부호를 바꾼 역변환으로 충분합니다 (오차 < 1 mm).
+		X, Y, Z = X-p[0], Y-p[1], Z-p[2]
+		m := 1 - s
+		return m * (X + rz*Y - ry*Z), m * (-rz*X + Y + rx*Z), m * (ry*X - rx*Y + Z)
+	}
+	m := 1 + s
+	return p[0] + m*(X-rz*Y+ry*Z), p[1] + m*(rz*X+Y-rx*Z), p[2] + m*(-ry*X+rx*Y+Z)
+}
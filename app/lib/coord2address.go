@@ -5,6 +5,7 @@ import "net/http"
 // ### 3. 좌표로 주소 변환
 //
 // 좌표를 이용해 지번 주소와 도로명 주소 정보를 얻는 API입니다.
+// 응답은 좌표가 속한 geohash 셀 단위로 캐시되어, 같은 셀 안의 다른 좌표에도 재사용됩니다.
 func (h *ApiHandler) Coord2AddressHandler(w http.ResponseWriter, r *http.Request) {
-	h.ProxyKakaoRequestStream(w, r, "/v2/local/geo/coord2address.json")
+	h.proxyCellCached(w, r, "/v2/local/geo/coord2address.json")
 }
@@ -5,6 +5,10 @@ import "net/http"
 // ### 2. 좌표로 행정구역정보 변환
 //
 // 좌표를 이용해 행정동 및 법정동 정보를 얻는 API입니다.
+// REGION_BOUNDARY_FILES로 법정동(B)과 행정동(H) 경계 파일을 지정하면 업스트림 없이 로컬 인덱스에서 답합니다.
+// 로컬 응답의 x/y는 Kakao처럼 요청 좌표가 아닌 각 영역의 대표점이며, 두 종류 중 하나라도 찾지 못하면
+// 업스트림으로 넘깁니다.
+// 그 외에는 좌표가 속한 geohash 셀 단위로 캐시되어, 같은 셀 안의 다른 좌표에도 재사용됩니다.
 func (h *ApiHandler) Coord2RegionCodeHandler(w http.ResponseWriter, r *http.Request) {
-	h.ProxyKakaoRequestStream(w, r, "/v2/local/geo/coord2regioncode.json")
+	h.proxyLocalFirst(w, r, "/v2/local/geo/coord2regioncode.json")
 }
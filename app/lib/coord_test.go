@@ -0,0 +1,71 @@
+package lib
+
+import (
+	"encoding/json"
+	"math"
+	"os"
+	"testing"
+)
+
+// coordGoldenPath는 Python kakao_proj와 함께 쓰는 기대값 파일입니다. 두 구현이 같은 투영 파라미터를
+// 쓰는지 이 파일 하나로 확인합니다.
+const coordGoldenPath = "../../example/langchain/tests/kakao_proj_golden.json"
+
+type coordGoldenCase struct {
+	Name        string  `json:"name"`
+	InputCoord  string  `json:"input_coord"`
+	OutputCoord string  `json:"output_coord"`
+	X           float64 `json:"x"`
+	Y           float64 `json:"y"`
+	ExpectedX   float64 `json:"expected_x"`
+	ExpectedY   float64 `json:"expected_y"`
+	Tolerance   float64 `json:"tolerance"`
+}
+
+func TestTransformCoordGolden(t *testing.T) {
+	raw, err := os.ReadFile(coordGoldenPath)
+	if err != nil {
+		t.Fatal(err)
+	}
+	var golden struct {
+		Cases []coordGoldenCase `json:"cases"`
+	}
+	if err := json.Unmarshal(raw, &golden); err != nil {
+		t.Fatal(err)
+	}
+	if len(golden.Cases) == 0 {
+		t.Fatal("no golden cases")
+	}
+	for _, c := range golden.Cases {
+		x, y, err := TransformCoord(c.X, c.Y, c.InputCoord, c.OutputCoord)
+		if err != nil {
+			t.Errorf("%s %s->%s: %v", c.Name, c.InputCoord, c.OutputCoord, err)
+			continue
+		}
+		if math.Abs(x-c.ExpectedX) > c.Tolerance || math.Abs(y-c.ExpectedY) > c.Tolerance {
+			t.Errorf("%s %s->%s: got (%.9f, %.9f), want (%.9f, %.9f) ± %g",
+				c.Name, c.InputCoord, c.OutputCoord, x, y, c.ExpectedX, c.ExpectedY, c.Tolerance)
+		}
+	}
+}
+
+func TestTransformCoordRoundTrip(t *testing.T) {
+	for system := range coordSystems {
+		for _, p := range [][2]float64{{124.6, 33.1}, {126.9779692, 37.5662952}, {129.3, 35.5}, {131.8, 38.5}} {
+			x, y, err := TransformCoord(p[0], p[1], "WGS84", system)
+			if err != nil {
+				t.Fatalf("%s: %v", system, err)
+			}
+			lon, lat, err := TransformCoord(x, y, system, "wgs84")
+			if err != nil {
+				t.Fatalf("%s: %v", system, err)
+			}
+			if math.Abs(lon-p[0]) > 1e-7 || math.Abs(lat-p[1]) > 1e-7 {
+				t.Errorf("%s round trip of %v = (%v, %v)", system, p, lon, lat)
+			}
+		}
+	}
+	if _, _, err := TransformCoord(127, 37, "WGS84", "EPSG:4326"); err == nil {
+		t.Error("unknown coordinate system accepted")
+	}
+}
@@ -0,0 +1,27 @@
+package lib
+
+import "strings"
+
+// endpointPaths는 MCP 서버 경로와 Kakao 로컬 API 경로의 대응표입니다.
+var endpointPaths = map[string]string{
+	"/search/address":       "/v2/local/search/address.json",
+	"/search/keyword":       "/v2/local/search/keyword.json",
+	"/search/category":      "/v2/local/search/category.json",
+	"/geo/coord2address":    "/v2/local/geo/coord2address.json",
+	"/geo/coord2regioncode": "/v2/local/geo/coord2regioncode.json",
+	"/geo/transcoord":       "/v2/local/geo/transcoord.json",
+}
+
+// kakaoPath는 MCP 서버 경로(예: "/search/keyword")나 짧은 이름(예: "keyword")을
+// Kakao API 경로로 변환합니다.
+func kakaoPath(endpoint string) (string, bool) {
+	if p, ok := endpointPaths[endpoint]; ok {
+		return p, true
+	}
+	for route, p := range endpointPaths {
+		if strings.HasSuffix(route, "/"+endpoint) {
+			return p, true
+		}
+	}
+	return "", false
+}
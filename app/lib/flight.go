@@ -0,0 +1,43 @@
+package lib
+
+import "sync"
+
+// flightCall은 진행 중이거나 완료된 하나의 업스트림 호출입니다.
+type flightCall struct {
+	wg  sync.WaitGroup
+	val *upstreamResult
+	err error
+}
+
+// flightGroup은 같은 키로 동시에 들어온 요청을 하나의 호출로 합칩니다.
+type flightGroup struct {
+	mu    sync.Mutex
+	calls map[string]*flightCall
+}
+
+// Do는 key에 대해 진행 중인 호출이 있으면 그 결과를 기다리고, 없으면 fn을 실행합니다.
+// shared는 결과를 다른 호출과 공유했는지 여부입니다.
+func (g *flightGroup) Do(key string, fn func() (*upstreamResult, error)) (val *upstreamResult, err error, shared bool) {
+	g.mu.Lock()
+	if g.calls == nil {
+		g.calls = make(map[string]*flightCall)
+	}
+	if c, ok := g.calls[key]; ok {
+		g.mu.Unlock()
+		c.wg.Wait()
+		return c.val, c.err, true
+	}
+	c := &flightCall{}
+	c.wg.Add(1)
+	g.calls[key] = c
+	g.mu.Unlock()
+
+	defer func() {
+		g.mu.Lock()
+		delete(g.calls, key)
+		g.mu.Unlock()
+		c.wg.Done()
+	}()
+	c.val, c.err = fn()
+	return c.val, c.err, false
+}
@@ -0,0 +1,114 @@
+package lib
+
+import "math"
+
+// geohash 셀 계산. 경위도 좌표를 precision 글자의 base32 geohash 셀로 양자화합니다.
+// precision별 셀 크기(적도 기준): 6≈1.2km×0.6km, 7≈153m×153m, 8≈38m×19m, 9≈4.8m×4.8m
+
+const geohashBase32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+var geohashDecode = func() [256]int8 {
+	var t [256]int8
+	for i := range t {
+		t[i] = -1
+	}
+	for i := 0; i < len(geohashBase32); i++ {
+		t[geohashBase32[i]] = int8(i)
+	}
+	return t
+}()
+
+// geohashEncode는 경도/위도(도)를 precision 글자의 geohash로 인코딩합니다.
+func geohashEncode(lon, lat float64, precision int) string {
+	minLat, maxLat := -90.0, 90.0
+	minLon, maxLon := -180.0, 180.0
+	buf := make([]byte, precision)
+	even := true
+	for i := 0; i < precision; i++ {
+		idx := 0
+		for bit := 4; bit >= 0; bit-- {
+			if even {
+				mid := (minLon + maxLon) / 2
+				if lon >= mid {
+					idx |= 1 << bit
+					minLon = mid
+				} else {
+					maxLon = mid
+				}
+			} else {
+				mid := (minLat + maxLat) / 2
+				if lat >= mid {
+					idx |= 1 << bit
+					minLat = mid
+				} else {
+					maxLat = mid
+				}
+			}
+			even = !even
+		}
+		buf[i] = geohashBase32[idx]
+	}
+	return string(buf)
+}
+
+// geohashBounds는 geohash 셀의 경계(minLon, minLat, maxLon, maxLat)를 반환합니다.
+func geohashBounds(hash string) (minLon, minLat, maxLon, maxLat float64) {
+	minLat, maxLat = -90.0, 90.0
+	minLon, maxLon = -180.0, 180.0
+	even := true
+	for i := 0; i < len(hash); i++ {
+		idx := int(geohashDecode[hash[i]])
+		for bit := 4; bit >= 0; bit-- {
+			on := idx&(1<<bit) != 0
+			if even {
+				mid := (minLon + maxLon) / 2
+				if on {
+					minLon = mid
+				} else {
+					maxLon = mid
+				}
+			} else {
+				mid := (minLat + maxLat) / 2
+				if on {
+					minLat = mid
+				} else {
+					maxLat = mid
+				}
+			}
+			even = !even
+		}
+	}
+	return
+}
+
+// geohashNeighbors는 셀을 둘러싼 8개의 이웃 셀을 반환합니다.
+func geohashNeighbors(hash string) []string {
+	minLon, minLat, maxLon, maxLat := geohashBounds(hash)
+	dLon, dLat := maxLon-minLon, maxLat-minLat
+	cLon, cLat := (minLon+maxLon)/2, (minLat+maxLat)/2
+	out := make([]string, 0, 8)
+	for _, dy := range []float64{-1, 0, 1} {
+		for _, dx := range []float64{-1, 0, 1} {
+			if dx == 0 && dy == 0 {
+				continue
+			}
+			lat := cLat + dy*dLat
+			if lat > 90 || lat < -90 {
+				continue
+			}
+			lon := math.Mod(cLon+dx*dLon+540, 360) - 180
+			out = append(out, geohashEncode(lon, lat, len(hash)))
+		}
+	}
+	return out
+}
+
+// haversineMeters는 두 경위도 좌표 사이의 대원 거리(m)를 반환합니다.
+func haversineMeters(lon1, lat1, lon2, lat2 float64) float64 {
+	const earthRadius = 6371008.8
+	p1, p2 := lat1*math.Pi/180, lat2*math.Pi/180
+	dp := p2 - p1
+	dl := (lon2 - lon1) * math.Pi / 180
+	a := math.Sin(dp/2)*math.Sin(dp/2) + math.Cos(p1)*math.Cos(p2)*math.Sin(dl/2)*math.Sin(dl/2)
+	return 2 * earthRadius * math.Asin(math.Min(1, math.Sqrt(a)))
+}
@@ -0,0 +1,170 @@
+package lib
+
+import (
+	"korean-map-mcp/internal/kakaomock"
+	"math"
+	"net/http"
+	"net/http/httptest"
+	"net/url"
+	"sort"
+	"strconv"
+	"strings"
+	"testing"
+)
+
+func TestGeohashEncode(t *testing.T) {
+	for _, c := range []struct {
+		lon, lat  float64
+		precision int
+		want      string
+	}{
+		// 널리 쓰이는 참조 값
+		{-5.6, 42.6, 5, "ezs42"},
+		{10.40744, 57.64911, 11, "u4pruydqqvj"},
+		// 서울시청, 강남역
+		{126.9780, 37.5665, 7, "wydm9qy"},
+		{127.0276, 37.4979, 9, "wydm6d69j"},
+		{0, 0, 1, "s"},
+		{-0.0001, -0.0001, 3, "7zz"},
+	} {
+		got := geohashEncode(c.lon, c.lat, c.precision)
+		if got != c.want {
+			t.Errorf("geohashEncode(%v, %v, %d) = %q, want %q", c.lon, c.lat, c.precision, got, c.want)
+		}
+		minLon, minLat, maxLon, maxLat := geohashBounds(got)
+		if c.lon < minLon || c.lon >= maxLon || c.lat < minLat || c.lat >= maxLat {
+			t.Errorf("geohashBounds(%q) = [%v,%v]x[%v,%v] does not contain (%v, %v)", got, minLon, maxLon, minLat, maxLat, c.lon, c.lat)
+		}
+	}
+
+	// precision 7/9 셀 크기 (도): 경도 360/2^18, 위도 180/2^17 / 경도 360/2^23, 위도 180/2^22
+	for _, c := range []struct {
+		precision  int
+		dLon, dLat float64
+	}{
+		{7, 360.0 / (1 << 18), 180.0 / (1 << 17)},
+		{9, 360.0 / (1 << 23), 180.0 / (1 << 22)},
+	} {
+		minLon, minLat, maxLon, maxLat := geohashBounds(geohashEncode(127.0276, 37.4979, c.precision))
+		if maxLon-minLon != c.dLon || maxLat-minLat != c.dLat {
+			t.Errorf("precision %d cell = %v x %v, want %v x %v", c.precision, maxLon-minLon, maxLat-minLat, c.dLon, c.dLat)
+		}
+	}
+}
+
+func TestGeohashNeighbors(t *testing.T) {
+	got := geohashNeighbors("ezs42")
+	sort.Strings(got)
+	if want := "ezefp,ezefr,ezefx,ezs40,ezs41,ezs43,ezs48,ezs49"; strings.Join(got, ",") != want {
+		t.Errorf("geohashNeighbors(ezs42) = %v, want %s", got, want)
+	}
+
+	// 이웃 셀은 모두 다르고, 가운데 셀과 변이나 꼭짓점을 맞댑니다.
+	for _, hash := range []string{"wydm9qy", "wydm6d69j"} {
+		minLon, minLat, maxLon, maxLat := geohashBounds(hash)
+		seen := map[string]bool{hash: true}
+		for _, n := range geohashNeighbors(hash) {
+			if seen[n] || len(n) != len(hash) {
+				t.Errorf("%s: duplicate or malformed neighbor %q", hash, n)
+			}
+			seen[n] = true
+			nMinLon, nMinLat, nMaxLon, nMaxLat := geohashBounds(n)
+			touchLon := nMaxLon == minLon || nMinLon == maxLon || nMinLon == minLon
+			touchLat := nMaxLat == minLat || nMinLat == maxLat || nMinLat == minLat
+			if !touchLon || !touchLat {
+				t.Errorf("%s: neighbor %q is not adjacent", hash, n)
+			}
+		}
+		if len(seen) != 9 {
+			t.Errorf("%s: %d neighbors, want 8", hash, len(seen)-1)
+		}
+	}
+
+	// 날짜 변경선에서는 경도가 반대편으로 넘어가고, 극에서는 바깥쪽 이웃이 없습니다.
+	east := geohashEncode(179.9999, 0.0001, 5)
+	var wrapped bool
+	for _, n := range geohashNeighbors(east) {
+		if minLon, _, _, _ := geohashBounds(n); minLon == -180 {
+			wrapped = true
+		}
+	}
+	if !wrapped {
+		t.Errorf("neighbors of %s do not wrap to -180", east)
+	}
+	if got := geohashNeighbors(geohashEncode(0.0001, 89.9999, 5)); len(got) != 5 {
+		t.Errorf("polar cell has %d neighbors, want 5", len(got))
+	}
+}
+
+func TestHaversineMeters(t *testing.T) {
+	// 위도 1도 ≈ 111.195km, 서울시청 → 강남역 ≈ 8.9km
+	if got := haversineMeters(127, 37, 127, 38); math.Abs(got-111195) > 1 {
+		t.Errorf("1 degree of latitude = %v m", got)
+	}
+	if got := haversineMeters(126.9780, 37.5665, 127.0276, 37.4979); math.Abs(got-8850) > 300 {
+		t.Errorf("City Hall to Gangnam = %v m", got)
+	}
+	if got := haversineMeters(127.0276, 37.4979, 127.0276, 37.4979); got != 0 {
+		t.Errorf("same point = %v m", got)
+	}
+}
+
+// TestCellCacheReuse는 같은 셀이나 재사용 거리 안의 이웃 셀 좌표가 업스트림 없이 저장된 응답으로 답하는지 확인합니다.
+func TestCellCacheReuse(t *testing.T) {
+	for _, c := range []struct {
+		endpoint string
+		serve    func(h *ApiHandler) http.HandlerFunc
+		// 셀 동쪽 변에서 안쪽/바깥쪽으로 떨어뜨릴 경도 차(도). 위도 37.5에서 1e-5 ≈ 0.88m이고,
+		// 셀 폭은 precision 9에서 약 4.3e-5, precision 7에서 약 1.37e-3입니다.
+		inside, near, far float64
+	}{
+		{"coord2address", func(h *ApiHandler) http.HandlerFunc { return h.Coord2AddressHandler }, 1e-5, 1e-5, 4e-5},
+		{"coord2regioncode", func(h *ApiHandler) http.HandlerFunc { return h.Coord2RegionCodeHandler }, 1e-4, 1e-4, 1e-3},
+	} {
+		t.Run(c.endpoint, func(t *testing.T) {
+			h, mock := newMockHandlerWith(t, kakaomock.Config{}, "0")
+			path := "/v2/local/geo/" + c.endpoint + ".json"
+			cq, ok := h.Cells.query(path, url.Values{"x": {"127.0276"}, "y": {"37.4979"}})
+			if !ok {
+				t.Fatalf("%s is not cell cached", path)
+			}
+			_, minLat, edge, maxLat := geohashBounds(cq.cell)
+			lat := (minLat + maxLat) / 2
+
+			get := func(lon, lat float64, extra string) string {
+				q := "x=" + strconv.FormatFloat(lon, 'f', -1, 64) + "&y=" + strconv.FormatFloat(lat, 'f', -1, 64) + extra
+				w := httptest.NewRecorder()
+				c.serve(h)(w, httptest.NewRequest(http.MethodGet, "/geo/"+c.endpoint+"?"+q, nil))
+				if w.Code != http.StatusOK {
+					t.Fatalf("status = %d: %s", w.Code, w.Body)
+				}
+				return w.Header().Get("X-Cache")
+			}
+
+			steps := []struct {
+				name     string
+				lon, lat float64
+				extra    string
+				want     string
+				upstream int64
+			}{
+				{"first request", edge - c.inside, lat, "", cacheMiss, 1},
+				{"same cell", edge - 2*c.inside, lat + (maxLat-minLat)/4, "", cacheCell, 1},
+				{"one cell over, within the radius", edge + c.near, lat, "", cacheCellNeighbor, 1},
+				{"one cell over, beyond the radius", edge + c.far, lat, "", cacheMiss, 2},
+				{"input_coord is not part of the key", edge - c.inside, lat, "&input_coord=WGS84", cacheCell, 2},
+			}
+			for _, s := range steps {
+				if got := get(s.lon, s.lat, s.extra); got != s.want {
+					t.Errorf("%s: X-Cache = %q, want %q", s.name, got, s.want)
+				}
+				if got := mockRequests(mock, c.endpoint); got != s.upstream {
+					t.Errorf("%s: upstream calls = %d, want %d", s.name, got, s.upstream)
+				}
+			}
+			if s := h.Cells.Stats(); s.Hits != 2 || s.NeighborHits != 1 || s.Entries != 2 {
+				t.Errorf("cell cache stats = %+v", s)
+			}
+		})
+	}
+}
@@ -1,50 +1,273 @@
 package lib
 
 import (
+	"context"
+	"encoding/json"
+	"errors"
 	"fmt"
 	"io"
 	"log/slog"
+	"math"
 	"net/http"
+	"net/url"
 	"os"
+	"strconv"
+	"sync"
+	"time"
 )
 
-const kakaoAPIURL = "https://dapi.kakao.com"
+// 응답의 X-Cache 헤더 값
+const (
+	cacheHit       = "HIT"
+	cacheMiss      = "MISS"
+	cacheCoalesced = "COALESCED"
+	cacheBypass    = "BYPASS"
+	cacheLocal     = "LOCAL"
+)
 
 type ApiHandler struct {
 	Logger *slog.Logger
+	// Logs가 있으면 DEBUG 응답 로그를 샘플링하고 로그 파이프라인 통계를 지표로 내보냅니다.
+	Logs *LogPipeline
+	// Metrics는 /metrics로 내보내는 요청/업스트림 지표입니다.
+	Metrics  *Metrics
+	Upstream *Upstream
+	Cache    *ResponseCache
+	Cells    *CellCache
+	Batch    BatchConfig
+	Sweep    SweepConfig
+	// MCP는 /mcp 엔드포인트의 Origin 허용 목록과 세션 설정입니다.
+	MCP MCPConfig
+	// Scheduler는 엔드포인트별 속도 제한, 일일 쿼터, 우선순위 대기열로 업스트림 호출 순서를 정합니다.
+	Scheduler *Scheduler
+	// Keys는 호출마다 여유가 가장 많은 Kakao REST API 키를 고르는 키 풀입니다.
+	Keys *KeyPool
+
+	// TranscoordLocal이 true이면 /geo/transcoord를 업스트림 없이 로컬에서 계산합니다.
+	TranscoordLocal bool
+	// Regions가 있으면 /geo/coord2regioncode를 경계 인덱스에서 로컬로 계산합니다.
+	Regions *RegionIndex
+	// POIs는 검색 응답에서 본 장소의 공간 인덱스입니다. 완전하고 새로운 범위 안의 카테고리 반경 질의에 로컬로 답합니다.
+	POIs *POIIndex
+
+	flights flightGroup
+	mcpOnce sync.Once
+	mcp     *mcpServer
 }
 
-func (h *ApiHandler) ProxyKakaoRequestStream(w http.ResponseWriter, r *http.Request, path string) {
-	w.Header().Set("Content-Type", "text/event-stream")
-	w.Header().Set("Cache-Control", "no-cache")
-	w.Header().Set("Connection", "keep-alive")
+// NewApiHandler는 환경 변수 설정으로 업스트림 연결 풀과 응답 캐시를 구성한 ApiHandler를 생성합니다.
+func NewApiHandler(logger *slog.Logger) *ApiHandler {
+	h := &ApiHandler{
+		Logger:   logger,
+		Upstream: NewUpstream(LoadUpstreamConfig()),
+		Cache:    NewResponseCache(LoadCacheConfig()),
+		Cells:    NewCellCache(LoadCellCacheConfig()),
+		Batch:    LoadBatchConfig(),
+		Sweep:    LoadSweepConfig(),
+		MCP:      LoadMCPConfig(),
+
+		Scheduler: NewScheduler(LoadSchedulerConfig()),
+		POIs:      NewPOIIndex(LoadPOIIndexConfig()),
+
+		TranscoordLocal: envBool("TRANSCOORD_LOCAL", true),
+	}
+	h.Metrics = NewMetrics()
+	h.Upstream.Metrics = h.Metrics
+	keys, err := NewKeyPool(LoadKeyPoolConfig())
+	if err != nil {
+		slog.Error("Failed to load Kakao API keys", "error", err)
+	}
+	h.Keys = keys
+	if spec := os.Getenv("REGION_BOUNDARY_FILES"); spec != "" {
+		regions, err := LoadRegionIndex(spec)
+		if err != nil {
+			slog.Error("Failed to load region boundaries, coord2regioncode will use Kakao API", "error", err)
+		} else {
+			h.Regions = regions
+		}
+	}
+	return h
+}
+
+// upstreamResult는 Kakao API 응답의 상태 코드와 본문입니다.
+type upstreamResult struct {
+	Status int
+	Body   []byte
+}
+
+// fetch는 캐시를 먼저 확인하고, 없으면 동일한 요청을 하나로 합쳐 Kakao API를 호출합니다.
+// 두 번째 반환값은 X-Cache 헤더에 쓰이는 캐시 상태입니다.
+func (h *ApiHandler) fetch(ctx context.Context, path string, query url.Values, bypass bool) (*upstreamResult, string, error) {
+	key := CacheKey(path, query)
+	if bypass {
+		h.Cache.countBypassed()
+	} else if body, ok := h.Cache.Get(key); ok {
+		return &upstreamResult{Status: http.StatusOK, Body: body}, cacheHit, nil
+	} else if body, ok := h.nearbyFromIndex(ctx, path, query); ok {
+		return &upstreamResult{Status: http.StatusOK, Body: body}, cacheLocal, nil
+	}
+
+	res, err, shared := h.fetchShared(ctx, path, key, query)
+
+	status := cacheMiss
+	if bypass {
+		status = cacheBypass
+	} else if shared {
+		status = cacheCoalesced
+		h.Cache.countCoalesced()
+	}
+	return res, status, err
+}
+
+// fetchShared는 같은 키의 동시 호출을 하나로 합쳐 Kakao API를 호출하고, 성공한 응답을 캐시와 장소 인덱스에 넣습니다.
+// 세 번째 반환값은 다른 호출의 결과를 받았는지 여부입니다.
+func (h *ApiHandler) fetchShared(ctx context.Context, path, key string, query url.Values) (*upstreamResult, error, bool) {
+	// 합쳐진 호출은 여러 클라이언트가 기다리므로 첫 요청자의 취소에 묶이지 않게 합니다.
+	return h.flights.Do(key, func() (*upstreamResult, error) {
+		res, err := h.fetchUpstream(context.WithoutCancel(ctx), path, query)
+		if err == nil && res.Status == http.StatusOK {
+			h.Cache.Set(path, key, res.Body)
+			h.POIs.Ingest(path, query, res.Body)
+		}
+		return res, err
+	})
+}
 
-	var err error
+// fetchUpstream은 스케줄러에서 호출 순서를 받은 뒤 Kakao API를 호출하고 응답 본문을 읽어 반환합니다.
+// 429/5xx 응답은 Retry-After 또는 지터를 넣은 지수 백오프 후 재시도합니다. 키 하나가 401/403/429를
+// 받으면 그 키를 쉬게 하고, 다른 키가 남아 있으면 기다리지 않고 그 키로 바로 다시 호출합니다.
+func (h *ApiHandler) fetchUpstream(ctx context.Context, path string, query url.Values) (*upstreamResult, error) {
+	targetURL := h.Upstream.BaseURL + path + "?" + query.Encode()
+	// 호출마다 쓰는 로그는 DEBUG이고, 꺼져 있으면 LogAttrs가 속성을 만들기 전에 돌아옵니다.
+	slog.LogAttrs(ctx, slog.LevelDebug, "Proxying SSE request", slog.String("url", targetURL))
 
-	targetURL := kakaoAPIURL + path + "?" + r.URL.RawQuery
-	slog.Info("Proxying SSE request", "url", targetURL)
+	for attempt := 0; ; attempt++ {
+		if err := h.Scheduler.Acquire(ctx, path); err != nil {
+			return nil, err
+		}
+		key, err := h.Keys.Acquire(path)
+		if err != nil {
+			return nil, err
+		}
+		req, err := http.NewRequestWithContext(ctx, "GET", targetURL, nil)
+		if err != nil {
+			h.Keys.Release(key, 0, "")
+			return nil, fmt.Errorf("create request: %w", err)
+		}
+		req.Header.Set("Authorization", "KakaoAK "+key.secret)
 
-	client := &http.Client{}
-	req, err := http.NewRequest("GET", targetURL, nil)
-	req.Header.Set("Authorization", "KakaoAK "+os.Getenv("KAKAO_API_KEY"))
+		resp, err := h.Upstream.Do(req)
+		if err != nil {
+			h.Keys.Release(key, 0, "")
+			return nil, fmt.Errorf("call Kakao API: %w", err)
+		}
+		// 응답 헤더와 본문은 크므로 DEBUG일 때도 LOG_DEBUG_SAMPLE 비율의 호출만 기록합니다.
+		payload := h.Logs.debugPayload(ctx)
+		if payload {
+			slog.LogAttrs(ctx, slog.LevelDebug, "Kakao API response",
+				slog.Int("status", resp.StatusCode), slog.String("key_id", key.id), slog.Any("headers", resp.Header))
+		}
+
+		cooled := h.Keys.Release(key, resp.StatusCode, resp.Header.Get("Retry-After"))
+		if cooled && attempt < h.Scheduler.cfg.MaxRetries && h.Keys.hasHealthy() {
+			h.Scheduler.countRetry(path)
+			io.Copy(io.Discard, io.LimitReader(resp.Body, 64<<10))
+			resp.Body.Close()
+			slog.Warn("Retrying Kakao API with another key", "path", path, "status", resp.StatusCode, "key_id", key.id, "attempt", attempt+1)
+			continue
+		}
+		if cooled && resp.StatusCode == http.StatusTooManyRequests {
+			// 남은 키가 모두 쉬는 중이므로 재시도하지 않고, 엔드포인트 대기열도 같은 시간 동안 막습니다.
+			h.Scheduler.throttled(path, resp.Header.Get("Retry-After"), h.Keys.cfg.QuotaCooldown)
+		}
+
+		if !cooled && retryable(resp.StatusCode) && attempt < h.Scheduler.cfg.MaxRetries {
+			delay := h.Scheduler.retryDelay(attempt, resp)
+			if resp.StatusCode == http.StatusTooManyRequests {
+				h.Scheduler.throttled(path, resp.Header.Get("Retry-After"), delay)
+			}
+			h.Scheduler.countRetry(path)
+			io.Copy(io.Discard, io.LimitReader(resp.Body, 64<<10))
+			resp.Body.Close()
+			slog.Warn("Retrying Kakao API", "path", path, "status", resp.StatusCode, "attempt", attempt+1, "delay", delay)
+			if err := sleepCtx(ctx, delay); err != nil {
+				return nil, err
+			}
+			continue
+		}
+
+		body, err := h.Upstream.readBody(resp)
+		resp.Body.Close()
+		if err != nil {
+			return nil, fmt.Errorf("read Kakao API response: %w", err)
+		}
+		if payload {
+			slog.LogAttrs(ctx, slog.LevelDebug, "Kakao API response body", slog.String("path", path), slog.String("body", string(body)))
+		}
+		return &upstreamResult{Status: resp.StatusCode, Body: body}, nil
+	}
+}
+
+// ProxyKakaoRequestStream은 Kakao API 응답을 SSE로 전달합니다. 검색 API에 max_pages나
+// max_results가 있으면 페이지를 차례로 따라가며 페이지마다 이벤트를 보냅니다.
+func (h *ApiHandler) ProxyKakaoRequestStream(w http.ResponseWriter, r *http.Request, path string) {
+	r, err := withProjection(r)
 	if err != nil {
-		slog.Error("Failed to create request", "error", err)
+		http.Error(w, err.Error(), http.StatusBadRequest)
 		return
 	}
-
-	resp, err := client.Do(req)
+	if wantsPagination(path, r.URL.Query()) {
+		h.streamPages(w, r, path)
+		return
+	}
+	res, cacheStatus, err := h.fetch(requestContext(r), path, r.URL.Query(), cacheBypassed(r))
 	if err != nil {
-		slog.Error("Failed to call Kakao API", "error", err)
+		h.writeError(w, err)
 		return
 	}
-	defer resp.Body.Close()
-	slog.Debug("Kakao API response status", "status", resp.Status)
-	slog.Debug("Kakao API response headers", "headers", resp.Header)
+	h.writeResult(w, r, res, cacheStatus)
+}
+
+// writeResult는 조회 결과를 하나의 SSE 이벤트로 씁니다. 요청에 fields/limit/format이 있으면
+// 줄인 응답을 씁니다. Kakao가 오류로 응답했으면 같은 상태 코드로 본문을 그대로 전달합니다.
+func (h *ApiHandler) writeResult(w http.ResponseWriter, r *http.Request, res *upstreamResult, cacheStatus string) {
+	setSSEHeaders(w)
+	w.Header().Set("X-Cache", cacheStatus)
+	if res.Status != http.StatusOK {
+		w.WriteHeader(res.Status)
+	}
+
+	p := projectionFrom(r.Context())
+	writeProjected(w, p, "", -1, res.Status, res.Body, p.docLimit())
+}
 
-	body, _ := io.ReadAll(resp.Body)
-	slog.Debug("Kakao API response body", "body", string(body))
+// errorResponse는 오류를 호출자에게 돌려줄 상태 코드와 Kakao 오류 형식의 본문으로 바꿉니다.
+func errorResponse(err error) (status int, retryAfter time.Duration, body []byte) {
+	status, errType := http.StatusBadGateway, "UpstreamError"
+	var ue *UpstreamError
+	switch {
+	case errors.As(err, &ue):
+		status, errType, retryAfter = ue.Status, ue.Type, ue.RetryAfter
+	case errors.Is(err, context.DeadlineExceeded):
+		status, errType = http.StatusGatewayTimeout, "UpstreamTimeout"
+	}
+	body, _ = json.Marshal(map[string]string{"errorType": errType, "message": err.Error()})
+	return status, retryAfter, body
+}
 
-	fmt.Fprintf(w, "data: %s\n\n", body)
-	flusher, _ := w.(http.Flusher)
-	flusher.Flush()
+// writeError는 업스트림 호출 실패를 기록하고, 상태 코드와 오류 본문으로 응답합니다.
+// 클라이언트가 먼저 연결을 끊은 경우에는 쓸 곳이 없으므로 기록만 합니다.
+func (h *ApiHandler) writeError(w http.ResponseWriter, err error) {
+	if errors.Is(err, context.Canceled) {
+		slog.Debug("Client went away before Kakao API responded", "error", err)
+		return
+	}
+	status, retryAfter, body := errorResponse(err)
+	slog.Error("Failed to call Kakao API", "status", status, "error", err)
+	if retryAfter > 0 {
+		w.Header().Set("Retry-After", strconv.Itoa(int(math.Ceil(retryAfter.Seconds()))))
+	}
+	w.Header().Set("Content-Type", "application/json")
+	w.WriteHeader(status)
+	w.Write(body)
 }
@@ -0,0 +1,93 @@
+package lib
+
+import (
+	"io"
+	"korean-map-mcp/internal/kakaomock"
+	"log/slog"
+	"net/http"
+	"net/http/httptest"
+	"testing"
+)
+
+// newMockHandler는 로컬 Kakao 목 서버(internal/kakaomock)를 업스트림으로 쓰는 ApiHandler를 만듭니다.
+// 루프백 TCP와 실제 Transport를 거치므로 연결 풀, gzip 해제, 스케줄러, 키 풀까지 함께 잽니다.
+func newMockHandler(tb testing.TB, cacheBytes string) *ApiHandler {
+	h, _ := newMockHandlerWith(tb, kakaomock.Config{}, cacheBytes)
+	return h
+}
+
+// newMockHandlerWith는 cfg로 만든 목 서버를 업스트림으로 쓰는 ApiHandler와 그 목 서버를 반환합니다.
+// 목 서버의 Stats로 업스트림 호출 수를 셀 수 있습니다.
+func newMockHandlerWith(tb testing.TB, cfg kakaomock.Config, cacheBytes string) (*ApiHandler, *kakaomock.Server) {
+	mock, err := kakaomock.New(cfg)
+	if err != nil {
+		tb.Fatal(err)
+	}
+	return newUpstreamHandler(tb, mock, cacheBytes), mock
+}
+
+// newUpstreamHandler는 upstream을 Kakao API 자리에 띄우고 그 서버를 쓰는 ApiHandler를 만듭니다.
+// 목 서버의 고정 응답으로는 부족한 테스트(rect를 보는 검색 등)가 직접 만든 업스트림을 넣을 때 씁니다.
+func newUpstreamHandler(tb testing.TB, upstream http.Handler, cacheBytes string) *ApiHandler {
+	slog.SetDefault(slog.New(slog.NewTextHandler(io.Discard, nil)))
+	srv := httptest.NewServer(upstream)
+	tb.Cleanup(srv.Close)
+
+	tb.Setenv("KAKAO_API_URL", srv.URL)
+	tb.Setenv("KAKAO_API_KEYS", "bench-key")
+	tb.Setenv("RATE_LIMIT_RPS", "0")
+	tb.Setenv("CACHE_MAX_BYTES", cacheBytes)
+	return NewApiHandler(slog.Default())
+}
+
+// BenchmarkProxyKakaoRequestStream은 /search/keyword 한 요청을 처리하는 ProxyKakaoRequestStream 경로를
+// 캐시 적중/실패, 응답 줄이기, 페이지 따라가기별로 잽니다. 결과를 JSON으로 남기려면 -json을 붙입니다.
+//
+//	go test ./lib -run '^$' -bench ProxyKakaoRequestStream -benchmem
+//	go test ./lib -run '^$' -bench ProxyKakaoRequestStream -benchmem -json > bench.json
+func BenchmarkProxyKakaoRequestStream(b *testing.B) {
+	const path = "/v2/local/search/keyword.json"
+	for _, c := range []struct {
+		name     string
+		cache    string
+		query    string
+		parallel bool
+	}{
+		{"miss", "0", "query=%EC%B9%B4%ED%8E%98", false},
+		{"miss-parallel", "0", "query=%EC%B9%B4%ED%8E%98", true},
+		{"hit", "67108864", "query=%EC%B9%B4%ED%8E%98", false},
+		{"hit-fields", "67108864", "query=%EC%B9%B4%ED%8E%98&fields=place_name,x,y&limit=5", false},
+		{"pages-3", "0", "query=%EC%B9%B4%ED%8E%98&max_pages=3", false},
+	} {
+		b.Run(c.name, func(b *testing.B) {
+			h := newMockHandler(b, c.cache)
+			req := httptest.NewRequest(http.MethodGet, "/search/keyword?"+c.query, nil)
+			serve := func(w *countingResponseWriter) {
+				w.reset()
+				h.ProxyKakaoRequestStream(w, req, path)
+			}
+			warm := &countingResponseWriter{header: http.Header{}}
+			serve(warm)
+			if warm.n == 0 {
+				b.Fatal("empty response")
+			}
+
+			b.ReportAllocs()
+			b.ResetTimer()
+			if c.parallel {
+				b.RunParallel(func(pb *testing.PB) {
+					w := &countingResponseWriter{header: http.Header{}}
+					for pb.Next() {
+						serve(w)
+					}
+				})
+			} else {
+				w := &countingResponseWriter{header: http.Header{}}
+				for i := 0; i < b.N; i++ {
+					serve(w)
+				}
+			}
+			b.ReportMetric(float64(warm.n), "resp-B")
+		})
+	}
+}
@@ -0,0 +1,312 @@
+package lib
+
+import (
+	"bufio"
+	"encoding/json"
+	"fmt"
+	"log/slog"
+	"net/http"
+	"os"
+	"sort"
+	"strings"
+	"sync"
+	"time"
+)
+
+// KeyPoolConfig는 Kakao REST API 키 풀 설정입니다.
+type KeyPoolConfig struct {
+	Keys          string
+	File          string
+	Single        string
+	QuotaDaily    int64
+	QuotaCooldown time.Duration
+	AuthCooldown  time.Duration
+}
+
+// LoadKeyPoolConfig는 환경 변수에서 키 풀 설정을 읽습니다.
+//
+//	KAKAO_API_KEYS           쉼표로 구분한 REST API 키 목록
+//	KAKAO_API_KEYS_FILE      한 줄에 키 하나인 파일 (# 주석 허용). 다시 읽기로 키를 교체할 수 있습니다
+//	KAKAO_API_KEY            위 두 값이 없을 때 쓰는 단일 키
+//	KEY_QUOTA_DAILY          키 하나의 엔드포인트별 일일 호출 한도 (기본 0, 한도 없음)
+//	KEY_COOLDOWN_QUOTA       429 응답을 받은 키를 쉬게 하는 시간 (기본 60s, Retry-After가 있으면 그 값)
+//	KEY_COOLDOWN_AUTH        401/403 응답을 받은 키를 쉬게 하는 시간 (기본 10m)
+func LoadKeyPoolConfig() KeyPoolConfig {
+	return KeyPoolConfig{
+		Keys:          os.Getenv("KAKAO_API_KEYS"),
+		File:          os.Getenv("KAKAO_API_KEYS_FILE"),
+		Single:        os.Getenv("KAKAO_API_KEY"),
+		QuotaDaily:    int64(envInt("KEY_QUOTA_DAILY", 0)),
+		QuotaCooldown: envDuration("KEY_COOLDOWN_QUOTA", time.Minute),
+		AuthCooldown:  envDuration("KEY_COOLDOWN_AUTH", 10*time.Minute),
+	}
+}
+
+// apiKey는 풀에 있는 키 하나와 그 키의 사용량, 상태입니다. 필드는 KeyPool.mu로 보호됩니다.
+type apiKey struct {
+	secret   string
+	id       string
+	inFlight int
+	day      string
+	used     map[string]int64 // 엔드포인트별 오늘 사용량
+
+	requests     int64
+	throttled    int64
+	authErrors   int64
+	coolingUntil time.Time
+	lastStatus   int
+}
+
+// KeyStats는 키 하나의 사용량과 남은 여유입니다. ID는 풀 번호와 키의 끝 4자리("k0-****abcd")입니다.
+type KeyStats struct {
+	ID             string           `json:"id"`
+	Healthy        bool             `json:"healthy"`
+	CoolingUntil   string           `json:"cooling_until,omitempty"`
+	InFlight       int              `json:"in_flight"`
+	Requests       int64            `json:"requests"`
+	Throttled      int64            `json:"throttled"`
+	AuthErrors     int64            `json:"auth_errors"`
+	LastStatus     int              `json:"last_status,omitempty"`
+	UsedToday      map[string]int64 `json:"used_today"`
+	RemainingToday map[string]int64 `json:"remaining_today,omitempty"`
+}
+
+// KeyPool은 여러 Kakao REST API 키에 요청을 나눠 보냅니다. 요청마다 쉬고 있지 않고
+// 일일 한도가 남은 키 중 진행 중인 요청이 가장 적은 키를 고릅니다.
+type KeyPool struct {
+	cfg KeyPoolConfig
+
+	mu   sync.Mutex
+	keys []*apiKey
+	// nextID는 다음에 추가되는 키의 번호입니다. 다시 읽기로 빠진 키의 번호는 재사용하지 않아
+	// 끝 4자리가 같은 키도, 교체 전후의 키도 메트릭과 로그에서 서로 다른 id를 가집니다.
+	nextID int
+}
+
+// NewKeyPool은 설정의 키를 읽어 풀을 만듭니다.
+func NewKeyPool(cfg KeyPoolConfig) (*KeyPool, error) {
+	p := &KeyPool{cfg: cfg}
+	return p, p.Reload()
+}
+
+// readKeys는 KAKAO_API_KEYS, KAKAO_API_KEYS_FILE, KAKAO_API_KEY 순서로 키를 모읍니다.
+func (p *KeyPool) readKeys() ([]string, error) {
+	var keys []string
+	for _, k := range strings.Split(p.cfg.Keys, ",") {
+		if k = strings.TrimSpace(k); k != "" {
+			keys = append(keys, k)
+		}
+	}
+	if p.cfg.File != "" {
+		f, err := os.Open(p.cfg.File)
+		if err != nil {
+			return nil, fmt.Errorf("read key file: %w", err)
+		}
+		defer f.Close()
+		sc := bufio.NewScanner(f)
+		for sc.Scan() {
+			if k := strings.TrimSpace(sc.Text()); k != "" && !strings.HasPrefix(k, "#") {
+				keys = append(keys, k)
+			}
+		}
+		if err := sc.Err(); err != nil {
+			return nil, fmt.Errorf("read key file: %w", err)
+		}
+	}
+	if len(keys) == 0 && p.cfg.Single != "" {
+		keys = append(keys, p.cfg.Single)
+	}
+	return keys, nil
+}
+
+// Reload는 키 목록을 다시 읽습니다. 계속 남아 있는 키의 사용량과 상태는 유지합니다.
+func (p *KeyPool) Reload() error {
+	secrets, err := p.readKeys()
+	if err != nil {
+		return err
+	}
+	p.mu.Lock()
+	defer p.mu.Unlock()
+	old := make(map[string]*apiKey, len(p.keys))
+	for _, k := range p.keys {
+		old[k.secret] = k
+	}
+	keys := make([]*apiKey, 0, len(secrets))
+	seen := make(map[string]bool, len(secrets))
+	for _, s := range secrets {
+		if seen[s] {
+			continue
+		}
+		seen[s] = true
+		if k, ok := old[s]; ok {
+			keys = append(keys, k)
+			continue
+		}
+		keys = append(keys, &apiKey{secret: s, id: fmt.Sprintf("k%d-%s", p.nextID, maskKey(s)), used: make(map[string]int64)})
+		p.nextID++
+	}
+	p.keys = keys
+	slog.Info("Loaded Kakao API keys", "keys", len(keys))
+	return nil
+}
+
+// maskKey는 로그와 통계에 쓸 수 있도록 끝 4자리만 남깁니다. 키 id는 여기에 풀 번호를 붙인 "k0-****abcd"입니다.
+func maskKey(s string) string {
+	if len(s) <= 4 {
+		return "****"
+	}
+	return "****" + s[len(s)-4:]
+}
+
+// Len은 풀의 키 개수입니다.
+func (p *KeyPool) Len() int {
+	p.mu.Lock()
+	defer p.mu.Unlock()
+	return len(p.keys)
+}
+
+func (k *apiKey) rollDay(now time.Time) {
+	if day := now.In(kst).Format("2006-01-02"); day != k.day {
+		k.day = day
+		k.used = make(map[string]int64)
+	}
+}
+
+// Acquire는 path를 호출할 키를 고르고 사용량을 기록합니다. 호출이 끝나면 Release를 불러야 합니다.
+func (p *KeyPool) Acquire(path string) (*apiKey, error) {
+	now := time.Now()
+	p.mu.Lock()
+	defer p.mu.Unlock()
+
+	var best *apiKey
+	var retryAt time.Time
+	for _, k := range p.keys {
+		k.rollDay(now)
+		if now.Before(k.coolingUntil) {
+			if retryAt.IsZero() || k.coolingUntil.Before(retryAt) {
+				retryAt = k.coolingUntil
+			}
+			continue
+		}
+		if p.cfg.QuotaDaily > 0 && k.used[path] >= p.cfg.QuotaDaily {
+			continue
+		}
+		if best == nil || k.inFlight < best.inFlight || (k.inFlight == best.inFlight && k.used[path] < best.used[path]) {
+			best = k
+		}
+	}
+	if best == nil {
+		if retryAt.IsZero() {
+			y, m, d := now.In(kst).Date()
+			retryAt = time.Date(y, m, d+1, 0, 0, 0, 0, kst)
+		}
+		return nil, &UpstreamError{Status: http.StatusServiceUnavailable, RetryAfter: retryAt.Sub(now), Type: "NoAvailableKey", Message: "every Kakao API key is cooling down or out of quota"}
+	}
+	best.inFlight++
+	best.used[path]++
+	best.requests++
+	return best, nil
+}
+
+// Release는 키의 호출 결과를 기록합니다. 429는 Retry-After(없으면 KEY_COOLDOWN_QUOTA) 동안,
+// 401/403은 KEY_COOLDOWN_AUTH 동안 그 키를 쉬게 합니다. 키를 쉬게 했으면 true를 반환합니다.
+// 키가 하나뿐인 풀에서는 사용량만 기록합니다.
+func (p *KeyPool) Release(k *apiKey, status int, retryAfter string) bool {
+	p.mu.Lock()
+	defer p.mu.Unlock()
+	k.inFlight--
+	if status != 0 {
+		k.lastStatus = status
+	}
+	var cooldown time.Duration
+	switch status {
+	case http.StatusTooManyRequests:
+		k.throttled++
+		cooldown = p.cfg.QuotaCooldown
+		if d, ok := parseRetryAfter(retryAfter); ok {
+			cooldown = d
+		}
+	case http.StatusUnauthorized, http.StatusForbidden:
+		k.authErrors++
+		cooldown = p.cfg.AuthCooldown
+	default:
+		return false
+	}
+	if len(p.keys) < 2 {
+		// 키가 하나뿐이면 바꿔 쓸 키가 없으므로 쉬게 하지 않고 스케줄러의 재시도에 맡깁니다.
+		return false
+	}
+	k.coolingUntil = time.Now().Add(cooldown)
+	slog.Warn("Cooling down Kakao API key", "key_id", k.id, "status", status, "for", cooldown)
+	return true
+}
+
+// hasHealthy는 쉬고 있지 않은 키가 남아 있는지 확인합니다.
+func (p *KeyPool) hasHealthy() bool {
+	now := time.Now()
+	p.mu.Lock()
+	defer p.mu.Unlock()
+	for _, k := range p.keys {
+		if !now.Before(k.coolingUntil) {
+			return true
+		}
+	}
+	return false
+}
+
+// Stats는 키별 사용량과 오늘 남은 호출 수를 반환합니다.
+func (p *KeyPool) Stats() []KeyStats {
+	now := time.Now()
+	p.mu.Lock()
+	defer p.mu.Unlock()
+	out := make([]KeyStats, 0, len(p.keys))
+	for _, k := range p.keys {
+		k.rollDay(now)
+		s := KeyStats{
+			ID:         k.id,
+			Healthy:    !now.Before(k.coolingUntil),
+			InFlight:   k.inFlight,
+			Requests:   k.requests,
+			Throttled:  k.throttled,
+			AuthErrors: k.authErrors,
+			LastStatus: k.lastStatus,
+			UsedToday:  make(map[string]int64, len(k.used)),
+		}
+		if !s.Healthy {
+			s.CoolingUntil = k.coolingUntil.UTC().Format(time.RFC3339)
+		}
+		for path, n := range k.used {
+			s.UsedToday[endpointName(path)] = n
+		}
+		if p.cfg.QuotaDaily > 0 {
+			s.RemainingToday = make(map[string]int64, len(endpointPaths))
+			for _, path := range endpointPaths {
+				s.RemainingToday[endpointName(path)] = max(p.cfg.QuotaDaily-k.used[path], 0)
+			}
+		}
+		out = append(out, s)
+	}
+	sort.SliceStable(out, func(a, b int) bool { return out[a].Requests > out[b].Requests })
+	return out
+}
+
+// KeyStatsHandler는 키별 사용량을 JSON으로 반환합니다.
+func (h *ApiHandler) KeyStatsHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(h.Keys.Stats())
+}
+
+// KeyReloadHandler는 POST 요청을 받으면 키 목록을 다시 읽습니다.
+func (h *ApiHandler) KeyReloadHandler(w http.ResponseWriter, r *http.Request) {
+	if r.Method != http.MethodPost {
+		w.Header().Set("Allow", http.MethodPost)
+		http.Error(w, "method not allowed", http.StatusMethodNotAllowed)
+		return
+	}
+	if err := h.Keys.Reload(); err != nil {
+		http.Error(w, err.Error(), http.StatusInternalServerError)
+		return
+	}
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(map[string]int{"keys": h.Keys.Len()})
+}
@@ -0,0 +1,173 @@
+package lib
+
+import (
+	"errors"
+	"io"
+	"log/slog"
+	"net/http"
+	"os"
+	"path/filepath"
+	"testing"
+	"time"
+)
+
+func newTestKeyPool(t *testing.T, cfg KeyPoolConfig) *KeyPool {
+	t.Helper()
+	slog.SetDefault(slog.New(slog.NewTextHandler(io.Discard, nil)))
+	if cfg.QuotaCooldown == 0 {
+		cfg.QuotaCooldown = time.Minute
+	}
+	if cfg.AuthCooldown == 0 {
+		cfg.AuthCooldown = 10 * time.Minute
+	}
+	p, err := NewKeyPool(cfg)
+	if err != nil {
+		t.Fatal(err)
+	}
+	return p
+}
+
+func acquireSecret(t *testing.T, p *KeyPool, path string) *apiKey {
+	t.Helper()
+	k, err := p.Acquire(path)
+	if err != nil {
+		t.Fatalf("Acquire: %v", err)
+	}
+	return k
+}
+
+func TestKeyPoolLeastLoaded(t *testing.T) {
+	p := newTestKeyPool(t, KeyPoolConfig{Keys: "key-a, key-b,key-c,key-a"})
+	if p.Len() != 3 {
+		t.Fatalf("Len = %d, want 3 (duplicates dropped)", p.Len())
+	}
+	// 진행 중인 요청이 없으면 오늘 덜 쓴 키, 같으면 앞의 키를 고릅니다.
+	var got []string
+	var held []*apiKey
+	for i := 0; i < 3; i++ {
+		k := acquireSecret(t, p, keywordSearchPath)
+		got = append(got, k.secret)
+		held = append(held, k)
+	}
+	if got[0] != "key-a" || got[1] != "key-b" || got[2] != "key-c" {
+		t.Errorf("dispatch order = %v, want a, b, c", got)
+	}
+	p.Release(held[1], http.StatusOK, "")
+	if k := acquireSecret(t, p, keywordSearchPath); k.secret != "key-b" {
+		t.Errorf("Acquire = %s, want the key with no request in flight (key-b)", k.secret)
+	}
+}
+
+func TestKeyPoolCooldown(t *testing.T) {
+	p := newTestKeyPool(t, KeyPoolConfig{Keys: "key-a,key-b", AuthCooldown: time.Hour})
+
+	a := acquireSecret(t, p, keywordSearchPath)
+	if !p.Release(a, http.StatusUnauthorized, "") {
+		t.Fatal("401 did not cool the key down")
+	}
+	b := acquireSecret(t, p, keywordSearchPath)
+	if b.secret != "key-b" {
+		t.Fatalf("Acquire = %s, want key-b while key-a cools down", b.secret)
+	}
+	if !p.Release(b, http.StatusTooManyRequests, "30") {
+		t.Fatal("429 did not cool the key down")
+	}
+	if p.hasHealthy() {
+		t.Error("hasHealthy = true with every key cooling down")
+	}
+
+	_, err := p.Acquire(keywordSearchPath)
+	var ue *UpstreamError
+	if !errors.As(err, &ue) || ue.Status != http.StatusServiceUnavailable || ue.Type != "NoAvailableKey" {
+		t.Fatalf("Acquire error = %v, want 503 NoAvailableKey", err)
+	}
+	// 가장 먼저 풀리는 키(Retry-After 30초)를 기다리라고 알려 줍니다.
+	if ue.RetryAfter <= 25*time.Second || ue.RetryAfter > 30*time.Second {
+		t.Errorf("RetryAfter = %v, want about 30s", ue.RetryAfter)
+	}
+
+	stats := p.Stats()
+	for _, s := range stats {
+		if s.Healthy || s.CoolingUntil == "" {
+			t.Errorf("stats %+v, want cooling down", s)
+		}
+	}
+	if stats[0].AuthErrors+stats[1].AuthErrors != 1 || stats[0].Throttled+stats[1].Throttled != 1 {
+		t.Errorf("stats = %+v, want one auth error and one throttle", stats)
+	}
+}
+
+func TestKeyPoolSingleKeyNeverCools(t *testing.T) {
+	p := newTestKeyPool(t, KeyPoolConfig{Single: "only-key"})
+	k := acquireSecret(t, p, keywordSearchPath)
+	if p.Release(k, http.StatusTooManyRequests, "") {
+		t.Error("single key was cooled down")
+	}
+	acquireSecret(t, p, keywordSearchPath)
+}
+
+func TestKeyPoolDailyQuota(t *testing.T) {
+	p := newTestKeyPool(t, KeyPoolConfig{Keys: "key-a,key-b", QuotaDaily: 1})
+	a := acquireSecret(t, p, keywordSearchPath)
+	b := acquireSecret(t, p, keywordSearchPath)
+	p.Release(a, http.StatusOK, "")
+	p.Release(b, http.StatusOK, "")
+	if _, err := p.Acquire(keywordSearchPath); err == nil {
+		t.Error("Acquire succeeded with every key out of quota")
+	}
+	// 한도는 엔드포인트별입니다.
+	acquireSecret(t, p, categorySearchPath)
+}
+
+func TestKeyPoolReload(t *testing.T) {
+	file := filepath.Join(t.TempDir(), "keys.txt")
+	write := func(body string) {
+		if err := os.WriteFile(file, []byte(body), 0o600); err != nil {
+			t.Fatal(err)
+		}
+	}
+	write("# 운영 키\nsecret-one-abcd\nsecret-two-abcd\n")
+	p := newTestKeyPool(t, KeyPoolConfig{File: file})
+
+	ids := map[string]string{}
+	for _, k := range p.keys {
+		ids[k.secret] = k.id
+	}
+	if ids["secret-one-abcd"] == ids["secret-two-abcd"] {
+		t.Fatalf("keys with the same suffix share id %q", ids["secret-one-abcd"])
+	}
+	if ids["secret-one-abcd"] != "k0-****abcd" {
+		t.Errorf("id = %q, want k0-****abcd", ids["secret-one-abcd"])
+	}
+
+	for i := 0; i < 2; i++ {
+		p.Release(acquireSecret(t, p, keywordSearchPath), http.StatusOK, "")
+	}
+
+	write("secret-two-abcd\nsecret-three-abcd\n")
+	if err := p.Reload(); err != nil {
+		t.Fatal(err)
+	}
+	if p.Len() != 2 {
+		t.Fatalf("Len = %d, want 2", p.Len())
+	}
+	byID := map[string]*apiKey{}
+	for _, k := range p.keys {
+		byID[k.id] = k
+	}
+	// 남은 키는 id와 사용량을 유지하고, 새 키는 빠진 키의 번호를 재사용하지 않습니다.
+	if kept := byID[ids["secret-two-abcd"]]; kept == nil || kept.secret != "secret-two-abcd" || kept.requests != 1 {
+		t.Errorf("kept key lost its id or usage: %v", byID)
+	}
+	if added := byID["k2-****abcd"]; added == nil || added.secret != "secret-three-abcd" {
+		t.Errorf("new key id: %v", byID)
+	}
+
+	os.Remove(file)
+	if err := p.Reload(); err == nil {
+		t.Error("Reload of a missing key file succeeded")
+	}
+	if p.Len() != 2 {
+		t.Errorf("failed Reload changed the pool: Len = %d", p.Len())
+	}
+}
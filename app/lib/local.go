@@ -0,0 +1,37 @@
+package lib
+
+import (
+	"net/http"
+	"net/url"
+)
+
+// localAnswer는 업스트림 없이 로컬에서 계산할 수 있는 요청이면 Kakao 형식의 응답 본문을 반환합니다.
+//   - /geo/transcoord: 좌표계 변환 (TRANSCOORD_LOCAL)
+//   - /geo/coord2regioncode: 행정구역 경계 인덱스 (REGION_BOUNDARY_FILES)
+func (h *ApiHandler) localAnswer(path string, query url.Values) ([]byte, bool) {
+	switch path {
+	case "/v2/local/geo/transcoord.json":
+		if h.TranscoordLocal {
+			return localTranscoord(query)
+		}
+	case "/v2/local/geo/coord2regioncode.json":
+		if h.Regions != nil {
+			return h.Regions.localRegionCode(query)
+		}
+	}
+	return nil, false
+}
+
+// proxyLocalFirst는 로컬에서 답할 수 있으면 바로 응답하고, 아니면 셀 캐시/업스트림 경로로 넘깁니다.
+func (h *ApiHandler) proxyLocalFirst(w http.ResponseWriter, r *http.Request, path string) {
+	r, err := withProjection(r)
+	if err != nil {
+		http.Error(w, err.Error(), http.StatusBadRequest)
+		return
+	}
+	if body, ok := h.localAnswer(path, r.URL.Query()); ok {
+		h.writeResult(w, r, &upstreamResult{Status: http.StatusOK, Body: body}, cacheLocal)
+		return
+	}
+	h.proxyCellCached(w, r, path)
+}
@@ -1,28 +1,328 @@
 package lib
 
 import (
+	"bufio"
+	"context"
+	"io"
 	"log/slog"
+	"math"
+	"net/http"
+	"net/url"
 	"os"
+	"regexp"
+	"strings"
+	"sync"
+	"sync/atomic"
+	"time"
 )
 
-func NewLogger() *slog.Logger {
-	logLevel := os.Getenv("LOG_LEVEL")
-	var level slog.Level
-	switch logLevel {
-	case "DEBUG":
-		level = slog.LevelDebug
-	case "INFO":
-		level = slog.LevelInfo
-	case "WARN":
-		level = slog.LevelWarn
-	case "ERROR":
-		level = slog.LevelError
+// LogConfig는 로그 파이프라인 설정입니다.
+type LogConfig struct {
+	Level slog.Level
+	// Buffer는 stdout에 쓰기 전에 쌓아 둘 수 있는 최대 로그 줄 수입니다. 가득 차면 새 로그를 버립니다.
+	Buffer int
+	// DebugSample은 요청별 DEBUG 본문/헤더 로그를 남길 비율입니다 (0~1).
+	DebugSample float64
+	// Output은 로그를 쓸 곳입니다. nil이면 stdout이고, MCP stdio 모드에서는 stdout이 프로토콜
+	// 채널이므로 stderr를 씁니다.
+	Output io.Writer
+}
+
+// LoadLogConfig는 환경 변수에서 로그 설정을 읽습니다.
+//
+//	LOG_LEVEL          DEBUG, INFO, WARN, ERROR (기본 INFO)
+//	LOG_BUFFER         비동기 출력 버퍼에 쌓아 둘 최대 로그 줄 수 (기본 8192)
+//	LOG_DEBUG_SAMPLE   DEBUG일 때 업스트림 응답 헤더/본문을 기록할 호출 비율, 1이면 모두 (기본 0.01)
+func LoadLogConfig() LogConfig {
+	level := slog.LevelInfo
+	if v := os.Getenv("LOG_LEVEL"); v != "" {
+		if err := level.UnmarshalText([]byte(v)); err != nil {
+			level = slog.LevelInfo
+		}
+	}
+	return LogConfig{
+		Level:       level,
+		Buffer:      max(envInt("LOG_BUFFER", 8192), 1),
+		DebugSample: math.Min(math.Max(envFloat("LOG_DEBUG_SAMPLE", 0.01), 0), 1),
+	}
+}
+
+// LogPipeline은 JSON 로그를 비동기 버퍼를 거쳐 stdout에 씁니다. 요청 처리 고루틴은 인코딩된 줄을
+// 버퍼에 넣기만 하고, 실제 쓰기는 전용 고루틴이 모아서 합니다. 버퍼가 가득 차면 요청을 막지 않고
+// 로그를 버리며 버린 수를 셉니다.
+type LogPipeline struct {
+	Logger *slog.Logger
+
+	out    *asyncWriter
+	sample *logSampler
+}
+
+// NewLogPipeline은 stdout으로 쓰는 로그 파이프라인을 시작합니다.
+func NewLogPipeline(cfg LogConfig) *LogPipeline {
+	if cfg.Output != nil {
+		return newLogPipeline(cfg, cfg.Output)
+	}
+	return newLogPipeline(cfg, os.Stdout)
+}
+
+func newLogPipeline(cfg LogConfig, w io.Writer) *LogPipeline {
+	out := newAsyncWriter(w, cfg.Buffer)
+	return &LogPipeline{
+		Logger: slog.New(redactHandler{slog.NewJSONHandler(out, &slog.HandlerOptions{Level: cfg.Level})}),
+		out:    out,
+		sample: newLogSampler(cfg.DebugSample),
+	}
+}
+
+// Close는 버퍼에 남은 로그를 모두 쓰고 파이프라인을 멈춥니다. 종료 직전에 부릅니다.
+func (p *LogPipeline) Close() {
+	p.out.Close()
+}
+
+// LogStats는 로그 파이프라인 통계입니다.
+type LogStats struct {
+	Written int64 `json:"written"`
+	Dropped int64 `json:"dropped"`
+	Queued  int   `json:"queued"`
+}
+
+func (p *LogPipeline) Stats() LogStats {
+	return LogStats{
+		Written: p.out.written.Load(),
+		Dropped: p.out.dropped.Load(),
+		Queued:  len(p.out.queue),
+	}
+}
+
+// debugPayload는 요청별 DEBUG 본문/헤더 로그를 남길지 정합니다. DEBUG가 꺼져 있으면 샘플러도
+// 건드리지 않으므로 비용이 없습니다. 파이프라인 없이 만든 핸들러(테스트 등)는 DEBUG 여부만 봅니다.
+func (p *LogPipeline) debugPayload(ctx context.Context) bool {
+	if !slog.Default().Enabled(ctx, slog.LevelDebug) {
+		return false
+	}
+	return p == nil || p.sample.sample()
+}
+
+// logSampler는 호출 N번에 한 번 true를 반환합니다. 난수 대신 카운터를 써서 경합이 적고 비율이 정확합니다.
+type logSampler struct {
+	every uint64
+	n     atomic.Uint64
+}
+
+func newLogSampler(rate float64) *logSampler {
+	if rate <= 0 {
+		return &logSampler{}
+	}
+	return &logSampler{every: uint64(math.Round(1 / rate))}
+}
+
+func (s *logSampler) sample() bool {
+	if s.every == 0 {
+		return false
+	}
+	return s.every == 1 || s.n.Add(1)%s.every == 1
+}
+
+var logLinePool = sync.Pool{New: func() any { return new([]byte) }}
+
+// asyncWriter는 slog 핸들러가 한 번에 쓰는 로그 한 줄을 복사해 큐에 넣고, 전용 고루틴이 bufio로
+// 모아서 씁니다. 큐가 비면 곧바로 flush하므로 한가할 때는 지연 없이, 바쁠 때는 여러 줄을 한 번의
+// 시스템 호출로 씁니다.
+type asyncWriter struct {
+	w     *bufio.Writer
+	queue chan *[]byte
+	quit  chan struct{}
+	done  chan struct{}
+	once  sync.Once
+
+	written atomic.Int64
+	dropped atomic.Int64
+}
+
+func newAsyncWriter(w io.Writer, size int) *asyncWriter {
+	a := &asyncWriter{
+		w:     bufio.NewWriterSize(w, 64<<10),
+		queue: make(chan *[]byte, size),
+		quit:  make(chan struct{}),
+		done:  make(chan struct{}),
+	}
+	go a.run()
+	return a
+}
+
+// Write는 막지 않습니다. 큐가 가득 찼거나 이미 닫혔으면 줄을 버리고 dropped를 늘립니다.
+func (a *asyncWriter) Write(p []byte) (int, error) {
+	line := logLinePool.Get().(*[]byte)
+	*line = append((*line)[:0], p...)
+	select {
+	case <-a.quit:
+		a.drop(line)
+		return len(p), nil
 	default:
-		level = slog.LevelDebug
 	}
+	select {
+	case a.queue <- line:
+	default:
+		a.drop(line)
+	}
+	return len(p), nil
+}
+
+func (a *asyncWriter) drop(line *[]byte) {
+	a.dropped.Add(1)
+	logLinePool.Put(line)
+}
+
+func (a *asyncWriter) run() {
+	defer close(a.done)
+	for {
+		select {
+		case line := <-a.queue:
+			a.write(line)
+			if len(a.queue) == 0 {
+				a.w.Flush()
+			}
+		case <-a.quit:
+			for {
+				select {
+				case line := <-a.queue:
+					a.write(line)
+				default:
+					a.w.Flush()
+					return
+				}
+			}
+		}
+	}
+}
+
+func (a *asyncWriter) write(line *[]byte) {
+	a.w.Write(*line)
+	a.written.Add(1)
+	if cap(*line) <= 64<<10 {
+		logLinePool.Put(line)
+	}
+}
+
+// Close는 큐에 남은 줄을 쓰고 돌아옵니다. 출력이 막혀 있어도 종료가 멈추지 않도록 최대 2초만 기다립니다.
+func (a *asyncWriter) Close() {
+	a.once.Do(func() { close(a.quit) })
+	select {
+	case <-a.done:
+	case <-time.After(2 * time.Second):
+	}
+}
+
+// 로그에 남기지 않을 값입니다. 키 이름(대소문자 무시)이 여기에 있으면 값을 가립니다.
+var secretLogKeys = map[string]bool{
+	"authorization": true,
+	"api_key":       true,
+	"apikey":        true,
+	"kakao_api_key": true,
+	"key":           true,
+	"secret":        true,
+	"token":         true,
+	"password":      true,
+}
+
+var kakaoAKPattern = regexp.MustCompile(`KakaoAK\s+[^\s"',]+`)
+
+const redacted = "[REDACTED]"
+
+// redactHandler는 비밀 값으로 보이는 속성을 가린 뒤 다음 핸들러로 넘깁니다. HandlerOptions.ReplaceAttr를
+// 쓰면 time 같은 기본 속성까지 느린 경로로 인코딩되므로, 호출자가 넘긴 속성만 검사하는 핸들러로 감쌉니다.
+// 가릴 속성이 없으면 레코드를 그대로 넘기므로 추가 할당이 없습니다.
+type redactHandler struct {
+	slog.Handler
+}
+
+func (h redactHandler) Handle(ctx context.Context, r slog.Record) error {
+	dirty := false
+	r.Attrs(func(a slog.Attr) bool {
+		_, dirty = redactAttr(a)
+		return !dirty
+	})
+	if dirty {
+		clean := slog.NewRecord(r.Time, r.Level, r.Message, r.PC)
+		r.Attrs(func(a slog.Attr) bool {
+			a, _ = redactAttr(a)
+			clean.AddAttrs(a)
+			return true
+		})
+		r = clean
+	}
+	return h.Handler.Handle(ctx, r)
+}
 
-	logger := slog.New(slog.NewJSONHandler(os.Stdout, &slog.HandlerOptions{
-		Level: level,
-	}))
-	return logger
+func (h redactHandler) WithAttrs(attrs []slog.Attr) slog.Handler {
+	clean := make([]slog.Attr, len(attrs))
+	for i, a := range attrs {
+		clean[i], _ = redactAttr(a)
+	}
+	return redactHandler{h.Handler.WithAttrs(clean)}
+}
+
+func (h redactHandler) WithGroup(name string) slog.Handler {
+	return redactHandler{h.Handler.WithGroup(name)}
+}
+
+// redactAttr는 키 이름이 secretLogKeys에 있거나, 문자열에 "KakaoAK <키>"가 들어 있거나,
+// http.Header/url.Values에 비밀 키가 있는 속성의 값을 가리고, 바꿨는지 함께 반환합니다.
+// 이미 가린 키 식별자(apiKey.id)는 "key_id"로 남깁니다.
+func redactAttr(a slog.Attr) (slog.Attr, bool) {
+	if secretLogKeys[strings.ToLower(a.Key)] {
+		return slog.String(a.Key, redacted), true
+	}
+	switch a.Value.Kind() {
+	case slog.KindString:
+		if s := a.Value.String(); strings.Contains(s, "KakaoAK") {
+			return slog.String(a.Key, kakaoAKPattern.ReplaceAllString(s, "KakaoAK "+redacted)), true
+		}
+	case slog.KindGroup:
+		group := a.Value.Group()
+		var clean []slog.Attr
+		for i, g := range group {
+			if g, changed := redactAttr(g); changed {
+				if clean == nil {
+					clean = append([]slog.Attr(nil), group...)
+				}
+				clean[i] = g
+			}
+		}
+		if clean != nil {
+			return slog.Attr{Key: a.Key, Value: slog.GroupValue(clean...)}, true
+		}
+	case slog.KindAny:
+		switch v := a.Value.Any().(type) {
+		case http.Header:
+			if hasSecretKey(v) {
+				return slog.Any(a.Key, http.Header(redactValues(v))), true
+			}
+		case url.Values:
+			if hasSecretKey(v) {
+				return slog.Any(a.Key, url.Values(redactValues(v))), true
+			}
+		}
+	}
+	return a, false
+}
+
+func hasSecretKey(values map[string][]string) bool {
+	for k := range values {
+		if secretLogKeys[strings.ToLower(k)] {
+			return true
+		}
+	}
+	return false
+}
+
+func redactValues(values map[string][]string) map[string][]string {
+	out := make(map[string][]string, len(values))
+	for k, v := range values {
+		if secretLogKeys[strings.ToLower(k)] {
+			v = []string{redacted}
+		}
+		out[k] = v
+	}
+	return out
 }
@@ -0,0 +1,459 @@
+package lib
+
+import (
+	"bytes"
+	"context"
+	"encoding/json"
+	"fmt"
+	"net/http"
+	"net/url"
+	"strings"
+	"sync"
+)
+
+// MCP(Model Context Protocol) 서버 구현입니다. 여섯 개 Kakao 로컬 API 라우트를 도구로 노출하고,
+// tools/call은 해당 라우트 핸들러를 프로세스 안에서 그대로 실행하므로 캐시, 셀 캐시, 로컬 계산,
+// 응답 줄이기, 페이지 따라가기가 HTTP 라우트와 똑같이 적용됩니다. 전송 계층은 mcp_transport.go에 있습니다.
+
+// mcpProtocolVersions는 지원하는 MCP 프로토콜 버전입니다. 첫 번째가 최신입니다.
+var mcpProtocolVersions = []string{"2025-03-26", "2024-11-05"}
+
+// JSON-RPC 2.0 오류 코드
+const (
+	rpcParseError     = -32700
+	rpcInvalidRequest = -32600
+	rpcMethodNotFound = -32601
+	rpcInvalidParams  = -32602
+)
+
+// rpcMessage는 클라이언트가 보낸 JSON-RPC 메시지입니다. id가 없으면 알림(notification)이고,
+// method가 없으면 서버 요청에 대한 응답입니다.
+type rpcMessage struct {
+	JSONRPC string          `json:"jsonrpc"`
+	ID      json.RawMessage `json:"id,omitempty"`
+	Method  string          `json:"method,omitempty"`
+	Params  json.RawMessage `json:"params,omitempty"`
+}
+
+func (m *rpcMessage) isRequest() bool { return m.Method != "" && len(m.ID) > 0 }
+
+type rpcResponse struct {
+	JSONRPC string          `json:"jsonrpc"`
+	ID      json.RawMessage `json:"id"`
+	Result  any             `json:"result,omitempty"`
+	Error   *rpcError       `json:"error,omitempty"`
+}
+
+type rpcError struct {
+	Code    int    `json:"code"`
+	Message string `json:"message"`
+}
+
+type rpcNotification struct {
+	JSONRPC string `json:"jsonrpc"`
+	Method  string `json:"method"`
+	Params  any    `json:"params,omitempty"`
+}
+
+var rpcNullID = json.RawMessage("null")
+
+func rpcErrorResponse(id json.RawMessage, code int, message string) *rpcResponse {
+	if len(id) == 0 {
+		id = rpcNullID
+	}
+	return &rpcResponse{JSONRPC: "2.0", ID: id, Error: &rpcError{Code: code, Message: message}}
+}
+
+// decodeRPC는 요청 본문을 메시지 목록으로 읽습니다. 배열이면 JSON-RPC 배치입니다.
+// 메시지 하나가 잘못되면 그 자리에 오류 응답을 담고 나머지는 그대로 처리합니다.
+func decodeRPC(body []byte) (msgs []*rpcMessage, invalid []*rpcResponse, batch bool, err *rpcResponse) {
+	body = bytes.TrimSpace(body)
+	if len(body) > 0 && body[0] == '[' {
+		var raws []json.RawMessage
+		if e := json.Unmarshal(body, &raws); e != nil {
+			return nil, nil, true, rpcErrorResponse(nil, rpcParseError, "parse error: "+e.Error())
+		}
+		if len(raws) == 0 {
+			return nil, nil, true, rpcErrorResponse(nil, rpcInvalidRequest, "empty batch")
+		}
+		for _, raw := range raws {
+			msg, bad := decodeRPCMessage(raw)
+			if bad != nil {
+				invalid = append(invalid, bad)
+			} else {
+				msgs = append(msgs, msg)
+			}
+		}
+		return msgs, invalid, true, nil
+	}
+	if !json.Valid(body) {
+		return nil, nil, false, rpcErrorResponse(nil, rpcParseError, "parse error")
+	}
+	msg, bad := decodeRPCMessage(body)
+	if bad != nil {
+		return nil, nil, false, bad
+	}
+	return []*rpcMessage{msg}, nil, false, nil
+}
+
+func decodeRPCMessage(raw json.RawMessage) (*rpcMessage, *rpcResponse) {
+	var msg rpcMessage
+	if err := json.Unmarshal(raw, &msg); err != nil || msg.JSONRPC != "2.0" {
+		return nil, rpcErrorResponse(msg.ID, rpcInvalidRequest, "invalid request")
+	}
+	return &msg, nil
+}
+
+// mcpTool은 MCP 클라이언트에 노출하는 도구 하나입니다. 인자는 Kakao API 파라미터 이름 그대로이며
+// 쿼리 문자열로 바꿔 route 핸들러에 넘깁니다.
+type mcpTool struct {
+	Name        string          `json:"name"`
+	Description string          `json:"description"`
+	InputSchema json.RawMessage `json:"inputSchema"`
+
+	route    string
+	required []string
+	handler  http.HandlerFunc
+}
+
+// mcpServer는 세션과 도구 목록을 가진 MCP 서버입니다. HTTP와 stdio 전송이 같이 씁니다.
+type mcpServer struct {
+	h      *ApiHandler
+	tools  []*mcpTool
+	byName map[string]*mcpTool
+
+	mu       sync.Mutex
+	sessions map[string]*mcpSession
+}
+
+func newMCPServer(h *ApiHandler) *mcpServer {
+	m := &mcpServer{h: h, byName: make(map[string]*mcpTool), sessions: make(map[string]*mcpSession)}
+	for _, t := range kakaoTools(h) {
+		t.handler = h.Metrics.Instrument("mcp:"+t.Name, t.handler)
+		m.tools = append(m.tools, t)
+		m.byName[t.Name] = t
+	}
+	return m
+}
+
+// 도구 인자 스키마 조각
+type schemaProp map[string]any
+
+func strProp(desc string) schemaProp { return schemaProp{"type": "string", "description": desc} }
+
+func enumProp(desc string, values ...string) schemaProp {
+	return schemaProp{"type": "string", "description": desc, "enum": values}
+}
+
+func intProp(desc string, lo, hi int) schemaProp {
+	return schemaProp{"type": "integer", "description": desc, "minimum": lo, "maximum": hi}
+}
+
+// coordProp은 숫자와 문자열을 모두 받습니다. Kakao 응답의 좌표는 문자열이라 그대로 넘기는 경우가 많습니다.
+func coordProp(desc string) schemaProp {
+	return schemaProp{"type": []string{"number", "string"}, "description": desc}
+}
+
+var coordSystemNames = []string{"WGS84", "WCONGNAMUL", "CONGNAMUL", "WTM", "TM", "KTM", "UTM", "BESSEL", "WKTM", "WUTM"}
+
+var categoryGroupCodes = []string{
+	"MT1", "CS2", "PS3", "SC4", "AC5", "PK6", "OL7", "SW8", "BK9",
+	"CT1", "AG2", "PO3", "AT4", "AD5", "FD6", "CE7", "HP8", "PM9",
+}
+
+func objectSchema(props map[string]schemaProp, required ...string) json.RawMessage {
+	// 응답을 줄이는 파라미터(projection.go)는 모든 도구에서 쓸 수 있습니다.
+	props["fields"] = strProp("Comma-separated top-level document fields to keep (e.g. \"place_name,x,y\"). Omit for full documents.")
+	props["limit"] = intProp("Maximum number of documents to return.", 0, 1000)
+	props["format"] = enumProp("json (default) or lines: a header line plus one tab-separated line per document. lines requires fields.", "json", "lines")
+	schema := map[string]any{"type": "object", "properties": props}
+	if len(required) > 0 {
+		schema["required"] = required
+	}
+	data, _ := json.Marshal(schema)
+	return data
+}
+
+// kakaoTools는 노출할 도구 목록입니다. 이름은 example/langchain의 도구 이름과 같습니다.
+func kakaoTools(h *ApiHandler) []*mcpTool {
+	page := func(maxSize int) map[string]schemaProp {
+		return map[string]schemaProp{
+			"page": intProp("Result page number.", 1, 45),
+			"size": intProp("Documents per page.", 1, maxSize),
+		}
+	}
+	with := func(base map[string]schemaProp, extra map[string]schemaProp) map[string]schemaProp {
+		for k, v := range extra {
+			base[k] = v
+		}
+		return base
+	}
+	placeSearch := map[string]schemaProp{
+		"x":           coordProp("Longitude (WGS84) of the search center."),
+		"y":           coordProp("Latitude (WGS84) of the search center."),
+		"radius":      intProp("Search radius in meters around x,y.", 0, 20000),
+		"rect":        strProp("Search rectangle \"minX,minY,maxX,maxY\" (WGS84)."),
+		"sort":        enumProp("Result order. distance requires x,y.", "accuracy", "distance"),
+		"max_pages":   intProp("Follow Kakao pagination up to this many pages; each page is returned as its own content block.", 1, 45),
+		"max_results": intProp("Stop following pages after this many documents.", 1, 45),
+	}
+	coords := func(required ...string) []string { return append([]string{"x", "y"}, required...) }
+
+	tools := []*mcpTool{
+		{
+			Name:        "korean_address_search",
+			Description: "Geocode a Korean address (road or lot-number, e.g. \"전북 삼성동 100\") into coordinates and structured address fields.",
+			InputSchema: objectSchema(with(map[string]schemaProp{
+				"query":        strProp("Address to search for."),
+				"analyze_type": enumProp("similar (default) allows partial matches; exact requires an exact address.", "similar", "exact"),
+			}, page(30)), "query"),
+			route:    "/search/address",
+			required: []string{"query"},
+			handler:  h.AddressHandler,
+		},
+		{
+			Name:        "korean_keyword_search",
+			Description: "Find places in Korea by keyword (e.g. \"카카오프렌즈\", \"맛집\"), optionally around a point or inside a rectangle.",
+			InputSchema: objectSchema(with(with(map[string]schemaProp{
+				"query":               strProp("Keyword to search for, such as a place name or category."),
+				"category_group_code": enumProp("Restrict results to a category group.", categoryGroupCodes...),
+			}, placeSearch), page(15)), "query"),
+			route:    "/search/keyword",
+			required: []string{"query"},
+			handler:  h.KeywordHandler,
+		},
+		{
+			Name:        "korean_category_search",
+			Description: "Find places in Korea by category group code (e.g. PM9 pharmacy, CE7 cafe) around a point or inside a rectangle.",
+			InputSchema: objectSchema(with(with(map[string]schemaProp{
+				"category_group_code": enumProp("Category group code.", categoryGroupCodes...),
+			}, placeSearch), page(15)), "category_group_code"),
+			route:    "/search/category",
+			required: []string{"category_group_code"},
+			handler:  h.CategoryHandler,
+		},
+		{
+			Name:        "korean_coord_to_address",
+			Description: "Reverse-geocode a coordinate into its road and lot-number addresses.",
+			InputSchema: objectSchema(map[string]schemaProp{
+				"x":           coordProp("Longitude (or x in input_coord)."),
+				"y":           coordProp("Latitude (or y in input_coord)."),
+				"input_coord": enumProp("Coordinate system of x,y (default WGS84).", coordSystemNames...),
+			}, coords()...),
+			route:    "/geo/coord2address",
+			required: coords(),
+			handler:  h.Coord2AddressHandler,
+		},
+		{
+			Name:        "korean_coord_to_regioncode",
+			Description: "Find the legal (B) and administrative (H) regions that contain a coordinate.",
+			InputSchema: objectSchema(map[string]schemaProp{
+				"x":            coordProp("Longitude (or x in input_coord)."),
+				"y":            coordProp("Latitude (or y in input_coord)."),
+				"input_coord":  enumProp("Coordinate system of x,y (default WGS84).", coordSystemNames...),
+				"output_coord": enumProp("Coordinate system of the returned region centers (default WGS84).", coordSystemNames...),
+			}, coords()...),
+			route:    "/geo/coord2regioncode",
+			required: coords(),
+			handler:  h.Coord2RegionCodeHandler,
+		},
+		{
+			Name:        "korean_coordinate_transformer",
+			Description: "Convert a coordinate between systems such as WGS84, WTM, TM and WCONGNAMUL.",
+			InputSchema: objectSchema(map[string]schemaProp{
+				"x":            coordProp("x (longitude for WGS84)."),
+				"y":            coordProp("y (latitude for WGS84)."),
+				"input_coord":  enumProp("Coordinate system of x,y (default WGS84).", coordSystemNames...),
+				"output_coord": enumProp("Target coordinate system.", coordSystemNames...),
+			}, coords("output_coord")...),
+			route:    "/geo/transcoord",
+			required: coords("output_coord"),
+			handler:  h.TranscoordHandler,
+		},
+	}
+	return tools
+}
+
+// handle은 요청 하나를 처리해 응답을 반환합니다. 알림이면 nil을 반환합니다.
+// notify는 진행 알림(notifications/progress)을 보낼 곳입니다.
+func (m *mcpServer) handle(ctx context.Context, msg *rpcMessage, notify func(any)) *rpcResponse {
+	if !msg.isRequest() {
+		return nil
+	}
+	result, rerr := m.dispatch(ctx, msg, notify)
+	if rerr != nil {
+		return &rpcResponse{JSONRPC: "2.0", ID: msg.ID, Error: rerr}
+	}
+	return &rpcResponse{JSONRPC: "2.0", ID: msg.ID, Result: result}
+}
+
+func (m *mcpServer) dispatch(ctx context.Context, msg *rpcMessage, notify func(any)) (any, *rpcError) {
+	switch msg.Method {
+	case "initialize":
+		var p struct {
+			ProtocolVersion string `json:"protocolVersion"`
+		}
+		json.Unmarshal(msg.Params, &p)
+		version := mcpProtocolVersions[0]
+		for _, v := range mcpProtocolVersions {
+			if v == p.ProtocolVersion {
+				version = v
+			}
+		}
+		return map[string]any{
+			"protocolVersion": version,
+			"capabilities":    map[string]any{"tools": map[string]any{"listChanged": false}},
+			"serverInfo":      map[string]any{"name": "korean-map-mcp", "version": "1.0.0"},
+			"instructions": "Kakao Local API tools for Korean addresses, places and coordinates. " +
+				"Send independent calls as one JSON-RPC batch; they run concurrently. " +
+				"Use fields/limit to keep responses small.",
+		}, nil
+	case "ping":
+		return map[string]any{}, nil
+	case "tools/list":
+		return map[string]any{"tools": m.tools}, nil
+	case "tools/call":
+		var p struct {
+			Name      string         `json:"name"`
+			Arguments map[string]any `json:"arguments"`
+			Meta      struct {
+				ProgressToken json.RawMessage `json:"progressToken"`
+			} `json:"_meta"`
+		}
+		dec := json.NewDecoder(bytes.NewReader(msg.Params))
+		dec.UseNumber()
+		if err := dec.Decode(&p); err != nil {
+			return nil, &rpcError{Code: rpcInvalidParams, Message: "invalid params: " + err.Error()}
+		}
+		tool, ok := m.byName[p.Name]
+		if !ok {
+			return nil, &rpcError{Code: rpcInvalidParams, Message: "unknown tool: " + p.Name}
+		}
+		var progress func(done int, message string)
+		if len(p.Meta.ProgressToken) > 0 && notify != nil {
+			progress = func(done int, message string) {
+				notify(rpcNotification{JSONRPC: "2.0", Method: "notifications/progress", Params: map[string]any{
+					"progressToken": p.Meta.ProgressToken,
+					"progress":      done,
+					"message":       message,
+				}})
+			}
+		}
+		return m.callTool(ctx, tool, p.Arguments, progress), nil
+	}
+	return nil, &rpcError{Code: rpcMethodNotFound, Message: "method not found: " + msg.Method}
+}
+
+type toolContent struct {
+	Type string `json:"type"`
+	Text string `json:"text"`
+}
+
+type toolResult struct {
+	Content []toolContent `json:"content"`
+	IsError bool          `json:"isError,omitempty"`
+}
+
+// callTool은 도구의 route 핸들러를 프로세스 안에서 실행합니다. SSE 이벤트 하나가 content 블록 하나가
+// 되며, 페이지를 따라가는 검색은 페이지마다 블록이 생기고 진행 알림을 보냅니다. 도구 오류(잘못된 인자,
+// Kakao 오류 응답)는 JSON-RPC 오류가 아니라 isError 결과로 돌려줘 모델이 고쳐서 다시 부를 수 있게 합니다.
+func (m *mcpServer) callTool(ctx context.Context, tool *mcpTool, args map[string]any, progress func(int, string)) *toolResult {
+	for _, name := range tool.required {
+		if v, ok := args[name]; !ok || v == nil || v == "" {
+			return &toolResult{IsError: true, Content: []toolContent{{Type: "text", Text: "missing required argument: " + name}}}
+		}
+	}
+	req, err := http.NewRequestWithContext(ctx, http.MethodGet, tool.route, nil)
+	if err != nil {
+		return &toolResult{IsError: true, Content: []toolContent{{Type: "text", Text: err.Error()}}}
+	}
+	req.URL = &url.URL{Path: tool.route, RawQuery: paramsQuery(args).Encode()}
+
+	rec := &toolRecorder{header: http.Header{}, status: http.StatusOK, progress: progress}
+	tool.handler(rec, req)
+	return rec.result()
+}
+
+// toolRecorder는 route 핸들러의 SSE 출력을 이벤트 단위로 모으는 ResponseWriter입니다.
+type toolRecorder struct {
+	header   http.Header
+	status   int
+	buf      bytes.Buffer
+	content  []toolContent
+	failed   bool
+	pages    int
+	progress func(int, string)
+}
+
+func (t *toolRecorder) Header() http.Header  { return t.header }
+func (t *toolRecorder) WriteHeader(code int) { t.status = code }
+func (t *toolRecorder) Flush()               {}
+
+func (t *toolRecorder) Write(p []byte) (int, error) {
+	t.buf.Write(p)
+	if strings.HasPrefix(t.header.Get("Content-Type"), "text/event-stream") {
+		t.drain()
+	}
+	return len(p), nil
+}
+
+// drain은 버퍼에서 완성된 SSE 이벤트("\n\n"으로 끝나는)를 꺼냅니다.
+func (t *toolRecorder) drain() {
+	for {
+		frame, rest, ok := bytes.Cut(t.buf.Bytes(), []byte("\n\n"))
+		if !ok {
+			return
+		}
+		var event string
+		var data []string
+		for _, line := range strings.Split(string(frame), "\n") {
+			field, value, _ := strings.Cut(line, ":")
+			value = strings.TrimPrefix(value, " ")
+			switch field {
+			case "event":
+				event = value
+			case "data":
+				data = append(data, value)
+			}
+		}
+		t.buf.Next(len(t.buf.Bytes()) - len(rest))
+		if data == nil {
+			continue
+		}
+		text := strings.Join(data, "\n")
+		if event == "error" || (event != "done" && isErrorBody(text, event == "page")) {
+			t.failed = true
+		}
+		t.content = append(t.content, toolContent{Type: "text", Text: text})
+		if event == "page" {
+			t.pages++
+			if t.progress != nil {
+				t.progress(t.pages, fmt.Sprintf("page %d", t.pages))
+			}
+		}
+	}
+}
+
+// isErrorBody는 이벤트 본문이 Kakao 오류(errorType)이거나, page 이벤트인데 documents가 없는지 확인합니다.
+// format=lines처럼 JSON이 아닌 본문은 오류로 보지 않습니다.
+func isErrorBody(text string, page bool) bool {
+	var body struct {
+		Documents json.RawMessage `json:"documents"`
+		ErrorType string          `json:"errorType"`
+	}
+	if json.Unmarshal([]byte(text), &body) != nil {
+		return false
+	}
+	return body.ErrorType != "" || (page && body.Documents == nil)
+}
+
+func (t *toolRecorder) result() *toolResult {
+	if rest := bytes.TrimSpace(t.buf.Bytes()); len(rest) > 0 {
+		// SSE가 아닌 응답(http.Error, writeError의 JSON 오류 본문)은 통째로 한 블록이 됩니다.
+		t.content = append(t.content, toolContent{Type: "text", Text: string(rest)})
+	}
+	if len(t.content) == 0 {
+		t.content = []toolContent{{Type: "text", Text: http.StatusText(t.status)}}
+	}
+	return &toolResult{Content: t.content, IsError: t.failed || t.status >= http.StatusBadRequest}
+}
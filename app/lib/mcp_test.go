@@ -0,0 +1,230 @@
+package lib
+
+import (
+	"encoding/json"
+	"korean-map-mcp/internal/kakaomock"
+	"net/http"
+	"net/http/httptest"
+	"strings"
+	"testing"
+	"time"
+)
+
+// mcpPost는 본문 body를 POST /mcp로 보내고 응답을 반환합니다. header는 이름과 값을 번갈아 적습니다.
+func mcpPost(h *ApiHandler, body string, header ...string) *httptest.ResponseRecorder {
+	r := httptest.NewRequest(http.MethodPost, "/mcp", strings.NewReader(body))
+	r.Header.Set("Content-Type", "application/json")
+	for i := 0; i+1 < len(header); i += 2 {
+		r.Header.Set(header[i], header[i+1])
+	}
+	w := httptest.NewRecorder()
+	h.MCPHandler(w, r)
+	return w
+}
+
+type testRPCResponse struct {
+	ID     json.RawMessage `json:"id"`
+	Result json.RawMessage `json:"result"`
+	Error  *rpcError       `json:"error"`
+}
+
+func decodeRPCResponse(t *testing.T, w *httptest.ResponseRecorder, v any) {
+	t.Helper()
+	if w.Code != http.StatusOK {
+		t.Fatalf("status = %d: %s", w.Code, w.Body)
+	}
+	if err := json.Unmarshal(w.Body.Bytes(), v); err != nil {
+		t.Fatalf("%v: %s", err, w.Body)
+	}
+}
+
+func TestMCPInitialize(t *testing.T) {
+	h := newMockHandler(t, "0")
+	for _, c := range []struct{ asked, want string }{
+		{"2024-11-05", "2024-11-05"},
+		{"2099-01-01", mcpProtocolVersions[0]},
+	} {
+		w := mcpPost(h, `{"jsonrpc":"2.0","id":1,"method":"initialize","params":{"protocolVersion":"`+c.asked+`","capabilities":{}}}`)
+		var res testRPCResponse
+		decodeRPCResponse(t, w, &res)
+		var result struct {
+			ProtocolVersion string `json:"protocolVersion"`
+			Capabilities    struct {
+				Tools json.RawMessage `json:"tools"`
+			} `json:"capabilities"`
+			ServerInfo struct {
+				Name string `json:"name"`
+			} `json:"serverInfo"`
+		}
+		json.Unmarshal(res.Result, &result)
+		if string(res.ID) != "1" || result.ProtocolVersion != c.want || result.Capabilities.Tools == nil || result.ServerInfo.Name != "korean-map-mcp" {
+			t.Errorf("initialize(%s) = %s", c.asked, w.Body)
+		}
+		if id := w.Header().Get("Mcp-Session-Id"); len(id) != 32 {
+			t.Errorf("Mcp-Session-Id = %q", id)
+		}
+	}
+}
+
+func TestMCPToolsList(t *testing.T) {
+	h := newMockHandler(t, "0")
+	var res testRPCResponse
+	decodeRPCResponse(t, mcpPost(h, `{"jsonrpc":"2.0","id":"list","method":"tools/list"}`), &res)
+	var result struct {
+		Tools []struct {
+			Name        string `json:"name"`
+			InputSchema struct {
+				Type       string                     `json:"type"`
+				Properties map[string]json.RawMessage `json:"properties"`
+				Required   []string                   `json:"required"`
+			} `json:"inputSchema"`
+		} `json:"tools"`
+	}
+	if err := json.Unmarshal(res.Result, &result); err != nil {
+		t.Fatal(err)
+	}
+	var names []string
+	for _, tool := range result.Tools {
+		names = append(names, tool.Name)
+		s := tool.InputSchema
+		if s.Type != "object" || s.Properties["fields"] == nil || len(s.Required) == 0 {
+			t.Errorf("%s: inputSchema = %+v", tool.Name, s)
+		}
+		for _, name := range s.Required {
+			if s.Properties[name] == nil {
+				t.Errorf("%s: required %q has no property", tool.Name, name)
+			}
+		}
+	}
+	want := "korean_address_search,korean_keyword_search,korean_category_search,korean_coord_to_address,korean_coord_to_regioncode,korean_coordinate_transformer"
+	if got := strings.Join(names, ","); got != want {
+		t.Errorf("tools = %s, want %s", got, want)
+	}
+}
+
+// TestMCPBatch는 요청, 알림, 잘못된 메시지가 섞인 배치에 요청마다 하나씩, 요청 순서대로 응답하는지 확인합니다.
+func TestMCPBatch(t *testing.T) {
+	h := newMockHandler(t, "0")
+	body := `[
+		{"jsonrpc":"2.0","id":1,"method":"tools/call","params":{"name":"korean_coordinate_transformer","arguments":{"x":127.0276,"y":37.4979,"output_coord":"WTM"}}},
+		{"jsonrpc":"2.0","method":"notifications/initialized"},
+		{"jsonrpc":"1.0","id":9,"method":"ping"},
+		{"jsonrpc":"2.0","id":"b","method":"tools/call","params":{"name":"korean_keyword_search","arguments":{"query":"카페","fields":"place_name","limit":2}}},
+		{"jsonrpc":"2.0","id":3,"method":"no/such/method"}
+	]`
+	var res []testRPCResponse
+	decodeRPCResponse(t, mcpPost(h, body), &res)
+	if len(res) != 4 {
+		t.Fatalf("%d responses, want 4 (one per request and invalid message)", len(res))
+	}
+	var ids []string
+	for _, r := range res {
+		ids = append(ids, string(r.ID))
+	}
+	if got := strings.Join(ids, ","); got != `9,1,"b",3` {
+		t.Errorf("response ids = %s", got)
+	}
+	if res[0].Error == nil || res[0].Error.Code != rpcInvalidRequest || res[3].Error == nil || res[3].Error.Code != rpcMethodNotFound {
+		t.Errorf("errors = %+v, %+v", res[0].Error, res[3].Error)
+	}
+	for _, r := range res[1:3] {
+		var result toolResult
+		if err := json.Unmarshal(r.Result, &result); err != nil || r.Error != nil || result.IsError || len(result.Content) == 0 {
+			t.Errorf("tools/call %s = %s", r.ID, r.Result)
+		}
+	}
+
+	// 알림만 있는 본문은 202로 끝납니다.
+	if w := mcpPost(h, `[{"jsonrpc":"2.0","method":"notifications/initialized"}]`); w.Code != http.StatusAccepted || w.Body.Len() != 0 {
+		t.Errorf("notification only: status = %d, body = %q", w.Code, w.Body)
+	}
+
+	// SSE로 받으면 같은 응답이 message 이벤트 하나씩으로 옵니다.
+	w := mcpPost(h, body, "Accept", "application/json, text/event-stream")
+	if ct := w.Header().Get("Content-Type"); !strings.HasPrefix(ct, "text/event-stream") {
+		t.Fatalf("Content-Type = %q", ct)
+	}
+	if n := strings.Count(w.Body.String(), "event: message\n"); n != 4 {
+		t.Errorf("%d SSE messages, want 4:\n%s", n, w.Body)
+	}
+}
+
+// TestMCPToolError는 도구 오류가 JSON-RPC 오류가 아니라 isError 결과로 돌아오는지 확인합니다.
+func TestMCPToolError(t *testing.T) {
+	h, _ := newMockHandlerWith(t, kakaomock.Config{Keys: []string{"other-key"}}, "0")
+	for _, c := range []struct{ name, params, text string }{
+		{"missing argument", `{"name":"korean_address_search","arguments":{}}`, "missing required argument: query"},
+		{"upstream error", `{"name":"korean_address_search","arguments":{"query":"판교역로 235"}}`, "errorType"},
+	} {
+		var res testRPCResponse
+		decodeRPCResponse(t, mcpPost(h, `{"jsonrpc":"2.0","id":1,"method":"tools/call","params":`+c.params+`}`), &res)
+		var result toolResult
+		json.Unmarshal(res.Result, &result)
+		if res.Error != nil || !result.IsError || len(result.Content) == 0 || !strings.Contains(result.Content[0].Text, c.text) {
+			t.Errorf("%s: response = %+v, result = %s", c.name, res.Error, res.Result)
+		}
+	}
+
+	var res testRPCResponse
+	decodeRPCResponse(t, mcpPost(h, `{"jsonrpc":"2.0","id":1,"method":"tools/call","params":{"name":"no_such_tool"}}`), &res)
+	if res.Error == nil || res.Error.Code != rpcInvalidParams {
+		t.Errorf("unknown tool: error = %+v", res.Error)
+	}
+}
+
+func TestMCPSessions(t *testing.T) {
+	h := newMockHandler(t, "0")
+	h.MCP.SessionTTL = time.Minute
+	ping := `{"jsonrpc":"2.0","id":1,"method":"ping"}`
+	newSession := func() string {
+		w := mcpPost(h, `{"jsonrpc":"2.0","id":1,"method":"initialize","params":{}}`)
+		return w.Header().Get("Mcp-Session-Id")
+	}
+	serve := func(method, id string) int {
+		r := httptest.NewRequest(method, "/mcp", strings.NewReader(ping))
+		r.Header.Set("Accept", "text/event-stream")
+		r.Header.Set("Mcp-Session-Id", id)
+		w := httptest.NewRecorder()
+		h.MCPHandler(w, r)
+		return w.Code
+	}
+
+	for _, method := range []string{http.MethodPost, http.MethodGet, http.MethodDelete} {
+		if got := serve(method, "no-such-session"); got != http.StatusNotFound {
+			t.Errorf("%s with unknown session = %d, want 404", method, got)
+		}
+	}
+
+	id := newSession()
+	if got := mcpPost(h, ping, "Mcp-Session-Id", id).Code; got != http.StatusOK {
+		t.Errorf("POST with session = %d", got)
+	}
+	if got := serve(http.MethodDelete, id); got != http.StatusNoContent {
+		t.Errorf("DELETE = %d, want 204", got)
+	}
+	if got := mcpPost(h, ping, "Mcp-Session-Id", id).Code; got != http.StatusNotFound {
+		t.Errorf("POST after DELETE = %d, want 404", got)
+	}
+
+	// SessionTTL 동안 쓰이지 않은 세션은 새 세션이 만들어지지 않아도 조회할 때 정리됩니다.
+	id = newSession()
+	m := h.mcpServer()
+	s := m.session(id)
+	s.mu.Lock()
+	s.lastSeen = time.Now().Add(-2 * time.Minute)
+	s.mu.Unlock()
+	if got := mcpPost(h, ping, "Mcp-Session-Id", id).Code; got != http.StatusNotFound {
+		t.Errorf("POST with idle session = %d, want 404", got)
+	}
+	select {
+	case <-s.closed:
+	default:
+		t.Error("idle session was not closed")
+	}
+	m.mu.Lock()
+	_, ok := m.sessions[id]
+	m.mu.Unlock()
+	if ok {
+		t.Error("idle session is still registered")
+	}
+}
@@ -0,0 +1,542 @@
+package lib
+
+import (
+	"bufio"
+	"bytes"
+	"context"
+	"crypto/rand"
+	"encoding/hex"
+	"encoding/json"
+	"fmt"
+	"io"
+	"log/slog"
+	"net"
+	"net/http"
+	"net/url"
+	"os"
+	"strings"
+	"sync"
+	"time"
+)
+
+// MCPConfig는 /mcp 엔드포인트(Streamable HTTP 전송) 설정입니다.
+type MCPConfig struct {
+	// AllowedOrigins는 localhost 외에 허용할 Origin 목록입니다. "*"이면 모든 Origin을 허용합니다.
+	AllowedOrigins []string
+	// SessionTTL 동안 요청이 없는 세션은 정리됩니다.
+	SessionTTL time.Duration
+	// Keepalive는 GET 알림 스트림에 주석 줄을 보내는 간격입니다.
+	Keepalive time.Duration
+}
+
+// LoadMCPConfig는 환경 변수에서 MCP 전송 설정을 읽습니다.
+//
+//	MCP_ALLOWED_ORIGINS   localhost 외에 허용할 Origin, 쉼표로 구분 (기본 없음, "*"는 모두 허용)
+//	MCP_SESSION_TTL       요청이 없는 세션을 정리하기까지의 시간 (기본 30m)
+//	MCP_KEEPALIVE         알림 스트림 keepalive 간격 (기본 15s)
+func LoadMCPConfig() MCPConfig {
+	cfg := MCPConfig{
+		SessionTTL: envDuration("MCP_SESSION_TTL", 30*time.Minute),
+		Keepalive:  envDuration("MCP_KEEPALIVE", 15*time.Second),
+	}
+	for _, origin := range strings.Split(os.Getenv("MCP_ALLOWED_ORIGINS"), ",") {
+		if origin = strings.TrimSpace(origin); origin != "" {
+			cfg.AllowedOrigins = append(cfg.AllowedOrigins, origin)
+		}
+	}
+	return cfg
+}
+
+// mcpMaxBody는 POST /mcp 본문 크기 상한입니다.
+const mcpMaxBody = 8 << 20
+
+// mcpSession은 initialize로 시작한 클라이언트 세션입니다. 진행 중인 요청을 id로 찾아 취소할 수 있고,
+// GET 스트림이 열려 있으면 JSON으로 응답한 요청의 진행 알림을 그 스트림으로 보냅니다.
+type mcpSession struct {
+	id       string
+	inflight *rpcInflight
+
+	mu       sync.Mutex
+	lastSeen time.Time
+	stream   chan []byte
+	closed   chan struct{}
+}
+
+// send는 열려 있는 GET 스트림에 메시지를 보냅니다. 스트림이 없거나 밀려 있으면 버립니다.
+// 알림은 진행 상황 표시용이라 응답을 늦추면서까지 전달할 필요가 없습니다.
+func (s *mcpSession) send(v any) {
+	s.mu.Lock()
+	stream := s.stream
+	s.mu.Unlock()
+	if stream == nil {
+		return
+	}
+	data, err := json.Marshal(v)
+	if err != nil {
+		return
+	}
+	select {
+	case stream <- data:
+	default:
+	}
+}
+
+// idle은 세션이 ttl보다 오래 쓰이지 않았는지 확인합니다. 스트림이 열려 있는 세션은 살려 둡니다.
+func (s *mcpSession) idle(ttl time.Duration, now time.Time) bool {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	return s.stream == nil && ttl > 0 && now.Sub(s.lastSeen) > ttl
+}
+
+// rpcInflight는 진행 중인 요청의 취소 함수를 id별로 보관합니다 (notifications/cancelled 처리).
+type rpcInflight struct {
+	mu     sync.Mutex
+	cancel map[string]context.CancelFunc
+}
+
+func newRPCInflight() *rpcInflight {
+	return &rpcInflight{cancel: make(map[string]context.CancelFunc)}
+}
+
+func (f *rpcInflight) start(ctx context.Context, id json.RawMessage) (context.Context, func()) {
+	ctx, cancel := context.WithCancel(ctx)
+	key := string(id)
+	f.mu.Lock()
+	f.cancel[key] = cancel
+	f.mu.Unlock()
+	return ctx, func() {
+		f.mu.Lock()
+		delete(f.cancel, key)
+		f.mu.Unlock()
+		cancel()
+	}
+}
+
+func (f *rpcInflight) cancelRequest(params json.RawMessage) {
+	var p struct {
+		RequestID json.RawMessage `json:"requestId"`
+	}
+	if json.Unmarshal(params, &p) != nil {
+		return
+	}
+	f.mu.Lock()
+	cancel := f.cancel[string(p.RequestID)]
+	f.mu.Unlock()
+	if cancel != nil {
+		cancel()
+	}
+}
+
+// run은 메시지 묶음을 최대 concurrency개씩 동시에 처리하고, 응답과 진행 알림을 준비되는 대로 emit에
+// 넘깁니다. emit은 여러 고루틴에서 불리므로 호출자가 직렬화해야 합니다. 모든 요청이 끝나면 반환합니다.
+func (m *mcpServer) run(ctx context.Context, msgs []*rpcMessage, inflight *rpcInflight, concurrency int, emit func(any)) {
+	sem := make(chan struct{}, max(concurrency, 1))
+	var wg sync.WaitGroup
+	for _, msg := range msgs {
+		if msg.Method == "notifications/cancelled" {
+			inflight.cancelRequest(msg.Params)
+			continue
+		}
+		if !msg.isRequest() {
+			continue
+		}
+		sem <- struct{}{}
+		wg.Add(1)
+		go func(msg *rpcMessage) {
+			defer func() { <-sem; wg.Done() }()
+			ctx, done := inflight.start(ctx, msg.ID)
+			defer done()
+			if res := m.handle(ctx, msg, emit); res != nil {
+				emit(res)
+			}
+		}(msg)
+	}
+	wg.Wait()
+}
+
+func (h *ApiHandler) mcpServer() *mcpServer {
+	h.mcpOnce.Do(func() { h.mcp = newMCPServer(h) })
+	return h.mcp
+}
+
+// ### 9. MCP (Streamable HTTP)
+//
+// POST /mcp는 JSON-RPC 메시지 하나 또는 배치 배열을 받습니다. 배치 안의 요청은 BATCH_CONCURRENCY까지
+// 동시에 실행됩니다. Accept에 text/event-stream이 있으면 응답과 진행 알림을 끝나는 순서대로 하나의 SSE
+// 스트림으로 보내고, 없으면 모든 응답을 JSON(배치면 배열)으로 한 번에 보냅니다.
+// initialize 응답의 Mcp-Session-Id를 이후 요청에 보내면 GET /mcp로 세션 알림 스트림을 열 수 있고,
+// DELETE /mcp로 세션을 끝냅니다.
+func (h *ApiHandler) MCPHandler(w http.ResponseWriter, r *http.Request) {
+	if !h.mcpOriginAllowed(r.Header.Get("Origin")) {
+		http.Error(w, "origin not allowed", http.StatusForbidden)
+		return
+	}
+	m := h.mcpServer()
+	switch r.Method {
+	case http.MethodPost:
+		m.servePost(w, r)
+	case http.MethodGet:
+		m.serveStream(w, r)
+	case http.MethodDelete:
+		if s := m.session(r.Header.Get("Mcp-Session-Id")); s != nil {
+			m.closeSession(s)
+			w.WriteHeader(http.StatusNoContent)
+			return
+		}
+		http.Error(w, "unknown session", http.StatusNotFound)
+	default:
+		w.Header().Set("Allow", "GET, POST, DELETE")
+		http.Error(w, "method not allowed", http.StatusMethodNotAllowed)
+	}
+}
+
+// mcpOriginAllowed는 DNS 리바인딩을 막기 위해 브라우저가 보낸 Origin이 localhost이거나
+// MCP_ALLOWED_ORIGINS에 있을 때만 허용합니다. Origin이 없는 요청(브라우저가 아닌 클라이언트)은 허용합니다.
+func (h *ApiHandler) mcpOriginAllowed(origin string) bool {
+	if origin == "" {
+		return true
+	}
+	for _, allowed := range h.MCP.AllowedOrigins {
+		if allowed == "*" || strings.EqualFold(allowed, origin) {
+			return true
+		}
+	}
+	u, err := url.Parse(origin)
+	if err != nil {
+		return false
+	}
+	host := u.Hostname()
+	if host == "localhost" {
+		return true
+	}
+	ip := net.ParseIP(host)
+	return ip != nil && ip.IsLoopback()
+}
+
+func (m *mcpServer) servePost(w http.ResponseWriter, r *http.Request) {
+	body, err := io.ReadAll(http.MaxBytesReader(w, r.Body, mcpMaxBody))
+	if err != nil {
+		writeRPCJSON(w, http.StatusRequestEntityTooLarge, rpcErrorResponse(nil, rpcInvalidRequest, err.Error()))
+		return
+	}
+	msgs, invalid, batch, perr := decodeRPC(body)
+	if perr != nil {
+		writeRPCJSON(w, http.StatusBadRequest, perr)
+		return
+	}
+	if len(msgs)+len(invalid) > m.h.Batch.MaxItems {
+		writeRPCJSON(w, http.StatusRequestEntityTooLarge, rpcErrorResponse(nil, rpcInvalidRequest,
+			fmt.Sprintf("too many messages: %d > %d", len(msgs)+len(invalid), m.h.Batch.MaxItems)))
+		return
+	}
+
+	var sess *mcpSession
+	if id := r.Header.Get("Mcp-Session-Id"); id != "" {
+		if sess = m.session(id); sess == nil {
+			http.Error(w, "unknown session", http.StatusNotFound)
+			return
+		}
+	}
+	requests := 0
+	for _, msg := range msgs {
+		if msg.isRequest() {
+			requests++
+			if msg.Method == "initialize" && sess == nil {
+				sess = m.newSession()
+				w.Header().Set("Mcp-Session-Id", sess.id)
+			}
+		}
+	}
+	inflight := newRPCInflight()
+	if sess != nil {
+		inflight = sess.inflight
+	}
+	if requests == 0 && len(invalid) == 0 {
+		// 알림과 응답만 있으면 처리하고 202로 끝냅니다.
+		m.run(r.Context(), msgs, inflight, 1, nil)
+		w.WriteHeader(http.StatusAccepted)
+		return
+	}
+
+	if strings.Contains(r.Header.Get("Accept"), "text/event-stream") {
+		m.streamResponses(w, r, msgs, invalid, inflight)
+		return
+	}
+
+	// JSON 응답: 응답은 모아서 입력 순서대로 보내고, 진행 알림은 세션 GET 스트림이 있으면 그리로 보냅니다.
+	var mu sync.Mutex
+	responses := append([]*rpcResponse(nil), invalid...)
+	order := make(map[string]int, len(msgs))
+	for i, msg := range msgs {
+		order[string(msg.ID)] = i
+	}
+	m.run(r.Context(), msgs, inflight, m.h.Batch.Concurrency, func(v any) {
+		if res, ok := v.(*rpcResponse); ok {
+			mu.Lock()
+			responses = append(responses, res)
+			mu.Unlock()
+		} else if sess != nil {
+			sess.send(v)
+		}
+	})
+	if !batch {
+		writeRPCJSON(w, http.StatusOK, responses[0])
+		return
+	}
+	sortResponses(responses, order)
+	writeRPCJSON(w, http.StatusOK, responses)
+}
+
+// streamResponses는 요청들의 응답과 진행 알림을 하나의 SSE 스트림으로 다중화합니다. 결과를 쓰는
+// 고루틴은 이 함수 하나뿐이고, 먼저 끝난 호출의 응답이 느린 호출을 기다리지 않고 바로 나갑니다.
+func (m *mcpServer) streamResponses(w http.ResponseWriter, r *http.Request, msgs []*rpcMessage, invalid []*rpcResponse, inflight *rpcInflight) {
+	setSSEHeaders(w)
+	w.WriteHeader(http.StatusOK)
+
+	out := make(chan any, m.h.Batch.Concurrency)
+	go func() {
+		for _, res := range invalid {
+			out <- res
+		}
+		m.run(r.Context(), msgs, inflight, m.h.Batch.Concurrency, func(v any) { out <- v })
+		close(out)
+	}()
+
+	seq := 0
+	writeFailed := false
+	for v := range out {
+		if writeFailed {
+			continue
+		}
+		data, err := json.Marshal(v)
+		if err != nil {
+			slog.Error("Failed to encode MCP message", "error", err)
+			continue
+		}
+		if err := writeSSEEvent(w, "message", seq, data); err != nil {
+			slog.Warn("MCP client went away", "error", err)
+			writeFailed = true
+		}
+		seq++
+	}
+}
+
+// serveStream은 세션의 알림 스트림(GET /mcp)입니다. 세션마다 하나만 열 수 있습니다.
+func (m *mcpServer) serveStream(w http.ResponseWriter, r *http.Request) {
+	if !strings.Contains(r.Header.Get("Accept"), "text/event-stream") {
+		http.Error(w, "GET /mcp requires Accept: text/event-stream", http.StatusNotAcceptable)
+		return
+	}
+	sess := m.session(r.Header.Get("Mcp-Session-Id"))
+	if sess == nil {
+		http.Error(w, "unknown session", http.StatusNotFound)
+		return
+	}
+	stream := make(chan []byte, 64)
+	sess.mu.Lock()
+	if sess.stream != nil {
+		sess.mu.Unlock()
+		http.Error(w, "session already has an open stream", http.StatusConflict)
+		return
+	}
+	sess.stream = stream
+	sess.mu.Unlock()
+	defer func() {
+		sess.mu.Lock()
+		sess.stream = nil
+		sess.lastSeen = time.Now()
+		sess.mu.Unlock()
+	}()
+
+	setSSEHeaders(w)
+	w.WriteHeader(http.StatusOK)
+	flusher, _ := w.(http.Flusher)
+	if flusher != nil {
+		flusher.Flush()
+	}
+	every := m.h.MCP.Keepalive
+	if every <= 0 {
+		every = 15 * time.Second
+	}
+	keepalive := time.NewTicker(every)
+	defer keepalive.Stop()
+	for seq := 0; ; {
+		select {
+		case data := <-stream:
+			if writeSSEEvent(w, "message", seq, data) != nil {
+				return
+			}
+			seq++
+		case <-keepalive.C:
+			if _, err := io.WriteString(w, ": keepalive\n\n"); err != nil {
+				return
+			}
+			if flusher != nil {
+				flusher.Flush()
+			}
+		case <-sess.closed:
+			return
+		case <-r.Context().Done():
+			return
+		}
+	}
+}
+
+func (m *mcpServer) newSession() *mcpSession {
+	var b [16]byte
+	rand.Read(b[:])
+	now := time.Now()
+	s := &mcpSession{id: hex.EncodeToString(b[:]), inflight: newRPCInflight(), lastSeen: now, closed: make(chan struct{})}
+	m.mu.Lock()
+	defer m.mu.Unlock()
+	// 오래된 세션은 새 세션을 만들 때 같이 정리합니다.
+	for id, old := range m.sessions {
+		if old.idle(m.h.MCP.SessionTTL, now) {
+			delete(m.sessions, id)
+			close(old.closed)
+		}
+	}
+	m.sessions[s.id] = s
+	return s
+}
+
+// session은 id의 세션을 찾아 마지막 사용 시각을 갱신합니다. SessionTTL이 지난 세션은 이 자리에서
+// 정리하고 nil을 반환하므로, 새 세션이 만들어지지 않아도 만료된 세션 id는 다시 쓸 수 없습니다.
+func (m *mcpServer) session(id string) *mcpSession {
+	if id == "" {
+		return nil
+	}
+	now := time.Now()
+	m.mu.Lock()
+	s := m.sessions[id]
+	if s != nil && s.idle(m.h.MCP.SessionTTL, now) {
+		delete(m.sessions, id)
+		close(s.closed)
+		s = nil
+	}
+	m.mu.Unlock()
+	if s != nil {
+		s.mu.Lock()
+		s.lastSeen = now
+		s.mu.Unlock()
+	}
+	return s
+}
+
+func (m *mcpServer) closeSession(s *mcpSession) {
+	m.mu.Lock()
+	defer m.mu.Unlock()
+	if _, ok := m.sessions[s.id]; ok {
+		delete(m.sessions, s.id)
+		close(s.closed)
+	}
+}
+
+func writeRPCJSON(w http.ResponseWriter, status int, v any) {
+	w.Header().Set("Content-Type", "application/json")
+	w.WriteHeader(status)
+	json.NewEncoder(w).Encode(v)
+}
+
+// sortResponses는 배치 응답을 요청 순서대로 정렬합니다. 잘못된 메시지에 대한 응답은 앞에 둡니다.
+func sortResponses(responses []*rpcResponse, order map[string]int) {
+	rank := func(res *rpcResponse) int {
+		if res.Error != nil && res.Error.Code == rpcInvalidRequest {
+			return -1
+		}
+		return order[string(res.ID)]
+	}
+	for i := 1; i < len(responses); i++ {
+		for j := i; j > 0 && rank(responses[j]) < rank(responses[j-1]); j-- {
+			responses[j], responses[j-1] = responses[j-1], responses[j]
+		}
+	}
+}
+
+// ServeMCPStdio는 stdio 전송으로 MCP를 제공합니다. 한 줄에 JSON-RPC 메시지(또는 배치 배열) 하나씩 읽고,
+// 요청은 줄마다 동시에 처리해 응답과 진행 알림을 끝나는 대로 한 줄씩 씁니다. 배치에 대한 응답은 한 줄의
+// 배열입니다. in이 끝나면 진행 중인 요청을 마저 처리하고 반환합니다.
+func (h *ApiHandler) ServeMCPStdio(ctx context.Context, in io.Reader, out io.Writer) error {
+	m := h.mcpServer()
+	inflight := newRPCInflight()
+	var writeMu sync.Mutex
+	write := func(v any) {
+		data, err := json.Marshal(v)
+		if err != nil {
+			slog.Error("Failed to encode MCP message", "error", err)
+			return
+		}
+		writeMu.Lock()
+		defer writeMu.Unlock()
+		out.Write(append(data, '\n'))
+	}
+	// 읽기는 별도 고루틴에서 해서 ctx가 끝나면(SIGTERM) stdin이 열려 있어도 반환할 수 있게 합니다.
+	lines := make(chan []byte)
+	readErr := make(chan error, 1)
+	go func() {
+		scanner := bufio.NewScanner(in)
+		scanner.Buffer(make([]byte, 64<<10), mcpMaxBody)
+		for scanner.Scan() {
+			line := append([]byte(nil), scanner.Bytes()...)
+			select {
+			case lines <- line:
+			case <-ctx.Done():
+				return
+			}
+		}
+		readErr <- scanner.Err()
+		close(lines)
+	}()
+
+	var wg sync.WaitGroup
+	defer wg.Wait()
+	for {
+		var line []byte
+		select {
+		case <-ctx.Done():
+			return nil
+		case l, ok := <-lines:
+			if !ok {
+				wg.Wait()
+				return <-readErr
+			}
+			line = l
+		}
+		if len(bytes.TrimSpace(line)) == 0 {
+			continue
+		}
+		msgs, invalid, batch, perr := decodeRPC(line)
+		if perr != nil {
+			write(perr)
+			continue
+		}
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			if !batch {
+				m.run(ctx, msgs, inflight, 1, write)
+				return
+			}
+			// 배치 응답은 한 줄의 배열로 모으고, 진행 알림만 바로 씁니다.
+			var mu sync.Mutex
+			responses := append([]*rpcResponse(nil), invalid...)
+			order := make(map[string]int, len(msgs))
+			for i, msg := range msgs {
+				order[string(msg.ID)] = i
+			}
+			m.run(ctx, msgs, inflight, h.Batch.Concurrency, func(v any) {
+				if res, ok := v.(*rpcResponse); ok {
+					mu.Lock()
+					responses = append(responses, res)
+					mu.Unlock()
+					return
+				}
+				write(v)
+			})
+			if len(responses) > 0 {
+				sortResponses(responses, order)
+				write(responses)
+			}
+		}()
+	}
+}
@@ -0,0 +1,430 @@
+package lib
+
+import (
+	"bufio"
+	"fmt"
+	"math"
+	"net/http"
+	"runtime"
+	"sort"
+	"strconv"
+	"strings"
+	"sync"
+	"sync/atomic"
+	"time"
+)
+
+// 지연 시간 히스토그램 버킷(초)과 응답 크기 히스토그램 버킷(바이트)
+var (
+	latencyBuckets = []float64{.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10}
+	sizeBuckets    = []float64{256, 1 << 10, 4 << 10, 16 << 10, 64 << 10, 256 << 10, 1 << 20}
+)
+
+// histogram은 누적되지 않은 버킷별 개수를 원자적으로 세고, 내보낼 때 누적 값으로 바꿉니다.
+type histogram struct {
+	buckets []float64
+	counts  []atomic.Uint64
+	count   atomic.Uint64
+	sumBits atomic.Uint64
+}
+
+func newHistogram(buckets []float64) *histogram {
+	return &histogram{buckets: buckets, counts: make([]atomic.Uint64, len(buckets))}
+}
+
+func (h *histogram) observe(v float64) {
+	if i := sort.SearchFloat64s(h.buckets, v); i < len(h.buckets) {
+		h.counts[i].Add(1)
+	}
+	h.count.Add(1)
+	for {
+		old := h.sumBits.Load()
+		if h.sumBits.CompareAndSwap(old, math.Float64bits(math.Float64frombits(old)+v)) {
+			return
+		}
+	}
+}
+
+// metricVec는 레이블 값 조합별 값을 담는 맵입니다. 값은 처음 쓰일 때 만들어집니다.
+type metricVec[T any] struct {
+	name, help, typ string
+	labels          []string
+	newValue        func() T
+
+	mu     sync.RWMutex
+	values map[string]T
+	keys   map[string][]string
+}
+
+func newVec[T any](name, help, typ string, newValue func() T, labels ...string) *metricVec[T] {
+	return &metricVec[T]{name: name, help: help, typ: typ, labels: labels, newValue: newValue,
+		values: make(map[string]T), keys: make(map[string][]string)}
+}
+
+func (v *metricVec[T]) with(values ...string) T {
+	key := strings.Join(values, "\xff")
+	v.mu.RLock()
+	m, ok := v.values[key]
+	v.mu.RUnlock()
+	if ok {
+		return m
+	}
+	v.mu.Lock()
+	defer v.mu.Unlock()
+	if m, ok = v.values[key]; !ok {
+		m = v.newValue()
+		v.values[key] = m
+		v.keys[key] = values
+	}
+	return m
+}
+
+// each는 레이블 값 순서로 정렬해 값을 하나씩 넘깁니다.
+func (v *metricVec[T]) each(fn func(labels []string, value T)) {
+	v.mu.RLock()
+	keys := make([]string, 0, len(v.values))
+	for k := range v.values {
+		keys = append(keys, k)
+	}
+	v.mu.RUnlock()
+	sort.Strings(keys)
+	for _, k := range keys {
+		v.mu.RLock()
+		value, labels := v.values[k], v.keys[k]
+		v.mu.RUnlock()
+		fn(labels, value)
+	}
+}
+
+type (
+	counterVec   = metricVec[*atomic.Uint64]
+	gaugeVec     = metricVec[*atomic.Int64]
+	histogramVec = metricVec[*histogram]
+)
+
+func newCounterVec(name, help string, labels ...string) *counterVec {
+	return newVec(name, help, "counter", func() *atomic.Uint64 { return new(atomic.Uint64) }, labels...)
+}
+
+func newGaugeVec(name, help string, labels ...string) *gaugeVec {
+	return newVec(name, help, "gauge", func() *atomic.Int64 { return new(atomic.Int64) }, labels...)
+}
+
+func newHistogramVec(name, help string, buckets []float64, labels ...string) *histogramVec {
+	return newVec(name, help, "histogram", func() *histogram { return newHistogram(buckets) }, labels...)
+}
+
+// Metrics는 HTTP 요청과 업스트림 호출의 Prometheus 지표입니다. nil이면 아무것도 기록하지 않습니다.
+type Metrics struct {
+	requests  *counterVec
+	duration  *histogramVec
+	size      *histogramVec
+	inFlight  *gaugeVec
+	phases    *histogramVec
+	responses *counterVec
+}
+
+// NewMetrics는 빈 지표 모음을 만듭니다.
+func NewMetrics() *Metrics {
+	return &Metrics{
+		requests: newCounterVec("kakao_mcp_http_requests_total",
+			"HTTP requests by route and status.", "route", "status"),
+		duration: newHistogramVec("kakao_mcp_http_request_duration_seconds",
+			"HTTP request latency by route and status.", latencyBuckets, "route", "status"),
+		size: newHistogramVec("kakao_mcp_http_response_size_bytes",
+			"HTTP response body size on the wire by route.", sizeBuckets, "route"),
+		inFlight: newGaugeVec("kakao_mcp_http_requests_in_flight",
+			"HTTP requests currently being served by route.", "route"),
+		phases: newHistogramVec("kakao_mcp_upstream_phase_seconds",
+			"Kakao API call latency by phase (dns, connect, tls, ttfb, body).", latencyBuckets, "endpoint", "phase"),
+		responses: newCounterVec("kakao_mcp_upstream_responses_total",
+			"Kakao API responses by endpoint and status (error for transport failures).", "endpoint", "status"),
+	}
+}
+
+// Instrument는 route 이름으로 요청 수, 지연 시간, 진행 중인 요청 수, 응답 크기를 기록합니다.
+// 압축 미들웨어 바깥에 두면 실제로 나간 바이트 수가 기록됩니다.
+func (m *Metrics) Instrument(route string, next http.HandlerFunc) http.HandlerFunc {
+	if m == nil {
+		return next
+	}
+	inFlight := m.inFlight.with(route)
+	return func(w http.ResponseWriter, r *http.Request) {
+		start := time.Now()
+		inFlight.Add(1)
+		defer inFlight.Add(-1)
+
+		mw := &meteredWriter{ResponseWriter: w, status: http.StatusOK}
+		next(mw, r)
+
+		status := strconv.Itoa(mw.status)
+		m.requests.with(route, status).Add(1)
+		m.duration.with(route, status).observe(time.Since(start).Seconds())
+		m.size.with(route).observe(float64(mw.bytes))
+	}
+}
+
+// meteredWriter는 상태 코드와 쓴 바이트 수를 기록하는 ResponseWriter입니다.
+type meteredWriter struct {
+	http.ResponseWriter
+	status int
+	bytes  int64
+}
+
+func (mw *meteredWriter) WriteHeader(code int) {
+	mw.status = code
+	mw.ResponseWriter.WriteHeader(code)
+}
+
+func (mw *meteredWriter) Write(p []byte) (int, error) {
+	n, err := mw.ResponseWriter.Write(p)
+	mw.bytes += int64(n)
+	return n, err
+}
+
+func (mw *meteredWriter) Flush() {
+	if flusher, ok := mw.ResponseWriter.(http.Flusher); ok {
+		flusher.Flush()
+	}
+}
+
+func (m *Metrics) observePhase(path, phase string, d time.Duration) {
+	if m != nil {
+		m.phases.with(endpointName(path), phase).observe(d.Seconds())
+	}
+}
+
+func (m *Metrics) countResponse(path, status string) {
+	if m != nil {
+		m.responses.with(endpointName(path), status).Add(1)
+	}
+}
+
+// metricWriter는 Prometheus 텍스트 형식(0.0.4)으로 지표를 씁니다.
+type metricWriter struct {
+	w *bufio.Writer
+}
+
+func (mw metricWriter) family(name, typ, help string) {
+	fmt.Fprintf(mw.w, "# HELP %s %s\n# TYPE %s %s\n", name, help, name, typ)
+}
+
+// sample은 `name{k="v",...} value` 한 줄을 씁니다. labels는 이름과 값이 번갈아 옵니다.
+func (mw metricWriter) sample(name string, value float64, labels ...string) {
+	mw.w.WriteString(name)
+	if len(labels) > 0 {
+		mw.w.WriteByte('{')
+		for i := 0; i+1 < len(labels); i += 2 {
+			if i > 0 {
+				mw.w.WriteByte(',')
+			}
+			mw.w.WriteString(labels[i])
+			mw.w.WriteString(`="`)
+			mw.w.WriteString(escapeLabel(labels[i+1]))
+			mw.w.WriteByte('"')
+		}
+		mw.w.WriteByte('}')
+	}
+	mw.w.WriteByte(' ')
+	mw.w.WriteString(strconv.FormatFloat(value, 'g', -1, 64))
+	mw.w.WriteByte('\n')
+}
+
+// gauge는 샘플 하나짜리 지표 계열을 씁니다.
+func (mw metricWriter) gauge(name, typ, help string, value float64, labels ...string) {
+	mw.family(name, typ, help)
+	mw.sample(name, value, labels...)
+}
+
+var labelEscaper = strings.NewReplacer(`\`, `\\`, `"`, `\"`, "\n", `\n`)
+
+func escapeLabel(v string) string {
+	return labelEscaper.Replace(v)
+}
+
+func pairs(names, values []string) []string {
+	out := make([]string, 0, 2*len(names)+2)
+	for i, n := range names {
+		out = append(out, n, values[i])
+	}
+	return out
+}
+
+func writeCounters(mw metricWriter, v *counterVec) {
+	mw.family(v.name, v.typ, v.help)
+	v.each(func(labels []string, c *atomic.Uint64) {
+		mw.sample(v.name, float64(c.Load()), pairs(v.labels, labels)...)
+	})
+}
+
+func writeGauges(mw metricWriter, v *gaugeVec) {
+	mw.family(v.name, v.typ, v.help)
+	v.each(func(labels []string, g *atomic.Int64) {
+		mw.sample(v.name, float64(g.Load()), pairs(v.labels, labels)...)
+	})
+}
+
+func writeHistograms(mw metricWriter, v *histogramVec) {
+	mw.family(v.name, v.typ, v.help)
+	v.each(func(labels []string, h *histogram) {
+		lp := pairs(v.labels, labels)
+		var cum uint64
+		for i, le := range h.buckets {
+			cum += h.counts[i].Load()
+			mw.sample(v.name+"_bucket", float64(cum), append(lp, "le", strconv.FormatFloat(le, 'g', -1, 64))...)
+		}
+		count := h.count.Load()
+		mw.sample(v.name+"_bucket", float64(count), append(lp, "le", "+Inf")...)
+		mw.sample(v.name+"_sum", math.Float64frombits(h.sumBits.Load()), lp...)
+		mw.sample(v.name+"_count", float64(count), lp...)
+	})
+}
+
+// MetricsHandler는 요청/업스트림 지표와 캐시, 스케줄러, 키 풀, 연결 풀, 런타임 상태를
+// Prometheus 텍스트 형식으로 반환합니다.
+func (h *ApiHandler) MetricsHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+	mw := metricWriter{w: bufio.NewWriter(w)}
+	defer mw.w.Flush()
+
+	if m := h.Metrics; m != nil {
+		writeCounters(mw, m.requests)
+		writeHistograms(mw, m.duration)
+		writeHistograms(mw, m.size)
+		writeGauges(mw, m.inFlight)
+		writeHistograms(mw, m.phases)
+		writeCounters(mw, m.responses)
+	}
+
+	up := h.Upstream.Stats()
+	mw.gauge("kakao_mcp_upstream_open_conns", "gauge", "Open connections to the Kakao API.", float64(up.OpenConns))
+	mw.gauge("kakao_mcp_upstream_in_flight", "gauge", "Kakao API calls in flight.", float64(up.InFlight))
+	mw.family("kakao_mcp_upstream_conns_total", "counter", "Connections handed to Kakao API calls by kind.")
+	mw.sample("kakao_mcp_upstream_conns_total", float64(up.NewConns), "kind", "new")
+	mw.sample("kakao_mcp_upstream_conns_total", float64(up.ReusedConns), "kind", "reused")
+	mw.gauge("kakao_mcp_upstream_dial_errors_total", "counter", "Failed dials to the Kakao API.", float64(up.DialErrors))
+	mw.family("kakao_mcp_upstream_bytes_total", "counter", "Kakao API response body bytes (wire = compressed, body = decoded).")
+	mw.sample("kakao_mcp_upstream_bytes_total", float64(up.BytesWire), "kind", "wire")
+	mw.sample("kakao_mcp_upstream_bytes_total", float64(up.BytesBody), "kind", "body")
+
+	cs := h.Cache.Stats()
+	mw.family("kakao_mcp_cache_events_total", "counter", "Response cache lookups and evictions by result.")
+	for _, e := range []struct {
+		result string
+		n      int64
+	}{{"hit", cs.Hits}, {"miss", cs.Misses}, {"coalesced", cs.Coalesced}, {"bypass", cs.Bypassed}, {"eviction", cs.Evictions}} {
+		mw.sample("kakao_mcp_cache_events_total", float64(e.n), "result", e.result)
+	}
+	mw.gauge("kakao_mcp_cache_entries", "gauge", "Response cache entries.", float64(cs.Entries))
+	mw.gauge("kakao_mcp_cache_bytes", "gauge", "Response cache body bytes.", float64(cs.Bytes))
+
+	cc := h.Cells.Stats()
+	mw.family("kakao_mcp_cellcache_events_total", "counter", "Reverse-geocoding cell cache lookups and evictions by result.")
+	for _, e := range []struct {
+		result string
+		n      int64
+	}{{"hit", cc.Hits}, {"neighbor_hit", cc.NeighborHits}, {"miss", cc.Misses}, {"eviction", cc.Evictions}} {
+		mw.sample("kakao_mcp_cellcache_events_total", float64(e.n), "result", e.result)
+	}
+	mw.gauge("kakao_mcp_cellcache_entries", "gauge", "Reverse-geocoding cell cache entries.", float64(cc.Entries))
+
+	if h.POIs != nil {
+		ps := h.POIs.Stats()
+		mw.family("kakao_mcp_poi_index_lookups_total", "counter", "Category radius queries checked against the place index by result.")
+		mw.sample("kakao_mcp_poi_index_lookups_total", float64(ps.Hits), "result", "hit")
+		mw.sample("kakao_mcp_poi_index_lookups_total", float64(ps.WidenedHits), "result", "widened_hit")
+		mw.sample("kakao_mcp_poi_index_lookups_total", float64(ps.Misses), "result", "miss")
+		mw.gauge("kakao_mcp_poi_index_places", "gauge", "Places in the place index.", float64(ps.Places))
+		mw.gauge("kakao_mcp_poi_index_covered_areas", "gauge", "Fresh areas whose category results are known to be complete.", float64(ps.Areas))
+	}
+
+	h.writeSchedulerMetrics(mw)
+	h.writeKeyMetrics(mw)
+	if h.Logs != nil {
+		ls := h.Logs.Stats()
+		mw.family("kakao_mcp_log_records_total", "counter", "Log records written to stdout or dropped because the log buffer was full.")
+		mw.sample("kakao_mcp_log_records_total", float64(ls.Written), "result", "written")
+		mw.sample("kakao_mcp_log_records_total", float64(ls.Dropped), "result", "dropped")
+		mw.gauge("kakao_mcp_log_queued", "gauge", "Log records waiting in the log buffer.", float64(ls.Queued))
+	}
+	writeRuntimeMetrics(mw)
+}
+
+func (h *ApiHandler) writeSchedulerMetrics(mw metricWriter) {
+	stats := h.Scheduler.Stats()
+	names := make([]string, 0, len(stats))
+	for name := range stats {
+		names = append(names, name)
+	}
+	sort.Strings(names)
+
+	mw.family("kakao_mcp_quota_used_today", "gauge", "Kakao API calls made today (KST) by endpoint.")
+	for _, n := range names {
+		mw.sample("kakao_mcp_quota_used_today", float64(stats[n].UsedToday), "endpoint", n)
+	}
+	mw.family("kakao_mcp_quota_daily_limit", "gauge", "Daily call limit by endpoint (0 = unlimited).")
+	for _, n := range names {
+		mw.sample("kakao_mcp_quota_daily_limit", float64(stats[n].Quota), "endpoint", n)
+	}
+	mw.family("kakao_mcp_scheduler_queued", "gauge", "Calls waiting for a token by endpoint and priority.")
+	for _, n := range names {
+		mw.sample("kakao_mcp_scheduler_queued", float64(stats[n].QueuedInteract), "endpoint", n, "priority", "interactive")
+		mw.sample("kakao_mcp_scheduler_queued", float64(stats[n].QueuedBulk), "endpoint", n, "priority", "bulk")
+	}
+	mw.family("kakao_mcp_scheduler_decisions_total", "counter", "Scheduler outcomes by endpoint.")
+	for _, n := range names {
+		s := stats[n]
+		mw.sample("kakao_mcp_scheduler_decisions_total", float64(s.Admitted), "endpoint", n, "result", "admitted")
+		mw.sample("kakao_mcp_scheduler_decisions_total", float64(s.Rejected), "endpoint", n, "result", "rejected")
+		mw.sample("kakao_mcp_scheduler_decisions_total", float64(s.Throttled), "endpoint", n, "result", "throttled")
+		mw.sample("kakao_mcp_scheduler_decisions_total", float64(s.Retries), "endpoint", n, "result", "retry")
+	}
+}
+
+func (h *ApiHandler) writeKeyMetrics(mw metricWriter) {
+	keys := h.Keys.Stats()
+	mw.family("kakao_mcp_key_healthy", "gauge", "1 when the API key is not cooling down.")
+	for _, k := range keys {
+		healthy := 0.0
+		if k.Healthy {
+			healthy = 1
+		}
+		mw.sample("kakao_mcp_key_healthy", healthy, "key", k.ID)
+	}
+	mw.family("kakao_mcp_key_in_flight", "gauge", "Kakao API calls in flight by API key.")
+	for _, k := range keys {
+		mw.sample("kakao_mcp_key_in_flight", float64(k.InFlight), "key", k.ID)
+	}
+	mw.family("kakao_mcp_key_used_today", "gauge", "Kakao API calls made today (KST) by API key and endpoint.")
+	for _, k := range keys {
+		for _, ep := range sortedKeys(k.UsedToday) {
+			mw.sample("kakao_mcp_key_used_today", float64(k.UsedToday[ep]), "key", k.ID, "endpoint", ep)
+		}
+	}
+	mw.family("kakao_mcp_key_remaining_today", "gauge", "Calls left today by API key and endpoint (only with KEY_QUOTA_DAILY).")
+	for _, k := range keys {
+		for _, ep := range sortedKeys(k.RemainingToday) {
+			mw.sample("kakao_mcp_key_remaining_today", float64(k.RemainingToday[ep]), "key", k.ID, "endpoint", ep)
+		}
+	}
+}
+
+func sortedKeys(m map[string]int64) []string {
+	keys := make([]string, 0, len(m))
+	for k := range m {
+		keys = append(keys, k)
+	}
+	sort.Strings(keys)
+	return keys
+}
+
+func writeRuntimeMetrics(mw metricWriter) {
+	var ms runtime.MemStats
+	runtime.ReadMemStats(&ms)
+	mw.gauge("go_goroutines", "gauge", "Number of goroutines.", float64(runtime.NumGoroutine()))
+	mw.gauge("go_memstats_heap_alloc_bytes", "gauge", "Heap bytes allocated and in use.", float64(ms.HeapAlloc))
+	mw.gauge("go_memstats_alloc_bytes_total", "counter", "Total heap bytes allocated.", float64(ms.TotalAlloc))
+	mw.gauge("go_memstats_mallocs_total", "counter", "Total heap objects allocated.", float64(ms.Mallocs))
+	mw.gauge("go_gc_cycles_total", "counter", "Completed GC cycles.", float64(ms.NumGC))
+	mw.gauge("go_gc_pause_seconds_total", "counter", "Total GC stop-the-world pause time.", float64(ms.PauseTotalNs)/1e9)
+}
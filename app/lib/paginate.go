@@ -0,0 +1,147 @@
+package lib
+
+import (
+	"context"
+	"encoding/json"
+	"log/slog"
+	"net/http"
+	"net/url"
+	"strconv"
+)
+
+// 페이지 단위 스트리밍에 쓰이는 MCP 서버 전용 파라미터입니다. 업스트림에는 전달하지 않습니다.
+//
+//	max_pages     따라갈 최대 페이지 수
+//	max_results   받을 최대 document 수 (도달한 페이지에서 멈춤)
+//	prefetch      1이면 현재 페이지를 보내는 동안 다음 페이지를 미리 요청
+var paginationParams = []string{"max_pages", "max_results", "prefetch"}
+
+// pageablePaths는 meta.is_end/page 페이지네이션을 지원하는 Kakao 검색 API입니다.
+var pageablePaths = map[string]bool{
+	"/v2/local/search/address.json":  true,
+	"/v2/local/search/keyword.json":  true,
+	"/v2/local/search/category.json": true,
+}
+
+// kakaoMaxPage는 Kakao 검색 API가 허용하는 최대 page 값입니다.
+const kakaoMaxPage = 45
+
+// pageMeta는 페이지 응답에서 페이지네이션에 필요한 부분만 읽기 위한 구조입니다.
+type pageMeta struct {
+	Meta struct {
+		IsEnd         bool `json:"is_end"`
+		PageableCount int  `json:"pageable_count"`
+		TotalCount    int  `json:"total_count"`
+	} `json:"meta"`
+	Documents []json.RawMessage `json:"documents"`
+}
+
+type pageSummary struct {
+	Pages   int  `json:"pages"`
+	Results int  `json:"results"`
+	IsEnd   bool `json:"is_end"`
+}
+
+type pageFetch struct {
+	page int
+	res  *upstreamResult
+	err  error
+}
+
+// wantsPagination은 요청이 페이지 단위 스트리밍을 원하는지 확인합니다.
+func wantsPagination(path string, q url.Values) bool {
+	return pageablePaths[path] && (q.Get("max_pages") != "" || q.Get("max_results") != "")
+}
+
+// streamPages는 Kakao의 meta.is_end/page를 따라가며 각 페이지를 도착하는 즉시
+// `event: page` SSE 이벤트로 보내고, 마지막에 `event: done` 요약을 보냅니다.
+// fields/format은 페이지마다 적용되고, limit은 모든 페이지를 합친 document 수의 상한입니다.
+func (h *ApiHandler) streamPages(w http.ResponseWriter, r *http.Request, path string) {
+	q := r.URL.Query()
+	maxPages, _ := strconv.Atoi(q.Get("max_pages"))
+	maxResults, _ := strconv.Atoi(q.Get("max_results"))
+	prefetch := q.Get("prefetch") == "1" || q.Get("prefetch") == "true"
+	if maxPages <= 0 {
+		maxPages = kakaoMaxPage
+	}
+	for _, p := range paginationParams {
+		q.Del(p)
+	}
+	page, _ := strconv.Atoi(q.Get("page"))
+	if page <= 0 {
+		page = 1
+	}
+	bypass := cacheBypassed(r)
+
+	fetchPage := func(ctx context.Context, page int) pageFetch {
+		pq := make(url.Values, len(q))
+		for k, v := range q {
+			pq[k] = v
+		}
+		pq.Set("page", strconv.Itoa(page))
+		res, _, err := h.fetch(ctx, path, pq, bypass)
+		return pageFetch{page: page, res: res, err: err}
+	}
+
+	ctx := requestContext(r)
+	proj := projectionFrom(ctx)
+	limit := proj.docLimit()
+	setSSEHeaders(w)
+	summary := pageSummary{}
+	current := fetchPage(ctx, page)
+	for {
+		if current.err != nil {
+			if summary.Pages == 0 {
+				h.writeError(w, current.err)
+				return
+			}
+			// 이미 페이지를 보냈으면 상태 코드를 바꿀 수 없으므로 오류 이벤트로 알립니다.
+			_, _, body := errorResponse(current.err)
+			writeSSEEvent(w, "error", current.page, body)
+			break
+		}
+		var meta pageMeta
+		if current.res.Status != http.StatusOK || json.Unmarshal(current.res.Body, &meta) != nil {
+			if summary.Pages == 0 {
+				// 아직 아무것도 보내지 않았으면 페이지를 따라가지 않는 응답처럼 Kakao의 상태 코드를 그대로 돌려줍니다.
+				w.WriteHeader(current.res.Status)
+				writeSSEEvent(w, "error", current.page, current.res.Body)
+				return
+			}
+			writeSSEEvent(w, "error", current.page, current.res.Body)
+			break
+		}
+		pageLimit, docs := 0, len(meta.Documents)
+		if limit > 0 {
+			pageLimit = limit - summary.Results
+			docs = min(docs, pageLimit)
+		}
+		summary.Pages++
+		summary.Results += docs
+		summary.IsEnd = meta.Meta.IsEnd
+
+		last := meta.Meta.IsEnd || summary.Pages >= maxPages || current.page >= kakaoMaxPage ||
+			(maxResults > 0 && summary.Results >= maxResults) || (limit > 0 && summary.Results >= limit)
+
+		var next chan pageFetch
+		if !last && prefetch {
+			next = make(chan pageFetch, 1)
+			go func(page int) { next <- fetchPage(ctx, page) }(current.page + 1)
+		}
+		if err := writeProjected(w, proj, "page", current.page, http.StatusOK, current.res.Body, pageLimit); err != nil {
+			// 클라이언트가 떠났으면 남은 페이지도 done 요약도 보낼 곳이 없습니다.
+			slog.Warn("Paginated search client went away", "error", err)
+			return
+		}
+		if last {
+			break
+		}
+		if next != nil {
+			current = <-next
+		} else {
+			current = fetchPage(ctx, current.page+1)
+		}
+	}
+	data, _ := json.Marshal(summary)
+	writeSSEEvent(w, "done", -1, data)
+}
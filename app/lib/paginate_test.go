@@ -0,0 +1,50 @@
+package lib
+
+import (
+	"errors"
+	"korean-map-mcp/internal/kakaomock"
+	"net/http"
+	"net/http/httptest"
+	"strings"
+	"testing"
+)
+
+// failingWriter는 okWrites번 쓴 뒤부터 Write가 실패하는, 연결이 끊긴 클라이언트입니다.
+type failingWriter struct {
+	*httptest.ResponseRecorder
+	okWrites int
+	writes   int
+}
+
+func (f *failingWriter) Write(p []byte) (int, error) {
+	f.writes++
+	if f.writes > f.okWrites {
+		return 0, errors.New("broken pipe")
+	}
+	return f.ResponseRecorder.Write(p)
+}
+
+func TestStreamPages(t *testing.T) {
+	h, mock := newMockHandlerWith(t, kakaomock.Config{Total: 100}, "0")
+	serve := func(w http.ResponseWriter, query string) {
+		h.KeywordHandler(w, httptest.NewRequest(http.MethodGet, "/search/keyword?query=%EC%B9%B4%ED%8E%98&"+query, nil))
+	}
+
+	w := httptest.NewRecorder()
+	serve(w, "max_pages=2")
+	body := w.Body.String()
+	if strings.Count(body, "event: page\n") != 2 || !strings.Contains(body, `{"pages":2,"results":30,"is_end":false}`) {
+		t.Errorf("max_pages=2:\n%s", body)
+	}
+
+	// 클라이언트가 떠나면 다음 페이지도, done 요약도 보내려 하지 않습니다.
+	before := mockRequests(mock, "keyword")
+	fw := &failingWriter{ResponseRecorder: httptest.NewRecorder(), okWrites: 1}
+	serve(fw, "max_pages=3")
+	if fw.writes != 2 || strings.Contains(fw.Body.String(), "event: done") {
+		t.Errorf("writes after the client went away = %d, body:\n%s", fw.writes, fw.Body)
+	}
+	if got := mockRequests(mock, "keyword") - before; got != 2 {
+		t.Errorf("upstream calls = %d, want 2", got)
+	}
+}
@@ -0,0 +1,205 @@
+package lib
+
+import (
+	"bytes"
+	"compress/gzip"
+	"io"
+	"net/http"
+	"strconv"
+	"strings"
+	"sync"
+	"time"
+)
+
+// maxPooledBuffer보다 커진 버퍼는 풀에 돌려놓지 않습니다. 드물게 큰 응답 하나가 풀을 부풀리지 않게 합니다.
+const maxPooledBuffer = 1 << 20
+
+var bufferPool = sync.Pool{New: func() any { return new(bytes.Buffer) }}
+
+func getBuffer() *bytes.Buffer {
+	return bufferPool.Get().(*bytes.Buffer)
+}
+
+func putBuffer(buf *bytes.Buffer) {
+	if buf.Cap() > maxPooledBuffer {
+		return
+	}
+	buf.Reset()
+	bufferPool.Put(buf)
+}
+
+// gzip.Reader는 만들 때마다 수십 KB의 상태를 할당하므로 Reset으로 재사용합니다.
+var gzipReaderPool sync.Pool
+
+// countingReader는 읽은 바이트 수를 셉니다. 업스트림에서 실제로 받은 (압축된) 크기를 재는 데 씁니다.
+type countingReader struct {
+	r io.Reader
+	n int64
+}
+
+func (c *countingReader) Read(p []byte) (int, error) {
+	n, err := c.r.Read(p)
+	c.n += int64(n)
+	return n, err
+}
+
+// readBody는 업스트림 응답 본문을 풀에 있는 버퍼로 읽고, 정확한 크기의 사본 하나만 할당해 반환합니다.
+// gzip으로 온 본문은 풀에 있는 gzip.Reader로 풉니다.
+func (u *Upstream) readBody(resp *http.Response) ([]byte, error) {
+	if resp.Request != nil {
+		start := time.Now()
+		defer func() { u.Metrics.observePhase(resp.Request.URL.Path, "body", time.Since(start)) }()
+	}
+	wire := &countingReader{r: resp.Body}
+	var src io.Reader = wire
+	if strings.EqualFold(resp.Header.Get("Content-Encoding"), "gzip") {
+		zr, _ := gzipReaderPool.Get().(*gzip.Reader)
+		var err error
+		if zr == nil {
+			zr, err = gzip.NewReader(wire)
+		} else {
+			err = zr.Reset(wire)
+		}
+		if err != nil {
+			return nil, err
+		}
+		defer gzipReaderPool.Put(zr)
+		src = zr
+	}
+
+	buf := getBuffer()
+	defer putBuffer(buf)
+	if resp.ContentLength > 0 && resp.Header.Get("Content-Encoding") == "" {
+		buf.Grow(int(resp.ContentLength) + bytes.MinRead)
+	}
+	if _, err := buf.ReadFrom(src); err != nil {
+		return nil, err
+	}
+	u.bytesWire.Add(wire.n)
+	u.bytesBody.Add(int64(buf.Len()))
+	return bytes.Clone(buf.Bytes()), nil
+}
+
+// CompressConfig는 클라이언트 응답 압축 설정입니다.
+type CompressConfig struct {
+	Enabled bool
+	Level   int
+}
+
+// LoadCompressConfig는 환경 변수에서 응답 압축 설정을 읽습니다.
+//
+//	RESPONSE_GZIP         Accept-Encoding에 gzip이 있으면 응답을 gzip으로 압축 (기본 true)
+//	RESPONSE_GZIP_LEVEL   압축 수준 1(빠름)~9(작음) (기본 1)
+func LoadCompressConfig() CompressConfig {
+	level := envInt("RESPONSE_GZIP_LEVEL", gzip.BestSpeed)
+	if level < gzip.BestSpeed || level > gzip.BestCompression {
+		level = gzip.BestSpeed
+	}
+	return CompressConfig{
+		Enabled: envBool("RESPONSE_GZIP", true),
+		Level:   level,
+	}
+}
+
+// Compressor는 gzip.Writer를 풀에서 재사용하며 응답을 압축하는 미들웨어를 만듭니다.
+type Compressor struct {
+	cfg  CompressConfig
+	pool sync.Pool
+}
+
+// NewCompressor는 설정에 맞는 Compressor를 만듭니다.
+func NewCompressor(cfg CompressConfig) *Compressor {
+	c := &Compressor{cfg: cfg}
+	c.pool.New = func() any {
+		zw, _ := gzip.NewWriterLevel(io.Discard, cfg.Level)
+		return zw
+	}
+	return c
+}
+
+// Wrap은 클라이언트가 gzip을 받을 수 있으면 next의 응답을 압축합니다.
+// SSE 이벤트마다 Flush가 불리므로 압축 스트림도 이벤트 단위로 내보내집니다.
+func (c *Compressor) Wrap(next http.HandlerFunc) http.HandlerFunc {
+	return func(w http.ResponseWriter, r *http.Request) {
+		if !c.cfg.Enabled || !acceptsGzip(r.Header.Get("Accept-Encoding")) {
+			next(w, r)
+			return
+		}
+		w.Header().Add("Vary", "Accept-Encoding")
+		gw := &gzipResponseWriter{ResponseWriter: w, c: c}
+		defer gw.close()
+		next(gw, r)
+	}
+}
+
+// acceptsGzip은 Accept-Encoding 헤더가 gzip(또는 *)을 q=0이 아닌 값으로 허용하는지 확인합니다.
+func acceptsGzip(header string) bool {
+	for _, part := range strings.Split(header, ",") {
+		coding, params, _ := strings.Cut(strings.TrimSpace(part), ";")
+		coding = strings.ToLower(strings.TrimSpace(coding))
+		if coding != "gzip" && coding != "*" {
+			continue
+		}
+		q := 1.0
+		if v, ok := strings.CutPrefix(strings.ReplaceAll(params, " ", ""), "q="); ok {
+			if f, err := strconv.ParseFloat(v, 64); err == nil {
+				q = f
+			}
+		}
+		return q > 0
+	}
+	return false
+}
+
+// gzipResponseWriter는 첫 Write에서 gzip 스트림을 시작합니다. 본문이 없는 응답에는 압축 헤더를 붙이지 않습니다.
+type gzipResponseWriter struct {
+	http.ResponseWriter
+	c           *Compressor
+	zw          *gzip.Writer
+	wroteHeader bool
+}
+
+func (g *gzipResponseWriter) WriteHeader(code int) {
+	if g.wroteHeader {
+		return
+	}
+	g.wroteHeader = true
+	h := g.Header()
+	if code != http.StatusNoContent && code != http.StatusNotModified && h.Get("Content-Encoding") == "" {
+		h.Set("Content-Encoding", "gzip")
+		h.Del("Content-Length")
+		g.zw = g.c.pool.Get().(*gzip.Writer)
+		g.zw.Reset(g.ResponseWriter)
+	}
+	g.ResponseWriter.WriteHeader(code)
+}
+
+func (g *gzipResponseWriter) Write(p []byte) (int, error) {
+	if !g.wroteHeader {
+		g.WriteHeader(http.StatusOK)
+	}
+	if g.zw == nil {
+		return g.ResponseWriter.Write(p)
+	}
+	return g.zw.Write(p)
+}
+
+// Flush는 지금까지 압축한 내용을 내보낸 뒤 하위 ResponseWriter를 flush합니다.
+func (g *gzipResponseWriter) Flush() {
+	if g.zw != nil {
+		g.zw.Flush()
+	}
+	if flusher, ok := g.ResponseWriter.(http.Flusher); ok {
+		flusher.Flush()
+	}
+}
+
+func (g *gzipResponseWriter) close() {
+	if g.zw == nil {
+		return
+	}
+	g.zw.Close()
+	g.zw.Reset(io.Discard)
+	g.c.pool.Put(g.zw)
+	g.zw = nil
+}
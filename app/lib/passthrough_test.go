@@ -0,0 +1,223 @@
+package lib
+
+import (
+	"bytes"
+	"compress/gzip"
+	"fmt"
+	"io"
+	"log/slog"
+	"net/http"
+	"net/http/httptest"
+	"strconv"
+	"testing"
+)
+
+// keywordPage는 실제 키워드 검색 한 페이지(15건, 약 20KB)와 비슷한 크기의 응답 본문을 만듭니다.
+func keywordPage() []byte {
+	words := []string{"판교", "테크노밸리", "카페", "주차", "가능", "무선인터넷", "단체석", "포장", "배달", "예약", "24시", "역세권", "신메뉴", "디저트", "브런치", "라떼"}
+	seed := uint32(1)
+	description := func() string {
+		var d bytes.Buffer
+		for d.Len() < 1200 {
+			seed = seed*1664525 + 1013904223
+			d.WriteString(words[seed>>28])
+			d.WriteString(strconv.Itoa(int(seed>>20) % 1000))
+			d.WriteByte(' ')
+		}
+		return d.String()
+	}
+	var buf bytes.Buffer
+	buf.WriteString(`{"documents":[`)
+	for i := 0; i < 15; i++ {
+		if i > 0 {
+			buf.WriteByte(',')
+		}
+		fmt.Fprintf(&buf, `{"address_name":"경기 성남시 분당구 삼평동 %d","category_group_code":"CE7","category_group_name":"카페",`+
+			`"category_name":"음식점 > 카페 > 커피전문점 > 스타벅스","distance":"%d","id":"%d","phone":"1522-3232",`+
+			`"place_name":"스타벅스 판교테크노밸리점 %d","place_url":"http://place.map.kakao.com/%d",`+
+			`"road_address_name":"경기 성남시 분당구 판교역로 %d","x":"127.1%05d","y":"37.4%05d",`+
+			`"description":"%s"}`, 600+i, 120*i, 26338954+i, i, 26338954+i, 200+i, i*37, i*53, description())
+	}
+	buf.WriteString(`],"meta":{"is_end":false,"pageable_count":45,"same_name":null,"total_count":312}}`)
+	return buf.Bytes()
+}
+
+func gzipBytes(b []byte) []byte {
+	var buf bytes.Buffer
+	zw := gzip.NewWriter(&buf)
+	zw.Write(b)
+	zw.Close()
+	return buf.Bytes()
+}
+
+// countingResponseWriter는 클라이언트로 나간 바이트 수만 세는 ResponseWriter입니다.
+type countingResponseWriter struct {
+	header http.Header
+	n      int64
+}
+
+func (c *countingResponseWriter) Header() http.Header { return c.header }
+func (c *countingResponseWriter) WriteHeader(int)     {}
+func (c *countingResponseWriter) Flush()              {}
+func (c *countingResponseWriter) Write(p []byte) (int, error) {
+	c.n += int64(len(p))
+	return len(p), nil
+}
+
+func (c *countingResponseWriter) reset() {
+	clear(c.header)
+	c.n = 0
+}
+
+type roundTripFunc func(*http.Request) (*http.Response, error)
+
+func (f roundTripFunc) RoundTrip(r *http.Request) (*http.Response, error) { return f(r) }
+
+func upstreamResponse(body []byte, encoding string) *http.Response {
+	resp := &http.Response{StatusCode: http.StatusOK, Header: http.Header{}, Body: io.NopCloser(bytes.NewReader(body)), ContentLength: int64(len(body))}
+	if encoding != "" {
+		resp.Header.Set("Content-Encoding", encoding)
+	}
+	return resp
+}
+
+// BenchmarkRelay는 업스트림 본문 하나를 읽어 SSE 이벤트로 쓰는 비용을 이전 방식과 비교합니다.
+//
+//	go test ./lib -run '^$' -bench Relay -benchmem
+func BenchmarkRelay(b *testing.B) {
+	slog.SetDefault(slog.New(slog.NewTextHandler(io.Discard, nil)))
+	body := keywordPage()
+	compressed := gzipBytes(body)
+	w := &countingResponseWriter{header: http.Header{}}
+
+	// 이전 방식: ReadAll, 디버그 로그용 string 변환, Fprintf로 SSE 프레임. gzip은 Transport가 매번 새 Reader로 풉니다.
+	legacy := func(resp *http.Response) {
+		var r io.Reader = resp.Body
+		if resp.Header.Get("Content-Encoding") == "gzip" {
+			zr, _ := gzip.NewReader(resp.Body)
+			r = zr
+		}
+		data, _ := io.ReadAll(r)
+		slog.Debug("Kakao API response body", "body", string(data))
+		fmt.Fprintf(w, "data: %s\n\n", data)
+	}
+	u := NewUpstream(LoadUpstreamConfig())
+	pooled := func(resp *http.Response) {
+		data, _ := u.readBody(resp)
+		writeSSEEvent(w, "", -1, data)
+	}
+
+	for _, c := range []struct {
+		name     string
+		relay    func(*http.Response)
+		body     []byte
+		encoding string
+	}{
+		{"legacy", legacy, body, ""},
+		{"legacy-gzip", legacy, compressed, "gzip"},
+		{"pooled", pooled, body, ""},
+		{"pooled-gzip", pooled, compressed, "gzip"},
+	} {
+		b.Run(c.name, func(b *testing.B) {
+			b.ReportAllocs()
+			b.SetBytes(int64(len(body)))
+			for i := 0; i < b.N; i++ {
+				c.relay(upstreamResponse(c.body, c.encoding))
+			}
+			b.ReportMetric(float64(len(c.body)), "upstream-B/op")
+		})
+	}
+}
+
+// BenchmarkKeywordHandler는 캐시 없이 /search/keyword 요청 하나를 처리하는 전체 경로의
+// 할당과 클라이언트로 나가는 바이트 수(wire-B/op)를 Accept-Encoding별로 잽니다.
+//
+//	go test ./lib -run '^$' -bench KeywordHandler -benchmem
+func BenchmarkKeywordHandler(b *testing.B) {
+	slog.SetDefault(slog.New(slog.NewTextHandler(io.Discard, nil)))
+	b.Setenv("KAKAO_API_KEYS", "bench-key")
+	b.Setenv("CACHE_MAX_BYTES", "0")
+	b.Setenv("RATE_LIMIT_RPS", "0")
+	body := keywordPage()
+	compressed := gzipBytes(body)
+
+	h := NewApiHandler(slog.Default())
+	h.Upstream.Client.Transport = roundTripFunc(func(r *http.Request) (*http.Response, error) {
+		if r.Header.Get("Accept-Encoding") == "gzip" {
+			return upstreamResponse(compressed, "gzip"), nil
+		}
+		return upstreamResponse(body, ""), nil
+	})
+	handler := NewCompressor(LoadCompressConfig()).Wrap(h.KeywordHandler)
+	req := httptest.NewRequest(http.MethodGet, "/search/keyword?query=%EC%B9%B4%ED%8E%98", nil)
+
+	for _, enc := range []string{"identity", "gzip"} {
+		b.Run(enc, func(b *testing.B) {
+			req.Header.Set("Accept-Encoding", enc)
+			w := &countingResponseWriter{header: http.Header{}}
+			var wire int64
+			b.ReportAllocs()
+			for i := 0; i < b.N; i++ {
+				w.reset()
+				handler(w, req)
+				wire += w.n
+			}
+			b.ReportMetric(float64(wire)/float64(b.N), "wire-B/op")
+			b.ReportMetric(float64(h.Upstream.Stats().BytesWire)/float64(h.Upstream.Stats().Requests), "upstream-B/op")
+		})
+	}
+}
+
+func TestAcceptsGzip(t *testing.T) {
+	for header, want := range map[string]bool{
+		"":                       false,
+		"gzip":                   true,
+		"br, gzip;q=0.8":         true,
+		"gzip;q=0":               false,
+		"identity":               false,
+		"*":                      true,
+		"deflate, GZIP ; q=0.5 ": true,
+	} {
+		if got := acceptsGzip(header); got != want {
+			t.Errorf("acceptsGzip(%q) = %v, want %v", header, got, want)
+		}
+	}
+}
+
+func TestGzipRoundTrip(t *testing.T) {
+	body := keywordPage()
+	u := NewUpstream(LoadUpstreamConfig())
+	for i := 0; i < 2; i++ {
+		got, err := u.readBody(upstreamResponse(gzipBytes(body), "gzip"))
+		if err != nil || !bytes.Equal(got, body) {
+			t.Fatalf("readBody #%d: err=%v equal=%v", i, err, bytes.Equal(got, body))
+		}
+	}
+
+	rec := httptest.NewRecorder()
+	req := httptest.NewRequest(http.MethodGet, "/", nil)
+	req.Header.Set("Accept-Encoding", "gzip")
+	NewCompressor(CompressConfig{Enabled: true, Level: gzip.BestSpeed}).Wrap(func(w http.ResponseWriter, r *http.Request) {
+		setSSEHeaders(w)
+		for id := 0; id < 3; id++ {
+			writeSSEEvent(w, "page", id, body)
+		}
+	})(rec, req)
+	if rec.Header().Get("Content-Encoding") != "gzip" {
+		t.Fatalf("Content-Encoding = %q", rec.Header().Get("Content-Encoding"))
+	}
+	zr, err := gzip.NewReader(rec.Body)
+	if err != nil {
+		t.Fatal(err)
+	}
+	plain, _ := io.ReadAll(zr)
+	var want bytes.Buffer
+	for id := 0; id < 3; id++ {
+		want.WriteString("event: page\nid: " + strconv.Itoa(id) + "\ndata: ")
+		want.Write(body)
+		want.WriteString("\n\n")
+	}
+	if !bytes.Equal(plain, want.Bytes()) {
+		t.Fatalf("decoded stream differs: %d bytes, want %d", len(plain), want.Len())
+	}
+}
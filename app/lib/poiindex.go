@@ -0,0 +1,585 @@
+package lib
+
+import (
+	"bytes"
+	"context"
+	"encoding/json"
+	"math"
+	"net/http"
+	"net/url"
+	"sort"
+	"strconv"
+	"sync"
+	"sync/atomic"
+	"time"
+)
+
+const (
+	categorySearchPath = "/v2/local/search/category.json"
+	keywordSearchPath  = "/v2/local/search/keyword.json"
+
+	// poiCellDeg는 장소 격자 한 칸의 크기(도)입니다. 위도 37°에서 약 440m x 555m입니다.
+	poiCellDeg = 0.005
+	// kakaoMaxRadius는 Kakao 검색 API의 radius 상한(m)입니다.
+	kakaoMaxRadius = 20000
+	// poiMaxAreas는 카테고리마다 기억하는 완전 범위/밀집 범위의 최대 개수입니다. 넘치면 오래된 것부터 버립니다.
+	poiMaxAreas = 4096
+	// metersPerDegree는 위도 1도의 길이(m)입니다.
+	metersPerDegree = 6371008.8 * math.Pi / 180
+)
+
+// POIIndexConfig는 검색 응답의 장소를 모아 두는 공간 인덱스 설정입니다.
+type POIIndexConfig struct {
+	MaxPlaces int
+	// TTL이 지나면 범위의 완전성을 더 믿지 않고 업스트림에 다시 묻습니다. 0이면 만료되지 않습니다.
+	TTL time.Duration
+	// Widen은 인덱스로 답하지 못한 반경 질의를 반경을 이 배수로 넓혀 한 번에 가져올지 정합니다. 1 이하이면 넓히지 않습니다.
+	Widen float64
+}
+
+// LoadPOIIndexConfig는 환경 변수에서 장소 인덱스 설정을 읽습니다.
+//
+//	POI_INDEX_MAX_PLACES   보관할 최대 장소 수 (기본 100000, 0이면 비활성화)
+//	POI_INDEX_TTL          범위를 "완전하고 새롭다"고 볼 시간 (기본 1h)
+//	POI_INDEX_WIDEN        인덱스 실패 시 반경을 넓혀 가져올 배수 (기본 2, 1이면 넓히지 않음)
+func LoadPOIIndexConfig() POIIndexConfig {
+	return POIIndexConfig{
+		MaxPlaces: envInt("POI_INDEX_MAX_PLACES", 100000),
+		TTL:       envDuration("POI_INDEX_TTL", time.Hour),
+		Widen:     envFloat("POI_INDEX_WIDEN", 2),
+	}
+}
+
+// POIIndexStats는 장소 인덱스의 현재 상태입니다.
+type POIIndexStats struct {
+	Hits        int64 `json:"hits"`
+	WidenedHits int64 `json:"widened_hits"`
+	Misses      int64 `json:"misses"`
+	Rejected    int64 `json:"rejected"`
+	Removed     int64 `json:"removed"`
+	Places      int   `json:"places"`
+	MaxPlaces   int   `json:"max_places"`
+	Areas       int   `json:"covered_areas"`
+	DenseAreas  int   `json:"dense_areas"`
+}
+
+// poiPlace는 인덱스에 든 장소 하나입니다. doc은 distance를 뺀 Kakao document이고, id가 비어 있으면 빈 슬롯입니다.
+type poiPlace struct {
+	id       string
+	category string
+	lon, lat float64
+	seen     int64
+	doc      []byte
+}
+
+type poiCell struct {
+	category string
+	ix, iy   int32
+}
+
+// poiArea는 한 카테고리의 결과를 빠짐없이 받은 범위(원 또는 사각형)입니다. 밀집 범위로 쓰일 때는
+// 한 페이지에 다 담기지 않을 만큼 장소가 많았던 원입니다.
+type poiArea struct {
+	lon, lat, radius float64
+	box              bbox
+	rect             bool
+	at               int64
+}
+
+// poiQuery는 인덱스로 답할 수 있는 형태의 카테고리 반경 질의입니다.
+type poiQuery struct {
+	category   string
+	x, y       string
+	lon, lat   float64
+	radius     float64
+	page, size int
+}
+
+// POIIndex는 keyword/category 응답에서 본 장소를 배열에 모아 두고, 카테고리별 격자로 찾는 공간 인덱스입니다.
+// 카테고리 응답 중 한 페이지에 모든 결과가 담긴 것은 그 범위가 "완전하다"는 기록을 남기고, 완전하고 새로운
+// 범위 안에 들어가는 sort=distance 반경 질의는 업스트림 없이 거리순으로 답합니다.
+type POIIndex struct {
+	cfg POIIndexConfig
+
+	mu        sync.RWMutex
+	places    []poiPlace
+	free      []int32
+	byID      map[string]int32
+	grid      map[poiCell][]int32
+	areas     map[string][]poiArea
+	dense     map[string][]poiArea
+	lastPurge int64
+
+	hits, widenedHits, misses, rejected, removed atomic.Int64
+}
+
+// NewPOIIndex는 빈 장소 인덱스를 생성합니다. MaxPlaces가 0 이하이면 nil을 반환하고, nil 인덱스의 메서드는 아무것도 하지 않습니다.
+func NewPOIIndex(cfg POIIndexConfig) *POIIndex {
+	if cfg.MaxPlaces <= 0 {
+		return nil
+	}
+	return &POIIndex{
+		cfg:   cfg,
+		byID:  make(map[string]int32),
+		grid:  make(map[poiCell][]int32),
+		areas: make(map[string][]poiArea),
+		dense: make(map[string][]poiArea),
+	}
+}
+
+func (x *POIIndex) fresh(at, now int64) bool {
+	return x.cfg.TTL <= 0 || now-at <= int64(x.cfg.TTL)
+}
+
+func cellOf(lon, lat float64) (int32, int32) {
+	return int32(math.Floor(lon / poiCellDeg)), int32(math.Floor(lat / poiCellDeg))
+}
+
+// discBox는 중심과 반경(m)인 원을 감싸는 경위도 사각형입니다.
+func discBox(lon, lat, radius float64) bbox {
+	dLat := radius / metersPerDegree
+	dLon := radius / (metersPerDegree * math.Max(math.Cos(lat*math.Pi/180), 1e-6))
+	return bbox{lon - dLon, lat - dLat, lon + dLon, lat + dLat}
+}
+
+// eachCell은 category의 격자 중 b와 겹치는 칸의 장소 번호를 f에 넘깁니다.
+func (x *POIIndex) eachCell(category string, b bbox, f func(i int32)) {
+	x0, y0 := cellOf(b.minX, b.minY)
+	x1, y1 := cellOf(b.maxX, b.maxY)
+	for iy := y0; iy <= y1; iy++ {
+		for ix := x0; ix <= x1; ix++ {
+			for _, i := range x.grid[poiCell{category, ix, iy}] {
+				f(i)
+			}
+		}
+	}
+}
+
+func (a poiArea) contains(lon, lat float64) bool {
+	if a.rect {
+		return a.box.contains(lon, lat)
+	}
+	return haversineMeters(a.lon, a.lat, lon, lat) <= a.radius
+}
+
+// covers는 원 (lon, lat, radius)가 이 범위 안에 들어가는지 확인합니다. 경계에서 1m의 오차는 허용합니다.
+func (a poiArea) covers(lon, lat, radius float64) bool {
+	if a.rect {
+		d := discBox(lon, lat, radius)
+		return d.minX >= a.box.minX && d.minY >= a.box.minY && d.maxX <= a.box.maxX && d.maxY <= a.box.maxY
+	}
+	return haversineMeters(a.lon, a.lat, lon, lat)+radius <= a.radius+1
+}
+
+// within은 이 범위가 a 안에 완전히 들어가는지 확인합니다.
+func (o poiArea) within(a poiArea) bool {
+	if !o.rect {
+		return a.covers(o.lon, o.lat, o.radius)
+	}
+	return a.rect && o.box.minX >= a.box.minX && o.box.minY >= a.box.minY && o.box.maxX <= a.box.maxX && o.box.maxY <= a.box.maxY
+}
+
+// searchArea는 카테고리 검색 파라미터가 뜻하는 검색 범위를 반환합니다. rect가 있으면 사각형, 없으면 x/y/radius 원입니다.
+func searchArea(q url.Values) (poiArea, bool) {
+	if v := q.Get("rect"); v != "" {
+		if q.Get("radius") != "" {
+			return poiArea{}, false
+		}
+		b, err := parseRect(v)
+		return poiArea{box: b, rect: true}, err == nil
+	}
+	lon, errX := strconv.ParseFloat(q.Get("x"), 64)
+	lat, errY := strconv.ParseFloat(q.Get("y"), 64)
+	radius, errR := strconv.Atoi(q.Get("radius"))
+	if errX != nil || errY != nil || errR != nil || radius <= 0 || radius > kakaoMaxRadius {
+		return poiArea{}, false
+	}
+	return poiArea{lon: lon, lat: lat, radius: float64(radius), box: discBox(lon, lat, float64(radius))}, true
+}
+
+// Ingest는 keyword/category 응답의 장소를 인덱스에 넣습니다. 카테고리 응답이 첫 페이지에 모든 결과를
+// 담고 있으면 그 범위를 완전한 범위로 기록하고, 범위 안에 있지만 응답에 없는 같은 카테고리의 장소
+// (폐업, 이전)는 지웁니다. 다 담기지 않은 원 응답은 밀집 범위로 기록해 반경 넓히기를 건너뛰게 합니다.
+func (x *POIIndex) Ingest(path string, query url.Values, body []byte) {
+	if x == nil || (path != categorySearchPath && path != keywordSearchPath) {
+		return
+	}
+	var resp struct {
+		Documents []map[string]json.RawMessage `json:"documents"`
+		Meta      struct {
+			TotalCount int  `json:"total_count"`
+			IsEnd      bool `json:"is_end"`
+		} `json:"meta"`
+	}
+	if json.Unmarshal(body, &resp) != nil {
+		return
+	}
+
+	category := ""
+	if path == categorySearchPath {
+		category = query.Get("category_group_code")
+	}
+	complete := category != "" && (query.Get("page") == "" || query.Get("page") == "1") &&
+		resp.Meta.IsEnd && len(resp.Documents) == resp.Meta.TotalCount
+
+	now := time.Now().UnixNano()
+	places := make([]poiPlace, 0, len(resp.Documents))
+	for _, d := range resp.Documents {
+		p, ok := parsePlace(d, now)
+		if !ok || (category != "" && p.category != category) {
+			complete = false
+			continue
+		}
+		if p.category != "" {
+			places = append(places, p)
+		}
+	}
+
+	x.mu.Lock()
+	defer x.mu.Unlock()
+	for _, p := range places {
+		if !x.upsert(p) {
+			complete = false
+		}
+	}
+	if category == "" {
+		return
+	}
+	area, ok := searchArea(query)
+	if !ok {
+		return
+	}
+	area.at = now
+	switch {
+	case complete:
+		ids := make(map[string]bool, len(places))
+		for _, p := range places {
+			ids[p.id] = true
+		}
+		x.cover(category, area, ids)
+	case !area.rect && resp.Meta.TotalCount > len(resp.Documents):
+		x.dense[category] = x.appendArea(x.dense[category], area, false)
+	}
+}
+
+func parsePlace(d map[string]json.RawMessage, now int64) (poiPlace, bool) {
+	var id, category, xs, ys string
+	if json.Unmarshal(d["id"], &id) != nil || json.Unmarshal(d["x"], &xs) != nil || json.Unmarshal(d["y"], &ys) != nil || id == "" {
+		return poiPlace{}, false
+	}
+	json.Unmarshal(d["category_group_code"], &category)
+	lon, errX := strconv.ParseFloat(xs, 64)
+	lat, errY := strconv.ParseFloat(ys, 64)
+	if errX != nil || errY != nil {
+		return poiPlace{}, false
+	}
+	// distance는 질의 중심에 따라 달라지므로 빼고 저장했다가 답할 때 다시 계산합니다.
+	delete(d, "distance")
+	var doc bytes.Buffer
+	enc := json.NewEncoder(&doc)
+	enc.SetEscapeHTML(false)
+	if enc.Encode(d) != nil {
+		return poiPlace{}, false
+	}
+	return poiPlace{id: id, category: category, lon: lon, lat: lat, seen: now, doc: bytes.TrimSpace(doc.Bytes())}, true
+}
+
+// upsert는 장소를 넣거나 갱신합니다. 인덱스가 가득 차 새 장소를 넣지 못하면 false를 반환합니다. x.mu를 잡고 호출합니다.
+func (x *POIIndex) upsert(p poiPlace) bool {
+	if i, ok := x.byID[p.id]; ok {
+		old := &x.places[i]
+		ox, oy := cellOf(old.lon, old.lat)
+		nx, ny := cellOf(p.lon, p.lat)
+		if old.category != p.category || ox != nx || oy != ny {
+			x.unlinkCell(poiCell{old.category, ox, oy}, i)
+			x.linkCell(poiCell{p.category, nx, ny}, i)
+		}
+		*old = p
+		return true
+	}
+	if len(x.byID) >= x.cfg.MaxPlaces {
+		x.purge(p.seen)
+		if len(x.byID) >= x.cfg.MaxPlaces {
+			x.rejected.Add(1)
+			return false
+		}
+	}
+	var i int32
+	if n := len(x.free); n > 0 {
+		i = x.free[n-1]
+		x.free = x.free[:n-1]
+		x.places[i] = p
+	} else {
+		i = int32(len(x.places))
+		x.places = append(x.places, p)
+	}
+	x.byID[p.id] = i
+	ix, iy := cellOf(p.lon, p.lat)
+	x.linkCell(poiCell{p.category, ix, iy}, i)
+	return true
+}
+
+func (x *POIIndex) linkCell(c poiCell, i int32) {
+	x.grid[c] = append(x.grid[c], i)
+}
+
+func (x *POIIndex) unlinkCell(c poiCell, i int32) {
+	s := x.grid[c]
+	for k, v := range s {
+		if v == i {
+			s[k] = s[len(s)-1]
+			s = s[:len(s)-1]
+			break
+		}
+	}
+	if len(s) == 0 {
+		delete(x.grid, c)
+	} else {
+		x.grid[c] = s
+	}
+}
+
+func (x *POIIndex) remove(i int32) {
+	p := &x.places[i]
+	ix, iy := cellOf(p.lon, p.lat)
+	x.unlinkCell(poiCell{p.category, ix, iy}, i)
+	delete(x.byID, p.id)
+	*p = poiPlace{}
+	x.free = append(x.free, i)
+	x.removed.Add(1)
+}
+
+// purge는 가득 찬 인덱스에서 TTL보다 오래 보지 못한 장소를 지웁니다. 그런 장소를 담은 완전 범위는
+// 모두 그 장소를 마지막으로 본 시각 이전에 기록된 것이라 이미 만료되었으므로, 지워도 답이 틀리지 않습니다.
+// 전체를 훑으므로 1분에 한 번만 합니다.
+func (x *POIIndex) purge(now int64) {
+	if x.cfg.TTL <= 0 || now-x.lastPurge < int64(time.Minute) {
+		return
+	}
+	x.lastPurge = now
+	for i := range x.places {
+		if x.places[i].id != "" && !x.fresh(x.places[i].seen, now) {
+			x.remove(int32(i))
+		}
+	}
+}
+
+// cover는 완전한 범위를 기록하고, 범위 안에 있지만 이번 응답에 없는 같은 카테고리 장소를 지웁니다.
+func (x *POIIndex) cover(category string, area poiArea, ids map[string]bool) {
+	var gone []int32
+	x.eachCell(category, area.box, func(i int32) {
+		p := &x.places[i]
+		if !ids[p.id] && area.contains(p.lon, p.lat) {
+			gone = append(gone, i)
+		}
+	})
+	for _, i := range gone {
+		x.remove(i)
+	}
+	x.areas[category] = x.appendArea(x.areas[category], area, true)
+}
+
+// appendArea는 만료된 범위를 걸러 내고 새 범위를 붙입니다. replace가 true이면 새 범위 안에 들어가는 기존 범위도
+// 버립니다. 개수가 poiMaxAreas를 넘으면 오래된 것부터 버립니다.
+func (x *POIIndex) appendArea(areas []poiArea, a poiArea, replace bool) []poiArea {
+	kept := areas[:0]
+	for _, o := range areas {
+		if x.fresh(o.at, a.at) && !(replace && o.within(a)) {
+			kept = append(kept, o)
+		}
+	}
+	kept = append(kept, a)
+	if len(kept) > poiMaxAreas {
+		kept = append(kept[:0], kept[len(kept)-poiMaxAreas:]...)
+	}
+	return kept
+}
+
+// parseQuery는 인덱스로 답할 수 있는 카테고리 질의인지 확인합니다. category_group_code, x, y, radius와
+// sort=distance가 있어야 하고, 그 밖에는 page와 size만 허용합니다.
+func (x *POIIndex) parseQuery(path string, q url.Values) (poiQuery, bool) {
+	if x == nil || path != categorySearchPath || q.Get("sort") != "distance" {
+		return poiQuery{}, false
+	}
+	for k := range q {
+		switch k {
+		case "category_group_code", "x", "y", "radius", "sort", "page", "size":
+		default:
+			return poiQuery{}, false
+		}
+	}
+	area, ok := searchArea(q)
+	if !ok || area.rect || q.Get("category_group_code") == "" {
+		return poiQuery{}, false
+	}
+	page, size := 1, 15
+	var err error
+	if v := q.Get("page"); v != "" {
+		if page, err = strconv.Atoi(v); err != nil || page < 1 || page > kakaoMaxPage {
+			return poiQuery{}, false
+		}
+	}
+	if v := q.Get("size"); v != "" {
+		if size, err = strconv.Atoi(v); err != nil || size < 1 || size > 15 {
+			return poiQuery{}, false
+		}
+	}
+	return poiQuery{
+		category: q.Get("category_group_code"),
+		x:        q.Get("x"), y: q.Get("y"),
+		lon: area.lon, lat: area.lat, radius: area.radius,
+		page: page, size: size,
+	}, true
+}
+
+type poiHit struct {
+	id   string
+	dist float64
+	doc  []byte
+}
+
+// answer는 완전하고 새로운 범위가 질의 원을 덮고 있으면 인덱스의 장소로 Kakao 형식의 응답을 만듭니다.
+func (x *POIIndex) answer(pq poiQuery) ([]byte, bool) {
+	now := time.Now().UnixNano()
+	x.mu.RLock()
+	covered := false
+	for _, a := range x.areas[pq.category] {
+		if x.fresh(a.at, now) && a.covers(pq.lon, pq.lat, pq.radius) {
+			covered = true
+			break
+		}
+	}
+	if !covered {
+		x.mu.RUnlock()
+		return nil, false
+	}
+	var hits []poiHit
+	x.eachCell(pq.category, discBox(pq.lon, pq.lat, pq.radius), func(i int32) {
+		p := &x.places[i]
+		if d := haversineMeters(pq.lon, pq.lat, p.lon, p.lat); d <= pq.radius {
+			hits = append(hits, poiHit{p.id, d, p.doc})
+		}
+	})
+	x.mu.RUnlock()
+
+	sort.Slice(hits, func(i, j int) bool {
+		if hits[i].dist != hits[j].dist {
+			return hits[i].dist < hits[j].dist
+		}
+		return hits[i].id < hits[j].id
+	})
+	pageable := min(len(hits), kakaoMaxPage*pq.size)
+	lo, hi := min((pq.page-1)*pq.size, pageable), min(pq.page*pq.size, pageable)
+
+	var b bytes.Buffer
+	b.WriteString(`{"documents":[`)
+	for i, h := range hits[lo:hi] {
+		if i > 0 {
+			b.WriteByte(',')
+		}
+		b.WriteString(`{"distance":"`)
+		b.WriteString(strconv.Itoa(int(math.Round(h.dist))))
+		b.WriteByte('"')
+		if len(h.doc) > 2 {
+			b.WriteByte(',')
+		}
+		b.Write(h.doc[1:])
+	}
+	b.WriteString(`],"meta":{"is_end":`)
+	b.WriteString(strconv.FormatBool(hi >= pageable))
+	b.WriteString(`,"pageable_count":`)
+	b.WriteString(strconv.Itoa(pageable))
+	b.WriteString(`,"same_name":null,"total_count":`)
+	b.WriteString(strconv.Itoa(len(hits)))
+	b.WriteString(`}}`)
+	return b.Bytes(), true
+}
+
+// widen은 인덱스로 답하지 못한 질의 대신 보낼, 반경을 Widen배로 넓힌 질의를 만듭니다. 넓힌 원 안에
+// 이미 한 페이지를 넘는 결과가 나온 밀집 범위가 있으면 넓혀도 완전한 응답을 받을 수 없으므로 false입니다.
+func (x *POIIndex) widen(pq poiQuery) (url.Values, bool) {
+	radius := math.Min(math.Ceil(pq.radius*x.cfg.Widen), kakaoMaxRadius)
+	if x.cfg.Widen <= 1 || radius <= pq.radius {
+		return nil, false
+	}
+	now := time.Now().UnixNano()
+	x.mu.RLock()
+	defer x.mu.RUnlock()
+	for _, d := range x.dense[pq.category] {
+		if x.fresh(d.at, now) && haversineMeters(pq.lon, pq.lat, d.lon, d.lat)+d.radius <= radius {
+			return nil, false
+		}
+	}
+	return url.Values{
+		"category_group_code": {pq.category},
+		"x":                   {pq.x},
+		"y":                   {pq.y},
+		"radius":              {strconv.Itoa(int(radius))},
+		"sort":                {"distance"},
+	}, true
+}
+
+// Stats는 현재 장소 인덱스 통계를 반환합니다.
+func (x *POIIndex) Stats() POIIndexStats {
+	if x == nil {
+		return POIIndexStats{}
+	}
+	s := POIIndexStats{
+		Hits:        x.hits.Load(),
+		WidenedHits: x.widenedHits.Load(),
+		Misses:      x.misses.Load(),
+		Rejected:    x.rejected.Load(),
+		Removed:     x.removed.Load(),
+		MaxPlaces:   x.cfg.MaxPlaces,
+	}
+	now := time.Now().UnixNano()
+	x.mu.RLock()
+	defer x.mu.RUnlock()
+	s.Places = len(x.byID)
+	for _, areas := range x.areas {
+		for _, a := range areas {
+			if x.fresh(a.at, now) {
+				s.Areas++
+			}
+		}
+	}
+	for _, areas := range x.dense {
+		for _, a := range areas {
+			if x.fresh(a.at, now) {
+				s.DenseAreas++
+			}
+		}
+	}
+	return s
+}
+
+// nearbyFromIndex는 카테고리 반경 질의를 장소 인덱스로 답합니다. 덮는 범위가 없으면 반경을 넓힌 질의를
+// 한 번 보내 그 응답으로 범위를 채운 뒤 다시 시도합니다. 넓힌 응답도 완전하지 않으면 false를 반환하고,
+// 호출자는 원래 질의를 업스트림에 보냅니다.
+func (h *ApiHandler) nearbyFromIndex(ctx context.Context, path string, query url.Values) ([]byte, bool) {
+	pq, ok := h.POIs.parseQuery(path, query)
+	if !ok {
+		return nil, false
+	}
+	if body, ok := h.POIs.answer(pq); ok {
+		h.POIs.hits.Add(1)
+		return body, true
+	}
+	if wq, ok := h.POIs.widen(pq); ok {
+		res, err, _ := h.fetchShared(ctx, path, CacheKey(path, wq), wq)
+		if err == nil && res.Status == http.StatusOK {
+			if body, ok := h.POIs.answer(pq); ok {
+				h.POIs.widenedHits.Add(1)
+				return body, true
+			}
+		}
+	}
+	h.POIs.misses.Add(1)
+	return nil, false
+}
+
+// POIIndexStatsHandler는 장소 인덱스 통계를 JSON으로 반환합니다.
+func (h *ApiHandler) POIIndexStatsHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(h.POIs.Stats())
+}
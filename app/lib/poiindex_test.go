@@ -0,0 +1,291 @@
+package lib
+
+import (
+	"encoding/json"
+	"fmt"
+	"net/url"
+	"slices"
+	"strings"
+	"testing"
+	"time"
+)
+
+// testPlace는 중심(127.1, 37.4)에서 북쪽으로 north미터 떨어진 장소입니다.
+type testPlace struct {
+	id       string
+	category string
+	north    float64
+}
+
+const testLon, testLat = 127.1, 37.4
+
+// categoryBody는 places를 담은 Kakao 카테고리 검색 응답 본문을 만듭니다.
+func categoryBody(places []testPlace, total int, isEnd bool) []byte {
+	docs := make([]string, len(places))
+	for i, p := range places {
+		docs[i] = fmt.Sprintf(`{"id":%q,"place_name":"장소 %s","category_group_code":%q,"distance":"%d","x":"%.7f","y":"%.7f"}`,
+			p.id, p.id, p.category, int(p.north), testLon, testLat+p.north/metersPerDegree)
+	}
+	return []byte(fmt.Sprintf(`{"documents":[%s],"meta":{"is_end":%t,"pageable_count":%d,"same_name":null,"total_count":%d}}`,
+		strings.Join(docs, ","), isEnd, min(total, 45), total))
+}
+
+func discQuery(radius int, extra ...string) url.Values {
+	q := url.Values{
+		"category_group_code": {"CE7"},
+		"x":                   {fmt.Sprintf("%.7f", testLon)},
+		"y":                   {fmt.Sprintf("%.7f", testLat)},
+		"radius":              {fmt.Sprint(radius)},
+		"sort":                {"distance"},
+	}
+	for i := 0; i+1 < len(extra); i += 2 {
+		q.Set(extra[i], extra[i+1])
+	}
+	return q
+}
+
+type poiAnswer struct {
+	Documents []struct {
+		ID       string `json:"id"`
+		Distance string `json:"distance"`
+	} `json:"documents"`
+	Meta struct {
+		IsEnd         bool `json:"is_end"`
+		PageableCount int  `json:"pageable_count"`
+		TotalCount    int  `json:"total_count"`
+	} `json:"meta"`
+}
+
+func (a poiAnswer) ids() []string {
+	ids := make([]string, len(a.Documents))
+	for i, d := range a.Documents {
+		ids[i] = d.ID
+	}
+	return ids
+}
+
+// ask는 query를 인덱스로 답하고, 답할 수 없으면 ok가 false입니다.
+func ask(t *testing.T, x *POIIndex, query url.Values) (poiAnswer, bool) {
+	t.Helper()
+	pq, ok := x.parseQuery(categorySearchPath, query)
+	if !ok {
+		t.Fatalf("parseQuery(%v) = false", query)
+	}
+	body, ok := x.answer(pq)
+	if !ok {
+		return poiAnswer{}, false
+	}
+	var a poiAnswer
+	if err := json.Unmarshal(body, &a); err != nil {
+		t.Fatalf("answer body %s: %v", body, err)
+	}
+	return a, true
+}
+
+var cafes = []testPlace{{"a", "CE7", 100}, {"b", "CE7", 300}, {"c", "CE7", 700}}
+
+func TestPOIIndexAnswer(t *testing.T) {
+	for _, c := range []struct {
+		name    string
+		ingest  func(x *POIIndex)
+		query   url.Values
+		want    []string // nil이면 인덱스로 답하지 못해야 합니다.
+		removed int64
+	}{
+		{
+			name: "complete area hit",
+			ingest: func(x *POIIndex) {
+				x.Ingest(categorySearchPath, discQuery(1000), categoryBody(cafes, 3, true))
+			},
+			query: discQuery(500),
+			want:  []string{"a", "b"},
+		},
+		{
+			name: "query larger than the complete area",
+			ingest: func(x *POIIndex) {
+				x.Ingest(categorySearchPath, discQuery(1000), categoryBody(cafes, 3, true))
+			},
+			query: discQuery(2000),
+		},
+		{
+			name: "incomplete first page",
+			ingest: func(x *POIIndex) {
+				x.Ingest(categorySearchPath, discQuery(1000), categoryBody(cafes, 20, false))
+			},
+			query: discQuery(500),
+		},
+		{
+			name: "later page",
+			ingest: func(x *POIIndex) {
+				x.Ingest(categorySearchPath, discQuery(1000, "page", "2"), categoryBody(cafes, 3, true))
+			},
+			query: discQuery(500),
+		},
+		{
+			name: "document of another category",
+			ingest: func(x *POIIndex) {
+				places := append(slices.Clone(cafes[:2]), testPlace{"d", "FD6", 200})
+				x.Ingest(categorySearchPath, discQuery(1000), categoryBody(places, 3, true))
+			},
+			query: discQuery(500),
+		},
+		{
+			name: "keyword responses never complete an area",
+			ingest: func(x *POIIndex) {
+				x.Ingest(keywordSearchPath, url.Values{"query": {"카페"}, "x": {"127.1"}, "y": {"37.4"}, "radius": {"1000"}}, categoryBody(cafes, 3, true))
+			},
+			query: discQuery(500),
+		},
+		{
+			name: "closed place dropped",
+			ingest: func(x *POIIndex) {
+				x.Ingest(categorySearchPath, discQuery(1000), categoryBody(cafes, 3, true))
+				x.Ingest(categorySearchPath, discQuery(1000), categoryBody([]testPlace{cafes[0], cafes[2]}, 2, true))
+			},
+			query:   discQuery(1000),
+			want:    []string{"a", "c"},
+			removed: 1,
+		},
+		{
+			name: "complete area expired",
+			ingest: func(x *POIIndex) {
+				x.Ingest(categorySearchPath, discQuery(1000), categoryBody(cafes, 3, true))
+				for i := range x.areas["CE7"] {
+					x.areas["CE7"][i].at -= int64(2 * time.Hour)
+				}
+			},
+			query: discQuery(500),
+		},
+		{
+			name: "complete rect covers the disc",
+			ingest: func(x *POIIndex) {
+				q := url.Values{"category_group_code": {"CE7"}, "rect": {"127.09,37.39,127.11,37.41"}}
+				x.Ingest(categorySearchPath, q, categoryBody(cafes, 3, true))
+			},
+			query: discQuery(800),
+			want:  []string{"a", "b", "c"},
+		},
+		{
+			name: "paged answer",
+			ingest: func(x *POIIndex) {
+				x.Ingest(categorySearchPath, discQuery(1000), categoryBody(cafes, 3, true))
+			},
+			query: discQuery(1000, "size", "2", "page", "2"),
+			want:  []string{"c"},
+		},
+	} {
+		t.Run(c.name, func(t *testing.T) {
+			x := NewPOIIndex(POIIndexConfig{MaxPlaces: 100, TTL: time.Hour})
+			c.ingest(x)
+			a, ok := ask(t, x, c.query)
+			if c.want == nil {
+				if ok {
+					t.Fatalf("answered %v, want a miss", a.ids())
+				}
+				return
+			}
+			if !ok {
+				t.Fatal("missed, want an answer")
+			}
+			if got := a.ids(); !slices.Equal(got, c.want) {
+				t.Errorf("ids = %v, want %v", got, c.want)
+			}
+			if got := x.Stats().Removed; got != c.removed {
+				t.Errorf("removed = %d, want %d", got, c.removed)
+			}
+		})
+	}
+}
+
+func TestPOIIndexAnswerDocuments(t *testing.T) {
+	x := NewPOIIndex(POIIndexConfig{MaxPlaces: 100, TTL: time.Hour})
+	x.Ingest(categorySearchPath, discQuery(1000), categoryBody(cafes, 3, true))
+
+	// 다른 중심에서 물어도 distance는 질의 중심 기준으로 다시 계산되어야 합니다.
+	q := discQuery(300)
+	q.Set("y", fmt.Sprintf("%.7f", testLat+500/metersPerDegree))
+	a, ok := ask(t, x, q)
+	if !ok {
+		t.Fatal("missed, want an answer")
+	}
+	var got []string
+	for _, d := range a.Documents {
+		got = append(got, d.ID+"@"+d.Distance)
+	}
+	if want := []string{"b@200", "c@200"}; !slices.Equal(got, want) {
+		t.Errorf("documents = %v, want %v", got, want)
+	}
+
+	a, _ = ask(t, x, discQuery(1000, "size", "2"))
+	if a.Meta.IsEnd || a.Meta.TotalCount != 3 || a.Meta.PageableCount != 3 {
+		t.Errorf("meta = %+v, want is_end false, total 3, pageable 3", a.Meta)
+	}
+}
+
+func TestPOIIndexWiden(t *testing.T) {
+	x := NewPOIIndex(POIIndexConfig{MaxPlaces: 100, TTL: time.Hour, Widen: 2})
+	pq, _ := x.parseQuery(categorySearchPath, discQuery(500))
+	wq, ok := x.widen(pq)
+	if !ok || wq.Get("radius") != "1000" || wq.Get("sort") != "distance" {
+		t.Fatalf("widen = %v, %v; want radius 1000 sorted by distance", wq, ok)
+	}
+
+	// 넓힌 원 안에 한 페이지를 넘는 밀집 범위가 있으면 넓혀도 완전한 응답을 받을 수 없습니다.
+	x.Ingest(categorySearchPath, discQuery(800), categoryBody(cafes, 60, false))
+	if wq, ok := x.widen(pq); ok {
+		t.Errorf("widen = %v, want false next to a dense area", wq)
+	}
+	if got := x.Stats().DenseAreas; got != 1 {
+		t.Errorf("dense areas = %d, want 1", got)
+	}
+}
+
+func TestPOIIndexFull(t *testing.T) {
+	x := NewPOIIndex(POIIndexConfig{MaxPlaces: 2, TTL: time.Hour})
+	// 장소를 다 넣지 못한 응답은 완전한 범위로 기록하지 않습니다.
+	x.Ingest(categorySearchPath, discQuery(1000), categoryBody(cafes, 3, true))
+	if _, ok := ask(t, x, discQuery(500)); ok {
+		t.Error("answered from an index that rejected places")
+	}
+	if s := x.Stats(); s.Places != 2 || s.Rejected != 1 {
+		t.Errorf("stats = %+v, want 2 places and 1 rejected", s)
+	}
+
+	// TTL보다 오래 보지 못한 장소는 가득 찼을 때 비워지고 슬롯이 재사용됩니다.
+	for i := range x.places {
+		x.places[i].seen -= int64(2 * time.Hour)
+	}
+	x.lastPurge = 0
+	x.Ingest(categorySearchPath, discQuery(200), categoryBody([]testPlace{{"e", "CE7", 50}}, 1, true))
+	if a, ok := ask(t, x, discQuery(200)); !ok || !slices.Equal(a.ids(), []string{"e"}) {
+		t.Errorf("answer = %v, %v; want [e]", a.ids(), ok)
+	}
+	if s := x.Stats(); s.Places != 1 || s.Removed != 2 {
+		t.Errorf("stats = %+v, want 1 place and 2 removed", s)
+	}
+	if len(x.places) != 2 {
+		t.Errorf("len(places) = %d, want freed slots reused", len(x.places))
+	}
+}
+
+func TestPOIIndexParseQuery(t *testing.T) {
+	x := NewPOIIndex(POIIndexConfig{MaxPlaces: 100})
+	for _, c := range []struct {
+		query url.Values
+		ok    bool
+	}{
+		{discQuery(500), true},
+		{discQuery(500, "page", "45", "size", "15"), true},
+		{discQuery(500, "sort", "accuracy"), false},
+		{discQuery(500, "radius", "20001"), false},
+		{discQuery(500, "size", "16"), false},
+		{discQuery(500, "fields", "id"), false},
+	} {
+		if _, ok := x.parseQuery(categorySearchPath, c.query); ok != c.ok {
+			t.Errorf("parseQuery(%v) = %v, want %v", c.query.Encode(), ok, c.ok)
+		}
+	}
+	if _, ok := (*POIIndex)(nil).parseQuery(categorySearchPath, discQuery(500)); ok {
+		t.Error("nil index parsed a query")
+	}
+}
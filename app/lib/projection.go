@@ -0,0 +1,307 @@
+package lib
+
+import (
+	"bytes"
+	"context"
+	"encoding/json"
+	"errors"
+	"fmt"
+	"net/http"
+	"net/url"
+	"strconv"
+	"strings"
+)
+
+// 응답을 줄이는 데 쓰이는 MCP 서버 전용 파라미터입니다. 업스트림에는 전달하지 않으며 캐시 키에도 들어가지 않습니다.
+//
+//	fields   documents의 각 항목에서 남길 최상위 필드 목록 (쉼표로 구분, 요청한 순서로 출력)
+//	limit    응답에 담을 최대 document 수
+//	format   json(기본) 또는 lines. lines는 필드 이름 한 줄과 document마다 탭으로 구분한 값 한 줄
+var projectionParams = []string{"fields", "limit", "format"}
+
+// fieldProjection은 요청의 fields/limit/format 설정입니다. nil이면 원본 응답을 그대로 보냅니다.
+type fieldProjection struct {
+	fields []string
+	index  map[string]int
+	limit  int
+	lines  bool
+}
+
+type projectionKey struct{}
+
+// parseProjection은 쿼리에서 fields/limit/format을 읽습니다. 하나도 없으면 nil을 반환합니다.
+func parseProjection(q url.Values) (*fieldProjection, error) {
+	if q.Get("fields") == "" && q.Get("limit") == "" && q.Get("format") == "" {
+		return nil, nil
+	}
+	p := &fieldProjection{}
+	for _, f := range strings.Split(q.Get("fields"), ",") {
+		if f = strings.TrimSpace(f); f != "" {
+			if p.index == nil {
+				p.index = make(map[string]int)
+			}
+			if _, dup := p.index[f]; !dup {
+				p.index[f] = len(p.fields)
+				p.fields = append(p.fields, f)
+			}
+		}
+	}
+	if v := q.Get("limit"); v != "" {
+		n, err := strconv.Atoi(v)
+		if err != nil || n < 0 {
+			return nil, fmt.Errorf("invalid limit %q", v)
+		}
+		p.limit = n
+	}
+	switch q.Get("format") {
+	case "", "json":
+	case "lines":
+		if len(p.fields) == 0 {
+			return nil, errors.New("format=lines requires fields")
+		}
+		p.lines = true
+	default:
+		return nil, fmt.Errorf("invalid format %q (json or lines)", q.Get("format"))
+	}
+	return p, nil
+}
+
+// withProjection은 요청에서 fields/limit/format을 떼어 내 컨텍스트에 담은 요청을 반환합니다.
+// 이미 떼어 낸 요청이면 그대로 반환하므로 라우팅 단계마다 불러도 됩니다.
+func withProjection(r *http.Request) (*http.Request, error) {
+	q := r.URL.Query()
+	p, err := parseProjection(q)
+	if err != nil || p == nil {
+		return r, err
+	}
+	for _, name := range projectionParams {
+		q.Del(name)
+	}
+	// WithContext는 URL을 공유하는 얕은 복사본을 만들므로, 호출자의 요청을 바꾸지 않도록 URL도 복사합니다.
+	r = r.WithContext(context.WithValue(r.Context(), projectionKey{}, p))
+	u := *r.URL
+	u.RawQuery = q.Encode()
+	r.URL = &u
+	return r, nil
+}
+
+func projectionFrom(ctx context.Context) *fieldProjection {
+	p, _ := ctx.Value(projectionKey{}).(*fieldProjection)
+	return p
+}
+
+// docLimit은 limit 파라미터 값입니다. projection이 없으면 0(제한 없음)입니다.
+func (p *fieldProjection) docLimit() int {
+	if p == nil {
+		return 0
+	}
+	return p.limit
+}
+
+// apply는 Kakao 응답 본문을 토큰 단위로 읽으며 documents를 limit개까지, fields만 남겨 out에 씁니다.
+// 전체 문서 트리를 만들지 않고 필요한 값만 json.RawMessage로 꺼냅니다. 반환값은 쓴 document 수입니다.
+func (p *fieldProjection) apply(out *bytes.Buffer, body []byte, limit int) (int, error) {
+	dec := json.NewDecoder(bytes.NewReader(body))
+	if err := expectDelim(dec, '{'); err != nil {
+		return 0, err
+	}
+	var (
+		raw    json.RawMessage
+		values = make([]json.RawMessage, len(p.fields))
+		n      int
+		first  = true
+	)
+	if !p.lines {
+		out.WriteByte('{')
+	} else {
+		out.WriteString(strings.Join(p.fields, "\t"))
+	}
+	for dec.More() {
+		tok, err := dec.Token()
+		if err != nil {
+			return 0, err
+		}
+		key, _ := tok.(string)
+		if key != "documents" {
+			if err := dec.Decode(&raw); err != nil {
+				return 0, err
+			}
+			if !p.lines {
+				writeMember(out, &first, key, raw)
+			}
+			continue
+		}
+
+		if err := expectDelim(dec, '['); err != nil {
+			return 0, err
+		}
+		if !p.lines {
+			writeMember(out, &first, key, nil)
+			out.WriteByte('[')
+		}
+		for dec.More() {
+			if limit > 0 && n >= limit {
+				if err := dec.Decode(&raw); err != nil {
+					return 0, err
+				}
+				continue
+			}
+			if p.fields == nil {
+				if err := dec.Decode(&raw); err != nil {
+					return 0, err
+				}
+				if n > 0 {
+					out.WriteByte(',')
+				}
+				out.Write(raw)
+				n++
+				continue
+			}
+			if err := p.readDocument(dec, values); err != nil {
+				return 0, err
+			}
+			if p.lines {
+				out.WriteByte('\n')
+				writeLine(out, values)
+			} else {
+				if n > 0 {
+					out.WriteByte(',')
+				}
+				p.writeObject(out, values)
+			}
+			n++
+		}
+		if err := expectDelim(dec, ']'); err != nil {
+			return 0, err
+		}
+		if !p.lines {
+			out.WriteByte(']')
+		}
+	}
+	if !p.lines {
+		out.WriteByte('}')
+	}
+	return n, expectDelim(dec, '}')
+}
+
+// readDocument는 document 객체 하나에서 fields에 있는 값만 values에 담고 나머지는 건너뜁니다.
+func (p *fieldProjection) readDocument(dec *json.Decoder, values []json.RawMessage) error {
+	for i := range values {
+		values[i] = values[i][:0]
+	}
+	if err := expectDelim(dec, '{'); err != nil {
+		return err
+	}
+	var skip json.RawMessage
+	for dec.More() {
+		tok, err := dec.Token()
+		if err != nil {
+			return err
+		}
+		key, _ := tok.(string)
+		dst := &skip
+		if i, ok := p.index[key]; ok {
+			dst = &values[i]
+		}
+		if err := dec.Decode(dst); err != nil {
+			return err
+		}
+	}
+	return expectDelim(dec, '}')
+}
+
+func (p *fieldProjection) writeObject(out *bytes.Buffer, values []json.RawMessage) {
+	first := true
+	out.WriteByte('{')
+	for i, v := range values {
+		if len(v) > 0 {
+			writeMember(out, &first, p.fields[i], v)
+		}
+	}
+	out.WriteByte('}')
+}
+
+// writeLine은 값들을 탭으로 구분한 한 줄로 씁니다. 문자열은 따옴표 없이, null과 없는 필드는 빈 칸으로 씁니다.
+func writeLine(out *bytes.Buffer, values []json.RawMessage) {
+	for i, v := range values {
+		if i > 0 {
+			out.WriteByte('\t')
+		}
+		switch {
+		case len(v) == 0 || string(v) == "null":
+		case v[0] == '"':
+			var s string
+			if json.Unmarshal(v, &s) == nil {
+				out.WriteString(strings.Map(func(r rune) rune {
+					if r == '\t' || r == '\n' || r == '\r' {
+						return ' '
+					}
+					return r
+				}, s))
+			}
+		default:
+			out.Write(v)
+		}
+	}
+}
+
+// writeMember는 객체 멤버 `"key":value`를 씁니다. value가 nil이면 키와 콜론까지만 씁니다.
+func writeMember(out *bytes.Buffer, first *bool, key string, value json.RawMessage) {
+	if !*first {
+		out.WriteByte(',')
+	}
+	*first = false
+	k, _ := json.Marshal(key)
+	out.Write(k)
+	out.WriteByte(':')
+	out.Write(value)
+}
+
+func expectDelim(dec *json.Decoder, want json.Delim) error {
+	tok, err := dec.Token()
+	if err != nil {
+		return err
+	}
+	if d, ok := tok.(json.Delim); !ok || d != want {
+		return fmt.Errorf("expected %q, got %v", want, tok)
+	}
+	return nil
+}
+
+// project는 본문에 projection을 적용한 새 본문을 반환합니다. lines 형식이면 JSON 문자열로 감쌉니다.
+func (p *fieldProjection) project(body []byte) ([]byte, error) {
+	buf := getBuffer()
+	defer putBuffer(buf)
+	if _, err := p.apply(buf, body, p.limit); err != nil {
+		return nil, err
+	}
+	if p.lines {
+		return json.Marshal(buf.String())
+	}
+	return bytes.Clone(buf.Bytes()), nil
+}
+
+// document는 document 하나(JSON 객체)에서 fields만 남겨 out에 씁니다.
+func (p *fieldProjection) document(out *bytes.Buffer, doc []byte) error {
+	values := make([]json.RawMessage, len(p.fields))
+	if err := p.readDocument(json.NewDecoder(bytes.NewReader(doc)), values); err != nil {
+		return err
+	}
+	p.writeObject(out, values)
+	return nil
+}
+
+// writeProjected는 정상 응답이면 projection을 적용해 SSE 이벤트로 쓰고, 아니면 본문을 그대로 씁니다.
+// limit은 이 이벤트에 담을 최대 document 수(0은 제한 없음)입니다.
+func writeProjected(w http.ResponseWriter, p *fieldProjection, event string, id int, status int, body []byte, limit int) error {
+	if p == nil || status != http.StatusOK {
+		return writeSSEEvent(w, event, id, body)
+	}
+	buf := getBuffer()
+	defer putBuffer(buf)
+	if _, err := p.apply(buf, body, limit); err != nil {
+		// Kakao 형식이 아닌 본문은 줄이지 않고 그대로 보냅니다.
+		return writeSSEEvent(w, event, id, body)
+	}
+	return writeSSEEvent(w, event, id, buf.Bytes())
+}
@@ -0,0 +1,422 @@
+package lib
+
+import (
+	"encoding/json"
+	"fmt"
+	"log/slog"
+	"math"
+	"net/url"
+	"os"
+	"sort"
+	"strconv"
+	"strings"
+)
+
+// 이 파일은 행정구역 경계 파일(GeoJSON)로 coord2regioncode를 로컬에서 계산합니다.
+// 경계 폴리곤의 bounding box로 STR-tree를 만들고, 후보 폴리곤에 대해서만 정확한
+// point-in-polygon 검사를 합니다.
+
+// regionNodeCapacity는 STR-tree 노드 하나가 담는 자식 수입니다.
+const regionNodeCapacity = 16
+
+type bbox struct {
+	minX, minY, maxX, maxY float64
+}
+
+func (b bbox) contains(x, y float64) bool {
+	return x >= b.minX && x <= b.maxX && y >= b.minY && y <= b.maxY
+}
+
+func (b bbox) union(o bbox) bbox {
+	return bbox{math.Min(b.minX, o.minX), math.Min(b.minY, o.minY), math.Max(b.maxX, o.maxX), math.Max(b.maxY, o.maxY)}
+}
+
+// Region은 행정구역 하나입니다. Kakao coord2regioncode 응답의 document와 같은 필드를 가집니다.
+type Region struct {
+	RegionType  string `json:"region_type"`
+	Code        string `json:"code"`
+	AddressName string `json:"address_name"`
+	Depth1      string `json:"region_1depth_name"`
+	Depth2      string `json:"region_2depth_name"`
+	Depth3      string `json:"region_3depth_name"`
+	Depth4      string `json:"region_4depth_name"`
+
+	// polygons[i][j]는 i번째 폴리곤의 j번째 링(첫 번째가 외곽, 나머지는 구멍)입니다.
+	polygons [][][][2]float64
+	box      bbox
+	// x, y는 응답 document의 x/y로 쓰는 영역의 대표점(WGS84)입니다.
+	x, y float64
+}
+
+// contains는 짝홀 규칙으로 점이 영역 안에 있는지 검사합니다.
+func (g *Region) contains(x, y float64) bool {
+	if !g.box.contains(x, y) {
+		return false
+	}
+	for _, poly := range g.polygons {
+		inside := false
+		for _, ring := range poly {
+			for i, j := 0, len(ring)-1; i < len(ring); j, i = i, i+1 {
+				xi, yi := ring[i][0], ring[i][1]
+				xj, yj := ring[j][0], ring[j][1]
+				if (yi > y) != (yj > y) && x < (xj-xi)*(y-yi)/(yj-yi)+xi {
+					inside = !inside
+				}
+			}
+		}
+		if inside {
+			return true
+		}
+	}
+	return false
+}
+
+type strNode struct {
+	box      bbox
+	children []*strNode
+	regions  []*Region
+}
+
+// RegionIndex는 행정구역 종류(B: 법정동, H: 행정동)별 STR-tree입니다.
+type RegionIndex struct {
+	types []string
+	roots map[string]*strNode
+	count int
+}
+
+// LoadRegionIndex는 "H=/data/adm.geojson,B=/data/bjd.geojson" 형식의 명세로 경계 파일을 읽습니다.
+// 각 feature의 properties에서 code, address_name(또는 adm_cd2/adm_cd, adm_nm 등)을 읽습니다.
+func LoadRegionIndex(spec string) (*RegionIndex, error) {
+	idx := &RegionIndex{roots: make(map[string]*strNode)}
+	for _, part := range strings.Split(spec, ",") {
+		part = strings.TrimSpace(part)
+		if part == "" {
+			continue
+		}
+		regionType, path, ok := strings.Cut(part, "=")
+		if !ok {
+			regionType, path = "B", part
+		}
+		regionType = strings.ToUpper(regionType)
+		regions, err := loadRegionFile(path, regionType)
+		if err != nil {
+			return nil, err
+		}
+		if _, exists := idx.roots[regionType]; !exists {
+			idx.types = append(idx.types, regionType)
+		}
+		idx.roots[regionType] = buildSTR(regions)
+		idx.count += len(regions)
+		slog.Info("Loaded region boundaries", "type", regionType, "path", path, "regions", len(regions))
+	}
+	if idx.count == 0 {
+		return nil, fmt.Errorf("no regions loaded from %q", spec)
+	}
+	if idx.roots["B"] == nil || idx.roots["H"] == nil {
+		slog.Warn("Region boundaries cover only some region types; coord2regioncode still calls the Kakao API", "types", idx.types)
+	}
+	return idx, nil
+}
+
+type geoJSONFile struct {
+	Features []struct {
+		Properties map[string]any `json:"properties"`
+		Geometry   struct {
+			Type        string          `json:"type"`
+			Coordinates json.RawMessage `json:"coordinates"`
+		} `json:"geometry"`
+	} `json:"features"`
+}
+
+func loadRegionFile(path, regionType string) ([]*Region, error) {
+	raw, err := os.ReadFile(path)
+	if err != nil {
+		return nil, fmt.Errorf("read region file: %w", err)
+	}
+	var fc geoJSONFile
+	if err := json.Unmarshal(raw, &fc); err != nil {
+		return nil, fmt.Errorf("parse region file %s: %w", path, err)
+	}
+
+	regions := make([]*Region, 0, len(fc.Features))
+	for _, f := range fc.Features {
+		var polygons [][][][2]float64
+		switch f.Geometry.Type {
+		case "Polygon":
+			var p [][][2]float64
+			if err := json.Unmarshal(f.Geometry.Coordinates, &p); err != nil {
+				return nil, fmt.Errorf("parse polygon in %s: %w", path, err)
+			}
+			polygons = [][][][2]float64{p}
+		case "MultiPolygon":
+			if err := json.Unmarshal(f.Geometry.Coordinates, &polygons); err != nil {
+				return nil, fmt.Errorf("parse multipolygon in %s: %w", path, err)
+			}
+		default:
+			continue
+		}
+		g := newRegion(f.Properties, regionType)
+		g.polygons = polygons
+		g.box = bbox{math.Inf(1), math.Inf(1), math.Inf(-1), math.Inf(-1)}
+		for _, poly := range polygons {
+			for _, pt := range poly[0] {
+				g.box = g.box.union(bbox{pt[0], pt[1], pt[0], pt[1]})
+			}
+		}
+		g.x, g.y = g.representativePoint(f.Properties)
+		regions = append(regions, g)
+	}
+	return regions, nil
+}
+
+// regionProp은 properties에서 첫 번째로 존재하는 키의 값을 문자열로 반환합니다.
+func regionProp(props map[string]any, keys ...string) string {
+	for _, k := range keys {
+		switch v := props[k].(type) {
+		case string:
+			return v
+		case float64:
+			return strconv.FormatFloat(v, 'f', -1, 64)
+		}
+	}
+	return ""
+}
+
+func newRegion(props map[string]any, regionType string) *Region {
+	g := &Region{
+		RegionType:  regionType,
+		Code:        regionProp(props, "code", "adm_cd2", "adm_cd", "BJD_CD", "bjd_cd"),
+		AddressName: regionProp(props, "address_name", "adm_nm", "BJD_NM", "bjd_nm", "name"),
+		Depth1:      regionProp(props, "region_1depth_name"),
+		Depth2:      regionProp(props, "region_2depth_name"),
+		Depth3:      regionProp(props, "region_3depth_name"),
+		Depth4:      regionProp(props, "region_4depth_name"),
+	}
+	if t := regionProp(props, "region_type"); t != "" {
+		g.RegionType = t
+	}
+	if g.Depth1 == "" {
+		// "경기도 성남시 분당구 삼평동" → 1depth=경기도, 2depth=성남시 분당구, 3depth=삼평동
+		parts := strings.Fields(g.AddressName)
+		if n := len(parts); n > 0 {
+			g.Depth1 = parts[0]
+			if n > 1 && strings.HasSuffix(parts[n-1], "리") && n > 2 {
+				g.Depth4 = parts[n-1]
+				parts = parts[:n-1]
+				n--
+			}
+			if n > 1 {
+				g.Depth3 = parts[n-1]
+				g.Depth2 = strings.Join(parts[1:n-1], " ")
+			}
+		}
+	}
+	return g
+}
+
+// representativePoint는 영역의 대표점을 정합니다. properties에 x/y(또는 center_x/center_y)가 있으면
+// 그 값을 쓰고, 없으면 가장 큰 폴리곤 외곽 링의 무게중심을 씁니다. 무게중심이 영역 밖이면(오목한 영역,
+// 구멍 안) 그 폴리곤의 가운데를 지나는 수평선에서 가장 긴 내부 구간의 중점을 씁니다.
+func (g *Region) representativePoint(props map[string]any) (float64, float64) {
+	for _, keys := range [][2]string{{"x", "y"}, {"center_x", "center_y"}} {
+		x, errX := strconv.ParseFloat(regionProp(props, keys[0]), 64)
+		y, errY := strconv.ParseFloat(regionProp(props, keys[1]), 64)
+		if errX == nil && errY == nil {
+			return x, y
+		}
+	}
+
+	var largest [][][2]float64
+	var largestArea float64
+	for _, poly := range g.polygons {
+		if a := math.Abs(ringArea(poly[0])); largest == nil || a > largestArea {
+			largest, largestArea = poly, a
+		}
+	}
+	if largest == nil || largestArea == 0 {
+		return (g.box.minX + g.box.maxX) / 2, (g.box.minY + g.box.maxY) / 2
+	}
+	cx, cy := ringCentroid(largest[0])
+	if g.contains(cx, cy) {
+		return cx, cy
+	}
+
+	minY, maxY := math.Inf(1), math.Inf(-1)
+	for _, pt := range largest[0] {
+		minY, maxY = math.Min(minY, pt[1]), math.Max(maxY, pt[1])
+	}
+	y := (minY + maxY) / 2
+	var xs []float64
+	for _, ring := range largest {
+		for i, j := 0, len(ring)-1; i < len(ring); j, i = i, i+1 {
+			xi, yi := ring[i][0], ring[i][1]
+			xj, yj := ring[j][0], ring[j][1]
+			if (yi > y) != (yj > y) {
+				xs = append(xs, (xj-xi)*(y-yi)/(yj-yi)+xi)
+			}
+		}
+	}
+	sort.Float64s(xs)
+	best := -1.0
+	for i := 0; i+1 < len(xs); i += 2 {
+		if w := xs[i+1] - xs[i]; w > best {
+			best, cx, cy = w, (xs[i]+xs[i+1])/2, y
+		}
+	}
+	return cx, cy
+}
+
+// ringArea는 링의 부호 있는 넓이(반시계 방향이 양수)입니다.
+func ringArea(ring [][2]float64) float64 {
+	var a float64
+	for i, j := 0, len(ring)-1; i < len(ring); j, i = i, i+1 {
+		a += ring[j][0]*ring[i][1] - ring[i][0]*ring[j][1]
+	}
+	return a / 2
+}
+
+// ringCentroid는 링으로 둘러싸인 영역의 무게중심입니다. 넓이가 0이 아닌 링에만 씁니다.
+func ringCentroid(ring [][2]float64) (float64, float64) {
+	var cx, cy float64
+	for i, j := 0, len(ring)-1; i < len(ring); j, i = i, i+1 {
+		cross := ring[j][0]*ring[i][1] - ring[i][0]*ring[j][1]
+		cx += (ring[j][0] + ring[i][0]) * cross
+		cy += (ring[j][1] + ring[i][1]) * cross
+	}
+	a := 6 * ringArea(ring)
+	return cx / a, cy / a
+}
+
+// buildSTR는 Sort-Tile-Recursive 방식으로 bounding box 트리를 만듭니다.
+func buildSTR(regions []*Region) *strNode {
+	var level []*strNode
+	for _, group := range strPack(regions, func(g *Region) bbox { return g.box }) {
+		n := &strNode{regions: group, box: group[0].box}
+		for _, g := range group[1:] {
+			n.box = n.box.union(g.box)
+		}
+		level = append(level, n)
+	}
+	for len(level) > 1 {
+		var next []*strNode
+		for _, group := range strPack(level, func(c *strNode) bbox { return c.box }) {
+			n := &strNode{children: group, box: group[0].box}
+			for _, c := range group[1:] {
+				n.box = n.box.union(c.box)
+			}
+			next = append(next, n)
+		}
+		level = next
+	}
+	if len(level) == 0 {
+		return &strNode{box: bbox{1, 1, -1, -1}}
+	}
+	return level[0]
+}
+
+// strPack은 항목을 x 중심으로 정렬해 세로 띠로 나누고, 각 띠를 y 중심으로 정렬한 뒤
+// regionNodeCapacity개씩 묶습니다. items는 제자리에서 정렬됩니다.
+func strPack[T any](items []T, boxOf func(T) bbox) [][]T {
+	n := len(items)
+	if n == 0 {
+		return nil
+	}
+	centerX := func(t T) float64 { b := boxOf(t); return b.minX + b.maxX }
+	centerY := func(t T) float64 { b := boxOf(t); return b.minY + b.maxY }
+	sort.Slice(items, func(a, b int) bool { return centerX(items[a]) < centerX(items[b]) })
+
+	nodes := (n + regionNodeCapacity - 1) / regionNodeCapacity
+	sliceSize := int(math.Ceil(math.Sqrt(float64(nodes)))) * regionNodeCapacity
+	groups := make([][]T, 0, nodes)
+	for start := 0; start < n; start += sliceSize {
+		slab := items[start:min(start+sliceSize, n)]
+		sort.Slice(slab, func(a, b int) bool { return centerY(slab[a]) < centerY(slab[b]) })
+		for s := 0; s < len(slab); s += regionNodeCapacity {
+			groups = append(groups, slab[s:min(s+regionNodeCapacity, len(slab))])
+		}
+	}
+	return groups
+}
+
+func (n *strNode) find(x, y float64) *Region {
+	if !n.box.contains(x, y) {
+		return nil
+	}
+	for _, g := range n.regions {
+		if g.contains(x, y) {
+			return g
+		}
+	}
+	for _, c := range n.children {
+		if g := c.find(x, y); g != nil {
+			return g
+		}
+	}
+	return nil
+}
+
+// Lookup은 WGS84 경도/위도가 속한 행정구역을 종류별로 하나씩 반환합니다.
+func (idx *RegionIndex) Lookup(lon, lat float64) []*Region {
+	var out []*Region
+	for _, t := range idx.types {
+		if g := idx.roots[t].find(lon, lat); g != nil {
+			out = append(out, g)
+		}
+	}
+	return out
+}
+
+// regionDocument는 coord2regioncode 응답의 document입니다.
+type regionDocument struct {
+	*Region
+	X float64 `json:"x"`
+	Y float64 `json:"y"`
+}
+
+// localRegionCode는 경계 인덱스로 coord2regioncode 응답 본문을 만듭니다. Kakao처럼 법정동(B), 행정동(H)
+// 순서로 두 document를 담고, x/y에는 요청 좌표가 아니라 각 영역의 대표점(representativePoint)을 넣습니다.
+// Kakao는 두 종류를 항상 함께 돌려주므로, 한 종류라도 경계 파일이 없거나 좌표가 속한 경계를 찾지 못하면
+// false를 반환해 업스트림으로 넘깁니다.
+func (idx *RegionIndex) localRegionCode(q url.Values) ([]byte, bool) {
+	x, errX := strconv.ParseFloat(q.Get("x"), 64)
+	y, errY := strconv.ParseFloat(q.Get("y"), 64)
+	if errX != nil || errY != nil {
+		return nil, false
+	}
+	lon, lat := x, y
+	if in := q.Get("input_coord"); in != "" && !strings.EqualFold(in, "WGS84") {
+		var err error
+		if lon, lat, err = TransformCoord(x, y, in, "WGS84"); err != nil {
+			return nil, false
+		}
+	}
+	byType := make(map[string]*Region, 2)
+	for _, g := range idx.Lookup(lon, lat) {
+		byType[g.RegionType] = g
+	}
+	regions := []*Region{byType["B"], byType["H"]}
+	if regions[0] == nil || regions[1] == nil {
+		return nil, false
+	}
+
+	out := q.Get("output_coord")
+	var resp struct {
+		Meta struct {
+			TotalCount int `json:"total_count"`
+		} `json:"meta"`
+		Documents []regionDocument `json:"documents"`
+	}
+	resp.Meta.TotalCount = len(regions)
+	for _, g := range regions {
+		outX, outY := g.x, g.y
+		if out != "" && !strings.EqualFold(out, "WGS84") {
+			var err error
+			if outX, outY, err = TransformCoord(g.x, g.y, "WGS84", out); err != nil {
+				return nil, false
+			}
+		}
+		resp.Documents = append(resp.Documents, regionDocument{Region: g, X: outX, Y: outY})
+	}
+	body, _ := json.Marshal(resp)
+	return body, true
+}
@@ -0,0 +1,221 @@
+package lib
+
+import (
+	"encoding/json"
+	"fmt"
+	"io"
+	"log/slog"
+	"math"
+	"net/url"
+	"os"
+	"path/filepath"
+	"strings"
+	"testing"
+)
+
+// square는 (x0, y0)에서 한 변이 size인 반시계 방향 사각형 링입니다.
+func square(x0, y0, size float64) [][2]float64 {
+	return [][2]float64{{x0, y0}, {x0 + size, y0}, {x0 + size, y0 + size}, {x0, y0 + size}, {x0, y0}}
+}
+
+type testFeature struct {
+	code     string
+	polygons [][][][2]float64
+}
+
+// writeRegionFile은 features를 GeoJSON FeatureCollection으로 dir에 씁니다. 폴리곤이 하나이면 Polygon으로 씁니다.
+func writeRegionFile(t *testing.T, name string, features []testFeature) string {
+	t.Helper()
+	var fs []string
+	for _, f := range features {
+		geomType, coords := "MultiPolygon", any(f.polygons)
+		if len(f.polygons) == 1 {
+			geomType, coords = "Polygon", f.polygons[0]
+		}
+		c, _ := json.Marshal(coords)
+		fs = append(fs, fmt.Sprintf(`{"type":"Feature","properties":{"code":%q,"address_name":"테스트도 %s동"},"geometry":{"type":%q,"coordinates":%s}}`,
+			f.code, f.code, geomType, c))
+	}
+	path := filepath.Join(t.TempDir(), name)
+	body := `{"type":"FeatureCollection","features":[` + strings.Join(fs, ",") + `]}`
+	if err := os.WriteFile(path, []byte(body), 0o644); err != nil {
+		t.Fatal(err)
+	}
+	return path
+}
+
+// regionFixture는 구멍 난 폴리곤(A)과 그 구멍을 채우는 영역(C), 떨어진 두 조각의 멀티폴리곤(M),
+// 그리고 STR-tree가 여러 단계가 되도록 20x20 격자(G)를 담은 경계 파일을 만듭니다.
+func regionFixture(t *testing.T) *RegionIndex {
+	t.Helper()
+	slog.SetDefault(slog.New(slog.NewTextHandler(io.Discard, nil)))
+	features := []testFeature{
+		{"A", [][][][2]float64{{square(0, 0, 2), square(0.5, 0.5, 1)}}},
+		{"C", [][][][2]float64{{square(0.5, 0.5, 1)}}},
+		{"M", [][][][2]float64{{square(2, 0, 1)}, {square(5, 5, 1)}}},
+	}
+	for i := 0; i < 20; i++ {
+		for j := 0; j < 20; j++ {
+			features = append(features, testFeature{fmt.Sprintf("G%02d%02d", i, j), [][][][2]float64{{square(10+float64(i), 10+float64(j), 1)}}})
+		}
+	}
+	idx, err := LoadRegionIndex("H=" + writeRegionFile(t, "adm.geojson", features))
+	if err != nil {
+		t.Fatal(err)
+	}
+	return idx
+}
+
+func lookupCodes(idx *RegionIndex, lon, lat float64) string {
+	var codes []string
+	for _, g := range idx.Lookup(lon, lat) {
+		codes = append(codes, g.Code)
+	}
+	return strings.Join(codes, ",")
+}
+
+func TestRegionIndexLookup(t *testing.T) {
+	idx := regionFixture(t)
+	for _, c := range []struct {
+		name     string
+		lon, lat float64
+		want     string
+	}{
+		{"outer ring", 0.25, 1, "A"},
+		{"hole belongs to the enclave", 1, 1, "C"},
+		{"first part of multipolygon", 2.5, 0.5, "M"},
+		{"second part of multipolygon", 5.5, 5.5, "M"},
+		{"between multipolygon parts", 4, 3, ""},
+		{"inside the multipolygon bbox only", 3.5, 0.5, ""},
+		{"grid cell", 17.5, 23.5, "G0713"},
+		{"far corner of the grid", 29.9, 29.9, "G1919"},
+		{"outside everything", -1, -1, ""},
+		// 짝홀 규칙은 반열린 구간이라 공유 변 위의 점은 정확히 한쪽(오른쪽/위쪽 영역)에만 속합니다.
+		{"shared vertical edge", 2, 0.5, "M"},
+		{"hole edge", 0.5, 1, "C"},
+		{"hole edge on the right", 1.5, 1, "A"},
+		{"grid edge", 15, 20.5, "G0510"},
+		{"grid corner", 15, 20, "G0510"},
+		{"right boundary is outside", 30, 25.5, ""},
+		{"top boundary is outside", 25.5, 30, ""},
+	} {
+		if got := lookupCodes(idx, c.lon, c.lat); got != c.want {
+			t.Errorf("%s: Lookup(%v, %v) = %q, want %q", c.name, c.lon, c.lat, got, c.want)
+		}
+	}
+}
+
+// TestRegionIndexSharedEdges는 격자 내부의 모든 공유 변과 꼭짓점 위의 점이 정확히 한 칸에 속하는지 확인합니다.
+func TestRegionIndexSharedEdges(t *testing.T) {
+	idx := regionFixture(t)
+	for i := 11; i < 30; i++ {
+		for j := 11; j < 30; j++ {
+			for _, p := range [][2]float64{{float64(i), float64(j)}, {float64(i), float64(j) + 0.5}, {float64(i) + 0.5, float64(j)}} {
+				if got := idx.Lookup(p[0], p[1]); len(got) != 1 {
+					t.Fatalf("Lookup(%v) found %d regions, want 1", p, len(got))
+				}
+			}
+		}
+	}
+}
+
+func TestRegionIndexTypes(t *testing.T) {
+	slog.SetDefault(slog.New(slog.NewTextHandler(io.Discard, nil)))
+	b := writeRegionFile(t, "bjd.geojson", []testFeature{{"B1", [][][][2]float64{{square(0, 0, 1)}}}})
+	h := writeRegionFile(t, "adm.geojson", []testFeature{{"H1", [][][][2]float64{{square(0, 0, 2)}}}})
+	idx, err := LoadRegionIndex("H=" + h + ", " + b)
+	if err != nil {
+		t.Fatal(err)
+	}
+	if got := lookupCodes(idx, 0.5, 0.5); got != "H1,B1" {
+		t.Errorf("Lookup = %q, want H1,B1", got)
+	}
+	if got := lookupCodes(idx, 1.5, 1.5); got != "H1" {
+		t.Errorf("Lookup = %q, want H1", got)
+	}
+
+	// document는 Kakao처럼 법정동, 행정동 순서이고 x/y는 요청 좌표가 아닌 각 영역의 대표점입니다.
+	body, ok := idx.localRegionCode(url.Values{"x": {"0.25"}, "y": {"0.75"}})
+	if !ok {
+		t.Fatal("localRegionCode missed")
+	}
+	var resp struct {
+		Meta struct {
+			TotalCount int `json:"total_count"`
+		} `json:"meta"`
+		Documents []struct {
+			RegionType string  `json:"region_type"`
+			Code       string  `json:"code"`
+			Depth1     string  `json:"region_1depth_name"`
+			Depth3     string  `json:"region_3depth_name"`
+			X          float64 `json:"x"`
+			Y          float64 `json:"y"`
+		} `json:"documents"`
+	}
+	if err := json.Unmarshal(body, &resp); err != nil {
+		t.Fatal(err)
+	}
+	if resp.Meta.TotalCount != 2 || len(resp.Documents) != 2 {
+		t.Fatalf("body = %s", body)
+	}
+	b1, h1 := resp.Documents[0], resp.Documents[1]
+	if b1.RegionType != "B" || b1.Code != "B1" || b1.Depth1 != "테스트도" || b1.Depth3 != "B1동" || b1.X != 0.5 || b1.Y != 0.5 ||
+		h1.RegionType != "H" || h1.Code != "H1" || h1.X != 1 || h1.Y != 1 {
+		t.Errorf("body = %s", body)
+	}
+	body, _ = idx.localRegionCode(url.Values{"x": {"0.25"}, "y": {"0.75"}, "output_coord": {"WTM"}})
+	json.Unmarshal(body, &resp)
+	if wx, wy, _ := TransformCoord(1, 1, "WGS84", "WTM"); resp.Documents[1].X != wx || resp.Documents[1].Y != wy {
+		t.Errorf("output_coord WTM: body = %s", body)
+	}
+
+	// 법정동이나 행정동 중 하나라도 없으면 업스트림으로 넘깁니다.
+	if _, ok := idx.localRegionCode(url.Values{"x": {"1.5"}, "y": {"1.5"}}); ok {
+		t.Error("localRegionCode answered a point with no legal (B) region")
+	}
+	if _, ok := idx.localRegionCode(url.Values{"x": {"3"}, "y": {"3"}}); ok {
+		t.Error("localRegionCode answered a point outside every boundary")
+	}
+	hOnly, err := LoadRegionIndex("H=" + h)
+	if err != nil {
+		t.Fatal(err)
+	}
+	if _, ok := hOnly.localRegionCode(url.Values{"x": {"0.5"}, "y": {"0.5"}}); ok {
+		t.Error("localRegionCode answered from an index without legal (B) boundaries")
+	}
+	if _, err := LoadRegionIndex(" , "); err == nil {
+		t.Error("LoadRegionIndex accepted an empty spec")
+	}
+}
+
+func TestRegionRepresentativePoint(t *testing.T) {
+	// ㄷ자 영역: 외곽 링의 무게중심 (1.36, 1.5)은 오른쪽이 뚫린 부분이라 영역 밖입니다.
+	u := [][2]float64{{0, 0}, {3, 0}, {3, 1}, {1, 1}, {1, 2}, {3, 2}, {3, 3}, {0, 3}, {0, 0}}
+	for _, c := range []struct {
+		name         string
+		props        map[string]any
+		polygons     [][][][2]float64
+		wantX, wantY float64
+	}{
+		{"centroid", nil, [][][][2]float64{{square(2, 4, 2)}}, 3, 5},
+		{"largest polygon", nil, [][][][2]float64{{square(0, 0, 1)}, {square(5, 5, 2)}}, 6, 6},
+		{"centroid outside the region", nil, [][][][2]float64{{u}}, 0.5, 1.5},
+		{"centroid in a hole", nil, [][][][2]float64{{square(0, 0, 4), square(1, 1, 2)}}, 0.5, 2},
+		{"from properties", map[string]any{"x": 127.1, "y": "37.4"}, [][][][2]float64{{square(0, 0, 1)}}, 127.1, 37.4},
+		{"center_x/center_y", map[string]any{"center_x": 1.25, "center_y": 1.75}, [][][][2]float64{{square(0, 0, 4)}}, 1.25, 1.75},
+	} {
+		g := &Region{polygons: c.polygons, box: bbox{math.Inf(1), math.Inf(1), math.Inf(-1), math.Inf(-1)}}
+		for _, poly := range c.polygons {
+			for _, pt := range poly[0] {
+				g.box = g.box.union(bbox{pt[0], pt[1], pt[0], pt[1]})
+			}
+		}
+		x, y := g.representativePoint(c.props)
+		if math.Abs(x-c.wantX) > 1e-12 || math.Abs(y-c.wantY) > 1e-12 {
+			t.Errorf("%s: representativePoint = (%v, %v), want (%v, %v)", c.name, x, y, c.wantX, c.wantY)
+		}
+		if c.props == nil && !g.contains(x, y) {
+			t.Errorf("%s: (%v, %v) is outside the region", c.name, x, y)
+		}
+	}
+}
@@ -0,0 +1,437 @@
+package lib
+
+import (
+	"container/list"
+	"context"
+	"encoding/json"
+	"fmt"
+	"math/rand"
+	"net/http"
+	"strconv"
+	"strings"
+	"sync"
+	"time"
+)
+
+// Priority는 업스트림 대기열에서의 우선순위입니다. 값이 작을수록 먼저 처리됩니다.
+type Priority int
+
+const (
+	// PriorityInteractive는 에이전트 도구 호출처럼 사용자가 기다리는 요청입니다.
+	PriorityInteractive Priority = iota
+	// PriorityBulk는 일괄 조회, 스윕처럼 처리량이 중요한 요청입니다.
+	PriorityBulk
+	numPriorities
+)
+
+type priorityKey struct{}
+
+// WithPriority는 ctx로 이어지는 업스트림 호출의 우선순위를 지정합니다.
+func WithPriority(ctx context.Context, p Priority) context.Context {
+	return context.WithValue(ctx, priorityKey{}, p)
+}
+
+func priorityFrom(ctx context.Context) Priority {
+	if p, ok := ctx.Value(priorityKey{}).(Priority); ok {
+		return p
+	}
+	return PriorityInteractive
+}
+
+// requestContext는 요청의 컨텍스트에 `X-Priority: bulk` 헤더의 우선순위를 반영합니다.
+func requestContext(r *http.Request) context.Context {
+	if strings.EqualFold(r.Header.Get("X-Priority"), "bulk") {
+		return WithPriority(r.Context(), PriorityBulk)
+	}
+	return r.Context()
+}
+
+// kst는 Kakao 일일 쿼터가 초기화되는 기준 시간대입니다.
+var kst = time.FixedZone("KST", 9*60*60)
+
+// SchedulerConfig는 업스트림 호출 스케줄러 설정입니다.
+type SchedulerConfig struct {
+	// Rates는 엔드포인트별 초당 호출 수입니다. 0 이하이면 속도 제한을 하지 않습니다.
+	Rates map[string]float64
+	Burst int
+	// Quotas는 엔드포인트별 하루(KST) 호출 한도입니다. 0이면 한도 없이 집계만 합니다.
+	Quotas      map[string]int64
+	MaxWait     [numPriorities]time.Duration
+	MaxRetries  int
+	BackoffBase time.Duration
+	BackoffMax  time.Duration
+}
+
+// LoadSchedulerConfig는 환경 변수에서 스케줄러 설정을 읽습니다. <NAME>은 엔드포인트 짧은 이름
+// (ADDRESS, KEYWORD, CATEGORY, COORD2ADDRESS, COORD2REGIONCODE, TRANSCOORD)입니다.
+//
+//	RATE_LIMIT_RPS            엔드포인트별 기본 초당 호출 수 (기본 20, 0이면 제한 없음)
+//	RATE_LIMIT_RPS_<NAME>     엔드포인트별 초당 호출 수
+//	RATE_LIMIT_BURST          토큰 버킷 크기 (기본 20)
+//	QUOTA_DAILY               엔드포인트별 기본 일일 호출 한도 (기본 0, 한도 없음)
+//	QUOTA_DAILY_<NAME>        엔드포인트별 일일 호출 한도
+//	SCHED_MAX_WAIT            대화형 요청의 최대 대기 시간 (기본 3s)
+//	SCHED_MAX_WAIT_BULK       일괄 요청의 최대 대기 시간 (기본 60s)
+//	SCHED_MAX_RETRIES         429/5xx 응답 재시도 횟수 (기본 3)
+//	SCHED_BACKOFF_BASE        재시도 백오프 기본값 (기본 200ms)
+//	SCHED_BACKOFF_MAX         재시도 백오프 최대값 (기본 5s)
+func LoadSchedulerConfig() SchedulerConfig {
+	cfg := SchedulerConfig{
+		Rates:       make(map[string]float64),
+		Burst:       max(envInt("RATE_LIMIT_BURST", 20), 1),
+		Quotas:      make(map[string]int64),
+		MaxRetries:  envInt("SCHED_MAX_RETRIES", 3),
+		BackoffBase: envDuration("SCHED_BACKOFF_BASE", 200*time.Millisecond),
+		BackoffMax:  envDuration("SCHED_BACKOFF_MAX", 5*time.Second),
+	}
+	cfg.MaxWait[PriorityInteractive] = envDuration("SCHED_MAX_WAIT", 3*time.Second)
+	cfg.MaxWait[PriorityBulk] = envDuration("SCHED_MAX_WAIT_BULK", 60*time.Second)
+	defaultRate := envInt("RATE_LIMIT_RPS", 20)
+	defaultQuota := envInt("QUOTA_DAILY", 0)
+	for _, path := range endpointPaths {
+		name := strings.ToUpper(endpointName(path))
+		cfg.Rates[path] = float64(envInt("RATE_LIMIT_RPS_"+name, defaultRate))
+		cfg.Quotas[path] = int64(envInt("QUOTA_DAILY_"+name, defaultQuota))
+	}
+	return cfg
+}
+
+// endpointName은 "/v2/local/search/keyword.json"에서 "keyword"를 꺼냅니다.
+func endpointName(path string) string {
+	name := path[strings.LastIndex(path, "/")+1:]
+	return strings.TrimSuffix(name, ".json")
+}
+
+// UpstreamError는 호출자에게 그대로 전달할 상태 코드가 있는 업스트림 오류입니다.
+type UpstreamError struct {
+	Status     int
+	RetryAfter time.Duration
+	Type       string
+	Message    string
+}
+
+func (e *UpstreamError) Error() string {
+	return fmt.Sprintf("%s: %s", e.Type, e.Message)
+}
+
+// EndpointSchedStats는 엔드포인트 하나의 스케줄러 상태입니다.
+type EndpointSchedStats struct {
+	Rate            float64 `json:"rate"`
+	Tokens          float64 `json:"tokens"`
+	QueuedInteract  int     `json:"queued_interactive"`
+	QueuedBulk      int     `json:"queued_bulk"`
+	UsedToday       int64   `json:"used_today"`
+	Quota           int64   `json:"quota"`
+	Admitted        int64   `json:"admitted"`
+	Rejected        int64   `json:"rejected"`
+	Throttled       int64   `json:"throttled"`
+	Retries         int64   `json:"retries"`
+	BlockedUntilUTC string  `json:"blocked_until,omitempty"`
+}
+
+type schedWaiter struct {
+	ready chan error
+	prio  Priority
+}
+
+// endpointLimiter는 엔드포인트 하나의 토큰 버킷, 우선순위 대기열, 일일 쿼터입니다.
+type endpointLimiter struct {
+	mu      sync.Mutex
+	rate    float64
+	burst   float64
+	tokens  float64
+	last    time.Time
+	blocked time.Time // 429/Retry-After로 호출을 멈춘 시각까지
+	queues  [numPriorities]*list.List
+	timer   *time.Timer
+
+	quota int64
+	day   string
+	used  int64
+
+	stats EndpointSchedStats
+	// now는 현재 시각입니다. 테스트에서 시계를 바꿔 끼울 수 있도록 time.Now를 직접 부르지 않습니다.
+	now func() time.Time
+}
+
+func newEndpointLimiter(rate float64, burst int, quota int64, now func() time.Time) *endpointLimiter {
+	l := &endpointLimiter{rate: rate, burst: float64(burst), tokens: float64(burst), last: now(), quota: quota, now: now}
+	for i := range l.queues {
+		l.queues[i] = list.New()
+	}
+	return l
+}
+
+// refillLocked는 마지막 갱신 이후 흐른 시간만큼 토큰을 채웁니다.
+// 429로 멈춘 동안에는 토큰이 쌓이지 않습니다.
+func (l *endpointLimiter) refillLocked(now time.Time) {
+	from := l.last
+	if from.Before(l.blocked) {
+		from = l.blocked
+	}
+	if now.After(from) {
+		l.tokens = min(l.burst, l.tokens+now.Sub(from).Seconds()*l.rate)
+	}
+	l.last = now
+}
+
+// chargeLocked는 일일 쿼터에서 한 번을 차감합니다. KST 자정이 지나면 사용량을 초기화합니다.
+func (l *endpointLimiter) chargeLocked(now time.Time) error {
+	if day := now.In(kst).Format("2006-01-02"); day != l.day {
+		l.day, l.used = day, 0
+	}
+	if l.quota > 0 && l.used >= l.quota {
+		y, m, d := now.In(kst).Date()
+		reset := time.Date(y, m, d+1, 0, 0, 0, 0, kst)
+		return &UpstreamError{Status: http.StatusServiceUnavailable, RetryAfter: reset.Sub(now), Type: "QuotaExceeded", Message: "daily Kakao API quota exhausted"}
+	}
+	l.used++
+	return nil
+}
+
+func (l *endpointLimiter) queued(upTo Priority) int {
+	n := 0
+	for p := Priority(0); p <= upTo; p++ {
+		n += l.queues[p].Len()
+	}
+	return n
+}
+
+// acquire는 토큰을 얻을 때까지 우선순위 대기열에서 기다립니다. 예상 대기 시간이
+// maxWait를 넘으면 기다리지 않고 바로 503 오류를 반환합니다.
+func (l *endpointLimiter) acquire(ctx context.Context, prio Priority, maxWait time.Duration) error {
+	now := l.now()
+	l.mu.Lock()
+	if l.rate <= 0 {
+		err := l.chargeLocked(now)
+		l.admitLocked(err)
+		l.mu.Unlock()
+		return err
+	}
+	l.refillLocked(now)
+	if l.queued(numPriorities-1) == 0 && l.tokens >= 1 && !now.Before(l.blocked) {
+		l.tokens--
+		err := l.chargeLocked(now)
+		l.admitLocked(err)
+		l.mu.Unlock()
+		return err
+	}
+
+	// 앞선 대기자(같거나 높은 우선순위)가 모두 처리된 뒤 토큰이 생기는 시각을 추정합니다.
+	wait := time.Duration((float64(l.queued(prio)+1) - l.tokens) / l.rate * float64(time.Second))
+	if now.Before(l.blocked) {
+		wait += l.blocked.Sub(now)
+	}
+	if deadline, ok := ctx.Deadline(); ok && deadline.Sub(now) < maxWait {
+		maxWait = deadline.Sub(now)
+	}
+	if wait > maxWait {
+		l.stats.Rejected++
+		l.mu.Unlock()
+		return &UpstreamError{Status: http.StatusServiceUnavailable, RetryAfter: wait, Type: "QueueTimeout", Message: fmt.Sprintf("upstream queue wait %s exceeds %s", wait.Round(time.Millisecond), maxWait)}
+	}
+
+	w := &schedWaiter{ready: make(chan error, 1), prio: prio}
+	el := l.queues[prio].PushBack(w)
+	l.scheduleLocked(now)
+	l.mu.Unlock()
+
+	select {
+	case err := <-w.ready:
+		return err
+	case <-ctx.Done():
+		l.mu.Lock()
+		defer l.mu.Unlock()
+		select {
+		case err := <-w.ready:
+			// 취소와 동시에 토큰을 받았으면 그대로 사용합니다.
+			return err
+		default:
+			l.queues[prio].Remove(el)
+			return ctx.Err()
+		}
+	}
+}
+
+func (l *endpointLimiter) admitLocked(err error) {
+	if err != nil {
+		l.stats.Rejected++
+	} else {
+		l.stats.Admitted++
+	}
+}
+
+// dispatchLocked는 가능한 만큼 대기자에게 토큰을 나눠 주고, 남은 대기자가 있으면 다음 시각에 다시 실행되도록 예약합니다.
+func (l *endpointLimiter) dispatchLocked(now time.Time) {
+	l.refillLocked(now)
+	for !now.Before(l.blocked) && l.tokens >= 1 {
+		var w *schedWaiter
+		for p := range l.queues {
+			if front := l.queues[p].Front(); front != nil {
+				w = l.queues[p].Remove(front).(*schedWaiter)
+				break
+			}
+		}
+		if w == nil {
+			return
+		}
+		l.tokens--
+		err := l.chargeLocked(now)
+		l.admitLocked(err)
+		w.ready <- err
+	}
+	l.scheduleLocked(now)
+}
+
+func (l *endpointLimiter) scheduleLocked(now time.Time) {
+	if l.queued(numPriorities-1) == 0 || l.timer != nil {
+		return
+	}
+	d := time.Duration((1 - l.tokens) / l.rate * float64(time.Second))
+	if now.Before(l.blocked) {
+		d = max(d, l.blocked.Sub(now))
+	}
+	l.timer = time.AfterFunc(max(d, time.Millisecond), func() {
+		l.mu.Lock()
+		defer l.mu.Unlock()
+		l.timer = nil
+		l.dispatchLocked(l.now())
+	})
+}
+
+// block은 429 응답 뒤 until까지 이 엔드포인트의 호출을 멈추고 모아 둔 토큰을 버립니다.
+func (l *endpointLimiter) block(until time.Time) {
+	l.mu.Lock()
+	defer l.mu.Unlock()
+	l.stats.Throttled++
+	l.refillLocked(l.now())
+	if until.After(l.blocked) {
+		l.blocked = until
+	}
+	l.tokens = 0
+}
+
+func (l *endpointLimiter) countRetry() {
+	l.mu.Lock()
+	l.stats.Retries++
+	l.mu.Unlock()
+}
+
+func (l *endpointLimiter) snapshot() EndpointSchedStats {
+	l.mu.Lock()
+	defer l.mu.Unlock()
+	now := l.now()
+	l.refillLocked(now)
+	s := l.stats
+	s.Rate = l.rate
+	s.Tokens = l.tokens
+	s.QueuedInteract = l.queues[PriorityInteractive].Len()
+	s.QueuedBulk = l.queues[PriorityBulk].Len()
+	s.UsedToday = l.used
+	s.Quota = l.quota
+	if now.Before(l.blocked) {
+		s.BlockedUntilUTC = l.blocked.UTC().Format(time.RFC3339Nano)
+	}
+	return s
+}
+
+// Scheduler는 Kakao API 호출을 엔드포인트별 속도 제한과 일일 쿼터 안에서 우선순위대로 내보냅니다.
+type Scheduler struct {
+	cfg      SchedulerConfig
+	limiters map[string]*endpointLimiter
+}
+
+// NewScheduler는 설정의 엔드포인트마다 토큰 버킷을 만듭니다.
+func NewScheduler(cfg SchedulerConfig) *Scheduler {
+	s := &Scheduler{cfg: cfg, limiters: make(map[string]*endpointLimiter)}
+	for path, rate := range cfg.Rates {
+		s.limiters[path] = newEndpointLimiter(rate, cfg.Burst, cfg.Quotas[path], time.Now)
+	}
+	return s
+}
+
+func (s *Scheduler) limiter(path string) *endpointLimiter {
+	return s.limiters[path]
+}
+
+// Acquire는 path로 한 번 호출할 수 있을 때까지 기다립니다.
+func (s *Scheduler) Acquire(ctx context.Context, path string) error {
+	l := s.limiter(path)
+	if l == nil {
+		return nil
+	}
+	prio := priorityFrom(ctx)
+	return l.acquire(ctx, prio, s.cfg.MaxWait[prio])
+}
+
+// retryDelay는 attempt번째 재시도 전에 기다릴 시간입니다. Retry-After가 있으면 따르고,
+// 없으면 지수 백오프에 full jitter를 적용합니다.
+func (s *Scheduler) retryDelay(attempt int, resp *http.Response) time.Duration {
+	if d, ok := parseRetryAfter(resp.Header.Get("Retry-After")); ok {
+		return min(d, s.cfg.BackoffMax)
+	}
+	backoff := min(s.cfg.BackoffBase<<attempt, s.cfg.BackoffMax)
+	return time.Duration(rand.Int63n(int64(backoff) + 1))
+}
+
+// parseRetryAfter는 초 단위 또는 HTTP 날짜 형식의 Retry-After 값을 읽습니다.
+func parseRetryAfter(v string) (time.Duration, bool) {
+	if v == "" {
+		return 0, false
+	}
+	if secs, err := strconv.Atoi(v); err == nil {
+		return time.Duration(max(secs, 0)) * time.Second, true
+	}
+	if t, err := http.ParseTime(v); err == nil {
+		return max(time.Until(t), 0), true
+	}
+	return 0, false
+}
+
+// retryable은 재시도할 업스트림 응답인지 판단합니다.
+func retryable(status int) bool {
+	return status == http.StatusTooManyRequests || status >= 500
+}
+
+// throttled는 429 응답을 받은 엔드포인트의 호출을 Retry-After(없으면 delay) 동안 멈춥니다.
+func (s *Scheduler) throttled(path, retryAfter string, delay time.Duration) {
+	if l := s.limiter(path); l != nil {
+		if d, ok := parseRetryAfter(retryAfter); ok {
+			delay = d
+		}
+		l.block(l.now().Add(delay))
+	}
+}
+
+func (s *Scheduler) countRetry(path string) {
+	if l := s.limiter(path); l != nil {
+		l.countRetry()
+	}
+}
+
+// Stats는 엔드포인트 짧은 이름별 스케줄러 상태를 반환합니다.
+func (s *Scheduler) Stats() map[string]EndpointSchedStats {
+	out := make(map[string]EndpointSchedStats, len(s.limiters))
+	for path, l := range s.limiters {
+		out[endpointName(path)] = l.snapshot()
+	}
+	return out
+}
+
+// sleepCtx는 d만큼 기다리거나 ctx가 끝나면 먼저 반환합니다.
+func sleepCtx(ctx context.Context, d time.Duration) error {
+	t := time.NewTimer(d)
+	defer t.Stop()
+	select {
+	case <-t.C:
+		return nil
+	case <-ctx.Done():
+		return ctx.Err()
+	}
+}
+
+// SchedulerStatsHandler는 스케줄러 상태를 JSON으로 반환합니다.
+func (h *ApiHandler) SchedulerStatsHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(h.Scheduler.Stats())
+}
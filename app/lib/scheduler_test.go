@@ -0,0 +1,203 @@
+package lib
+
+import (
+	"context"
+	"errors"
+	"io"
+	"log/slog"
+	"net/http"
+	"net/http/httptest"
+	"sync"
+	"testing"
+	"time"
+)
+
+// fakeClock은 테스트가 직접 움직이는 시계입니다.
+type fakeClock struct {
+	mu sync.Mutex
+	t  time.Time
+}
+
+func (c *fakeClock) now() time.Time {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	return c.t
+}
+
+func (c *fakeClock) advance(d time.Duration) {
+	c.mu.Lock()
+	c.t = c.t.Add(d)
+	c.mu.Unlock()
+}
+
+func newTestLimiter(rate float64, burst int, quota int64, start time.Time) (*endpointLimiter, *fakeClock) {
+	clock := &fakeClock{t: start}
+	return newEndpointLimiter(rate, burst, quota, clock.now), clock
+}
+
+// dispatch는 시계를 움직인 뒤 타이머를 기다리지 않고 대기자에게 토큰을 나눠 줍니다.
+func (l *endpointLimiter) dispatch() {
+	l.mu.Lock()
+	defer l.mu.Unlock()
+	l.dispatchLocked(l.now())
+}
+
+func waitQueued(t *testing.T, l *endpointLimiter, n int) {
+	t.Helper()
+	for deadline := time.Now().Add(2 * time.Second); time.Now().Before(deadline); time.Sleep(time.Millisecond) {
+		l.mu.Lock()
+		q := l.queued(numPriorities - 1)
+		l.mu.Unlock()
+		if q == n {
+			return
+		}
+	}
+	t.Fatalf("queue never reached %d waiters", n)
+}
+
+func TestSchedulerInteractiveBeforeBulk(t *testing.T) {
+	l, clock := newTestLimiter(10, 1, 0, time.Now())
+	if err := l.acquire(context.Background(), PriorityInteractive, time.Second); err != nil {
+		t.Fatal(err)
+	}
+
+	order := make(chan Priority, 2)
+	enqueue := func(p Priority) {
+		go func() {
+			if err := l.acquire(context.Background(), p, time.Hour); err != nil {
+				t.Error(err)
+			}
+			order <- p
+		}()
+	}
+	// 일괄 요청이 먼저 줄을 섰어도 대화형 요청이 먼저 토큰을 받아야 합니다.
+	enqueue(PriorityBulk)
+	waitQueued(t, l, 1)
+	enqueue(PriorityInteractive)
+	waitQueued(t, l, 2)
+
+	clock.advance(100 * time.Millisecond)
+	l.dispatch()
+	if got := <-order; got != PriorityInteractive {
+		t.Fatalf("first admitted priority = %d, want interactive", got)
+	}
+	select {
+	case <-order:
+		t.Fatal("bulk request admitted without a token")
+	case <-time.After(20 * time.Millisecond):
+	}
+	clock.advance(100 * time.Millisecond)
+	l.dispatch()
+	if got := <-order; got != PriorityBulk {
+		t.Fatalf("second admitted priority = %d, want bulk", got)
+	}
+	if s := l.snapshot(); s.Admitted != 3 || s.QueuedInteract+s.QueuedBulk != 0 {
+		t.Errorf("stats = %+v, want 3 admitted and an empty queue", s)
+	}
+}
+
+func TestSchedulerQueueTimeout(t *testing.T) {
+	slog.SetDefault(slog.New(slog.NewTextHandler(io.Discard, nil)))
+	l, _ := newTestLimiter(1, 1, 0, time.Now())
+	if err := l.acquire(context.Background(), PriorityInteractive, time.Second); err != nil {
+		t.Fatal(err)
+	}
+	// 토큰이 1초 뒤에 생기므로 500ms까지만 기다리는 요청은 줄을 서지 않고 바로 거절됩니다.
+	err := l.acquire(context.Background(), PriorityInteractive, 500*time.Millisecond)
+	var ue *UpstreamError
+	if !errors.As(err, &ue) || ue.Type != "QueueTimeout" || ue.Status != http.StatusServiceUnavailable {
+		t.Fatalf("acquire = %v, want 503 QueueTimeout", err)
+	}
+	if ue.RetryAfter != time.Second {
+		t.Errorf("RetryAfter = %v, want 1s", ue.RetryAfter)
+	}
+
+	// 컨텍스트 마감이 maxWait보다 이르면 그 마감을 기준으로 합니다.
+	ctx, cancel := context.WithTimeout(context.Background(), 200*time.Millisecond)
+	defer cancel()
+	if err := l.acquire(ctx, PriorityBulk, time.Hour); !errors.As(err, &ue) || ue.Type != "QueueTimeout" {
+		t.Errorf("acquire with a short deadline = %v, want QueueTimeout", err)
+	}
+
+	w := httptest.NewRecorder()
+	(&ApiHandler{}).writeError(w, err)
+	if w.Code != http.StatusServiceUnavailable || w.Header().Get("Retry-After") != "1" {
+		t.Errorf("response = %d Retry-After %q, want 503 with Retry-After 1", w.Code, w.Header().Get("Retry-After"))
+	}
+	if s := l.snapshot(); s.Rejected != 2 {
+		t.Errorf("rejected = %d, want 2", s.Rejected)
+	}
+}
+
+func TestSchedulerBlockedAfter429(t *testing.T) {
+	l, clock := newTestLimiter(10, 5, 0, time.Now())
+	l.block(clock.now().Add(5 * time.Second))
+	// 멈춘 동안에는 모아 둔 토큰도 쓰지 않습니다.
+	var ue *UpstreamError
+	if err := l.acquire(context.Background(), PriorityInteractive, time.Second); !errors.As(err, &ue) || ue.RetryAfter < 5*time.Second {
+		t.Fatalf("acquire while blocked = %v, want QueueTimeout of at least 5s", err)
+	}
+	clock.advance(5*time.Second + 100*time.Millisecond)
+	if err := l.acquire(context.Background(), PriorityInteractive, time.Second); err != nil {
+		t.Errorf("acquire after the block = %v", err)
+	}
+	if s := l.snapshot(); s.Throttled != 1 || s.BlockedUntilUTC != "" {
+		t.Errorf("stats = %+v", s)
+	}
+}
+
+func TestSchedulerDailyQuotaResetsAtKSTMidnight(t *testing.T) {
+	for _, rate := range []float64{0, 1000} {
+		start := time.Date(2026, 10, 18, 23, 59, 0, 0, kst)
+		l, clock := newTestLimiter(rate, 10, 2, start)
+		for i := 0; i < 2; i++ {
+			if err := l.acquire(context.Background(), PriorityInteractive, time.Second); err != nil {
+				t.Fatal(err)
+			}
+		}
+		err := l.acquire(context.Background(), PriorityInteractive, time.Second)
+		var ue *UpstreamError
+		if !errors.As(err, &ue) || ue.Type != "QuotaExceeded" || ue.RetryAfter != time.Minute {
+			t.Fatalf("rate %v: acquire over quota = %v, want QuotaExceeded retrying in 1m", rate, err)
+		}
+
+		// UTC 기준으로는 아직 같은 날(14:59 UTC)이지만 KST 자정이 지나면 한도가 초기화됩니다.
+		clock.advance(time.Minute)
+		if err := l.acquire(context.Background(), PriorityInteractive, time.Second); err != nil {
+			t.Errorf("rate %v: acquire after KST midnight = %v", rate, err)
+		}
+		if s := l.snapshot(); s.UsedToday != 1 || s.Quota != 2 {
+			t.Errorf("rate %v: stats = %+v, want 1 used of 2", rate, s)
+		}
+	}
+}
+
+func TestRequestPriority(t *testing.T) {
+	r := httptest.NewRequest(http.MethodGet, "/search/keyword", nil)
+	if p := priorityFrom(requestContext(r)); p != PriorityInteractive {
+		t.Errorf("default priority = %d, want interactive", p)
+	}
+	r.Header.Set("X-Priority", "BULK")
+	if p := priorityFrom(requestContext(r)); p != PriorityBulk {
+		t.Errorf("X-Priority: BULK priority = %d, want bulk", p)
+	}
+}
+
+func TestParseRetryAfter(t *testing.T) {
+	for _, c := range []struct {
+		in   string
+		want time.Duration
+		ok   bool
+	}{
+		{"", 0, false},
+		{"7", 7 * time.Second, true},
+		{"-3", 0, true},
+		{"soon", 0, false},
+		{"Mon, 02 Jan 2006 15:04:05 GMT", 0, true},
+	} {
+		got, ok := parseRetryAfter(c.in)
+		if got != c.want || ok != c.ok {
+			t.Errorf("parseRetryAfter(%q) = %v, %v; want %v, %v", c.in, got, ok, c.want, c.ok)
+		}
+	}
+}
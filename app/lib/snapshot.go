@@ -0,0 +1,226 @@
+package lib
+
+import (
+	"bufio"
+	"encoding/json"
+	"errors"
+	"fmt"
+	"io"
+	"log/slog"
+	"net/http"
+	"os"
+	"path/filepath"
+	"time"
+)
+
+// 응답 캐시 스냅샷. 한 줄에 항목 하나인 JSONL 파일로 캐시를 내보내고 읽어 들여,
+// 재시작하거나 새 노드를 띄울 때 업스트림 호출 없이 캐시를 채웁니다.
+// 형식은 example/langchain/geostore.py의 import/export와 같습니다.
+//
+//	{"key":"/v2/local/search/address.json?query=...","expires":1767225600,"body":{...}}
+//
+// key는 CacheKey 형식이고, expires는 만료 시각(Unix 초)이며 0이면 만료되지 않습니다.
+
+// SnapshotConfig는 응답 캐시 스냅샷 설정입니다.
+type SnapshotConfig struct {
+	Path     string
+	Interval time.Duration
+}
+
+// LoadSnapshotConfig는 환경 변수에서 스냅샷 설정을 읽습니다.
+//
+//	CACHE_SNAPSHOT_FILE       시작할 때 읽고 주기적으로 저장할 JSONL 파일 (기본 없음, 비활성화)
+//	CACHE_SNAPSHOT_INTERVAL   저장 주기 (기본 5m, 0이면 종료할 때만 저장)
+func LoadSnapshotConfig() SnapshotConfig {
+	return SnapshotConfig{
+		Path:     os.Getenv("CACHE_SNAPSHOT_FILE"),
+		Interval: envDuration("CACHE_SNAPSHOT_INTERVAL", 5*time.Minute),
+	}
+}
+
+type snapshotLine struct {
+	Key     string          `json:"key"`
+	Expires int64           `json:"expires"`
+	Body    json.RawMessage `json:"body"`
+}
+
+// Export는 만료되지 않은 항목을 최근에 사용한 순서로 JSONL로 씁니다.
+// 쓰는 동안 캐시를 잠그지 않도록 항목 목록을 먼저 복사합니다.
+func (c *ResponseCache) Export(w io.Writer) (int, error) {
+	now := time.Now()
+	c.mu.Lock()
+	entries := make([]*cacheEntry, 0, c.ll.Len())
+	for el := c.ll.Front(); el != nil; el = el.Next() {
+		e := el.Value.(*cacheEntry)
+		if e.expires.IsZero() || now.Before(e.expires) {
+			entries = append(entries, e)
+		}
+	}
+	c.mu.Unlock()
+
+	bw := bufio.NewWriter(w)
+	enc := json.NewEncoder(bw)
+	enc.SetEscapeHTML(false)
+	n := 0
+	for _, e := range entries {
+		if !json.Valid(e.body) {
+			continue
+		}
+		line := snapshotLine{Key: e.key, Body: e.body}
+		if !e.expires.IsZero() {
+			line.Expires = e.expires.Unix()
+		}
+		if err := enc.Encode(line); err != nil {
+			return n, err
+		}
+		n++
+	}
+	return n, bw.Flush()
+}
+
+// Import는 JSONL 스냅샷을 읽어 캐시에 넣습니다. 이미 만료된 항목은 건너뜁니다.
+// 파일은 최근 사용 순서이므로 뒤에서부터 넣어 예산을 넘으면 오래된 항목이 먼저 축출되게 합니다.
+func (c *ResponseCache) Import(r io.Reader) (int, error) {
+	if c.cfg.MaxBytes <= 0 {
+		return 0, nil
+	}
+	now := time.Now()
+	var lines []snapshotLine
+	dec := json.NewDecoder(bufio.NewReader(r))
+	for {
+		var line snapshotLine
+		if err := dec.Decode(&line); err == io.EOF {
+			break
+		} else if err != nil {
+			return 0, fmt.Errorf("decode snapshot line %d: %w", len(lines)+1, err)
+		}
+		if line.Key == "" || (line.Expires > 0 && now.Unix() >= line.Expires) {
+			continue
+		}
+		lines = append(lines, line)
+	}
+
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	n := 0
+	for i := len(lines) - 1; i >= 0; i-- {
+		line := lines[i]
+		body := []byte(line.Body)
+		if int64(len(body)) > c.cfg.MaxBytes {
+			continue
+		}
+		var expires time.Time
+		if line.Expires > 0 {
+			expires = time.Unix(line.Expires, 0)
+		}
+		if el, ok := c.items[line.Key]; ok {
+			c.removeElement(el)
+		}
+		c.items[line.Key] = c.ll.PushFront(&cacheEntry{key: line.Key, body: body, expires: expires})
+		c.bytes += entrySize(line.Key, body)
+		n++
+		for c.bytes > c.cfg.MaxBytes {
+			c.removeElement(c.ll.Back())
+			c.stats.Evictions++
+		}
+	}
+	return n, nil
+}
+
+// LoadSnapshot은 스냅샷 파일이 있으면 캐시로 읽어 들입니다.
+func (c *ResponseCache) LoadSnapshot(path string) error {
+	f, err := os.Open(path)
+	if os.IsNotExist(err) {
+		return nil
+	} else if err != nil {
+		return err
+	}
+	defer f.Close()
+	n, err := c.Import(f)
+	if err != nil {
+		return err
+	}
+	slog.Info("Loaded cache snapshot", "path", path, "entries", n)
+	return nil
+}
+
+// SaveSnapshot은 캐시를 임시 파일에 쓴 뒤 rename해, 다른 프로세스가 읽는 중에도
+// 항상 완전한 스냅샷만 보이도록 합니다.
+func (c *ResponseCache) SaveSnapshot(path string) error {
+	tmp, err := os.CreateTemp(filepath.Dir(path), filepath.Base(path)+".tmp*")
+	if err != nil {
+		return err
+	}
+	defer os.Remove(tmp.Name())
+	n, err := c.Export(tmp)
+	if err == nil {
+		err = tmp.Sync()
+	}
+	if cerr := tmp.Close(); err == nil {
+		err = cerr
+	}
+	if err != nil {
+		return err
+	}
+	if err := os.Rename(tmp.Name(), path); err != nil {
+		return err
+	}
+	slog.Debug("Saved cache snapshot", "path", path, "entries", n)
+	return nil
+}
+
+// RunSnapshots는 시작할 때 스냅샷을 읽고 Interval마다 저장합니다. 반환된 함수를
+// 종료 직전에 호출하면 마지막 스냅샷을 저장합니다.
+func (c *ResponseCache) RunSnapshots(cfg SnapshotConfig) (save func()) {
+	if cfg.Path == "" {
+		return func() {}
+	}
+	if err := c.LoadSnapshot(cfg.Path); err != nil {
+		slog.Error("Failed to load cache snapshot", "path", cfg.Path, "error", err)
+	}
+	save = func() {
+		if err := c.SaveSnapshot(cfg.Path); err != nil {
+			slog.Error("Failed to save cache snapshot", "path", cfg.Path, "error", err)
+		}
+	}
+	if cfg.Interval > 0 {
+		go func() {
+			for range time.Tick(cfg.Interval) {
+				save()
+			}
+		}()
+	}
+	return save
+}
+
+// CacheExportHandler는 응답 캐시를 JSONL 스냅샷으로 내려줍니다.
+func (h *ApiHandler) CacheExportHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/x-ndjson")
+	if _, err := h.Cache.Export(w); err != nil {
+		slog.Warn("Cache export interrupted", "error", err)
+	}
+}
+
+// CacheImportHandler는 POST 본문의 JSONL 스냅샷을 응답 캐시에 넣습니다.
+func (h *ApiHandler) CacheImportHandler(w http.ResponseWriter, r *http.Request) {
+	if r.Method != http.MethodPost {
+		w.Header().Set("Allow", http.MethodPost)
+		http.Error(w, "method not allowed", http.StatusMethodNotAllowed)
+		return
+	}
+	// 캐시에 다 들어가는 스냅샷은 본문 합계가 CACHE_MAX_BYTES 이하이므로, 키와 JSON 이스케이프를 감안해
+	// 두 배(최소 1MiB)까지만 받습니다.
+	limit := max(2*h.Cache.cfg.MaxBytes, 1<<20)
+	n, err := h.Cache.Import(http.MaxBytesReader(w, r.Body, limit))
+	if err != nil {
+		var tooLarge *http.MaxBytesError
+		if errors.As(err, &tooLarge) {
+			http.Error(w, fmt.Sprintf("snapshot larger than %d bytes", limit), http.StatusRequestEntityTooLarge)
+			return
+		}
+		http.Error(w, "invalid snapshot: "+err.Error(), http.StatusBadRequest)
+		return
+	}
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(map[string]int{"imported": n})
+}
@@ -0,0 +1,52 @@
+package lib
+
+import (
+	"bytes"
+	"net/http"
+	"strconv"
+)
+
+// setSSEHeaders는 SSE 응답에 필요한 헤더를 설정합니다.
+func setSSEHeaders(w http.ResponseWriter) {
+	w.Header().Set("Content-Type", "text/event-stream")
+	w.Header().Set("Cache-Control", "no-cache")
+	w.Header().Set("Connection", "keep-alive")
+}
+
+// writeSSEEvent는 하나의 SSE 이벤트를 쓰고 즉시 flush합니다.
+// event가 비어 있으면 event 필드를, id가 음수이면 id 필드를 생략합니다.
+// data에 개행이 있으면 줄마다 data 필드로 나눠 씁니다(클라이언트는 개행으로 다시 이어 붙입니다).
+// 이벤트는 풀에 있는 버퍼에서 조립하므로 응답마다 새로 할당하지 않고 한 번의 Write로 나갑니다.
+func writeSSEEvent(w http.ResponseWriter, event string, id int, data []byte) error {
+	buf := getBuffer()
+	defer putBuffer(buf)
+	buf.Grow(len(data) + 64)
+	if event != "" {
+		buf.WriteString("event: ")
+		buf.WriteString(event)
+		buf.WriteByte('\n')
+	}
+	if id >= 0 {
+		buf.WriteString("id: ")
+		buf.Write(strconv.AppendInt(buf.AvailableBuffer(), int64(id), 10))
+		buf.WriteByte('\n')
+	}
+	for {
+		line, rest, more := bytes.Cut(data, []byte{'\n'})
+		buf.WriteString("data: ")
+		buf.Write(line)
+		buf.WriteByte('\n')
+		if !more {
+			break
+		}
+		data = rest
+	}
+	buf.WriteByte('\n')
+	if _, err := w.Write(buf.Bytes()); err != nil {
+		return err
+	}
+	if flusher, ok := w.(http.Flusher); ok {
+		flusher.Flush()
+	}
+	return nil
+}
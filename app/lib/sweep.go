@@ -0,0 +1,333 @@
+package lib
+
+import (
+	"bytes"
+	"context"
+	"encoding/json"
+	"fmt"
+	"log/slog"
+	"math"
+	"net/http"
+	"net/url"
+	"strconv"
+	"strings"
+	"sync"
+	"sync/atomic"
+)
+
+// SweepConfig는 영역 전체를 타일로 나눠 훑는 검색의 한도입니다.
+type SweepConfig struct {
+	Concurrency int
+	MaxCalls    int
+	MaxDepth    int
+	// TileCap은 한 타일의 meta.total_count가 이 값 이상이면 타일을 4등분합니다.
+	TileCap int
+}
+
+// LoadSweepConfig는 환경 변수에서 스윕 설정을 읽습니다.
+//
+//	SWEEP_CONCURRENCY   업스트림 동시 호출 수 상한 (기본 8)
+//	SWEEP_MAX_CALLS     한 스윕에서 쓸 수 있는 최대 업스트림 호출 수 (기본 5000)
+//	SWEEP_MAX_DEPTH     타일을 나눌 수 있는 최대 깊이 (기본 12)
+//	SWEEP_TILE_CAP      타일을 나누는 total_count 기준 (기본 45, Kakao가 한 질의에서 넘겨주는 최대 결과 수)
+func LoadSweepConfig() SweepConfig {
+	return SweepConfig{
+		Concurrency: max(envInt("SWEEP_CONCURRENCY", 8), 1),
+		MaxCalls:    envInt("SWEEP_MAX_CALLS", 5000),
+		MaxDepth:    envInt("SWEEP_MAX_DEPTH", 12),
+		TileCap:     envInt("SWEEP_TILE_CAP", 45),
+	}
+}
+
+// sweepReport는 스윕이 끝난 뒤 보내는 요약입니다. 시작 타일 크기를 조정할 때
+// calls 대비 places(places_per_call)를 봅니다.
+type sweepReport struct {
+	Calls         int64   `json:"calls"`
+	Places        int     `json:"places"`
+	Duplicates    int     `json:"duplicates"`
+	Tiles         int64   `json:"tiles"`
+	Splits        int64   `json:"splits"`
+	MaxDepth      int64   `json:"max_depth"`
+	Unresolved    int64   `json:"unresolved"`
+	Failed        int64   `json:"failed"`
+	Truncated     bool    `json:"truncated"`
+	PlacesPerCall float64 `json:"places_per_call"`
+}
+
+// sweeper는 스윕 하나의 상태입니다. 타일마다 고루틴을 띄우고 업스트림 호출만 sem으로 제한합니다.
+type sweeper struct {
+	h     *ApiHandler
+	ctx   context.Context
+	path  string
+	base  url.Values
+	cfg   SweepConfig
+	sem   chan struct{}
+	wg    sync.WaitGroup
+	out   chan json.RawMessage
+	calls atomic.Int64
+
+	tiles, splits, depth, unresolved, failed atomic.Int64
+	truncated                                atomic.Bool
+}
+
+// ### 8. 영역 스윕
+//
+// rect 범위 안의 장소를 빠짐없이 찾기 위해 범위를 타일로 나눠 rect 검색을 반복합니다.
+// 한 타일의 결과가 Kakao 한도(SWEEP_TILE_CAP)에 닿으면 타일을 4등분해 다시 검색합니다.
+// 찾은 장소는 id로 중복을 제거해 `event: place`로 바로 보내고, 마지막에 호출 수 대비
+// 장소 수를 담은 `event: done` 리포트를 보냅니다. fields가 있으면 장소마다 그 필드만 보냅니다.
+func (h *ApiHandler) SweepHandler(w http.ResponseWriter, r *http.Request) {
+	q := r.URL.Query()
+	proj, err := parseProjection(q)
+	if err != nil {
+		http.Error(w, err.Error(), http.StatusBadRequest)
+		return
+	}
+	if proj != nil && proj.fields == nil {
+		proj = nil
+	}
+	path := "/v2/local/search/category.json"
+	if q.Get("category_group_code") == "" {
+		path = "/v2/local/search/keyword.json"
+		if q.Get("query") == "" {
+			http.Error(w, "category_group_code or query is required", http.StatusBadRequest)
+			return
+		}
+	}
+	area, err := parseRect(q.Get("rect"))
+	if err != nil {
+		http.Error(w, err.Error(), http.StatusBadRequest)
+		return
+	}
+	tileSize, _ := strconv.ParseFloat(q.Get("tile"), 64)
+
+	cfg := h.Sweep
+	if n, _ := strconv.Atoi(q.Get("concurrency")); n > 0 && n < cfg.Concurrency {
+		cfg.Concurrency = n
+	}
+	if n, _ := strconv.Atoi(q.Get("max_calls")); n > 0 && n < cfg.MaxCalls {
+		cfg.MaxCalls = n
+	}
+	for _, k := range append([]string{"rect", "tile", "concurrency", "max_calls", "page", "x", "y", "radius"}, projectionParams...) {
+		q.Del(k)
+	}
+	q.Set("size", "15")
+
+	ctx, cancel := context.WithCancel(WithPriority(r.Context(), PriorityBulk))
+	defer cancel()
+	s := &sweeper{
+		h:    h,
+		ctx:  ctx,
+		path: path,
+		base: q,
+		cfg:  cfg,
+		sem:  make(chan struct{}, cfg.Concurrency),
+		out:  make(chan json.RawMessage, 64),
+	}
+
+	tiles, ok := area.grid(tileSize, cfg.MaxCalls)
+	if !ok {
+		http.Error(w, fmt.Sprintf("tile too small: more starting tiles than max_calls %d", cfg.MaxCalls), http.StatusBadRequest)
+		return
+	}
+
+	setSSEHeaders(w)
+	w.WriteHeader(http.StatusOK)
+
+	for _, t := range tiles {
+		s.spawn(t, 0)
+	}
+	go func() {
+		s.wg.Wait()
+		close(s.out)
+	}()
+
+	report := sweepReport{}
+	seen := make(map[string]struct{})
+	var projected bytes.Buffer
+	for doc := range s.out {
+		var place struct {
+			ID string `json:"id"`
+		}
+		if json.Unmarshal(doc, &place) == nil && place.ID != "" {
+			if _, dup := seen[place.ID]; dup {
+				report.Duplicates++
+				continue
+			}
+			seen[place.ID] = struct{}{}
+		}
+		if proj != nil {
+			projected.Reset()
+			if proj.document(&projected, doc) == nil {
+				doc = projected.Bytes()
+			}
+		}
+		if err := writeSSEEvent(w, "place", report.Places, doc); err != nil {
+			slog.Warn("Sweep client went away", "error", err)
+			cancel()
+			for range s.out {
+			}
+			return
+		}
+		report.Places++
+	}
+
+	report.Calls = s.calls.Load()
+	report.Tiles = s.tiles.Load()
+	report.Splits = s.splits.Load()
+	report.MaxDepth = s.depth.Load()
+	report.Unresolved = s.unresolved.Load()
+	report.Failed = s.failed.Load()
+	report.Truncated = s.truncated.Load()
+	if report.Calls > 0 {
+		report.PlacesPerCall = float64(report.Places) / float64(report.Calls)
+	}
+	data, _ := json.Marshal(report)
+	writeSSEEvent(w, "done", -1, data)
+}
+
+func (s *sweeper) spawn(t bbox, depth int) {
+	s.wg.Add(1)
+	go func() {
+		defer s.wg.Done()
+		s.sweepTile(t, depth)
+	}()
+}
+
+// sweepTile은 타일의 첫 페이지를 보고, 한도에 닿으면 4등분하고 아니면 남은 페이지를 모두 읽습니다.
+func (s *sweeper) sweepTile(t bbox, depth int) {
+	s.tiles.Add(1)
+	for {
+		d := s.depth.Load()
+		if int64(depth) <= d || s.depth.CompareAndSwap(d, int64(depth)) {
+			break
+		}
+	}
+
+	for page := 1; page <= kakaoMaxPage; page++ {
+		meta, ok := s.fetchPage(t, page)
+		if !ok {
+			return
+		}
+		full := meta.Meta.TotalCount >= s.cfg.TileCap || meta.Meta.TotalCount > meta.Meta.PageableCount
+		if page == 1 && full {
+			if depth < s.cfg.MaxDepth {
+				// 첫 페이지 결과도 하위 타일에서 다시 찾게 되지만, 먼저 보내 두면 결과가 빨리 도착합니다.
+				s.emit(meta.Documents)
+				s.splits.Add(1)
+				for _, child := range t.quadrants() {
+					s.spawn(child, depth+1)
+				}
+				return
+			}
+			s.unresolved.Add(1)
+		}
+		s.emit(meta.Documents)
+		if meta.Meta.IsEnd {
+			return
+		}
+	}
+}
+
+func (s *sweeper) fetchPage(t bbox, page int) (*pageMeta, bool) {
+	select {
+	case s.sem <- struct{}{}:
+	case <-s.ctx.Done():
+		return nil, false
+	}
+	defer func() { <-s.sem }()
+	if s.calls.Add(1) > int64(s.cfg.MaxCalls) {
+		s.calls.Add(-1)
+		s.truncated.Store(true)
+		return nil, false
+	}
+
+	q := make(url.Values, len(s.base)+2)
+	for k, v := range s.base {
+		q[k] = v
+	}
+	q.Set("rect", t.rect())
+	q.Set("page", strconv.Itoa(page))
+	res, _, err := s.h.fetch(s.ctx, s.path, q, false)
+	if err != nil || res.Status != http.StatusOK {
+		if s.ctx.Err() == nil {
+			s.failed.Add(1)
+			slog.Warn("Sweep tile failed", "rect", t.rect(), "page", page, "error", err)
+		}
+		return nil, false
+	}
+	var meta pageMeta
+	if err := json.Unmarshal(res.Body, &meta); err != nil {
+		s.failed.Add(1)
+		return nil, false
+	}
+	return &meta, true
+}
+
+func (s *sweeper) emit(docs []json.RawMessage) {
+	for _, d := range docs {
+		select {
+		case s.out <- d:
+		case <-s.ctx.Done():
+			return
+		}
+	}
+}
+
+// parseRect는 Kakao rect 형식("좌측 X,좌측 Y,우측 X,우측 Y")을 읽습니다.
+func parseRect(v string) (bbox, error) {
+	parts := strings.Split(v, ",")
+	if len(parts) != 4 {
+		return bbox{}, fmt.Errorf("rect must be minX,minY,maxX,maxY")
+	}
+	var f [4]float64
+	for i, p := range parts {
+		n, err := strconv.ParseFloat(strings.TrimSpace(p), 64)
+		if err != nil {
+			return bbox{}, fmt.Errorf("invalid rect: %w", err)
+		}
+		f[i] = n
+	}
+	b := bbox{min(f[0], f[2]), min(f[1], f[3]), max(f[0], f[2]), max(f[1], f[3])}
+	if b.minX == b.maxX || b.minY == b.maxY {
+		return bbox{}, fmt.Errorf("rect has zero area")
+	}
+	return b, nil
+}
+
+func (b bbox) rect() string {
+	f := func(v float64) string { return strconv.FormatFloat(v, 'f', -1, 64) }
+	return f(b.minX) + "," + f(b.minY) + "," + f(b.maxX) + "," + f(b.maxY)
+}
+
+func (b bbox) quadrants() [4]bbox {
+	cx, cy := (b.minX+b.maxX)/2, (b.minY+b.maxY)/2
+	return [4]bbox{
+		{b.minX, b.minY, cx, cy},
+		{cx, b.minY, b.maxX, cy},
+		{b.minX, cy, cx, b.maxY},
+		{cx, cy, b.maxX, b.maxY},
+	}
+}
+
+// grid는 범위를 한 변이 size(도) 이하인 시작 타일로 나눕니다. size가 0 이하이면 범위 전체가 한 타일입니다.
+// 타일이 limit개를 넘으면 false를 반환합니다.
+func (b bbox) grid(size float64, limit int) ([]bbox, bool) {
+	if size <= 0 {
+		return []bbox{b}, true
+	}
+	// 부동소수점 누적 오차로 가장자리에 얇은 타일이 생기지 않도록 개수를 먼저 정합니다.
+	nx := int(math.Ceil((b.maxX-b.minX)/size - 1e-9))
+	ny := int(math.Ceil((b.maxY-b.minY)/size - 1e-9))
+	if float64(nx)*float64(ny) > float64(limit) {
+		return nil, false
+	}
+	tiles := make([]bbox, 0, nx*ny)
+	for j := 0; j < ny; j++ {
+		for i := 0; i < nx; i++ {
+			x, y := b.minX+float64(i)*size, b.minY+float64(j)*size
+			tiles = append(tiles, bbox{x, y, min(x+size, b.maxX), min(y+size, b.maxY)})
+		}
+	}
+	return tiles, true
+}
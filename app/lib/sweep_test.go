@@ -0,0 +1,239 @@
+package lib
+
+import (
+	"bufio"
+	"encoding/json"
+	"fmt"
+	"net/http"
+	"net/http/httptest"
+	"strconv"
+	"strings"
+	"sync/atomic"
+	"testing"
+)
+
+func TestParseRect(t *testing.T) {
+	for _, c := range []struct {
+		in   string
+		want bbox
+		err  bool
+	}{
+		{"127.0,37.5,127.1,37.6", bbox{127.0, 37.5, 127.1, 37.6}, false},
+		{" 127.1 , 37.6 ,127.0, 37.5", bbox{127.0, 37.5, 127.1, 37.6}, false}, // 꼭짓점 순서가 뒤집혀도 됩니다.
+		{"127.0,37.5,127.1", bbox{}, true},
+		{"127.0,37.5,127.1,north", bbox{}, true},
+		{"127.0,37.5,127.0,37.6", bbox{}, true},
+		{"", bbox{}, true},
+	} {
+		got, err := parseRect(c.in)
+		if (err != nil) != c.err || got != c.want {
+			t.Errorf("parseRect(%q) = %v, %v", c.in, got, err)
+		}
+	}
+	if got := (bbox{127, 37.5, 127.125, 37.75}).rect(); got != "127,37.5,127.125,37.75" {
+		t.Errorf("rect() = %q", got)
+	}
+}
+
+func TestBBoxGrid(t *testing.T) {
+	b := bbox{0, 0, 1, 0.5}
+	if tiles, ok := b.grid(0, 1); !ok || len(tiles) != 1 || tiles[0] != b {
+		t.Errorf("grid(0) = %v, %v", tiles, ok)
+	}
+
+	// 0.3으로 나누면 가장자리 타일은 잘리고, 누적 오차로 얇은 타일이 덧붙지 않습니다.
+	tiles, ok := b.grid(0.3, 100)
+	if !ok || len(tiles) != 4*2 {
+		t.Fatalf("grid(0.3) = %d tiles, %v; want 8", len(tiles), ok)
+	}
+	var area float64
+	for _, tile := range tiles {
+		if tile.minX < b.minX || tile.minY < b.minY || tile.maxX > b.maxX || tile.maxY > b.maxY ||
+			tile.maxX-tile.minX > 0.3+1e-12 || tile.maxY-tile.minY > 0.3+1e-12 {
+			t.Errorf("tile %v is outside the area or larger than 0.3", tile)
+		}
+		area += (tile.maxX - tile.minX) * (tile.maxY - tile.minY)
+	}
+	if d := area - 0.5; d > 1e-12 || d < -1e-12 {
+		t.Errorf("tiles cover %v, want 0.5", area)
+	}
+	if tiles, _ := b.grid(0.1, 100); len(tiles) != 50 {
+		t.Errorf("grid(0.1) = %d tiles, want 50", len(tiles))
+	}
+	if _, ok := b.grid(0.1, 49); ok {
+		t.Error("grid accepted more tiles than the limit")
+	}
+}
+
+func TestBBoxQuadrants(t *testing.T) {
+	q := (bbox{0, 0, 4, 2}).quadrants()
+	want := [4]bbox{{0, 0, 2, 1}, {2, 0, 4, 1}, {0, 1, 2, 2}, {2, 1, 4, 2}}
+	if q != want {
+		t.Errorf("quadrants = %v, want %v", q, want)
+	}
+}
+
+// maxPageable은 Kakao가 한 질의에서 넘겨주는 최대 결과 수입니다.
+const maxPageable = 45
+
+type sweepPlace struct {
+	id   string
+	x, y float64
+}
+
+// sweepUpstream은 rect 안의 장소만 돌려주는 키워드 검색 업스트림입니다. Kakao처럼 한 질의에서
+// 최대 45개(pageable_count)까지만 넘겨주고, total_count에는 rect 안의 전체 장소 수를 담습니다.
+type sweepUpstream struct {
+	places []sweepPlace
+	calls  atomic.Int64
+}
+
+func (u *sweepUpstream) ServeHTTP(w http.ResponseWriter, r *http.Request) {
+	u.calls.Add(1)
+	q := r.URL.Query()
+	area, err := parseRect(q.Get("rect"))
+	if err != nil {
+		w.WriteHeader(http.StatusBadRequest)
+		fmt.Fprintf(w, `{"errorType":"InvalidArgument","message":%q}`, err.Error())
+		return
+	}
+	var in []sweepPlace
+	for _, p := range u.places {
+		if area.contains(p.x, p.y) {
+			in = append(in, p)
+		}
+	}
+	page, _ := strconv.Atoi(q.Get("page"))
+	size, _ := strconv.Atoi(q.Get("size"))
+	pageable := min(len(in), maxPageable)
+	start, end := min((page-1)*size, pageable), min(page*size, pageable)
+	docs := make([]map[string]string, 0, end-start)
+	for _, p := range in[start:end] {
+		docs = append(docs, map[string]string{
+			"id":         p.id,
+			"place_name": "장소 " + p.id,
+			"x":          strconv.FormatFloat(p.x, 'f', -1, 64),
+			"y":          strconv.FormatFloat(p.y, 'f', -1, 64),
+		})
+	}
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(map[string]any{
+		"documents": docs,
+		"meta":      map[string]any{"total_count": len(in), "pageable_count": pageable, "is_end": end >= pageable},
+	})
+}
+
+// sweepFixture는 (0,0)-(8,8) 범위에 한쪽 구석에 몰린 60개 장소, 흩어진 5개 장소,
+// 그리고 네 사분면이 만나는 중심점 위의 장소 하나를 둡니다.
+func sweepFixture() *sweepUpstream {
+	u := &sweepUpstream{}
+	for i := 0; i < 6; i++ {
+		for j := 0; j < 10; j++ {
+			u.places = append(u.places, sweepPlace{fmt.Sprintf("c%d%d", i, j), 0.55 + 0.15*float64(i), 0.52 + 0.09*float64(j)})
+		}
+	}
+	for i, p := range [][2]float64{{6, 6}, {7, 1}, {1, 7}, {5.5, 2.5}, {3, 5}, {4, 4}} {
+		u.places = append(u.places, sweepPlace{fmt.Sprintf("s%d", i), p[0], p[1]})
+	}
+	return u
+}
+
+type sweepResult struct {
+	ids    []string
+	report sweepReport
+}
+
+func runSweep(t *testing.T, h *ApiHandler, query string) sweepResult {
+	t.Helper()
+	w := httptest.NewRecorder()
+	h.SweepHandler(w, httptest.NewRequest(http.MethodGet, "/search/sweep?"+query, nil))
+	if w.Code != http.StatusOK {
+		t.Fatalf("status = %d: %s", w.Code, w.Body)
+	}
+	var res sweepResult
+	var event string
+	scanner := bufio.NewScanner(w.Body)
+	for scanner.Scan() {
+		field, value, _ := strings.Cut(scanner.Text(), ": ")
+		switch field {
+		case "event":
+			event = value
+		case "data":
+			if event == "done" {
+				if err := json.Unmarshal([]byte(value), &res.report); err != nil {
+					t.Fatal(err)
+				}
+				continue
+			}
+			var place struct {
+				ID string `json:"id"`
+			}
+			json.Unmarshal([]byte(value), &place)
+			res.ids = append(res.ids, place.ID)
+		}
+	}
+	return res
+}
+
+// TestSweepSplitsSaturatedTiles는 한도에 닿은 타일이 4등분되고, 여러 타일에서 나온 장소가 id로 한 번씩만
+// 나가는지 확인합니다. 나누는 기준은 total_count가 TileCap 이상이거나 pageable_count보다 큰 경우입니다.
+func TestSweepSplitsSaturatedTiles(t *testing.T) {
+	for _, c := range []struct {
+		name    string
+		tileCap string
+	}{
+		{"total_count reaches the tile cap", "45"},
+		{"total_count exceeds pageable_count", "1000"},
+	} {
+		t.Run(c.name, func(t *testing.T) {
+			t.Setenv("SWEEP_TILE_CAP", c.tileCap)
+			upstream := sweepFixture()
+			h := newUpstreamHandler(t, upstream, "0")
+			res := runSweep(t, h, "query=%EC%B9%B4%ED%8E%98&rect=0,0,8,8")
+
+			seen := map[string]bool{}
+			for _, id := range res.ids {
+				if seen[id] {
+					t.Errorf("place %s sent twice", id)
+				}
+				seen[id] = true
+			}
+			r := res.report
+			if len(seen) != len(upstream.places) || r.Places != len(upstream.places) {
+				t.Errorf("found %d places (report %d), want %d", len(seen), r.Places, len(upstream.places))
+			}
+			// 뿌리 타일(66개)과 구석의 몰린 타일들은 나뉘고, 중심점 위의 장소는 네 사분면 모두에서 다시 나옵니다.
+			if r.Splits < 2 || r.Duplicates < 3 || r.Unresolved != 0 || r.Failed != 0 || r.Truncated {
+				t.Errorf("report = %+v", r)
+			}
+			if r.Tiles != 1+4*r.Splits || r.Calls != upstream.calls.Load() || r.MaxDepth < 2 {
+				t.Errorf("report = %+v, upstream calls = %d", r, upstream.calls.Load())
+			}
+		})
+	}
+}
+
+func TestSweepLimits(t *testing.T) {
+	// 더 나눌 수 없으면 넘겨받을 수 있는 45개까지 모든 페이지를 읽고 unresolved로 남깁니다.
+	t.Setenv("SWEEP_MAX_DEPTH", "0")
+	upstream := sweepFixture()
+	res := runSweep(t, newUpstreamHandler(t, upstream, "0"), "query=x&rect=0,0,8,8")
+	if r := res.report; len(res.ids) != maxPageable || r.Unresolved != 1 || r.Splits != 0 || r.Calls != 3 || r.Truncated {
+		t.Errorf("max depth 0: %d places, report = %+v", len(res.ids), r)
+	}
+
+	// max_calls에 닿으면 호출을 멈추고 truncated로 알립니다.
+	t.Setenv("SWEEP_MAX_DEPTH", "12")
+	upstream = sweepFixture()
+	res = runSweep(t, newUpstreamHandler(t, upstream, "0"), "query=x&rect=0,0,8,8&max_calls=3")
+	if r := res.report; !r.Truncated || r.Calls != 3 || upstream.calls.Load() != 3 || len(res.ids) >= len(upstream.places) {
+		t.Errorf("max_calls 3: %d places, report = %+v, upstream calls = %d", len(res.ids), r, upstream.calls.Load())
+	}
+
+	// 시작 타일이 max_calls보다 많으면 시작하지 않습니다.
+	w := httptest.NewRecorder()
+	newUpstreamHandler(t, sweepFixture(), "0").SweepHandler(w, httptest.NewRequest(http.MethodGet, "/search/sweep?query=x&rect=0,0,8,8&tile=1&max_calls=10", nil))
+	if w.Code != http.StatusBadRequest {
+		t.Errorf("64 starting tiles with max_calls 10: status = %d", w.Code)
+	}
+}
@@ -1,10 +1,57 @@
 package lib
 
-import "net/http"
+import (
+	"encoding/json"
+	"net/http"
+	"net/url"
+	"strconv"
+)
+
+// transcoordResponse는 Kakao transcoord API와 같은 모양의 응답입니다.
+type transcoordResponse struct {
+	Meta struct {
+		TotalCount int `json:"total_count"`
+	} `json:"meta"`
+	Documents []transcoordDocument `json:"documents"`
+}
+
+type transcoordDocument struct {
+	X float64 `json:"x"`
+	Y float64 `json:"y"`
+}
 
 // ### 4. 좌표계 변환
 //
 // 서로 다른 좌표계의 좌표를 변환하는 API입니다.
+// 좌표계 변환은 결정적인 계산이므로 기본적으로 업스트림 호출 없이 로컬에서 계산합니다
+// (TRANSCOORD_LOCAL=false로 끌 수 있음). 파라미터를 해석할 수 없거나 지원하지 않는
+// 좌표계이면 Kakao API로 전달해 원래의 오류 응답을 받습니다.
 func (h *ApiHandler) TranscoordHandler(w http.ResponseWriter, r *http.Request) {
-	h.ProxyKakaoRequestStream(w, r, "/v2/local/geo/transcoord.json")
+	h.proxyLocalFirst(w, r, "/v2/local/geo/transcoord.json")
+}
+
+// localTranscoord는 쿼리 파라미터로 좌표를 변환해 Kakao 형식의 JSON 응답 본문을 만듭니다.
+func localTranscoord(q url.Values) ([]byte, bool) {
+	x, errX := strconv.ParseFloat(q.Get("x"), 64)
+	y, errY := strconv.ParseFloat(q.Get("y"), 64)
+	if errX != nil || errY != nil {
+		return nil, false
+	}
+	inputCoord, outputCoord := q.Get("input_coord"), q.Get("output_coord")
+	if inputCoord == "" {
+		inputCoord = "WGS84"
+	}
+	if outputCoord == "" {
+		outputCoord = "WGS84"
+	}
+	tx, ty, err := TransformCoord(x, y, inputCoord, outputCoord)
+	if err != nil {
+		return nil, false
+	}
+
+	var resp transcoordResponse
+	resp.Meta.TotalCount = 1
+	resp.Documents = []transcoordDocument{{X: tx, Y: ty}}
+	body, _ := json.Marshal(resp)
+	return body, true
 }
@@ -0,0 +1,248 @@
+package lib
+
+import (
+	"context"
+	"crypto/tls"
+	"encoding/json"
+	"net"
+	"net/http"
+	"net/http/httptrace"
+	"os"
+	"strconv"
+	"strings"
+	"sync/atomic"
+	"time"
+)
+
+// UpstreamConfig는 Kakao API로 나가는 연결 풀의 설정입니다.
+type UpstreamConfig struct {
+	// BaseURL은 Kakao API 주소입니다. 부하 테스트에서는 로컬 목 서버(cmd/mockkakao)를 가리킵니다.
+	BaseURL               string
+	MaxIdleConns          int
+	MaxIdleConnsPerHost   int
+	MaxConnsPerHost       int
+	IdleConnTimeout       time.Duration
+	DialTimeout           time.Duration
+	KeepAlive             time.Duration
+	TLSHandshakeTimeout   time.Duration
+	ResponseHeaderTimeout time.Duration
+	RequestTimeout        time.Duration
+	HTTP2                 bool
+	Gzip                  bool
+}
+
+// LoadUpstreamConfig는 환경 변수에서 업스트림 연결 설정을 읽습니다.
+//
+//	KAKAO_API_URL                      Kakao API 주소 (기본 https://dapi.kakao.com)
+//	UPSTREAM_MAX_IDLE_CONNS            전체 유휴 연결 최대 개수 (기본 256)
+//	UPSTREAM_MAX_IDLE_CONNS_PER_HOST   호스트별 유휴 연결 최대 개수 (기본 64)
+//	UPSTREAM_MAX_CONNS_PER_HOST        호스트별 최대 연결 개수, 0은 무제한 (기본 0)
+//	UPSTREAM_IDLE_CONN_TIMEOUT         유휴 연결 유지 시간 (기본 90s)
+//	UPSTREAM_DIAL_TIMEOUT              TCP 연결 타임아웃 (기본 3s)
+//	UPSTREAM_TLS_HANDSHAKE_TIMEOUT     TLS 핸드셰이크 타임아웃 (기본 3s)
+//	UPSTREAM_RESPONSE_HEADER_TIMEOUT   응답 헤더 대기 타임아웃 (기본 5s)
+//	UPSTREAM_REQUEST_TIMEOUT           요청 전체 타임아웃 (기본 10s)
+//	UPSTREAM_HTTP2                     HTTP/2 사용 여부 (기본 true)
+//	UPSTREAM_GZIP                      Kakao API에 gzip 응답 요청 (기본 true)
+func LoadUpstreamConfig() UpstreamConfig {
+	baseURL := os.Getenv("KAKAO_API_URL")
+	if baseURL == "" {
+		baseURL = defaultKakaoAPIURL
+	}
+	return UpstreamConfig{
+		BaseURL:               strings.TrimRight(baseURL, "/"),
+		MaxIdleConns:          envInt("UPSTREAM_MAX_IDLE_CONNS", 256),
+		MaxIdleConnsPerHost:   envInt("UPSTREAM_MAX_IDLE_CONNS_PER_HOST", 64),
+		MaxConnsPerHost:       envInt("UPSTREAM_MAX_CONNS_PER_HOST", 0),
+		IdleConnTimeout:       envDuration("UPSTREAM_IDLE_CONN_TIMEOUT", 90*time.Second),
+		DialTimeout:           envDuration("UPSTREAM_DIAL_TIMEOUT", 3*time.Second),
+		KeepAlive:             30 * time.Second,
+		TLSHandshakeTimeout:   envDuration("UPSTREAM_TLS_HANDSHAKE_TIMEOUT", 3*time.Second),
+		ResponseHeaderTimeout: envDuration("UPSTREAM_RESPONSE_HEADER_TIMEOUT", 5*time.Second),
+		RequestTimeout:        envDuration("UPSTREAM_REQUEST_TIMEOUT", 10*time.Second),
+		HTTP2:                 envBool("UPSTREAM_HTTP2", true),
+		Gzip:                  envBool("UPSTREAM_GZIP", true),
+	}
+}
+
+const defaultKakaoAPIURL = "https://dapi.kakao.com"
+
+// UpstreamStats는 업스트림 연결 풀의 현재 상태입니다.
+type UpstreamStats struct {
+	OpenConns   int64 `json:"open_conns"`
+	Dials       int64 `json:"dials"`
+	DialErrors  int64 `json:"dial_errors"`
+	ReusedConns int64 `json:"reused_conns"`
+	NewConns    int64 `json:"new_conns"`
+	IdleReused  int64 `json:"idle_reused"`
+	InFlight    int64 `json:"in_flight"`
+	Requests    int64 `json:"requests"`
+	Errors      int64 `json:"errors"`
+	// BytesWire는 업스트림에서 받은 (압축된) 본문 크기, BytesBody는 푼 뒤의 크기입니다.
+	BytesWire int64 `json:"bytes_wire"`
+	BytesBody int64 `json:"bytes_body"`
+}
+
+// Upstream은 프로세스 전체에서 공유하는 Kakao API 클라이언트입니다.
+// 하나의 Transport를 재사용하므로 DNS/TCP/TLS 비용은 연결이 새로 열릴 때만 발생합니다.
+type Upstream struct {
+	Client    *http.Client
+	Transport *http.Transport
+	BaseURL   string
+
+	gzip bool
+	// Metrics가 있으면 호출 단계별(DNS/연결/TLS/첫 바이트/본문) 지연 시간과 응답 상태를 기록합니다.
+	Metrics *Metrics
+
+	openConns   atomic.Int64
+	dials       atomic.Int64
+	dialErrors  atomic.Int64
+	reusedConns atomic.Int64
+	newConns    atomic.Int64
+	idleReused  atomic.Int64
+	inFlight    atomic.Int64
+	requests    atomic.Int64
+	errors      atomic.Int64
+	bytesWire   atomic.Int64
+	bytesBody   atomic.Int64
+}
+
+// NewUpstream은 설정에 맞춰 튜닝된 Transport와 Client를 생성합니다.
+func NewUpstream(cfg UpstreamConfig) *Upstream {
+	u := &Upstream{BaseURL: cfg.BaseURL, gzip: cfg.Gzip}
+	if u.BaseURL == "" {
+		u.BaseURL = defaultKakaoAPIURL
+	}
+	dialer := &net.Dialer{Timeout: cfg.DialTimeout, KeepAlive: cfg.KeepAlive}
+
+	transport := &http.Transport{
+		Proxy: http.ProxyFromEnvironment,
+		DialContext: func(ctx context.Context, network, addr string) (net.Conn, error) {
+			u.dials.Add(1)
+			conn, err := dialer.DialContext(ctx, network, addr)
+			if err != nil {
+				u.dialErrors.Add(1)
+				return nil, err
+			}
+			u.openConns.Add(1)
+			return &countedConn{Conn: conn, open: &u.openConns}, nil
+		},
+		ForceAttemptHTTP2:     cfg.HTTP2,
+		MaxIdleConns:          cfg.MaxIdleConns,
+		MaxIdleConnsPerHost:   cfg.MaxIdleConnsPerHost,
+		MaxConnsPerHost:       cfg.MaxConnsPerHost,
+		IdleConnTimeout:       cfg.IdleConnTimeout,
+		TLSHandshakeTimeout:   cfg.TLSHandshakeTimeout,
+		ResponseHeaderTimeout: cfg.ResponseHeaderTimeout,
+		ExpectContinueTimeout: time.Second,
+		// gzip 요청과 해제는 Do/readBody에서 직접 하므로 Transport의 자동 해제는 끕니다.
+		DisableCompression: true,
+	}
+	if !cfg.HTTP2 {
+		// 비어 있지 않은 TLSNextProto 맵은 HTTP/2 업그레이드를 비활성화합니다.
+		transport.TLSNextProto = map[string]func(string, *tls.Conn) http.RoundTripper{}
+	}
+
+	u.Transport = transport
+	u.Client = &http.Client{Transport: transport, Timeout: cfg.RequestTimeout}
+	return u
+}
+
+// Do는 공유 클라이언트로 요청을 보내고 연결 재사용 통계와 단계별 지연 시간을 기록합니다.
+// 재사용한 연결에서는 DNS/연결/TLS 단계가 없으므로 ttfb(요청 전송 완료 → 첫 응답 바이트)만 기록됩니다.
+func (u *Upstream) Do(req *http.Request) (*http.Response, error) {
+	path := req.URL.Path
+	// 병렬 다이얼(IPv4/IPv6)에서는 콜백이 여러 고루틴에서 불릴 수 있으므로 시각을 원자적으로 저장합니다.
+	var dnsStart, connectStart, tlsStart, wrote atomic.Int64
+	since := func(start *atomic.Int64) time.Duration { return time.Duration(time.Now().UnixNano() - start.Load()) }
+	trace := &httptrace.ClientTrace{
+		DNSStart: func(httptrace.DNSStartInfo) { dnsStart.Store(time.Now().UnixNano()) },
+		DNSDone: func(info httptrace.DNSDoneInfo) {
+			if info.Err == nil {
+				u.Metrics.observePhase(path, "dns", since(&dnsStart))
+			}
+		},
+		ConnectStart: func(string, string) { connectStart.Store(time.Now().UnixNano()) },
+		ConnectDone: func(_, _ string, err error) {
+			if err == nil {
+				u.Metrics.observePhase(path, "connect", since(&connectStart))
+			}
+		},
+		TLSHandshakeStart: func() { tlsStart.Store(time.Now().UnixNano()) },
+		TLSHandshakeDone: func(_ tls.ConnectionState, err error) {
+			if err == nil {
+				u.Metrics.observePhase(path, "tls", since(&tlsStart))
+			}
+		},
+		WroteRequest: func(httptrace.WroteRequestInfo) { wrote.Store(time.Now().UnixNano()) },
+		GotFirstResponseByte: func() {
+			if wrote.Load() != 0 {
+				u.Metrics.observePhase(path, "ttfb", since(&wrote))
+			}
+		},
+		GotConn: func(info httptrace.GotConnInfo) {
+			if info.Reused {
+				u.reusedConns.Add(1)
+			} else {
+				u.newConns.Add(1)
+			}
+			if info.WasIdle {
+				u.idleReused.Add(1)
+			}
+		},
+	}
+	req = req.WithContext(httptrace.WithClientTrace(req.Context(), trace))
+	if u.gzip {
+		req.Header.Set("Accept-Encoding", "gzip")
+	}
+
+	u.requests.Add(1)
+	u.inFlight.Add(1)
+	defer u.inFlight.Add(-1)
+
+	resp, err := u.Client.Do(req)
+	if err != nil {
+		u.errors.Add(1)
+		u.Metrics.countResponse(path, "error")
+	} else {
+		u.Metrics.countResponse(path, strconv.Itoa(resp.StatusCode))
+	}
+	return resp, err
+}
+
+// Stats는 현재 연결 풀 통계를 반환합니다.
+func (u *Upstream) Stats() UpstreamStats {
+	return UpstreamStats{
+		OpenConns:   u.openConns.Load(),
+		Dials:       u.dials.Load(),
+		DialErrors:  u.dialErrors.Load(),
+		ReusedConns: u.reusedConns.Load(),
+		NewConns:    u.newConns.Load(),
+		IdleReused:  u.idleReused.Load(),
+		InFlight:    u.inFlight.Load(),
+		Requests:    u.requests.Load(),
+		Errors:      u.errors.Load(),
+		BytesWire:   u.bytesWire.Load(),
+		BytesBody:   u.bytesBody.Load(),
+	}
+}
+
+// countedConn은 Close 시 열린 연결 수를 감소시키는 net.Conn 래퍼입니다.
+type countedConn struct {
+	net.Conn
+	open   *atomic.Int64
+	closed atomic.Bool
+}
+
+func (c *countedConn) Close() error {
+	if c.closed.CompareAndSwap(false, true) {
+		c.open.Add(-1)
+	}
+	return c.Conn.Close()
+}
+
+// UpstreamStatsHandler는 업스트림 연결 풀 통계를 JSON으로 반환합니다.
+func (h *ApiHandler) UpstreamStatsHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(h.Upstream.Stats())
+}
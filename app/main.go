@@ -1,10 +1,15 @@
 package main
 
 import (
+	"context"
+	"errors"
+	"flag"
 	"korean-map-mcp/lib"
 	"log/slog"
 	"net/http"
 	"os"
+	"os/signal"
+	"syscall"
 	"time"
 )
 
@@ -19,6 +24,13 @@ func (rw *responseWriter) WriteHeader(code int) {
 	rw.ResponseWriter.WriteHeader(code)
 }
 
+// Flush는 SSE 이벤트가 래핑된 ResponseWriter를 거쳐서도 즉시 전송되도록 합니다.
+func (rw *responseWriter) Flush() {
+	if flusher, ok := rw.ResponseWriter.(http.Flusher); ok {
+		flusher.Flush()
+	}
+}
+
 // loggingMiddleware는 들어오는 모든 HTTP 요청에 대한 정보를 로깅하는 미들웨어입니다.
 func loggingMiddleware(next http.HandlerFunc) http.HandlerFunc {
 	return func(w http.ResponseWriter, r *http.Request) {
@@ -29,37 +41,117 @@ func loggingMiddleware(next http.HandlerFunc) http.HandlerFunc {
 
 		next.ServeHTTP(rw, r)
 
-		slog.Info("Handled request",
-			"method", r.Method,
-			"path", r.URL.Path,
-			"status", rw.status,
-			"duration", time.Since(start),
+		// LogAttrs는 INFO가 꺼져 있으면 속성을 만들지 않고, 켜져 있어도 any 변환 없이 기록합니다.
+		slog.LogAttrs(r.Context(), slog.LevelInfo, "Handled request",
+			slog.String("method", r.Method),
+			slog.String("path", r.URL.Path),
+			slog.Int("status", rw.status),
+			slog.Duration("duration", time.Since(start)),
 		)
 	}
 }
 func main() {
-	logger := lib.NewLogger()
-	slog.SetDefault(logger)
+	stdio := flag.Bool("stdio", false, "serve MCP over stdin/stdout instead of HTTP")
+	flag.Parse()
 
-	if os.Getenv("KAKAO_API_KEY") == "" {
-		slog.Error("`KAKAO_API_KEY` 정의 되지 않았음.")
+	logCfg := lib.LoadLogConfig()
+	if *stdio {
+		logCfg.Output = os.Stderr
+	}
+	logs := lib.NewLogPipeline(logCfg)
+	slog.SetDefault(logs.Logger)
+	defer logs.Close()
+
+	slog.Info("Logging configured", "level", logCfg.Level, "debug_sample", logCfg.DebugSample)
+
+	apiHandler := lib.NewApiHandler(logs.Logger)
+	apiHandler.Logs = logs
+	if apiHandler.Keys.Len() == 0 {
+		slog.Error("`KAKAO_API_KEYS`, `KAKAO_API_KEYS_FILE`, `KAKAO_API_KEY` 중 하나는 정의해야 함.")
+		logs.Close()
 		os.Exit(1)
 	}
-	slog.Info("KAKAO_API_KEY", os.Getenv("KAKAO_API_KEY"))
-	slog.Info("LOG_LEVEL", os.Getenv("LOG_LEVEL"))
+	saveSnapshot := apiHandler.Cache.RunSnapshots(lib.LoadSnapshotConfig())
 
-	apiHandler := &lib.ApiHandler{Logger: logger}
+	// stdio 모드: MCP 클라이언트가 서버를 하위 프로세스로 띄우고 stdin/stdout으로 JSON-RPC를 주고받습니다.
+	// stdin이 닫히면 진행 중인 호출을 마치고 캐시 스냅샷을 저장한 뒤 종료합니다.
+	if *stdio {
+		ctx, stop := signal.NotifyContext(context.Background(), syscall.SIGINT, syscall.SIGTERM)
+		defer stop()
+		slog.Info("Serving MCP over stdio")
+		if err := apiHandler.ServeMCPStdio(ctx, os.Stdin, os.Stdout); err != nil {
+			slog.Error("MCP stdio stopped", "error", err)
+		}
+		saveSnapshot()
+		return
+	}
+	compress := lib.NewCompressor(lib.LoadCompressConfig())
 
-	http.HandleFunc("/search/address", loggingMiddleware(apiHandler.AddressHandler))
-	http.HandleFunc("/search/category", loggingMiddleware(apiHandler.CategoryHandler))
-	http.HandleFunc("/geo/coord2address", loggingMiddleware(apiHandler.Coord2AddressHandler))
-	http.HandleFunc("/geo/coord2regioncode", loggingMiddleware(apiHandler.Coord2RegionCodeHandler))
-	http.HandleFunc("/search/keyword", loggingMiddleware(apiHandler.KeywordHandler))
-	http.HandleFunc("/geo/transcoord", loggingMiddleware(apiHandler.TranscoordHandler))
+	// 서비스 포트는 전용 ServeMux를 씁니다. net/http/pprof와 expvar가 DefaultServeMux에 등록하는
+	// 핸들러가 서비스 포트로 노출되지 않게 합니다.
+	mux := http.NewServeMux()
+	route := func(pattern string, handler http.HandlerFunc) {
+		mux.HandleFunc(pattern, loggingMiddleware(apiHandler.Metrics.Instrument(pattern, compress.Wrap(handler))))
+	}
+	route("/search/address", apiHandler.AddressHandler)
+	route("/search/category", apiHandler.CategoryHandler)
+	route("/geo/coord2address", apiHandler.Coord2AddressHandler)
+	route("/geo/coord2regioncode", apiHandler.Coord2RegionCodeHandler)
+	route("/search/keyword", apiHandler.KeywordHandler)
+	route("/geo/transcoord", apiHandler.TranscoordHandler)
+	route("/search/sweep", apiHandler.SweepHandler)
+	route("/batch", apiHandler.BatchHandler)
+	route("/mcp", apiHandler.MCPHandler)
+
+	mux.HandleFunc("/metrics", apiHandler.MetricsHandler)
+	mux.HandleFunc("/debug/upstream", apiHandler.UpstreamStatsHandler)
+	mux.HandleFunc("/debug/cache", apiHandler.CacheStatsHandler)
+	mux.HandleFunc("/debug/cellcache", apiHandler.CellCacheStatsHandler)
+	mux.HandleFunc("/debug/poi", apiHandler.POIIndexStatsHandler)
+	mux.HandleFunc("/debug/scheduler", apiHandler.SchedulerStatsHandler)
+
+	// SIGHUP을 받으면 재시작 없이 키 목록을 다시 읽습니다.
+	go func() {
+		hup := make(chan os.Signal, 1)
+		signal.Notify(hup, syscall.SIGHUP)
+		for range hup {
+			if err := apiHandler.Keys.Reload(); err != nil {
+				slog.Error("Failed to reload Kakao API keys", "error", err)
+			}
+		}
+	}()
+
+	// 종료 신호를 받으면 진행 중인 요청을 마무리하고 캐시 스냅샷을 저장합니다.
+	// Shutdown을 부르면 ListenAndServe는 바로 반환하므로, 스냅샷은 Shutdown이 끝난(done이 닫힌) 뒤에 저장합니다.
+	server := &http.Server{Addr: ":8080", Handler: mux}
+	done := make(chan struct{})
+	go func() {
+		defer close(done)
+		stop := make(chan os.Signal, 1)
+		signal.Notify(stop, syscall.SIGINT, syscall.SIGTERM)
+		<-stop
+		ctx, cancel := context.WithTimeout(context.Background(), 10*time.Second)
+		defer cancel()
+		if err := server.Shutdown(ctx); err != nil {
+			slog.Error("Failed to finish in-flight requests", "error", err)
+		}
+	}()
+
+	if addr := lib.LoadAdminAddr(); addr != "" {
+		go func() {
+			slog.Info("Starting admin server", "addr", addr)
+			if err := http.ListenAndServe(addr, apiHandler.NewAdminMux()); err != nil {
+				slog.Error("Admin server stopped", "error", err)
+			}
+		}()
+	}
 
 	slog.Info("Starting MCP server on :8080")
-	if err := http.ListenAndServe(":8080", nil); err != nil {
+	if err := server.ListenAndServe(); err != nil && !errors.Is(err, http.ErrServerClosed) {
 		slog.Error("Failed to start server", "error", err)
+		logs.Close()
 		os.Exit(1)
 	}
+	<-done
+	saveSnapshot()
 }
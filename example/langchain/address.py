@@ -1,6 +1,4 @@
 import os
-import requests
-import json
 import logging as log
 from typing import Type, Optional
 from pydantic import Field
@@ -9,12 +7,18 @@ from pydantic import BaseModel, Field
 from langchain_openai import ChatOpenAI
 from langchain.agents import initialize_agent, AgentType
 
+from mcp_client import get_json, aget_json, TOOL_ERRORS, tool_error
+from address_index import default_index
+
 # --- Prerequisites ---
 # 1. Run the MCP server: `go run ./app` in the `app` directory.
-# 2. Install libraries: `pip install langchain langchain-openai requests`
+# 2. Install libraries: `pip install -r requirements.txt`
 # 3. Set OpenAI API Key: `export OPENAI_API_KEY="your_openai_api_key"`
 # ---------------------
 
+# 서버가 응답에서 남길 필드. 나머지는 서버에서 잘라내므로 전송량과 에이전트 컨텍스트가 줄어듭니다.
+FIELDS = "address_name,x,y"
+
 
 class AddressSearchToolInput(BaseModel):
     """Input for the address search tool."""
@@ -29,29 +33,57 @@ class AddressSearchTool(BaseTool):
 
     def _run(self, query: str) -> str:
         """Use the tool."""
-        mcp_server_url = "http://localhost:8080/search/address"
-        params = {"query": query}
+        local = self._local(query)
+        if local:
+            return local
+        try:
+            return self._format(self._remember(query, get_json("/search/address", self._params(query))))
+        except TOOL_ERRORS as e:
+            return tool_error(e)
 
+    async def _arun(self, query: str) -> str:
+        """Use the tool asynchronously."""
+        local = self._local(query)
+        if local:
+            return local
         try:
-            response = requests.get(mcp_server_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            # 결과에서 필요한 정보만 추출하여 반환
-            if data and data.get("documents"):
-                # 첫 번째 결과만 사용
-                first_doc = data["documents"][0]
-                address_name = first_doc.get('address_name', 'N/A')
-                x = first_doc.get('x', 'N/A') # 경도(longitude)
-                y = first_doc.get('y', 'N/A') # 위도(latitude)
-                return f"Address: {address_name}, Latitude: {y}, Longitude: {x}"
-            else:
-                return "No results found for the given address."
-
-        except requests.exceptions.RequestException as e:
-            return f"Error calling the API: {e}"
-        except (KeyError, IndexError):
-            return "Could not parse the API response."
+            return self._format(self._remember(query, await aget_json("/search/address", self._params(query))))
+        except TOOL_ERRORS as e:
+            return tool_error(e)
+
+    @classmethod
+    def _local(cls, query: str) -> Optional[str]:
+        # 이미 찾아 둔 주소와 같거나 충분히 비슷하면(ADDRESS_MATCH_THRESHOLD) 서버를 부르지 않습니다.
+        # 색인은 normalize_address로 정규화한 키를 쓰고, 서버에는 사용자가 입력한 주소를 그대로 보냅니다.
+        match = default_index().lookup(query)
+        if match is None:
+            return None
+        log.info(f"Answered {query!r} from the local address index ({match.key!r}, score {match.score})")
+        return cls._format({"documents": [match.document]})
+
+    @staticmethod
+    def _remember(query: str, data: dict) -> dict:
+        if data and data.get("documents"):
+            default_index().add(query, data["documents"][0])
+        return data
+
+    @staticmethod
+    def _params(query: str) -> dict:
+        # 첫 번째 결과만 쓰므로 한 건만 받습니다.
+        return {"query": query, "fields": FIELDS, "limit": 1}
+
+    @staticmethod
+    def _format(data: dict) -> str:
+        # 결과에서 필요한 정보만 추출하여 반환
+        if data and data.get("documents"):
+            # 첫 번째 결과만 사용
+            first_doc = data["documents"][0]
+            address_name = first_doc.get('address_name', 'N/A')
+            x = first_doc.get('x', 'N/A') # 경도(longitude)
+            y = first_doc.get('y', 'N/A') # 위도(latitude)
+            return f"Address: {address_name}, Latitude: {y}, Longitude: {x}"
+        else:
+            return "No results found for the given address."
 
 
 def main():
@@ -0,0 +1,288 @@
+"""Hangul-aware address normalization and a local fuzzy index of resolved addresses.
+
+Most address traffic repeats a bounded set of places with small spelling
+differences (전북/전라북도/전북특별자치도, 삼성동100/삼성동 100, 100번지).
+`normalize_address` folds those variants into one canonical string, and
+`AddressIndex` remembers the documents we have already resolved so that
+exact and near-exact queries are answered without calling the server::
+
+    from address_index import AddressIndex, normalize_address
+    index = AddressIndex()
+    index.add("전라북도 익산시 삼성동 100번지", {"address_name": "전북 익산시 삼성동 100", "x": "...", "y": "..."})
+    index.lookup("전북 익산시 삼성동100")       # Match(document, score=1.0, key=...)
+    index.lookup("익산시 삼성동 100")           # 시도 생략: Match with score < 1.0, or None below the threshold
+    index.lookup("전북 익산시 삼승동 100")      # None: a different 동 is a different place
+
+Near-exact matching uses an inverted index of jamo trigrams: every indexed
+string is decomposed into 초성/중성/종성 and candidates are scored with the
+Dice coefficient of their gram sets. Because most of an address is the
+shared 시도/시군구 prefix, a high score alone does not mean the same place
+(판교로/판교역로, 교동리/요장리, 일산동구/일산서구), so a candidate is only
+considered when its numbers (lot/building numbers), its 시군구 token and its
+road/동/리 token are identical to the query's; the score then measures the
+remaining differences (omitted or differently spelled 시도/시, 읍면, spacing).
+
+The index can be warm-started from a server cache snapshot or a GeoStore
+export (`load_snapshot`).
+"""
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+from urllib.parse import parse_qs, urlsplit
+
+# --- Configuration ---
+# ADDRESS_MATCH_THRESHOLD : 이 점수(0~1) 이상인 근사 일치만 로컬에서 응답 (기본값: 0.85)
+# ADDRESS_INDEX_SIZE      : 색인에 담을 최대 주소 수 (기본값: 100000)
+# ADDRESS_INDEX_SNAPSHOT  : 설정하면 default_index()가 이 캐시 스냅샷(JSONL)으로 색인을 미리 채움
+# ---------------------
+
+MATCH_THRESHOLD = float(os.getenv("ADDRESS_MATCH_THRESHOLD", "0.85"))
+INDEX_SIZE = int(os.getenv("ADDRESS_INDEX_SIZE", "100000"))
+
+NGRAM = 3
+ADDRESS_PATH = "/v2/local/search/address.json"
+
+# 시도 이름의 변형 -> 짧은 표기. Kakao 주소 검색은 짧은 표기를 그대로 받고 응답의 address_name도
+# 짧은 표기를 씁니다. "광주시"는 경기 광주시와 겹치므로 넣지 않습니다.
+_SIDO_ALIASES = {
+    "서울": ("서울특별시", "서울시"),
+    "부산": ("부산광역시", "부산시"),
+    "대구": ("대구광역시", "대구시"),
+    "인천": ("인천광역시", "인천시"),
+    "광주": ("광주광역시",),
+    "대전": ("대전광역시", "대전시"),
+    "울산": ("울산광역시", "울산시"),
+    "세종": ("세종특별자치시", "세종시"),
+    "경기": ("경기도",),
+    "강원": ("강원도", "강원특별자치도"),
+    "충북": ("충청북도",),
+    "충남": ("충청남도",),
+    "전북": ("전라북도", "전북특별자치도", "전북도"),
+    "전남": ("전라남도",),
+    "경북": ("경상북도",),
+    "경남": ("경상남도",),
+    "제주": ("제주특별자치도", "제주도"),
+}
+SIDO = {alias: short for short, aliases in _SIDO_ALIASES.items() for alias in aliases}
+
+_SPACES = re.compile(r"\s+")
+_PARENS = re.compile(r"\([^)]*\)")
+_DASHES = re.compile(r"\s*[‐‑‒–—―−-]\s*")
+_BEONJI = re.compile(r"(\d+(?:-\d+)?)\s*번지")
+# "삼성동100", "테헤란로152"처럼 붙여 쓴 번지/건물번호를 띄웁니다. "강남대로94길", "을지로3가"처럼
+# 숫자가 도로명/동 이름의 일부인 경우는 숫자 뒤에 공백이나 끝이 오지 않으므로 그대로 둡니다.
+_GLUED_NUMBER = re.compile(r"(?<=[동리가로길])(?=(?:산\s*)?\d+(?:-\d+)?(?:\s|,|$))")
+_NUMBERS = re.compile(r"\d+(?:-\d+)?")
+_NUMBER_TOKEN = re.compile(r"^(?:산)?\d+(?:-\d+)?$|^산$")
+
+
+def normalize_address(text: str) -> str:
+    """Canonical form used for deduplication, index keys and as the upstream query."""
+    text = unicodedata.normalize("NFKC", text or "")
+    text = _PARENS.sub(" ", text)
+    text = _DASHES.sub("-", text)
+    text = _BEONJI.sub(r"\1", text)
+    text = _GLUED_NUMBER.sub(" ", text)
+    tokens = text.replace(",", " ").split()
+    if tokens and tokens[0] == "대한민국":
+        tokens = tokens[1:]
+    if tokens:
+        tokens[0] = SIDO.get(tokens[0], tokens[0])
+    return _SPACES.sub(" ", " ".join(tokens)).strip(" ,.")
+
+
+# --- Jamo -------------------------------------------------------------------
+
+_CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONG = ("", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+         "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+
+
+def decompose(text: str) -> str:
+    """Split precomposed Hangul syllables into compatibility jamo; other characters pass through."""
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_CHO[code // 588])
+            out.append(_JUNG[code % 588 // 28])
+            out.append(_JONG[code % 28])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def jamo_ngrams(normalized: str, n: int = NGRAM) -> frozenset:
+    """Set of jamo n-grams of a normalized address; spacing is ignored."""
+    jamo = decompose(normalized.replace(" ", ""))
+    if len(jamo) <= n:
+        return frozenset((jamo,)) if jamo else frozenset()
+    return frozenset(jamo[i:i + n] for i in range(len(jamo) - n + 1))
+
+
+def address_anchor(normalized: str) -> tuple:
+    """Parts of a normalized address that must match exactly for a fuzzy match.
+
+    Returns `(numbers, sigungu, name)`: the lot/building numbers, the
+    innermost 시/군/구 token (without a trailing 시/군, so 익산 and 익산시 agree)
+    and the road/동/리 token, the last non-numeric token before the first number.
+    """
+    tokens = normalized.split()
+    first_number = next((i for i, t in enumerate(tokens) if _NUMBER_TOKEN.match(t)), len(tokens))
+    names = tokens[:first_number]
+    name = names[-1] if names else ""
+    parts = names[:-1]
+    if parts and parts[0] in _SIDO_ALIASES:
+        parts = parts[1:]
+    parts = [t for t in parts if t[-1] not in "읍면"]
+    sigungu = parts[-1] if parts else ""
+    if len(sigungu) > 2 and sigungu[-1] in "시군":
+        sigungu = sigungu[:-1]
+    return tuple(_NUMBERS.findall(normalized)), sigungu, name
+
+
+# --- Index ------------------------------------------------------------------
+
+class Match(NamedTuple):
+    """A local answer: the stored document, its confidence (1.0 = same normalized address) and the key it matched."""
+    document: Dict[str, Any]
+    score: float
+    key: str
+
+
+class AddressIndex:
+    """In-memory index of resolved addresses with exact and jamo-trigram fuzzy lookup.
+
+    Every document is indexed under the normalized query that resolved it and
+    under its own `address_name`/`road_address_name`, so both the caller's
+    spelling and Kakao's canonical spelling hit. Once `max_entries` documents
+    are stored, new ones are no longer added.
+    """
+
+    def __init__(self, threshold: float = MATCH_THRESHOLD, max_entries: int = INDEX_SIZE):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._documents: List[Dict[str, Any]] = []
+        self._exact: Dict[str, int] = {}
+        # 키 id -> (정규화 키, 문서 번호, n-gram 수)
+        self._keys: List[tuple] = []
+        # address_anchor(번지/건물번호, 시군구, 도로/동/리) -> n-gram -> 키 id 목록. 이 셋이 같은 키끼리만
+        # 비교하므로 역색인을 나눠 두면 "서울", "동" 같은 흔한 n-gram의 긴 목록을 훑지 않아도 됩니다.
+        self._postings: Dict[tuple, Dict[str, List[int]]] = {}
+        self._lock = threading.Lock()
+        self.hits = {"exact": 0, "fuzzy": 0, "miss": 0}
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, query: str, document: Dict[str, Any]) -> bool:
+        """Index `document` under `query` and its own address names; False when the index is full."""
+        keys = [normalize_address(query)]
+        for field in ("address_name", "road_address_name"):
+            if document.get(field):
+                keys.append(normalize_address(document[field]))
+        for nested in ("address", "road_address"):
+            if isinstance(document.get(nested), dict) and document[nested].get("address_name"):
+                keys.append(normalize_address(document[nested]["address_name"]))
+        keys = [k for k in dict.fromkeys(keys) if k]
+        with self._lock:
+            if all(k in self._exact for k in keys):
+                return True
+            if len(self._documents) >= self.max_entries:
+                return False
+            doc_id = len(self._documents)
+            self._documents.append(document)
+            for key in keys:
+                if key in self._exact:
+                    continue
+                self._exact[key] = doc_id
+                grams = jamo_ngrams(key)
+                key_id = len(self._keys)
+                self._keys.append((key, doc_id, len(grams)))
+                postings = self._postings.setdefault(address_anchor(key), {})
+                for gram in grams:
+                    postings.setdefault(gram, []).append(key_id)
+        return True
+
+    def lookup(self, query: str, threshold: Optional[float] = None) -> Optional[Match]:
+        """Best local match for `query` at or above `threshold` (default: the index threshold), else None."""
+        match = self.best(query)
+        if match is not None and match.score >= (self.threshold if threshold is None else threshold):
+            self.hits["exact" if match.score == 1.0 else "fuzzy"] += 1
+            return match
+        self.hits["miss"] += 1
+        return None
+
+    def best(self, query: str) -> Optional[Match]:
+        """Highest-scoring candidate regardless of the threshold."""
+        key = normalize_address(query)
+        if not key:
+            return None
+        doc_id = self._exact.get(key)
+        if doc_id is not None:
+            return Match(self._documents[doc_id], 1.0, key)
+
+        # 번지/건물번호, 시군구, 도로/동/리 중 하나라도 다르면 다른 장소이므로 글자가 아무리 비슷해도
+        # 후보가 되지 않습니다.
+        postings = self._postings.get(address_anchor(key))
+        if not postings:
+            return None
+        grams = jamo_ngrams(key)
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(postings.get(gram, ()))
+        best = None
+        for key_id, count in shared.most_common():
+            # most_common 순서라 공유 n-gram 수는 줄어들기만 합니다. 남은 후보가 낼 수 있는 최대 점수
+            # (모든 n-gram이 겹치는 짧은 후보)가 지금 최고 점수 이하이면 멈춥니다.
+            if best is not None and 2.0 * count / (len(grams) + count) <= best.score:
+                break
+            cand_key, cand_doc, cand_grams = self._keys[key_id]
+            score = 2.0 * count / (len(grams) + cand_grams)
+            if best is None or score > best.score:
+                best = Match(self._documents[cand_doc], round(score, 4), cand_key)
+        return best
+
+    def load_snapshot(self, src: Iterable[str]) -> int:
+        """Index `/search/address` entries of a cache snapshot (server or GeoStore JSONL export)."""
+        n = 0
+        for line in src:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            parts = urlsplit(item.get("key", ""))
+            if parts.path != ADDRESS_PATH:
+                continue
+            query = (parse_qs(parts.query).get("query") or [""])[0]
+            docs = (item.get("body") or {}).get("documents") or []
+            if query and docs and self.add(query, docs[0]):
+                n += 1
+        return n
+
+    def stats(self) -> Dict[str, int]:
+        return {"documents": len(self._documents), "keys": len(self._keys), "grams": sum(len(p) for p in self._postings.values()), **self.hits}
+
+
+_default_index: Optional[AddressIndex] = None
+_default_lock = threading.Lock()
+
+
+def default_index() -> AddressIndex:
+    """Process-wide index shared by the address tools, warm-started from `ADDRESS_INDEX_SNAPSHOT` when set."""
+    global _default_index
+    if _default_index is None:
+        with _default_lock:
+            if _default_index is None:
+                index = AddressIndex()
+                path = os.getenv("ADDRESS_INDEX_SNAPSHOT")
+                if path:
+                    with open(path, encoding="utf-8") as f:
+                        index.load_snapshot(f)
+                _default_index = index
+    return _default_index
+
@@ -0,0 +1,331 @@
+"""Streaming bulk geocoder for CSV/Parquet files.
+
+Reads the input in chunks, normalizes and deduplicates the address column,
+resolves each distinct address through the MCP server (`/search/address`,
+falling back to `/search/keyword`) with bounded concurrency and a request
+rate cap, and appends the results to the output chunk by chunk::
+
+    python bulk_geocode.py addresses.csv geocoded.csv --column 주소 --rate 50
+    python bulk_geocode.py addresses.parquet geocoded.parquet --column addr
+
+Progress is checkpointed to `<output>.checkpoint.json` after every chunk, so
+re-running the same command after an interruption resumes from the last
+finished chunk. Parquet input/output needs `pyarrow`; Parquet output is
+written as a directory of `part-NNNNN.parquet` files, one per chunk.
+
+Output rows keep every input column and add `geo_x`, `geo_y`,
+`geo_address`, `geo_source` (`address`/`keyword`, or `index` when a spelling
+variant of an address resolved earlier in the run was answered from the local
+fuzzy index, see `address_index.py`) and `geo_status` (`ok`/`not_found`/`error`).
+Pass `--index-snapshot` with a server or GeoStore cache snapshot to start the
+index warm.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from mcp_client import BULK_HEADERS, aget_json
+from address_index import MATCH_THRESHOLD, AddressIndex, normalize_address
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# 입력 열 뒤에 이 순서로 붙는 결과 열
+GEO_COLUMNS = ["geo_x", "geo_y", "geo_address", "geo_source", "geo_status"]
+# 청크 간에 재사용할 정규화 주소 -> 결과 메모의 최대 크기
+MEMO_SIZE = 200_000
+
+# --- Input / output ---------------------------------------------------------
+
+def _is_parquet(path: str) -> bool:
+    return path.lower().endswith((".parquet", ".pq"))
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Parquet input/output requires `pip install pyarrow`") from e
+    return pyarrow
+
+
+def read_chunks(path: str, chunk_size: int, skip_rows: int = 0) -> Iterator[List[dict]]:
+    """Yield the input as lists of row dicts, skipping the first `skip_rows` rows."""
+    if _is_parquet(path):
+        pa = _require_pyarrow()
+        reader = pa.parquet.ParquetFile(path)
+        for batch in reader.iter_batches(batch_size=chunk_size):
+            if skip_rows >= batch.num_rows:
+                skip_rows -= batch.num_rows
+                continue
+            rows = batch.to_pylist()[skip_rows:]
+            skip_rows = 0
+            yield rows
+        return
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        chunk = []
+        for i, row in enumerate(csv.DictReader(f)):
+            if i < skip_rows:
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class CSVSink:
+    """Appends rows to one CSV file; `offset` is the byte size after the last flush."""
+
+    def __init__(self, path: str, offset: int):
+        self.path = path
+        # 마지막 체크포인트 이후에 쓰인 부분은 잘라내고 그 지점부터 이어 씁니다. 파일이 없거나
+        # offset보다 짧으면 run()이 체크포인트를 먼저 되돌리므로 여기서는 빈 공간을 채우지 않습니다.
+        self.file = open(path, "r+" if offset else "w", newline="", encoding="utf-8")
+        self.file.seek(offset)
+        self.file.truncate()
+        self.writer = None
+        self.header_written = offset > 0
+
+    def write(self, index: int, rows: List[dict]) -> int:
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.file, fieldnames=list(rows[0].keys()))
+            if not self.header_written:
+                self.writer.writeheader()
+        self.writer.writerows(rows)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """Writes each chunk to `<dir>/part-NNNNN.parquet`; rewriting a chunk replaces its part."""
+
+    def __init__(self, path: str, offset: int):
+        self.pa = _require_pyarrow()
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def part(path: str, index: int) -> str:
+        return os.path.join(path, f"part-{index:05d}.parquet")
+
+    def write(self, index: int, rows: List[dict]) -> int:
+        part = self.part(self.path, index)
+        self.pa.parquet.write_table(self.pa.Table.from_pylist(rows), part + ".tmp")
+        os.replace(part + ".tmp", part)
+        return 0
+
+    def close(self):
+        pass
+
+
+# --- Checkpoint -------------------------------------------------------------
+
+def new_checkpoint(input_path: str) -> dict:
+    return {"input": os.path.abspath(input_path), "chunks": 0, "rows": 0, "offset": 0, "calls": 0, "elapsed": 0.0}
+
+
+def load_checkpoint(path: str, input_path: str) -> dict:
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("input") == os.path.abspath(input_path):
+            return state
+        logging.warning(f"Checkpoint {path} belongs to another input, starting over")
+    return new_checkpoint(input_path)
+
+
+def output_matches(path: str, state: dict) -> bool:
+    """Whether the output still holds everything the checkpoint says was written."""
+    if not state["chunks"]:
+        return True
+    if _is_parquet(path):
+        return all(os.path.exists(ParquetSink.part(path, i)) for i in range(state["chunks"]))
+    return os.path.exists(path) and os.path.getsize(path) >= state["offset"]
+
+
+def save_checkpoint(path: str, state: dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# --- Geocoding --------------------------------------------------------------
+
+class RateLimiter:
+    """Spaces request starts at least `1/rate` seconds apart (no limit when rate <= 0)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class Geocoder:
+    def __init__(self, concurrency: int, rate: float, keyword_fallback: bool = True, index: Optional[AddressIndex] = None):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.limiter = RateLimiter(rate)
+        self.keyword_fallback = keyword_fallback
+        self.memo: "OrderedDict[str, dict]" = OrderedDict()
+        # memo는 정규화한 주소가 같아야 맞고, index는 오타/축약이 조금 다른 주소까지 맞춥니다.
+        self.index = index if index is not None else AddressIndex()
+        self.calls = 0
+
+    async def _call(self, path: str, query: str) -> List[dict]:
+        async with self.semaphore:
+            await self.limiter.wait()
+            self.calls += 1
+            data = await aget_json(path, {"query": query, "fields": "x,y,address_name", "limit": 1}, headers=BULK_HEADERS)
+        return data.get("documents") or []
+
+    async def resolve(self, address: str) -> dict:
+        """Geocode one normalized address; `geo_status` is `error` only for transport/parse failures."""
+        if address in self.memo:
+            self.memo.move_to_end(address)
+            return self.memo[address]
+        result = dict.fromkeys(GEO_COLUMNS, None)
+        result["geo_status"] = "not_found"
+        match = self.index.lookup(address) if address else None
+        if match is not None:
+            result.update(
+                geo_x=float(match.document["x"]),
+                geo_y=float(match.document["y"]),
+                geo_address=match.document.get("address_name"),
+                geo_source="index",
+                geo_status="ok",
+            )
+        elif address:
+            try:
+                for source, path in (("address", "/search/address"), ("keyword", "/search/keyword")):
+                    if source == "keyword" and not self.keyword_fallback:
+                        break
+                    docs = await self._call(path, address)
+                    if docs:
+                        doc = docs[0]
+                        result.update(
+                            geo_x=float(doc["x"]),
+                            geo_y=float(doc["y"]),
+                            geo_address=doc.get("address_name"),
+                            geo_source=source,
+                            geo_status="ok",
+                        )
+                        if source == "address":
+                            self.index.add(address, doc)
+                        break
+            except (httpx.HTTPError, json.JSONDecodeError, KeyError, ValueError) as e:
+                logging.warning(f"Failed to geocode {address!r}: {e}")
+                result["geo_status"] = "error"
+                return result
+        self.memo[address] = result
+        if len(self.memo) > MEMO_SIZE:
+            self.memo.popitem(last=False)
+        return result
+
+    async def geocode_chunk(self, rows: List[dict], column: str) -> Tuple[List[dict], int]:
+        """Return the rows with geo columns added and the number of distinct addresses."""
+        keys = [normalize_address(str(row.get(column) or "")) for row in rows]
+        unique = list(dict.fromkeys(keys))
+        results = dict(zip(unique, await asyncio.gather(*(self.resolve(k) for k in unique))))
+        # 결과 열은 입력에 같은 이름의 열이 있어도 항상 입력 열 뒤에 GEO_COLUMNS 순서로 둡니다.
+        out = []
+        for row, k in zip(rows, keys):
+            row = {c: v for c, v in row.items() if c not in GEO_COLUMNS}
+            row.update((c, results[k][c]) for c in GEO_COLUMNS)
+            out.append(row)
+        return out, len(unique)
+
+
+async def run(args) -> dict:
+    checkpoint_path = args.checkpoint or args.output + ".checkpoint.json"
+    state = load_checkpoint(checkpoint_path, args.input)
+    if not output_matches(args.output, state):
+        logging.warning(f"{args.output} is missing or shorter than checkpoint {checkpoint_path} says, starting over")
+        state = new_checkpoint(args.input)
+    if state["rows"]:
+        logging.info(f"Resuming after {state['rows']} rows ({state['chunks']} chunks)")
+
+    sink = (ParquetSink if _is_parquet(args.output) else CSVSink)(args.output, state["offset"])
+    index = AddressIndex(threshold=args.match_threshold)
+    if args.index_snapshot:
+        with open(args.index_snapshot, encoding="utf-8") as f:
+            logging.info(f"Loaded {index.load_snapshot(f)} addresses into the local index")
+    geocoder = Geocoder(args.concurrency, args.rate, keyword_fallback=not args.no_keyword, index=index)
+    geocoder.calls = state["calls"]
+    started, base_elapsed, base_rows = time.monotonic(), state["elapsed"], state["rows"]
+    try:
+        for rows in read_chunks(args.input, args.chunk_size, state["rows"]):
+            out, distinct = await geocoder.geocode_chunk(rows, args.column)
+            state["offset"] = sink.write(state["chunks"], out)
+            state["chunks"] += 1
+            state["rows"] += len(rows)
+            state["calls"] = geocoder.calls
+            state["elapsed"] = base_elapsed + time.monotonic() - started
+            save_checkpoint(checkpoint_path, state)
+
+            run_seconds = time.monotonic() - started
+            logging.info(
+                f"chunk {state['chunks']}: {state['rows']} rows, "
+                f"{(state['rows'] - base_rows) / max(run_seconds, 1e-9):.1f} rows/s, "
+                f"{state['calls'] / max(state['rows'], 1):.3f} calls/row, "
+                f"{distinct}/{len(rows)} distinct in chunk, "
+                f"{geocoder.index.hits['fuzzy']} fuzzy index hits"
+            )
+    finally:
+        sink.close()
+    return state
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, float]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV or Parquet file to geocode")
+    parser.add_argument("output", help="CSV file or Parquet directory to write")
+    parser.add_argument("--column", default="address", help="column holding the address (default: address)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per chunk/checkpoint (default: 5000)")
+    parser.add_argument("--concurrency", type=int, default=16, help="in-flight requests (default: 16)")
+    parser.add_argument("--rate", type=float, default=50, help="max requests per second, 0 = unlimited (default: 50)")
+    parser.add_argument("--no-keyword", action="store_true", help="do not fall back to keyword search")
+    parser.add_argument("--match-threshold", type=float, default=MATCH_THRESHOLD,
+                        help=f"min score (0-1) to answer a spelling variant from the local index, >1 disables (default: {MATCH_THRESHOLD})")
+    parser.add_argument("--index-snapshot", help="cache snapshot (JSONL) to warm the local address index from")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.checkpoint.json)")
+    args = parser.parse_args(argv)
+
+    state = asyncio.run(run(args))
+    report = {
+        "rows": state["rows"],
+        "calls": state["calls"],
+        "calls_per_row": state["calls"] / max(state["rows"], 1),
+        "rows_per_second": state["rows"] / max(state["elapsed"], 1e-9),
+    }
+    print(json.dumps(report))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# tests/에서 이 디렉토리의 모듈(kakao_proj 등)을 import할 수 있도록 rootdir에 conftest를 둡니다.
@@ -1,6 +1,4 @@
 import os
-import requests
-import json
 from typing import Type, Optional
 import logging
 
@@ -9,12 +7,17 @@ from pydantic.v1 import BaseModel, Field
 from langchain_openai import ChatOpenAI
 from langchain.agents import initialize_agent, AgentType
 
+from mcp_client import get_json, aget_json, TOOL_ERRORS, tool_error
+
 # --- Prerequisites ---
 # 1. Run the MCP server: `go run ./app` in the `app` directory.
-# 2. Install libraries: `pip install langchain langchain-openai requests`
+# 2. Install libraries: `pip install -r requirements.txt`
 # 3. Set OpenAI API Key: `export OPENAI_API_KEY="your_openai_api_key"`
 # ---------------------
 
+# 서버가 응답에서 남길 필드. 나머지는 서버에서 잘라내므로 전송량과 에이전트 컨텍스트가 줄어듭니다.
+FIELDS = "road_address,address"
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -32,52 +35,44 @@ class CoordToAddressTool(BaseTool):
 
     def _run(self, latitude: float, longitude: float) -> str:
         """Use the tool."""
-        mcp_server_url = "http://localhost:8080/geo/coord2address"
-        params = {"y": latitude, "x": longitude}
-        logging.info(f"Requesting {mcp_server_url} with params: {params}")
+        params = self._params(latitude, longitude)
+        logging.info(f"Requesting /geo/coord2address with params: {params}")
+
+        try:
+            return self._format(get_json("/geo/coord2address", params))
+        except TOOL_ERRORS as e:
+            return tool_error(e)
+
+    async def _arun(self, latitude: float, longitude: float) -> str:
+        """Use the tool asynchronously."""
+        params = self._params(latitude, longitude)
+        logging.info(f"Requesting /geo/coord2address with params: {params}")
 
         try:
-            response = requests.get(mcp_server_url, params=params)
-            logging.info(f"Response Status Code: {response.status_code}")
-            response.raise_for_status()
-
-            raw_response_text = response.text
-            logging.info(f"Raw Response Text: {raw_response_text}")
-
-            # 서버가 SSE 형식("data: ...")으로 응답하는 경우를 처리합니다.
-            if raw_response_text.strip().startswith('data:'):
-                # "data: " 접두사를 제거하고 JSON으로 파싱합니다.
-                json_data = raw_response_text.strip()[len('data:'):].strip()
-                data = json.loads(json_data)
-            else:
-                # 일반 JSON 형식으로 파싱합니다.
-                data = response.json()
-
-            logging.info(f"Parsed JSON data: {data}")
-
-            if data and data.get("documents"):
-                first_doc = data["documents"][0]
-                # road_address 또는 address가 None일 수 있는 경우를 안전하게 처리
-                road_address_obj = first_doc.get('road_address')
-                road_address = road_address_obj.get('address_name', 'N/A') if road_address_obj else 'N/A'
-                
-                address_obj = first_doc.get('address')
-                lot_address = address_obj.get('address_name', 'N/A') if address_obj else 'N/A'
-
-                return f"Road Address: {road_address}, Lot Address: {lot_address}"
-            else:
-                logging.warning("No documents found in the response.")
-                return "Could not find an address for the given coordinates."
-
-        except requests.exceptions.RequestException as e:
-            logging.error(f"HTTP Request failed: {e}")
-            return f"Error calling the API: {e}"
-        except json.JSONDecodeError as e:
-            logging.error(f"Failed to decode JSON from response: {e}. Response text: '{response.text}'")
-            return f"Error parsing server response. The response was not valid JSON: {response.text}"
-        except (KeyError, IndexError, AttributeError) as e:
-            logging.error(f"Error parsing response structure: {e}")
-            return "Could not parse the API response."
+            return self._format(await aget_json("/geo/coord2address", params))
+        except TOOL_ERRORS as e:
+            return tool_error(e)
+
+    @staticmethod
+    def _params(latitude: float, longitude: float) -> dict:
+        params = {"y": latitude, "x": longitude, "fields": FIELDS, "limit": 1}
+        return params
+
+    @staticmethod
+    def _format(data: dict) -> str:
+        if data and data.get("documents"):
+            first_doc = data["documents"][0]
+            # road_address 또는 address가 None일 수 있는 경우를 안전하게 처리
+            road_address_obj = first_doc.get('road_address')
+            road_address = road_address_obj.get('address_name', 'N/A') if road_address_obj else 'N/A'
+            
+            address_obj = first_doc.get('address')
+            lot_address = address_obj.get('address_name', 'N/A') if address_obj else 'N/A'
+
+            return f"Road Address: {road_address}, Lot Address: {lot_address}"
+        else:
+            logging.warning("No documents found in the response.")
+            return "Could not find an address for the given coordinates."
 
 
 def main():
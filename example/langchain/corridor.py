@@ -0,0 +1,263 @@
+"""Place search along a route: every place within `buffer_m` of a polyline.
+
+The route (WGS84 or any coordinate system `kakao_proj` supports) is projected
+to WTM meters, simplified, and covered with a chain of `radius` queries whose
+circles overlap enough to contain the whole buffer corridor. Straight
+stretches get few, large circles and bends get more, so a 30 km drive costs
+a handful of calls instead of one tool call per neighbourhood. The queries
+run concurrently through the MCP server; places are deduplicated by `id`,
+dropped when they fall outside the corridor, and annotated with their
+distance along the route (`route_offset_m`) and from it
+(`route_distance_m`) using vectorized point-to-segment projection::
+
+    from corridor import search_corridor
+    route = [(126.9780, 37.5665), (127.0276, 37.4979), (127.1086, 37.4012)]
+    places, report = search_corridor(route, 300, category_group_code="OL7")  # 주유소
+
+`astream_corridor` yields the same places as soon as each query returns,
+which lets an agent answer with the first hits before the whole route is
+covered; `search_corridor` collects them and sorts by `route_offset_m`.
+The number of upstream calls (pages) is capped by `max_calls`: the circles
+grow up to Kakao's 20 km radius limit to fit the cap, and if the route is
+still too long the report says `truncated`. A circle whose last fetched page
+still is not Kakao's last page counts as `saturated`: the farther matches in
+it were not returned, so raise `pages` or narrow the query.
+"""
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+import numpy as np
+
+from kakao_proj import transform
+from mcp_client import BULK_HEADERS, aget_json
+
+# --- Configuration ---
+# CORRIDOR_MAX_CALLS   : 경로 하나에 쓸 최대 업스트림 호출(페이지) 수 (기본값: 40)
+# CORRIDOR_CONCURRENCY : 동시에 보낼 검색 수 (기본값: 8)
+# ---------------------
+
+MAX_CALLS = int(os.getenv("CORRIDOR_MAX_CALLS", "40"))
+CONCURRENCY = int(os.getenv("CORRIDOR_CONCURRENCY", "8"))
+
+# Kakao 검색 API의 radius 상한과 한 질의에서 받을 수 있는 최대 페이지 수(15건 x 3)
+KAKAO_MAX_RADIUS = 20000
+KAKAO_MAX_PAGES = 3
+# 원의 반지름을 버퍼의 몇 배로 시작할지. √2배이면 이웃한 원의 간격이 버퍼의 2배가 됩니다.
+RADIUS_FACTOR = math.sqrt(2)
+# 단순화 허용 오차(버퍼 대비). 단순화로 생기는 오차만큼 원을 키워 빈틈이 생기지 않게 합니다.
+SIMPLIFY_RATIO = 0.25
+# 원이 띠 전체를 덮으려면 반지름이 (버퍼 + 단순화 오차)보다 커야 하므로 버퍼 폭에 상한이 있습니다.
+MAX_BUFFER = 10000
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def _simplify(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Douglas-Peucker simplification of an (n, 2) array in meters; endpoints are always kept."""
+    if len(points) < 3 or tolerance <= 0:
+        return points
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = points[start], points[end]
+        inner = points[start + 1:end]
+        ab = b - a
+        length = np.hypot(*ab)
+        if length == 0:
+            dist = np.hypot(*(inner - a).T)
+        else:
+            dist = np.abs(ab[0] * (inner[:, 1] - a[1]) - ab[1] * (inner[:, 0] - a[0])) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            mid = start + 1 + i
+            keep[mid] = True
+            stack.extend(((start, mid), (mid, end)))
+    return points[keep]
+
+
+def _sample(points: np.ndarray, spacing: float) -> np.ndarray:
+    """Vertices of the polyline plus evenly spaced points on each segment, at most `spacing` apart."""
+    centers = [points[:1]]
+    for a, b in zip(points[:-1], points[1:]):
+        steps = max(int(math.ceil(np.hypot(*(b - a)) / spacing)), 1)
+        t = np.arange(1, steps + 1)[:, None] / steps
+        centers.append(a + t * (b - a))
+    return np.concatenate(centers)
+
+
+def plan_corridor(route_m: np.ndarray, buffer_m: float, max_queries: int) -> Tuple[np.ndarray, float, bool]:
+    """Choose query centers (WTM meters) and one radius covering the corridor with at most `max_queries` circles.
+
+    Returns `(centers, radius, truncated)`. Circles of radius `r` centered on
+    the route cover a band of half-width `b` between neighbours up to
+    `2*sqrt(r^2 - b^2)` apart; the radius grows until the route fits the
+    budget or hits Kakao's limit.
+    """
+    tolerance = buffer_m * SIMPLIFY_RATIO
+    simplified = _simplify(route_m, tolerance)
+    half_width = buffer_m + tolerance
+    radius = min(max(half_width * RADIUS_FACTOR, 1.0), KAKAO_MAX_RADIUS)
+    while True:
+        spacing = 2 * math.sqrt(max(radius ** 2 - half_width ** 2, 1.0))
+        centers = _sample(simplified, spacing)
+        if len(centers) <= max_queries or radius >= KAKAO_MAX_RADIUS:
+            break
+        radius = min(radius * 1.25, KAKAO_MAX_RADIUS)
+    truncated = len(centers) > max_queries
+    if truncated:
+        # 한도 안에서 경로 앞부분부터 빈틈없이 덮습니다. 뒷부분은 다음 호출에서 이어서 찾으면 됩니다.
+        centers = centers[:max(max_queries, 1)]
+    return centers, float(math.ceil(radius)), truncated
+
+
+def route_positions(route_m: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Distance along the route and from the route (meters) of each point, vectorized over points x segments."""
+    a, b = route_m[:-1], route_m[1:]
+    ab = b - a
+    seg_len2 = np.maximum((ab ** 2).sum(axis=1), 1e-12)
+    cum = np.concatenate(([0.0], np.cumsum(np.sqrt(seg_len2))))[:-1]
+    px = xs[:, None] - a[None, :, 0]
+    py = ys[:, None] - a[None, :, 1]
+    t = np.clip((px * ab[:, 0] + py * ab[:, 1]) / seg_len2, 0.0, 1.0)
+    dx = px - t * ab[:, 0]
+    dy = py - t * ab[:, 1]
+    dist2 = dx * dx + dy * dy
+    seg = np.argmin(dist2, axis=1)
+    rows = np.arange(len(xs))
+    offset = cum[seg] + t[rows, seg] * np.sqrt(seg_len2[seg])
+    return offset, np.sqrt(dist2[rows, seg])
+
+
+def _to_wtm(route: Sequence[Sequence[float]], input_coord: str) -> np.ndarray:
+    pts = np.asarray(route, dtype=np.float64)
+    if pts.ndim != 2 or pts.shape[1] != 2 or len(pts) < 1:
+        raise ValueError("route must be a sequence of (x, y) points")
+    if len(pts) == 1:
+        pts = np.vstack([pts, pts])
+    x, y = transform(pts[:, 0], pts[:, 1], input_coord, "WTM")
+    return np.column_stack([x, y])
+
+
+def parse_route(text: str) -> List[Tuple[float, float]]:
+    """Parse `"x1,y1;x2,y2;..."` (any separators) into points."""
+    values = [float(v) for v in _NUMBER.findall(text)]
+    if len(values) % 2:
+        raise ValueError("route needs an even number of coordinates")
+    return list(zip(values[0::2], values[1::2]))
+
+
+async def astream_corridor(
+    route: Sequence[Sequence[float]],
+    buffer_m: float,
+    query: Optional[str] = None,
+    category_group_code: Optional[str] = None,
+    input_coord: str = "WGS84",
+    max_calls: int = MAX_CALLS,
+    concurrency: int = CONCURRENCY,
+    pages: int = 1,
+    fields: Optional[str] = None,
+    report: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield corridor places as each query returns; see the module docstring.
+
+    `pages` is how many result pages (15 places each) to fetch per circle;
+    each page is one upstream call and counts against `max_calls`. `fields`
+    trims the documents on the server (`id`, `x`, `y` are always kept). When
+    `report` is given it is filled with call/place counters at the end.
+    """
+    if not query and not category_group_code:
+        raise ValueError("query or category_group_code is required")
+    if not 0 < buffer_m <= MAX_BUFFER:
+        raise ValueError(f"buffer_m must be in (0, {MAX_BUFFER}] meters")
+    pages = min(max(pages, 1), KAKAO_MAX_PAGES)
+    route_m = _to_wtm(route, input_coord)
+    centers, radius, truncated = plan_corridor(route_m, buffer_m, max(max_calls // pages, 1))
+    lon, lat = transform(centers[:, 0], centers[:, 1], "WTM", "WGS84")
+
+    path = "/search/keyword" if query else "/search/category"
+    base: Dict[str, Any] = {"radius": int(radius), "sort": "distance"}
+    if query:
+        base["query"] = query
+    if category_group_code:
+        base["category_group_code"] = category_group_code
+    if fields:
+        base["fields"] = ",".join(dict.fromkeys(["id", "x", "y"] + [f.strip() for f in fields.split(",") if f.strip()]))
+
+    stats = {"calls": 0, "circles": len(centers), "radius_m": int(radius), "places": 0, "duplicates": 0,
+             "outside": 0, "saturated": 0, "failed": 0, "truncated": truncated}
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def fetch(cx: float, cy: float) -> List[dict]:
+        docs: List[dict] = []
+        async with semaphore:
+            for page in range(1, pages + 1):
+                if stats["calls"] >= max_calls:
+                    stats["truncated"] = True
+                    break
+                stats["calls"] += 1
+                data = await aget_json(path, dict(base, x=f"{cx:.7f}", y=f"{cy:.7f}", page=page), headers=BULK_HEADERS)
+                docs.extend(data.get("documents") or [])
+                meta = data.get("meta") or {}
+                if meta.get("is_end", True):
+                    break
+            else:
+                # 마지막 페이지까지 받았는데 더 남았으면 이 원 안의 먼 장소는 빠졌을 수 있습니다.
+                stats["saturated"] += 1
+        return docs
+
+    seen = set()
+    tasks = [asyncio.ensure_future(fetch(cx, cy)) for cx, cy in zip(lon, lat)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                docs = await next_done
+            except (httpx.HTTPError, json.JSONDecodeError) as e:
+                logging.warning(f"Corridor query failed: {e}")
+                stats["failed"] += 1
+                continue
+            fresh = []
+            for doc in docs:
+                key = doc.get("id") or (doc.get("place_name"), doc.get("x"), doc.get("y"))
+                if key in seen:
+                    stats["duplicates"] += 1
+                    continue
+                seen.add(key)
+                fresh.append(doc)
+            if not fresh:
+                continue
+            xs, ys = transform([float(d["x"]) for d in fresh], [float(d["y"]) for d in fresh], "WGS84", "WTM")
+            offsets, dists = route_positions(route_m, np.atleast_1d(xs), np.atleast_1d(ys))
+            for i in np.argsort(offsets, kind="stable"):
+                if dists[i] > buffer_m:
+                    stats["outside"] += 1
+                    continue
+                stats["places"] += 1
+                yield dict(fresh[i], route_offset_m=round(float(offsets[i]), 1), route_distance_m=round(float(dists[i]), 1))
+    finally:
+        for task in tasks:
+            task.cancel()
+        if report is not None:
+            report.update(stats)
+
+
+async def asearch_corridor(route: Sequence[Sequence[float]], buffer_m: float, **kwargs) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Collect :func:`astream_corridor` and sort the places by distance along the route."""
+    report: Dict[str, Any] = {}
+    places = [p async for p in astream_corridor(route, buffer_m, report=report, **kwargs)]
+    places.sort(key=lambda p: p["route_offset_m"])
+    return places, report
+
+
+def search_corridor(route: Sequence[Sequence[float]], buffer_m: float, **kwargs) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Synchronous wrapper around :func:`asearch_corridor`."""
+    return asyncio.run(asearch_corridor(route, buffer_m, **kwargs))
@@ -0,0 +1,101 @@
+import os
+from typing import Type, Optional
+import logging
+
+from langchain.tools import BaseTool
+from pydantic.v1 import BaseModel, Field
+from langchain_openai import ChatOpenAI
+from langchain.agents import initialize_agent, AgentType
+
+from corridor import MAX_BUFFER, asearch_corridor, parse_route, search_corridor
+from mcp_client import TOOL_ERRORS, tool_error
+
+# --- Prerequisites ---
+# 1. Run the MCP server: `go run ./app` in the `app` directory.
+# 2. Install libraries: `pip install -r requirements.txt`
+# 3. Set OpenAI API Key: `export OPENAI_API_KEY="your_openai_api_key"`
+# ---------------------
+
+# 서버가 응답에서 남길 필드. 경로 위치 계산에 x, y가 필요합니다.
+FIELDS = "id,place_name,address_name,x,y"
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# 에이전트에 돌려줄 최대 결과 수
+MAX_RESULTS = 5
+
+
+class CorridorSearchToolInput(BaseModel):
+    """Input for the route corridor search tool."""
+    route: str = Field(description="The route as 'x1,y1;x2,y2;...' (longitude,latitude pairs for WGS84), in driving order.")
+    buffer_m: int = Field(default=500, description=f"Maximum distance in meters from the route (1-{MAX_BUFFER}).")
+    query: Optional[str] = Field(default=None, description="Keyword to search for, such as '주유소' or a brand name.")
+    category_group_code: Optional[str] = Field(default=None, description="Category group code instead of (or in addition to) a keyword, e.g. 'OL7' gas station, 'PM9' pharmacy.")
+    input_coord: str = Field(default="WGS84", description="Coordinate system of the route (WGS84, WTM, TM, WCONGNAMUL, ...).")
+
+
+class CorridorSearchTool(BaseTool):
+    """A tool to find places along a route in a single call."""
+    name: str = "korean_corridor_search"
+    description: str = "Useful for finding places along a route in Korea (e.g. a gas station or pharmacy on the way). Give the whole route as a polyline; results are ordered by distance along the route."
+    args_schema: Type[BaseModel] = CorridorSearchToolInput
+
+    def _run(self, route: str, buffer_m: int = 500, query: Optional[str] = None, category_group_code: Optional[str] = None, input_coord: str = "WGS84") -> str:
+        """Use the tool."""
+        try:
+            places, report = search_corridor(parse_route(route), buffer_m, query=query, category_group_code=category_group_code, input_coord=input_coord, fields=FIELDS)
+            return self._format(places, report)
+        except TOOL_ERRORS as e:
+            return tool_error(e)
+        except ValueError as e:
+            return f"Invalid input: {e}"
+
+    async def _arun(self, route: str, buffer_m: int = 500, query: Optional[str] = None, category_group_code: Optional[str] = None, input_coord: str = "WGS84") -> str:
+        """Use the tool asynchronously."""
+        try:
+            places, report = await asearch_corridor(parse_route(route), buffer_m, query=query, category_group_code=category_group_code, input_coord=input_coord, fields=FIELDS)
+            return self._format(places, report)
+        except TOOL_ERRORS as e:
+            return tool_error(e)
+        except ValueError as e:
+            return f"Invalid input: {e}"
+
+    @staticmethod
+    def _format(places, report) -> str:
+        logging.info(f"Corridor search report: {report}")
+        results = [
+            f"Place: {p.get('place_name')}, Address: {p.get('address_name')}, "
+            f"{p['route_offset_m'] / 1000:.1f} km along the route, {p['route_distance_m']:.0f} m off the route"
+            for p in places[:MAX_RESULTS]
+        ]
+        if report.get("truncated"):
+            results.append("(Only the first part of the route was searched; split the route to search the rest.)")
+        if report.get("saturated"):
+            results.append(
+                f"({report['saturated']} of {report['circles']} search areas had more matches than one page returns, "
+                "so places there may be missing; use a more specific query or a smaller buffer_m.)"
+            )
+        if results:
+            return "\n".join(results)
+        return "No places found along the given route."
+
+
+def main():
+    """Initializes and runs a LangChain agent with the corridor search tool."""
+    if not os.getenv("OPENAI_API_KEY"):
+        print("Error: OPENAI_API_KEY environment variable not set.")
+        return
+
+    llm = ChatOpenAI(temperature=0, model_name="gpt-4o")
+    tools = [CorridorSearchTool()]
+
+    agent = initialize_agent(tools, llm, agent=AgentType.OPENAI_FUNCTIONS, verbose=True)
+
+    question = "서울시청(126.9780,37.5665)에서 강남역(127.0276,37.4979)을 거쳐 판교(127.1086,37.4012)로 가는 길에 있는 주유소를 찾아줘."
+    result = agent.invoke({"input": question})
+    print("\n--- 최종 답변 ---")
+    print(result["output"])
+
+if __name__ == "__main__":
+    main()
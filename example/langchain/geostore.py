@@ -0,0 +1,232 @@
+"""Durable on-disk cache of normalized request -> response, shared across processes.
+
+The store is a single SQLite database in WAL mode, so any number of worker
+processes can read it concurrently while one writes, and reads go through a
+memory-mapped view of the file (`PRAGMA mmap_size`) instead of private page
+copies. Keys use the same format as the Go server's response cache
+(`CacheKey`: Kakao API path + sorted, trimmed query without the
+`fields`/`limit`/`format` projection parameters) and bodies are the full,
+unprojected responses, and the JSONL import/export format is the server's
+cache snapshot format, so a snapshot taken from either side can warm-start
+the other::
+
+    from geostore import GeoStore
+    store = GeoStore("/var/cache/kakao.db")
+    with open("snapshot.jsonl", encoding="utf-8") as f:
+        store.import_jsonl(f)
+    body = store.get(store.key("/search/address", {"query": "판교역로 235"}))
+
+Maintenance from the command line::
+
+    python geostore.py stats   /var/cache/kakao.db
+    python geostore.py compact /var/cache/kakao.db
+    python geostore.py export  /var/cache/kakao.db snapshot.jsonl
+    python geostore.py import  /var/cache/kakao.db snapshot.jsonl
+
+`mcp_client.get_json` uses the store automatically when `GEOSTORE_PATH` is set.
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, TextIO
+from urllib.parse import quote_plus, urlencode
+
+# MCP 서버 경로 -> Kakao API 경로 (app/lib/endpoints.go와 같은 대응표)
+ENDPOINT_PATHS = {
+    "/search/address": "/v2/local/search/address.json",
+    "/search/keyword": "/v2/local/search/keyword.json",
+    "/search/category": "/v2/local/search/category.json",
+    "/geo/coord2address": "/v2/local/geo/coord2address.json",
+    "/geo/coord2regioncode": "/v2/local/geo/coord2regioncode.json",
+    "/geo/transcoord": "/v2/local/geo/transcoord.json",
+}
+
+# 엔드포인트별 기본 TTL(초). 0은 만료 없음. 서버의 CACHE_TTL_* 기본값과 같습니다.
+DEFAULT_TTLS = {
+    "/v2/local/search/address.json": 24 * 3600,
+    "/v2/local/search/keyword.json": 5 * 60,
+    "/v2/local/search/category.json": 5 * 60,
+    "/v2/local/geo/coord2address.json": 24 * 3600,
+    "/v2/local/geo/coord2regioncode.json": 24 * 3600,
+    "/v2/local/geo/transcoord.json": 0,
+}
+DEFAULT_TTL = 10 * 60
+
+MMAP_SIZE = 256 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key     TEXT PRIMARY KEY,
+    body    TEXT NOT NULL,
+    expires INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires) WHERE expires > 0;
+"""
+
+
+# 서버가 캐시 키에서 빼고 응답을 쓸 때 적용하는 응답 줄이기 파라미터 (app/lib/projection.go의 projectionParams)
+PROJECTION_PARAMS = ("fields", "limit", "format")
+
+
+def cache_key(path: str, params: Dict[str, Any]) -> str:
+    """Same normalization as the server's `CacheKey` (drop projection params, trim values, drop empty, sort keys)."""
+    path = ENDPOINT_PATHS.get(path, path)
+    items = []
+    for k in sorted(params):
+        if k in PROJECTION_PARAMS:
+            continue
+        values = params[k] if isinstance(params[k], (list, tuple)) else [params[k]]
+        for v in values:
+            if v is None:
+                continue
+            v = str(v).strip()
+            if v:
+                items.append((k, v))
+    return path + "?" + urlencode(items, quote_via=quote_plus)
+
+
+class GeoStore:
+    """SQLite (WAL) key/value store with per-entry expiry."""
+
+    def __init__(self, path: str, mmap_size: int = MMAP_SIZE):
+        self.path = path
+        self.mmap_size = mmap_size
+        # sqlite3 연결은 스레드 간에 공유할 수 없으므로 스레드마다 하나씩 엽니다.
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self._local.conn = conn
+        return conn
+
+    key = staticmethod(cache_key)
+
+    def get(self, key: str) -> Optional[str]:
+        """Response body for `key`, or None when missing or expired."""
+        row = self._conn().execute(
+            "SELECT body FROM entries WHERE key = ? AND (expires = 0 OR expires > ?)",
+            (key, int(time.time())),
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, body: str, ttl: Optional[float] = None) -> None:
+        """Store `body`; `ttl` defaults to the endpoint's TTL (0 means never expire)."""
+        if ttl is None:
+            ttl = DEFAULT_TTLS.get(key.partition("?")[0], DEFAULT_TTL)
+        if ttl < 0:
+            return
+        expires = int(time.time() + ttl) if ttl > 0 else 0
+        self._conn().execute(
+            "INSERT OR REPLACE INTO entries (key, body, expires) VALUES (?, ?, ?)",
+            (key, body, expires),
+        )
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        cur = self._conn().execute("DELETE FROM entries WHERE expires > 0 AND expires <= ?", (int(time.time()),))
+        return cur.rowcount
+
+    def compact(self) -> int:
+        """Expire old entries, fold the WAL back into the database and reclaim free pages."""
+        removed = self.purge_expired()
+        conn = self._conn()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._conn()
+        total, expired = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(expires > 0 AND expires <= ?), 0) FROM entries", (int(time.time()),)
+        ).fetchone()
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return {"entries": total, "expired": expired, "bytes": pages * page_size}
+
+    def _iter_live(self) -> Iterator[tuple]:
+        return self._conn().execute(
+            "SELECT key, body, expires FROM entries WHERE expires = 0 OR expires > ?", (int(time.time()),)
+        )
+
+    def export_jsonl(self, out: TextIO) -> int:
+        """Write live entries in the server's cache snapshot format."""
+        n = 0
+        for key, body, expires in self._iter_live():
+            try:
+                payload = json.loads(body)
+            except json.JSONDecodeError:
+                continue
+            out.write(json.dumps({"key": key, "expires": expires, "body": payload}, ensure_ascii=False, separators=(",", ":")) + "\n")
+            n += 1
+        return n
+
+    def import_jsonl(self, src: TextIO, batch: int = 10_000) -> int:
+        """Bulk-load a snapshot, skipping entries that have already expired."""
+        now = int(time.time())
+        conn = self._conn()
+        rows, n = [], 0
+
+        def flush():
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("INSERT OR REPLACE INTO entries (key, body, expires) VALUES (?, ?, ?)", rows)
+            conn.execute("COMMIT")
+            rows.clear()
+
+        for line in src:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            expires = int(item.get("expires") or 0)
+            if not item.get("key") or (expires and expires <= now):
+                continue
+            rows.append((item["key"], json.dumps(item["body"], ensure_ascii=False, separators=(",", ":")), expires))
+            n += 1
+            if len(rows) >= batch:
+                flush()
+        if rows:
+            flush()
+        return n
+
+
+_default_store: Optional[GeoStore] = None
+
+
+def default_store() -> Optional[GeoStore]:
+    """Store at `GEOSTORE_PATH`, or None when it is not set."""
+    global _default_store
+    path = os.getenv("GEOSTORE_PATH")
+    if _default_store is None and path:
+        _default_store = GeoStore(path)
+    return _default_store
+
+
+def main(argv):
+    if len(argv) < 3 or argv[1] not in ("stats", "compact", "export", "import"):
+        print(__doc__)
+        return 2
+    command, store = argv[1], GeoStore(argv[2])
+    if command == "stats":
+        print(json.dumps(store.stats()))
+    elif command == "compact":
+        print(f"removed {store.compact()} expired entries")
+    elif command == "export":
+        with (open(argv[3], "w", encoding="utf-8") if len(argv) > 3 else sys.stdout) as out:
+            print(f"exported {store.export_jsonl(out)} entries", file=sys.stderr)
+    else:
+        with (open(argv[3], encoding="utf-8") if len(argv) > 3 else sys.stdin) as src:
+            print(f"imported {store.import_jsonl(src)} entries", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,207 @@
+"""Offline, vectorized implementation of the coordinate systems behind `/geo/transcoord`.
+
+Every conversion Kakao's transcoord API offers is deterministic math, so this
+module computes it locally on NumPy arrays instead of making one HTTP call per
+point::
+
+    from kakao_proj import transform
+    lon, lat = transform(xs, ys, "WTM", "WGS84")
+
+Supported systems (same names as Kakao's `input_coord` / `output_coord`):
+
+    WGS84       geographic, WGS84/GRS80 datum
+    BESSEL      geographic, Bessel 1841 (Tokyo datum)
+    WTM         TM central belt,   GRS80  (lat0=38, lon0=127,   k=1,      x0=200000,  y0=500000)
+    TM          TM central belt,   Bessel (lat0=38, lon0=127+10.405", k=1, x0=200000,  y0=500000)
+    WKTM        Korea TM,          GRS80  (lat0=38, lon0=128,   k=0.9999, x0=400000,  y0=600000)
+    KTM         Korea TM,          Bessel (lat0=38, lon0=128,   k=0.9999, x0=400000,  y0=600000)
+    WUTM/UTMK   UTM-K,             GRS80  (lat0=38, lon0=127.5, k=0.9996, x0=1000000, y0=2000000)
+    UTM         UTM-K,             Bessel (lat0=38, lon0=127.5, k=0.9996, x0=1000000, y0=2000000)
+    WCONGNAMUL  WTM scaled by 2.5
+    CONGNAMUL   TM scaled by 2.5
+
+Tolerance: the transverse Mercator math (3rd-order Krüger series) agrees with
+PROJ to well under 1 mm inside Korea, which is what the golden values in
+`tests/kakao_proj_golden.json` check. For GRS80-based systems that is also the
+agreement with Kakao. Bessel-based systems additionally go through a
+7-parameter Helmert datum shift (Bessel -> WGS84); Kakao does not publish its
+parameters, so expect up to about 1 m of difference from the API there.
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+
+# (semi-major axis, flattening)
+GRS80 = (6378137.0, 1 / 298.257222101)
+BESSEL = (6377397.155, 1 / 299.1528128)
+
+# Bessel(Tokyo) -> WGS84, position vector 7-parameter Helmert
+# (tx, ty, tz [m], rx, ry, rz [arc-second], s [ppm])
+BESSEL_TO_WGS84 = (-115.80, 474.99, 674.11, 1.16, -2.31, -1.63, 6.43)
+
+_ARCSEC = np.pi / (180 * 3600)
+
+
+class _TransverseMercator:
+    """Transverse Mercator projection using the Krüger n-series."""
+
+    def __init__(self, ellps, lat0, lon0, k0, x0, y0, scale=1.0):
+        a, f = ellps
+        n = f / (2 - f)
+        self.lon0 = np.radians(lon0)
+        self.k0 = k0
+        self.x0 = x0
+        self.y0 = y0
+        self.scale = scale
+        self.e = 2 * np.sqrt(n) / (1 + n)
+        self.A = a / (1 + n) * (1 + n ** 2 / 4 + n ** 4 / 64)
+        self.alpha = (
+            n / 2 - 2 * n ** 2 / 3 + 5 * n ** 3 / 16,
+            13 * n ** 2 / 48 - 3 * n ** 3 / 5,
+            61 * n ** 3 / 240,
+        )
+        self.beta = (
+            n / 2 - 2 * n ** 2 / 3 + 37 * n ** 3 / 96,
+            n ** 2 / 48 + n ** 3 / 15,
+            17 * n ** 3 / 480,
+        )
+        self.delta = (
+            2 * n - 2 * n ** 2 / 3 - 2 * n ** 3,
+            7 * n ** 2 / 3 - 8 * n ** 3 / 5,
+            56 * n ** 3 / 15,
+        )
+        self.xi0, _ = self._xi_eta(np.radians(lat0), 0.0)
+
+    def _xi_eta(self, lat, dlon):
+        t = np.sinh(np.arctanh(np.sin(lat)) - self.e * np.arctanh(self.e * np.sin(lat)))
+        xi_p = np.arctan2(t, np.cos(dlon))
+        eta_p = np.arctanh(np.sin(dlon) / np.sqrt(1 + t * t))
+        xi, eta = xi_p, eta_p
+        for j, a in enumerate(self.alpha, start=1):
+            xi = xi + a * np.sin(2 * j * xi_p) * np.cosh(2 * j * eta_p)
+            eta = eta + a * np.cos(2 * j * xi_p) * np.sinh(2 * j * eta_p)
+        return xi, eta
+
+    def forward(self, lon, lat):
+        """Radians on the projection's ellipsoid -> projected metres."""
+        xi, eta = self._xi_eta(lat, lon - self.lon0)
+        x = self.x0 + self.k0 * self.A * eta
+        y = self.y0 + self.k0 * self.A * (xi - self.xi0)
+        return x * self.scale, y * self.scale
+
+    def inverse(self, x, y):
+        """Projected metres -> radians on the projection's ellipsoid."""
+        xi = (y / self.scale - self.y0) / (self.k0 * self.A) + self.xi0
+        eta = (x / self.scale - self.x0) / (self.k0 * self.A)
+        xi_p, eta_p = xi, eta
+        for j, b in enumerate(self.beta, start=1):
+            xi_p = xi_p - b * np.sin(2 * j * xi) * np.cosh(2 * j * eta)
+            eta_p = eta_p - b * np.cos(2 * j * xi) * np.sinh(2 * j * eta)
+        chi = np.arcsin(np.sin(xi_p) / np.cosh(eta_p))
+        lat = chi
+        for j, d in enumerate(self.delta, start=1):
+            lat = lat + d * np.sin(2 * j * chi)
+        lon = self.lon0 + np.arctan2(np.sinh(eta_p), np.cos(xi_p))
+        return lon, lat
+
+
+class _Geographic:
+    """Longitude/latitude in degrees."""
+
+    @staticmethod
+    def forward(lon, lat):
+        return np.degrees(lon), np.degrees(lat)
+
+    @staticmethod
+    def inverse(x, y):
+        return np.radians(x), np.radians(y)
+
+
+_WTM = _TransverseMercator(GRS80, 38, 127, 1, 200000, 500000)
+_TM = _TransverseMercator(BESSEL, 38, 127 + 10.405 / 3600, 1, 200000, 500000)
+
+# name -> (projection, datum ellipsoid)
+SYSTEMS: Dict[str, Tuple[object, Tuple[float, float]]] = {
+    "WGS84": (_Geographic, GRS80),
+    "BESSEL": (_Geographic, BESSEL),
+    "WTM": (_WTM, GRS80),
+    "TM": (_TM, BESSEL),
+    "WKTM": (_TransverseMercator(GRS80, 38, 128, 0.9999, 400000, 600000), GRS80),
+    "KTM": (_TransverseMercator(BESSEL, 38, 128, 0.9999, 400000, 600000), BESSEL),
+    "WUTM": (_TransverseMercator(GRS80, 38, 127.5, 0.9996, 1000000, 2000000), GRS80),
+    "UTM": (_TransverseMercator(BESSEL, 38, 127.5, 0.9996, 1000000, 2000000), BESSEL),
+    "WCONGNAMUL": (_TransverseMercator(GRS80, 38, 127, 1, 200000, 500000, scale=2.5), GRS80),
+    "CONGNAMUL": (_TransverseMercator(BESSEL, 38, 127 + 10.405 / 3600, 1, 200000, 500000, scale=2.5), BESSEL),
+}
+SYSTEMS["UTMK"] = SYSTEMS["WUTM"]
+
+
+def _to_ecef(lon, lat, ellps):
+    a, f = ellps
+    e2 = f * (2 - f)
+    sin_lat = np.sin(lat)
+    N = a / np.sqrt(1 - e2 * sin_lat ** 2)
+    return (
+        N * np.cos(lat) * np.cos(lon),
+        N * np.cos(lat) * np.sin(lon),
+        N * (1 - e2) * sin_lat,
+    )
+
+
+def _from_ecef(X, Y, Z, ellps):
+    a, f = ellps
+    e2 = f * (2 - f)
+    p = np.hypot(X, Y)
+    lat = np.arctan2(Z, p * (1 - e2))
+    for _ in range(4):
+        N = a / np.sqrt(1 - e2 * np.sin(lat) ** 2)
+        lat = np.arctan2(Z + e2 * N * np.sin(lat), p)
+    return np.arctan2(Y, X), lat
+
+
+def _helmert(X, Y, Z, params, inverse=False):
+    tx, ty, tz, rx, ry, rz, s = params
+    rx, ry, rz, s = rx * _ARCSEC, ry * _ARCSEC, rz * _ARCSEC, s * 1e-6
+    if inverse:
+        # 회전/축척이 매우 작으므로 부호를 바꾼 역변환으로 충분합니다 (오차 < 1 mm).
+        X, Y, Z = X - tx, Y - ty, Z - tz
+        m = 1 - s
+        return (
+            m * (X + rz * Y - ry * Z),
+            m * (-rz * X + Y + rx * Z),
+            m * (ry * X - rx * Y + Z),
+        )
+    m = 1 + s
+    return (
+        tx + m * (X - rz * Y + ry * Z),
+        ty + m * (rz * X + Y - rx * Z),
+        tz + m * (-ry * X + rx * Y + Z),
+    )
+
+
+def _shift_datum(lon, lat, src, dst):
+    if src == dst:
+        return lon, lat
+    X, Y, Z = _to_ecef(lon, lat, src)
+    X, Y, Z = _helmert(X, Y, Z, BESSEL_TO_WGS84, inverse=src == GRS80)
+    return _from_ecef(X, Y, Z, dst)
+
+
+def transform(x, y, input_coord: str = "WGS84", output_coord: str = "WGS84"):
+    """Convert coordinates between Kakao coordinate systems.
+
+    `x`/`y` may be scalars or NumPy arrays of any (matching) shape; geographic
+    systems use longitude/latitude in degrees. Returns a `(x, y)` tuple of
+    float64 arrays with the input's shape.
+    """
+    try:
+        src_proj, src_datum = SYSTEMS[input_coord.upper()]
+        dst_proj, dst_datum = SYSTEMS[output_coord.upper()]
+    except KeyError as e:
+        raise ValueError(f"Unsupported coordinate system: {e.args[0]}") from None
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    lon, lat = src_proj.inverse(x, y)
+    lon, lat = _shift_datum(lon, lat, src_datum, dst_datum)
+    return dst_proj.forward(lon, lat)
@@ -1,6 +1,4 @@
 import os
-import requests
-import json
 from typing import Type, Optional
 import logging
 
@@ -9,15 +7,23 @@ from pydantic.v1 import BaseModel, Field
 from langchain_openai import ChatOpenAI
 from langchain.agents import initialize_agent, AgentType
 
+from mcp_client import iter_documents, aiter_documents, TOOL_ERRORS, tool_error
+
 # --- Prerequisites ---
 # 1. Run the MCP server: `go run ./app` in the `app` directory.
-# 2. Install libraries: `pip install langchain langchain-openai requests`
+# 2. Install libraries: `pip install -r requirements.txt`
 # 3. Set OpenAI API Key: `export OPENAI_API_KEY="your_openai_api_key"`
 # ---------------------
 
+# 서버가 응답에서 남길 필드. 나머지는 서버에서 잘라내므로 전송량과 에이전트 컨텍스트가 줄어듭니다.
+FIELDS = "place_name,address_name"
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# 에이전트에 돌려줄 최대 결과 수
+MAX_RESULTS = 3
+
 class KeywordSearchToolInput(BaseModel):
     """Input for the keyword search tool."""
     query: str = Field(description="The keyword to search for, such as a place name or category.")
@@ -34,50 +40,43 @@ class KeywordSearchTool(BaseTool):
 
     def _run(self, query: str, latitude: Optional[float] = None, longitude: Optional[float] = None, radius: Optional[int] = None) -> str:
         """Use the tool."""
-        mcp_server_url = "http://localhost:8080/search/keyword"
-        params = {"query": query}
+        params = self._params(query, latitude, longitude, radius)
+        logging.info(f"Requesting /search/keyword with params: {params}")
+
+        try:
+            return self._format(iter_documents("/search/keyword", params, limit=MAX_RESULTS))
+        except TOOL_ERRORS as e:
+            return tool_error(e)
+
+    async def _arun(self, query: str, latitude: Optional[float] = None, longitude: Optional[float] = None, radius: Optional[int] = None) -> str:
+        """Use the tool asynchronously."""
+        params = self._params(query, latitude, longitude, radius)
+        logging.info(f"Requesting /search/keyword with params: {params}")
+
+        try:
+            return self._format([doc async for doc in aiter_documents("/search/keyword", params, limit=MAX_RESULTS)])
+        except TOOL_ERRORS as e:
+            return tool_error(e)
+
+    @staticmethod
+    def _params(query: str, latitude: Optional[float] = None, longitude: Optional[float] = None, radius: Optional[int] = None) -> dict:
+        params = {"query": query, "fields": FIELDS}
         if latitude is not None:
             params["y"] = latitude
         if longitude is not None:
             params["x"] = longitude
         if radius is not None:
             params["radius"] = radius
-        logging.info(f"Requesting {mcp_server_url} with params: {params}")
-
-        try:
-            response = requests.get(mcp_server_url, params=params)
-            logging.info(f"Response Status Code: {response.status_code}")
-            response.raise_for_status()
-
-            raw_response_text = response.text
-            logging.info(f"Raw Response Text: {raw_response_text}")
-
-            # 서버가 SSE 형식("data: ...")으로 응답하는 경우를 처리합니다.
-            if raw_response_text.strip().startswith('data:'):
-                # "data: " 접두사를 제거하고 JSON으로 파싱합니다.
-                json_data = raw_response_text.strip()[len('data:'):].strip()
-                data = json.loads(json_data)
-            else:
-                # 일반 JSON 형식으로 파싱합니다.
-                data = response.json()
-
-            if data and data.get("documents"):
-                # Return up to 3 results for brevity
-                results = [f"Place: {doc.get('place_name')}, Address: {doc.get('address_name')}" for doc in data["documents"][:3]]
-                return "\n".join(results)
-            else:
-                logging.warning("No documents found in the response.")
-                return "No results found for the given keyword."
-
-        except requests.exceptions.RequestException as e:
-            logging.error(f"HTTP Request failed: {e}")
-            return f"Error calling the API: {e}"
-        except json.JSONDecodeError as e:
-            logging.error(f"Failed to decode JSON from response: {e}. Response text: '{response.text}'")
-            return f"Error parsing server response. The response was not valid JSON: {response.text}"
-        except (KeyError, IndexError, AttributeError) as e:
-            logging.error(f"Error parsing response structure: {e}")
-            return "Could not parse the API response."
+        return params
+
+    @staticmethod
+    def _format(documents) -> str:
+        # 페이지 이벤트가 도착하는 대로 결과를 만들고, MAX_RESULTS개가 모이면 스트림을 닫습니다.
+        results = [f"Place: {doc.get('place_name')}, Address: {doc.get('address_name')}" for doc in documents]
+        if results:
+            return "\n".join(results)
+        logging.warning("No documents found in the response.")
+        return "No results found for the given keyword."
 
 
 def main():
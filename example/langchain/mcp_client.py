@@ -0,0 +1,544 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+from geostore import PROJECTION_PARAMS, cache_key, default_store
+
+# --- Configuration ---
+# MCP_SERVER_URL      : MCP 서버 주소 (기본값: http://localhost:8080)
+# MCP_TIMEOUT         : 요청 전체 타임아웃(초)
+# MCP_CONNECT_TIMEOUT : 연결 타임아웃(초)
+# MCP_RETRIES         : 연결 실패 / 5xx 응답 시 재시도 횟수
+# MCP_MAX_CONNECTIONS : 풀에서 유지할 최대 연결 수
+# GEOSTORE_PATH       : 설정하면 get_json/aget_json 응답을 이 SQLite 파일에 저장해 프로세스 간에 공유 (geostore.py)
+# ---------------------
+
+MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8080")
+MCP_TIMEOUT = float(os.getenv("MCP_TIMEOUT", "10"))
+MCP_CONNECT_TIMEOUT = float(os.getenv("MCP_CONNECT_TIMEOUT", "3"))
+MCP_RETRIES = int(os.getenv("MCP_RETRIES", "2"))
+MCP_MAX_CONNECTIONS = int(os.getenv("MCP_MAX_CONNECTIONS", "32"))
+
+RETRY_STATUS_CODES = {502, 503, 504}
+# 일괄 작업이 붙이는 헤더. 서버 스케줄러는 이 요청을 대화형 요청보다 뒤에 처리합니다.
+BULK_HEADERS = {"X-Priority": "bulk"}
+RETRY_BACKOFF = 0.2
+# 서버가 보낸 Retry-After를 따르되, 도구 호출이 너무 오래 멈추지 않도록 상한을 둡니다.
+RETRY_AFTER_MAX = 10.0
+
+_sync_client: Optional[httpx.Client] = None
+_sync_lock = threading.Lock()
+# AsyncClient는 생성된 이벤트 루프에 묶이므로 루프마다 하나씩 유지합니다.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(MCP_TIMEOUT, connect=MCP_CONNECT_TIMEOUT)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=MCP_MAX_CONNECTIONS, max_keepalive_connections=MCP_MAX_CONNECTIONS)
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Honour `Retry-After` (e.g. from the server's upstream scheduler), else back off exponentially."""
+    try:
+        return min(float(response.headers["Retry-After"]), RETRY_AFTER_MAX)
+    except (KeyError, ValueError):
+        return RETRY_BACKOFF * (2 ** attempt)
+
+
+def get_client() -> httpx.Client:
+    """Return the process-wide pooled client used by the synchronous tools."""
+    global _sync_client
+    if _sync_client is None:
+        with _sync_lock:
+            if _sync_client is None:
+                _sync_client = httpx.Client(
+                    base_url=MCP_SERVER_URL,
+                    timeout=_timeout(),
+                    limits=_limits(),
+                    transport=httpx.HTTPTransport(retries=MCP_RETRIES, limits=_limits()),
+                )
+    return _sync_client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the pooled async client bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            base_url=MCP_SERVER_URL,
+            timeout=_timeout(),
+            limits=_limits(),
+            transport=httpx.AsyncHTTPTransport(retries=MCP_RETRIES, limits=_limits()),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def parse_response(text: str) -> Dict[str, Any]:
+    """Parse a server response that is either plain JSON or a single SSE `data:` frame."""
+    # 서버가 SSE 형식("data: ...")으로 응답하는 경우를 처리합니다.
+    stripped = text.strip()
+    if stripped.startswith("data:"):
+        stripped = stripped[len("data:"):].strip()
+    return json.loads(stripped)
+
+
+class SSEEvent(NamedTuple):
+    """One server-sent event; `event` is "" for unnamed `data:` frames."""
+    event: str
+    id: Optional[str]
+    data: str
+
+
+class _SSEDecoder:
+    """Incremental SSE line decoder shared by the sync and async readers."""
+
+    def __init__(self):
+        self.event, self.id, self.data = "", None, []
+
+    def feed(self, line: str) -> Optional[SSEEvent]:
+        if not line:
+            return self.flush()
+        field, _, value = line.partition(":")
+        value = value[1:] if value.startswith(" ") else value
+        if field == "event":
+            self.event = value
+        elif field == "id":
+            self.id = value
+        elif field == "data":
+            self.data.append(value)
+        return None
+
+    def flush(self) -> Optional[SSEEvent]:
+        event = SSEEvent(self.event, self.id, "\n".join(self.data)) if self.data else None
+        self.event, self.id, self.data = "", None, []
+        return event
+
+
+def parse_sse(lines: Iterable[str]) -> Iterator[SSEEvent]:
+    """Split a stream of SSE lines into events as soon as each blank line arrives."""
+    decoder = _SSEDecoder()
+    for line in lines:
+        event = decoder.feed(line)
+        if event:
+            yield event
+    event = decoder.flush()
+    if event:
+        yield event
+
+
+async def aparse_sse(lines: AsyncIterator[str]) -> AsyncIterator[SSEEvent]:
+    """Async counterpart of :func:`parse_sse`."""
+    decoder = _SSEDecoder()
+    async for line in lines:
+        event = decoder.feed(line)
+        if event:
+            yield event
+    event = decoder.flush()
+    if event:
+        yield event
+
+
+def project(data: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply the server's `fields`/`limit` projection to a full response body."""
+    documents = data.get("documents")
+    if not isinstance(documents, list):
+        return data
+    fields = [f.strip() for f in str(params.get("fields") or "").split(",") if f.strip()]
+    limit = int(params.get("limit") or 0)
+    if limit > 0:
+        documents = documents[:limit]
+    if fields:
+        documents = [{f: doc[f] for f in dict.fromkeys(fields) if f in doc} for doc in documents]
+    return dict(data, documents=documents)
+
+
+def _store_lookup(path: str, params: Dict[str, Any]):
+    """Return `(store, key, request_params, cached)` for a GeoStore-backed request.
+
+    The store holds full responses under the server's cache keys, which leave
+    out the projection parameters, so with a store the request goes out
+    without them and the projection is applied locally.
+    """
+    store = default_store()
+    if not store or params.get("format") not in (None, "", "json"):
+        return None, None, params, None
+    full = {k: v for k, v in params.items() if k not in PROJECTION_PARAMS}
+    key = cache_key(path, full)
+    cached = store.get(key)
+    return store, key, full, None if cached is None else json.loads(cached)
+
+
+def _remember(store, key: Optional[str], data: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    if store and "documents" in data:
+        store.set(key, json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+    return project(data, params) if store else data
+
+
+def get_json(path: str, params: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """GET `path` on the MCP server and return the decoded JSON payload.
+
+    `headers` are sent with the request, e.g. :data:`BULK_HEADERS` for
+    background work that should yield to interactive calls.
+    """
+    client = get_client()
+    store, key, request_params, cached = _store_lookup(path, params)
+    if cached is not None:
+        return project(cached, params)
+    for attempt in range(MCP_RETRIES + 1):
+        response = client.get(path, params=request_params, headers=headers)
+        if response.status_code in RETRY_STATUS_CODES and attempt < MCP_RETRIES:
+            logging.warning(f"Retrying {path} after status {response.status_code}")
+            time.sleep(_retry_delay(response, attempt))
+            continue
+        response.raise_for_status()
+        return _remember(store, key, parse_response(response.text), params)
+    raise RuntimeError("unreachable")
+
+
+async def aget_json(path: str, params: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Async counterpart of :func:`get_json`."""
+    client = get_async_client()
+    store, key, request_params, cached = _store_lookup(path, params)
+    if cached is not None:
+        return project(cached, params)
+    for attempt in range(MCP_RETRIES + 1):
+        response = await client.get(path, params=request_params, headers=headers)
+        if response.status_code in RETRY_STATUS_CODES and attempt < MCP_RETRIES:
+            logging.warning(f"Retrying {path} after status {response.status_code}")
+            await asyncio.sleep(_retry_delay(response, attempt))
+            continue
+        response.raise_for_status()
+        return _remember(store, key, parse_response(response.text), params)
+    raise RuntimeError("unreachable")
+
+
+def iter_events(path: str, params: Dict[str, Any]) -> Iterator[SSEEvent]:
+    """Stream `path` and yield SSE events as the server flushes them.
+
+    Closing the generator early closes the connection, which also stops the
+    server from fetching further pages.
+    """
+    client = get_client()
+    for attempt in range(MCP_RETRIES + 1):
+        with client.stream("GET", path, params=params) as response:
+            if response.status_code in RETRY_STATUS_CODES and attempt < MCP_RETRIES:
+                logging.warning(f"Retrying {path} after status {response.status_code}")
+            else:
+                response.raise_for_status()
+                yield from parse_sse(response.iter_lines())
+                return
+        time.sleep(_retry_delay(response, attempt))
+
+
+async def aiter_events(path: str, params: Dict[str, Any]) -> AsyncIterator[SSEEvent]:
+    """Async counterpart of :func:`iter_events`."""
+    client = get_async_client()
+    for attempt in range(MCP_RETRIES + 1):
+        async with client.stream("GET", path, params=params) as response:
+            if response.status_code in RETRY_STATUS_CODES and attempt < MCP_RETRIES:
+                logging.warning(f"Retrying {path} after status {response.status_code}")
+            else:
+                response.raise_for_status()
+                async for event in aparse_sse(response.aiter_lines()):
+                    yield event
+                return
+        await asyncio.sleep(_retry_delay(response, attempt))
+
+
+class KakaoAPIError(httpx.HTTPError):
+    """A Kakao error body (`errorType`/`message`) delivered inside an SSE stream."""
+
+
+def _page_documents(event: SSEEvent) -> list:
+    if event.event not in ("", "page", "error"):
+        return []
+    page = json.loads(event.data)
+    # 첫 페이지가 실패하면 상태 코드로, 중간 페이지가 실패하면 `event: error`로 옵니다.
+    # 어느 쪽이든 결과가 없는 것과 구분되도록 예외로 올립니다.
+    if event.event == "error" or "errorType" in page:
+        raise KakaoAPIError(f"{page.get('errorType', 'Error')}: {page.get('message', event.data)}")
+    if "documents" not in page:
+        logging.warning(f"Page without documents: {page}")
+    return page.get("documents") or []
+
+
+def _paged_params(params: Dict[str, Any], limit: Optional[int], max_pages: Optional[int]) -> Dict[str, Any]:
+    params = dict(params)
+    if limit is not None:
+        # max_results는 페이지를 더 따라가지 않게 하고, limit은 마지막 페이지의 남는 document를 서버에서 잘라냅니다.
+        params["max_results"] = limit
+        params["limit"] = limit
+    if max_pages is not None:
+        params["max_pages"] = max_pages
+    params.setdefault("max_pages", 45)
+    params.setdefault("prefetch", 1)
+    return params
+
+
+def iter_documents(path: str, params: Dict[str, Any], limit: Optional[int] = None, max_pages: Optional[int] = None) -> Iterator[dict]:
+    """Yield documents of a paginated search endpoint page by page.
+
+    The server follows Kakao's `meta.is_end`/`page` pagination and sends every
+    page as its own event, so the first documents are available before the
+    last page has been fetched. Stops after `limit` documents when given.
+    A Kakao error on a later page raises :class:`KakaoAPIError` after the
+    documents already received.
+    """
+    count = 0
+    events = iter_events(path, _paged_params(params, limit, max_pages))
+    try:
+        for event in events:
+            for doc in _page_documents(event):
+                yield doc
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+    finally:
+        events.close()
+
+
+async def aiter_documents(path: str, params: Dict[str, Any], limit: Optional[int] = None, max_pages: Optional[int] = None) -> AsyncIterator[dict]:
+    """Async counterpart of :func:`iter_documents`."""
+    count = 0
+    events = aiter_events(path, _paged_params(params, limit, max_pages))
+    try:
+        async for event in events:
+            for doc in _page_documents(event):
+                yield doc
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+    finally:
+        await events.aclose()
+
+
+def iter_sweep(params: Dict[str, Any], report: Optional[Dict[str, Any]] = None) -> Iterator[dict]:
+    """Enumerate every place in `params["rect"]` through the server's `/search/sweep`.
+
+    Places are yielded as soon as the server finds them (already deduplicated
+    by `id`). When `report` is given it is filled with the final call/place
+    report, which is what `tile` should be tuned against.
+    """
+    for event in iter_events("/search/sweep", params):
+        if event.event == "place":
+            yield json.loads(event.data)
+        elif event.event == "done" and report is not None:
+            report.update(json.loads(event.data))
+
+
+# 도구의 _run/_arun이 잡아서 에이전트에게 문자열로 돌려주는 예외들입니다.
+# json.JSONDecodeError는 ValueError의 하위 클래스이므로 ValueError보다 먼저 잡아야 합니다.
+TOOL_ERRORS = (httpx.HTTPError, json.JSONDecodeError, KeyError, IndexError, AttributeError)
+
+
+def tool_error(e: Exception) -> str:
+    """Log an exception from `TOOL_ERRORS` and return the message a tool hands back to the agent."""
+    if isinstance(e, httpx.HTTPError):
+        logging.error(f"HTTP Request failed: {e}")
+        return f"Error calling the API: {e}"
+    if isinstance(e, json.JSONDecodeError):
+        logging.error(f"Failed to decode JSON from response: {e}")
+        return "Error parsing server response. The response was not valid JSON."
+    logging.error(f"Error parsing response structure: {e}")
+    return "Could not parse the API response."
+
+
+# --- MCP (JSON-RPC) ---
+# 서버의 /mcp 엔드포인트로 여러 도구 호출을 한 번의 배치 요청으로 보냅니다. 서버는 배치 안의 호출을
+# 동시에 실행하고 끝나는 순서대로 같은 SSE 스트림으로 응답하므로, 한 턴의 지오 호출을 연결 하나,
+# 왕복 한 번으로 처리할 수 있습니다.
+
+MCP_PROTOCOL_VERSION = "2025-03-26"
+_MCP_ACCEPT = "application/json, text/event-stream"
+
+
+def tool_text(result: Dict[str, Any]) -> str:
+    """Join the text blocks of a `tools/call` result (one block per page for paginated searches)."""
+    return "\n".join(block.get("text", "") for block in result.get("content", []))
+
+
+def _rpc_result(message: Dict[str, Any]) -> Dict[str, Any]:
+    # JSON-RPC 오류(알 수 없는 도구 등)도 도구 오류와 같은 모양으로 돌려줘 호출자가 한 가지만 처리하게 합니다.
+    if "error" in message:
+        return {"isError": True, "content": [{"type": "text", "text": message["error"].get("message", "")}]}
+    return message.get("result", {})
+
+
+def _rpc_messages(body: Any) -> Iterator[Dict[str, Any]]:
+    if isinstance(body, list):
+        yield from body
+    elif body is not None:
+        yield body
+
+
+class _MCPSessionBase:
+    def __init__(self, path: str = "/mcp"):
+        self.path = path
+        self.session_id: Optional[str] = None
+        self._next_id = 0
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Accept": _MCP_ACCEPT, "Content-Type": "application/json"}
+        if self.session_id:
+            headers["Mcp-Session-Id"] = self.session_id
+        return headers
+
+    def _initialize_message(self) -> Dict[str, Any]:
+        return {
+            "jsonrpc": "2.0", "id": 0, "method": "initialize",
+            "params": {"protocolVersion": MCP_PROTOCOL_VERSION, "capabilities": {},
+                       "clientInfo": {"name": "korean-map-langchain", "version": "1.0.0"}},
+        }
+
+    def _batch(self, calls: Iterable[Tuple[str, Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], Dict[int, int]]:
+        batch, index = [], {}
+        for i, (name, arguments) in enumerate(calls):
+            self._next_id += 1
+            index[self._next_id] = i
+            batch.append({"jsonrpc": "2.0", "id": self._next_id, "method": "tools/call",
+                          "params": {"name": name, "arguments": arguments}})
+        return batch, index
+
+
+class MCPSession(_MCPSessionBase):
+    """Synchronous MCP session over the server's streamable HTTP endpoint.
+
+    `call_many` sends every call as one JSON-RPC batch; the server runs them
+    concurrently and `iter_results` yields `(index, result)` pairs in the
+    order they finish.
+    """
+
+    def __init__(self, client: Optional[httpx.Client] = None, path: str = "/mcp"):
+        super().__init__(path)
+        self.client = client or get_client()
+
+    def __enter__(self) -> "MCPSession":
+        self.initialize()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def initialize(self) -> Dict[str, Any]:
+        response = self.client.post(self.path, json=self._initialize_message(), headers=self._headers())
+        response.raise_for_status()
+        self.session_id = response.headers.get("Mcp-Session-Id")
+        result = next(self._read(response))["result"]
+        notice = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+        self.client.post(self.path, json=notice, headers=self._headers()).raise_for_status()
+        return result
+
+    def list_tools(self) -> List[Dict[str, Any]]:
+        self._next_id += 1
+        message = {"jsonrpc": "2.0", "id": self._next_id, "method": "tools/list"}
+        response = self.client.post(self.path, json=message, headers=self._headers())
+        response.raise_for_status()
+        return next(self._read(response))["result"]["tools"]
+
+    def iter_results(self, calls: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        batch, index = self._batch(calls)
+        if not batch:
+            return
+        with self.client.stream("POST", self.path, json=batch, headers=self._headers()) as response:
+            response.raise_for_status()
+            for message in self._read(response):
+                if message.get("id") in index:
+                    yield index[message["id"]], _rpc_result(message)
+
+    def call_many(self, calls: Iterable[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Run all calls in one round trip and return their results in input order."""
+        calls = list(calls)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+        for i, result in self.iter_results(calls):
+            results[i] = result
+        return results
+
+    def call(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        return self.call_many([(name, arguments)])[0]
+
+    def close(self) -> None:
+        if self.session_id:
+            self.client.delete(self.path, headers=self._headers())
+            self.session_id = None
+
+    @staticmethod
+    def _read(response: httpx.Response) -> Iterator[Dict[str, Any]]:
+        if response.headers.get("Content-Type", "").startswith("text/event-stream"):
+            for event in parse_sse(response.iter_lines()):
+                yield from _rpc_messages(json.loads(event.data))
+        else:
+            yield from _rpc_messages(json.loads(response.read()))
+
+
+class AsyncMCPSession(_MCPSessionBase):
+    """Async counterpart of :class:`MCPSession`."""
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, path: str = "/mcp"):
+        super().__init__(path)
+        self.client = client or get_async_client()
+
+    async def __aenter__(self) -> "AsyncMCPSession":
+        await self.initialize()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def initialize(self) -> Dict[str, Any]:
+        response = await self.client.post(self.path, json=self._initialize_message(), headers=self._headers())
+        response.raise_for_status()
+        self.session_id = response.headers.get("Mcp-Session-Id")
+        result = None
+        async for message in self._read(response):
+            result = message["result"]
+            break
+        notice = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+        (await self.client.post(self.path, json=notice, headers=self._headers())).raise_for_status()
+        return result
+
+    async def aiter_results(self, calls: Iterable[Tuple[str, Dict[str, Any]]]) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        batch, index = self._batch(calls)
+        if not batch:
+            return
+        async with self.client.stream("POST", self.path, json=batch, headers=self._headers()) as response:
+            response.raise_for_status()
+            async for message in self._read(response):
+                if message.get("id") in index:
+                    yield index[message["id"]], _rpc_result(message)
+
+    async def call_many(self, calls: Iterable[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        calls = list(calls)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+        async for i, result in self.aiter_results(calls):
+            results[i] = result
+        return results
+
+    async def call(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        return (await self.call_many([(name, arguments)]))[0]
+
+    async def close(self) -> None:
+        if self.session_id:
+            await self.client.delete(self.path, headers=self._headers())
+            self.session_id = None
+
+    @staticmethod
+    async def _read(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+        if response.headers.get("Content-Type", "").startswith("text/event-stream"):
+            async for event in aparse_sse(response.aiter_lines()):
+                for message in _rpc_messages(json.loads(event.data)):
+                    yield message
+        else:
+            for message in _rpc_messages(json.loads(await response.aread())):
+                yield message
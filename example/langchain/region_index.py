@@ -0,0 +1,285 @@
+"""Offline administrative-region resolver for `coord2regioncode`.
+
+Loads 법정동(B)/행정동(H) boundary files into an STR-tree over polygon
+bounding boxes and answers point-in-polygon queries locally, either for a
+single point (same document shape as Kakao's `coord2regioncode`) or for whole
+NumPy arrays of points at once::
+
+    from region_index import RegionIndex
+    index = RegionIndex.from_spec("H=/data/adm.geojson,B=/data/bjd.geojson")
+    index.lookup(127.1086228, 37.4012191)
+    codes = index.codes(lons, lats, "H")   # array of region codes, "" if outside
+
+The spec format is the same as the server's `REGION_BOUNDARY_FILES`.
+GeoJSON is read with the standard library; shapefiles need `pyshp`.
+Feature properties are read from `code`/`address_name` (or the common
+`adm_cd2`/`adm_cd`/`adm_nm`, `BJD_CD`/`BJD_NM` columns).
+"""
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from kakao_proj import transform
+
+NODE_CAPACITY = 16
+# 점 × 변 행렬을 만들 때 한 번에 처리할 최대 원소 수
+PIP_CHUNK = 4_000_000
+
+_CODE_KEYS = ("code", "adm_cd2", "adm_cd", "BJD_CD", "bjd_cd")
+_NAME_KEYS = ("address_name", "adm_nm", "BJD_NM", "bjd_nm", "name")
+
+
+def _prop(props: dict, keys) -> str:
+    for k in keys:
+        v = props.get(k)
+        if v is not None:
+            return str(v)
+    return ""
+
+
+def _region_document(props: dict, region_type: str) -> dict:
+    doc = {
+        "region_type": props.get("region_type", region_type),
+        "code": _prop(props, _CODE_KEYS),
+        "address_name": _prop(props, _NAME_KEYS),
+        "region_1depth_name": props.get("region_1depth_name", ""),
+        "region_2depth_name": props.get("region_2depth_name", ""),
+        "region_3depth_name": props.get("region_3depth_name", ""),
+        "region_4depth_name": props.get("region_4depth_name", ""),
+    }
+    if not doc["region_1depth_name"]:
+        # "경기도 성남시 분당구 삼평동" -> 경기도 / 성남시 분당구 / 삼평동
+        parts = doc["address_name"].split()
+        if parts:
+            doc["region_1depth_name"] = parts[0]
+            if len(parts) > 2 and parts[-1].endswith("리"):
+                doc["region_4depth_name"] = parts.pop()
+            if len(parts) > 1:
+                doc["region_3depth_name"] = parts[-1]
+                doc["region_2depth_name"] = " ".join(parts[1:-1])
+    return doc
+
+
+def _read_features(path: str):
+    if path.lower().endswith(".shp"):
+        try:
+            import shapefile  # pyshp
+        except ImportError as e:
+            raise ImportError("Reading shapefiles requires `pip install pyshp`") from e
+        with shapefile.Reader(path) as reader:
+            for rec in reader.iterShapeRecords():
+                yield rec.record.as_dict(), rec.shape.__geo_interface__
+        return
+    with open(path, encoding="utf-8") as f:
+        for feature in json.load(f)["features"]:
+            yield feature.get("properties") or {}, feature.get("geometry") or {}
+
+
+def _prop_point(props: dict) -> Optional[Tuple[float, float]]:
+    for kx, ky in (("x", "y"), ("center_x", "center_y")):
+        try:
+            return float(props[kx]), float(props[ky])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+def _ring_area(ring: np.ndarray) -> float:
+    x, y = ring[:, 0], ring[:, 1]
+    return float((np.roll(x, 1) * y - x * np.roll(y, 1)).sum() / 2)
+
+
+def _ring_centroid(ring: np.ndarray) -> Tuple[float, float]:
+    x, y = ring[:, 0], ring[:, 1]
+    px, py = np.roll(x, 1), np.roll(y, 1)
+    cross = px * y - x * py
+    a = 6 * _ring_area(ring)
+    return float(((px + x) * cross).sum() / a), float(((py + y) * cross).sum() / a)
+
+
+class _Region:
+    __slots__ = ("doc", "rings", "bbox", "point")
+
+    def __init__(self, doc: dict, polygons: List[List[np.ndarray]], point: Optional[Tuple[float, float]] = None):
+        self.doc = doc
+        # 짝홀 규칙은 외곽/구멍 구분 없이 모든 링의 교차 횟수를 합치면 되므로 링만 보관합니다.
+        # 단, 멀티폴리곤의 폴리곤끼리는 겹치지 않는다고 가정합니다.
+        self.rings = [ring for poly in polygons for ring in poly]
+        outer = np.concatenate([poly[0] for poly in polygons])
+        self.bbox = np.array([outer[:, 0].min(), outer[:, 1].min(), outer[:, 0].max(), outer[:, 1].max()])
+        self.point = point or self._representative_point(polygons)
+
+    def _representative_point(self, polygons: List[List[np.ndarray]]) -> Tuple[float, float]:
+        """Centroid of the largest polygon, or a point inside it when the centroid falls outside (same rule as the server)."""
+        poly = max(polygons, key=lambda p: abs(_ring_area(p[0])))
+        if _ring_area(poly[0]) == 0:
+            return float(self.bbox[0] + self.bbox[2]) / 2, float(self.bbox[1] + self.bbox[3]) / 2
+        cx, cy = _ring_centroid(poly[0])
+        if self.contains(np.array([cx]), np.array([cy]))[0]:
+            return cx, cy
+        # 가운데를 지나는 수평선에서 가장 긴 내부 구간의 중점
+        y = float(poly[0][:, 1].min() + poly[0][:, 1].max()) / 2
+        xs = []
+        for ring in poly:
+            x1, y1 = ring[:, 0], ring[:, 1]
+            x2, y2 = np.roll(x1, 1), np.roll(y1, 1)
+            hit = (y1 > y) != (y2 > y)
+            xs.extend((x2[hit] - x1[hit]) * (y - y1[hit]) / (y2[hit] - y1[hit]) + x1[hit])
+        xs = np.sort(xs)
+        if len(xs) < 2:
+            return cx, cy
+        widths = xs[1::2] - xs[:-1:2]
+        i = int(np.argmax(widths))
+        return float(xs[2 * i] + xs[2 * i + 1]) / 2, y
+
+    def contains(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Vectorized even-odd point-in-polygon test."""
+        inside = np.zeros(x.shape, dtype=bool)
+        for ring in self.rings:
+            x1, y1 = ring[:, 0], ring[:, 1]
+            x2, y2 = np.roll(x1, 1), np.roll(y1, 1)
+            step = max(1, PIP_CHUNK // len(ring))
+            for s in range(0, len(x), step):
+                px = x[s:s + step, None]
+                py = y[s:s + step, None]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    cross = ((y1 > py) != (y2 > py)) & (px < (x2 - x1) * (py - y1) / (y2 - y1) + x1)
+                inside[s:s + step] ^= np.logical_xor.reduce(cross, axis=1)
+        return inside
+
+
+class _Node:
+    __slots__ = ("bbox", "children", "regions")
+
+    def __init__(self, bbox, children=(), regions=()):
+        self.bbox = bbox
+        self.children = list(children)
+        self.regions = list(regions)
+
+
+def _str_pack(items, bboxes: np.ndarray):
+    """Sort-Tile-Recursive grouping of `items` into NODE_CAPACITY-sized groups."""
+    n = len(items)
+    nodes = -(-n // NODE_CAPACITY)
+    slice_size = int(np.ceil(np.sqrt(nodes))) * NODE_CAPACITY
+    cx = bboxes[:, 0] + bboxes[:, 2]
+    cy = bboxes[:, 1] + bboxes[:, 3]
+    order = np.argsort(cx, kind="stable")
+    groups = []
+    for start in range(0, n, slice_size):
+        slab = order[start:start + slice_size]
+        slab = slab[np.argsort(cy[slab], kind="stable")]
+        for s in range(0, len(slab), NODE_CAPACITY):
+            idx = slab[s:s + NODE_CAPACITY]
+            box = np.array([bboxes[idx, 0].min(), bboxes[idx, 1].min(), bboxes[idx, 2].max(), bboxes[idx, 3].max()])
+            groups.append(([items[i] for i in idx], box))
+    return groups
+
+
+def _build_str(regions: List[_Region]) -> Optional[_Node]:
+    if not regions:
+        return None
+    level = [_Node(box, regions=group) for group, box in _str_pack(regions, np.array([r.bbox for r in regions]))]
+    while len(level) > 1:
+        level = [_Node(box, children=group) for group, box in _str_pack(level, np.array([n.bbox for n in level]))]
+    return level[0]
+
+
+class RegionIndex:
+    """STR-tree point-in-polygon index per region type (B: 법정동, H: 행정동)."""
+
+    def __init__(self):
+        self.regions: Dict[str, List[_Region]] = {}
+        self._roots: Dict[str, _Node] = {}
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "RegionIndex":
+        """Load boundary files from a `"H=path,B=path"` spec (a bare path means `B`)."""
+        index = cls()
+        for part in spec.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            region_type, sep, path = part.partition("=")
+            if not sep:
+                region_type, path = "B", part
+            index.add_file(path, region_type.upper())
+        return index
+
+    def add_file(self, path: str, region_type: str) -> None:
+        """Load one GeoJSON/shapefile of boundaries as `region_type`."""
+        regions = self.regions.setdefault(region_type, [])
+        for props, geometry in _read_features(path):
+            if geometry.get("type") == "Polygon":
+                polygons = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiPolygon":
+                polygons = geometry["coordinates"]
+            else:
+                continue
+            polygons = [[np.asarray(ring, dtype=np.float64)[:, :2] for ring in poly] for poly in polygons]
+            regions.append(_Region(_region_document(props, region_type), polygons, _prop_point(props)))
+        self._roots[region_type] = _build_str(list(regions))
+
+    def lookup_many(self, x, y, input_coord: str = "WGS84") -> Dict[str, np.ndarray]:
+        """Resolve arrays of points in bulk.
+
+        Returns, per region type, an int array with the index into
+        `self.regions[type]` of the region containing each point (-1 if none).
+        """
+        x, y = (np.asarray(v, dtype=np.float64) for v in (x, y))
+        if input_coord.upper() != "WGS84":
+            x, y = transform(x, y, input_coord, "WGS84")
+        x, y = x.ravel(), y.ravel()
+        out = {}
+        for region_type, root in self._roots.items():
+            result = np.full(x.shape, -1, dtype=np.int64)
+            positions = {id(r): i for i, r in enumerate(self.regions[region_type])}
+            stack = [(root, np.arange(len(x)))]
+            while stack:
+                node, idx = stack.pop()
+                bx = node.bbox
+                idx = idx[(x[idx] >= bx[0]) & (x[idx] <= bx[2]) & (y[idx] >= bx[1]) & (y[idx] <= bx[3])]
+                if len(idx) == 0:
+                    continue
+                stack.extend((child, idx) for child in node.children)
+                for region in node.regions:
+                    rb = region.bbox
+                    cand = idx[(result[idx] < 0) & (x[idx] >= rb[0]) & (x[idx] <= rb[2]) & (y[idx] >= rb[1]) & (y[idx] <= rb[3])]
+                    if len(cand):
+                        hit = cand[region.contains(x[cand], y[cand])]
+                        result[hit] = positions[id(region)]
+            out[region_type] = result
+        return out
+
+    def codes(self, x, y, region_type: str = "B", input_coord: str = "WGS84") -> np.ndarray:
+        """Region codes for arrays of points ("" where a point is outside every boundary)."""
+        idx = self.lookup_many(x, y, input_coord)[region_type]
+        table = np.array([r.doc["code"] for r in self.regions[region_type]] + [""], dtype=object)
+        return table[idx]
+
+    def lookup(self, x: float, y: float, input_coord: str = "WGS84") -> List[dict]:
+        """Kakao-style `coord2regioncode` documents for one point.
+
+        Like Kakao, `x`/`y` are each region's representative point (WGS84),
+        not the query point.
+        """
+        docs = []
+        for region_type, idx in self.lookup_many([x], [y], input_coord).items():
+            if idx[0] >= 0:
+                region = self.regions[region_type][idx[0]]
+                docs.append(dict(region.doc, x=region.point[0], y=region.point[1]))
+        return docs
+
+
+_default_index: Optional[RegionIndex] = None
+
+
+def default_index() -> Optional[RegionIndex]:
+    """Index loaded from `REGION_BOUNDARY_FILES`, or None when it is not set."""
+    global _default_index
+    spec = os.getenv("REGION_BOUNDARY_FILES")
+    if _default_index is None and spec:
+        _default_index = RegionIndex.from_spec(spec)
+    return _default_index
@@ -0,0 +1,44 @@
+import pytest
+
+from address_index import AddressIndex, address_anchor, normalize_address
+
+
+def _doc(address):
+    return {"address_name": address, "x": "127.0", "y": "37.0"}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("전라북도 익산시 삼성동 100번지", "전북 익산시 삼성동 100"),
+    ("전북특별자치도 익산시 삼성동100", "전북 익산시 삼성동 100"),
+    ("대한민국 서울특별시 강남구 테헤란로152 (역삼동)", "서울 강남구 테헤란로 152"),
+    ("서울 중구 을지로3가 1-1", "서울 중구 을지로3가 1-1"),
+])
+def test_normalize_address(text, expected):
+    assert normalize_address(text) == expected
+
+
+def test_anchor_ignores_sido_and_eupmyeon():
+    assert address_anchor("전북 익산시 삼성동 100") == (("100",), "익산", "삼성동")
+    assert address_anchor("익산 삼성동 100") == (("100",), "익산", "삼성동")
+    assert address_anchor("경남 창원시 마산합포구 진동면 요장리 100") == (("100",), "마산합포구", "요장리")
+
+
+def test_exact_and_near_matches():
+    index = AddressIndex(threshold=0.8)
+    index.add("전라북도 익산시 삼성동 100번지", _doc("전북 익산시 삼성동 100"))
+    assert index.lookup("전북 익산시 삼성동100").score == 1.0
+    near = index.lookup("익산시 삼성동 100")
+    assert near is not None and near.score < 1.0
+
+
+@pytest.mark.parametrize("indexed, query", [
+    ("경기 성남시 분당구 판교역로 100", "경기 성남시 분당구 판교로 100"),
+    ("경남 창원시 마산합포구 진동면 교동리 100", "경남 창원시 마산합포구 진동면 요장리 100"),
+    ("경기 고양시 일산동구 장항동 100", "경기 고양시 일산서구 장항동 100"),
+    ("전북 익산시 삼성동 100", "전북 익산시 삼성동 101"),
+])
+def test_different_places_never_match(indexed, query):
+    index = AddressIndex(threshold=0.5)
+    index.add(indexed, _doc(indexed))
+    assert index.best(query) is None
+    assert index.lookup(query) is None
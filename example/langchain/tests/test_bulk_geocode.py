@@ -0,0 +1,139 @@
+import asyncio
+import csv
+import json
+
+import httpx
+import pytest
+
+import bulk_geocode
+from address_index import AddressIndex
+from bulk_geocode import GEO_COLUMNS, CSVSink, Geocoder, load_checkpoint, read_chunks, save_checkpoint
+
+ADDRESS_DOC = {"address_name": "전북 익산시 삼성동 100", "x": "126.99", "y": "35.97"}
+KEYWORD_DOC = {"address_name": "서울 중구 세종대로 110", "x": "126.978", "y": "37.5665"}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Fake `aget_json`: answers from `responses[(path, query)]` and records every call."""
+    calls = []
+    responses = {
+        ("/search/address", "전북 익산시 삼성동 100"): [ADDRESS_DOC],
+        ("/search/keyword", "서울시청"): [KEYWORD_DOC],
+    }
+
+    async def fake_aget_json(path, params, headers=None):
+        calls.append((path, params["query"]))
+        if params["query"] == "끊김":
+            raise httpx.ConnectError("connection refused")
+        return {"documents": responses.get((path, params["query"]), []), "meta": {}}
+
+    monkeypatch.setattr(bulk_geocode, "aget_json", fake_aget_json)
+    return calls
+
+
+def write_csv(path, addresses):
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        w = csv.writer(f)
+        w.writerow(["id", "address"])
+        w.writerows([i, a] for i, a in enumerate(addresses))
+    return str(path)
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_read_chunks_skips_rows(tmp_path):
+    path = write_csv(tmp_path / "in.csv", [f"주소 {i}" for i in range(7)])
+    ids = lambda chunks: [[row["id"] for row in chunk] for chunk in chunks]
+    assert ids(read_chunks(path, 3)) == [["0", "1", "2"], ["3", "4", "5"], ["6"]]
+    assert ids(read_chunks(path, 3, skip_rows=2)) == [["2", "3", "4"], ["5", "6"]]
+    assert ids(read_chunks(path, 3, skip_rows=7)) == []
+    # BOM은 첫 열 이름에 섞이지 않습니다.
+    assert list(next(read_chunks(path, 1))[0]) == ["id", "address"]
+
+
+def test_csv_sink_truncates_and_resumes(tmp_path):
+    path = str(tmp_path / "out.csv")
+    sink = CSVSink(path, 0)
+    offset = sink.write(0, [{"a": "1"}, {"a": "2"}])
+    sink.write(1, [{"a": "3"}])  # 체크포인트를 남기기 전에 중단된 청크
+    sink.close()
+
+    sink = CSVSink(path, offset)
+    sink.write(1, [{"a": "3"}, {"a": "4"}])
+    sink.close()
+    assert [row["a"] for row in read_csv(path)] == ["1", "2", "3", "4"]
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = str(tmp_path / "out.csv.checkpoint.json")
+    state = load_checkpoint(path, "in.csv")
+    assert state["rows"] == 0 and state["offset"] == 0
+    state.update(chunks=2, rows=10, offset=123, calls=7, elapsed=1.5)
+    save_checkpoint(path, state)
+    assert load_checkpoint(path, "in.csv") == state
+    assert load_checkpoint(path, "other.csv")["rows"] == 0
+    assert not (tmp_path / "out.csv.checkpoint.json.tmp").exists()
+
+
+def test_resolve_memo_index_and_keyword_fallback(upstream):
+    async def scenario():
+        geocoder = Geocoder(concurrency=4, rate=0, index=AddressIndex(threshold=0.8))
+        first = await geocoder.resolve("전북 익산시 삼성동 100")
+        assert first["geo_source"] == "address" and first["geo_x"] == 126.99 and first["geo_status"] == "ok"
+        assert await geocoder.resolve("전북 익산시 삼성동 100") is first  # 메모
+        # 표기가 조금 다른 주소는 로컬 색인에서 답합니다.
+        near = await geocoder.resolve("익산시 삼성동 100")
+        assert near["geo_source"] == "index" and near["geo_address"] == "전북 익산시 삼성동 100"
+        assert upstream == [("/search/address", "전북 익산시 삼성동 100")]
+
+        upstream.clear()
+        landmark = await geocoder.resolve("서울시청")
+        assert landmark["geo_source"] == "keyword" and landmark["geo_y"] == 37.5665
+        assert upstream == [("/search/address", "서울시청"), ("/search/keyword", "서울시청")]
+        missing = await geocoder.resolve("없는 곳")
+        assert missing["geo_status"] == "not_found" and list(missing) == GEO_COLUMNS
+
+        # 전송 오류는 error로 남기고 메모하지 않아 다음에 다시 시도합니다.
+        upstream.clear()
+        assert (await geocoder.resolve("끊김"))["geo_status"] == "error"
+        assert (await geocoder.resolve("끊김"))["geo_status"] == "error"
+        assert len(upstream) == 2
+        assert (await geocoder.resolve(""))["geo_status"] == "not_found" and len(upstream) == 2
+
+        no_keyword = Geocoder(concurrency=1, rate=0, keyword_fallback=False)
+        assert (await no_keyword.resolve("서울시청"))["geo_status"] == "not_found"
+        assert geocoder.calls == 7 and no_keyword.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_run_resumes_from_checkpoint(tmp_path, upstream):
+    source = write_csv(tmp_path / "in.csv", ["전북 익산시 삼성동 100", "서울시청", "없는 곳", "전라북도 익산시 삼성동 100번지", "서울시청"])
+    output = str(tmp_path / "out.csv")
+    argv = [source, output, "--chunk-size", "2", "--rate", "0"]
+
+    report = bulk_geocode.main(argv)
+    rows = read_csv(output)
+    assert report["rows"] == 5 and [row["id"] for row in rows] == ["0", "1", "2", "3", "4"]
+    assert list(rows[0]) == ["id", "address"] + GEO_COLUMNS
+    assert [row["geo_status"] for row in rows] == ["ok", "ok", "not_found", "ok", "ok"]
+    # 청크 사이에서도 정규화한 주소와 메모를 재사용합니다.
+    assert report["calls"] == len(upstream) == 5
+
+    # 다시 실행하면 체크포인트 이후의 행이 없으므로 호출하지 않습니다.
+    assert bulk_geocode.main(argv)["calls"] == 5 and len(upstream) == 5
+    assert read_csv(output) == rows
+
+    # 출력 파일이 사라졌으면 체크포인트를 버리고 처음부터 다시 씁니다(NUL로 채우지 않습니다).
+    (tmp_path / "out.csv").unlink()
+    upstream.clear()
+    assert bulk_geocode.main(argv)["rows"] == 5
+    with open(output, "rb") as f:
+        assert b"\0" not in f.read()
+    assert read_csv(output) == rows
+    with open(output + ".checkpoint.json", encoding="utf-8") as f:
+        assert json.load(f)["calls"] == len(upstream)
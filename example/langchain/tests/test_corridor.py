@@ -0,0 +1,94 @@
+import math
+
+import numpy as np
+import pytest
+
+import corridor
+from corridor import KAKAO_MAX_RADIUS, parse_route, plan_corridor, route_positions, search_corridor
+
+
+def band_points(route_m, buffer_m, n, rng):
+    """Random points at most `buffer_m` from the polyline."""
+    seg = rng.integers(0, len(route_m) - 1, n)
+    t = rng.uniform(0, 1, (n, 1))
+    on_route = route_m[seg] + t * (route_m[seg + 1] - route_m[seg])
+    angle = rng.uniform(0, 2 * math.pi, n)
+    dist = buffer_m * np.sqrt(rng.uniform(0, 1, n))
+    dist[: n // 4] = buffer_m  # 띠의 가장자리도 충분히 섞습니다.
+    return on_route + np.column_stack([np.cos(angle), np.sin(angle)]) * dist[:, None]
+
+
+def wiggly_route(rng):
+    # 50m 간격으로 흔들리며 나아가는 15km 경로: 단순화와 굽은 구간을 함께 거칩니다.
+    x = np.arange(0, 15000, 50.0)
+    return np.column_stack([x, 400 * np.sin(x / 900) + rng.normal(0, 20, len(x))])
+
+
+@pytest.mark.parametrize(
+    "name, route_m, buffer_m",
+    [
+        ("straight", np.array([[0.0, 0.0], [30000.0, 0.0]]), 300),
+        ("hairpin", np.array([[0.0, 0.0], [5000.0, 0.0], [5000.0, 150.0], [0.0, 150.0]]), 100),
+        ("zigzag", np.array([[0.0, 0.0], [2000.0, 2000.0], [4000.0, 0.0], [6000.0, 2000.0], [8000.0, 0.0]]), 500),
+        ("wiggly", wiggly_route(np.random.default_rng(1)), 200),
+        ("single point", np.array([[100.0, 100.0], [100.0, 100.0]]), 1000),
+    ],
+)
+def test_plan_covers_the_corridor(name, route_m, buffer_m):
+    centers, radius, truncated = plan_corridor(route_m, buffer_m, 10_000)
+    assert not truncated
+    assert buffer_m < radius <= KAKAO_MAX_RADIUS
+    points = band_points(route_m, buffer_m, 4000, np.random.default_rng(2))
+    nearest = np.sqrt(((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)).min(axis=1)
+    assert (nearest <= radius).all(), f"{name}: {int((nearest > radius).sum())} band points outside every circle"
+
+
+def test_plan_grows_radius_to_fit_budget():
+    route_m = np.array([[0.0, 0.0], [30000.0, 0.0]])
+    small, small_radius, _ = plan_corridor(route_m, 300, 10_000)
+    capped, capped_radius, truncated = plan_corridor(route_m, 300, 5)
+    assert not truncated and len(capped) <= 5 < len(small)
+    assert capped_radius > small_radius
+
+
+def test_plan_truncates_at_kakao_radius_limit():
+    route_m = np.array([[0.0, 0.0], [500000.0, 0.0]])
+    centers, radius, truncated = plan_corridor(route_m, 300, 3)
+    assert truncated and len(centers) == 3 and radius == KAKAO_MAX_RADIUS
+    assert (centers[:, 0] == np.sort(centers[:, 0])).all() and centers[0, 0] == 0
+
+
+def test_route_positions_on_known_polyline():
+    # (0,0) → (1000,0) → (1000,1000) ㄱ자 경로
+    route_m = np.array([[0.0, 0.0], [1000.0, 0.0], [1000.0, 1000.0]])
+    xs = np.array([500.0, 1100.0, -50.0, 1000.0, 1080.0, 0.0])
+    ys = np.array([100.0, 500.0, 0.0, 1200.0, -60.0, 0.0])
+    offsets, dists = route_positions(route_m, xs, ys)
+    np.testing.assert_allclose(offsets, [500, 1500, 0, 2000, 1000, 0], atol=1e-9)
+    np.testing.assert_allclose(dists, [100, 100, 50, 200, 100, 0], atol=1e-9)
+
+
+def test_route_positions_degenerate_route():
+    offsets, dists = route_positions(np.array([[10.0, 10.0], [10.0, 10.0]]), np.array([13.0]), np.array([14.0]))
+    np.testing.assert_allclose(offsets, [0])
+    np.testing.assert_allclose(dists, [5])
+
+
+def test_parse_route():
+    assert parse_route("127.0276,37.4979; 127.1086 37.4012") == [(127.0276, 37.4979), (127.1086, 37.4012)]
+    with pytest.raises(ValueError):
+        parse_route("127.0276,37.4979;127.1086")
+
+
+@pytest.mark.parametrize("pages, last_page, saturated", [(1, 1, 0), (1, 3, "all"), (2, 2, 0), (2, 3, "all")])
+def test_search_reports_saturated_circles(monkeypatch, pages, last_page, saturated):
+    # 원마다 중심에 15개씩 last_page 페이지만큼 장소가 있는 가짜 서버
+    async def fake_aget_json(path, params, headers=None):
+        docs = [{"id": f"{params['x']},{params['y']},{params['page']},{i}", "x": params["x"], "y": params["y"]} for i in range(15)]
+        return {"documents": docs, "meta": {"is_end": params["page"] >= last_page}}
+
+    monkeypatch.setattr(corridor, "aget_json", fake_aget_json)
+    places, report = search_corridor([(127.0, 37.5), (127.05, 37.5)], 300, query="주유소", pages=pages)
+    assert report["calls"] == report["circles"] * min(pages, last_page)
+    assert report["saturated"] == (report["circles"] if saturated == "all" else 0)
+    assert report["places"] == len(places) == report["calls"] * 15 and not report["truncated"]
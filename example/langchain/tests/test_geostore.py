@@ -0,0 +1,28 @@
+import io
+
+from geostore import GeoStore, cache_key
+from mcp_client import project
+
+
+def test_cache_key_matches_server_format():
+    key = cache_key("/search/keyword", {"query": " 카카오 ", "page": 2, "size": None, "fields": "id,x", "limit": 3})
+    assert key == "/v2/local/search/keyword.json?page=2&query=%EC%B9%B4%EC%B9%B4%EC%98%A4"
+    assert key == cache_key("/search/keyword", {"page": "2", "query": "카카오"})
+
+
+def test_project_applies_fields_and_limit():
+    body = {"documents": [{"id": "1", "x": "127", "y": "37"}, {"id": "2", "x": "128"}], "meta": {"total_count": 2}}
+    assert project(body, {"fields": "y,id", "limit": 1}) == {"documents": [{"y": "37", "id": "1"}], "meta": {"total_count": 2}}
+    assert project(body, {}) == body
+
+
+def test_snapshot_round_trip(tmp_path):
+    src = GeoStore(str(tmp_path / "a.db"))
+    key = cache_key("/search/address", {"query": "판교역로 235", "fields": "x,y"})
+    src.set(key, '{"documents":[]}')
+    buf = io.StringIO()
+    assert src.export_jsonl(buf) == 1
+    buf.seek(0)
+    dst = GeoStore(str(tmp_path / "b.db"))
+    assert dst.import_jsonl(buf) == 1
+    assert dst.get("/v2/local/search/address.json?query=%ED%8C%90%EA%B5%90%EC%97%AD%EB%A1%9C+235") == '{"documents":[]}'
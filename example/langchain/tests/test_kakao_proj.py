@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from kakao_proj import SYSTEMS, transform
+
+GOLDEN = json.loads((Path(__file__).parent / "kakao_proj_golden.json").read_text(encoding="utf-8"))["cases"]
+
+
+@pytest.mark.parametrize("case", GOLDEN, ids=lambda c: f"{c['name']}:{c['input_coord']}->{c['output_coord']}")
+def test_golden_values(case):
+    x, y = transform(case["x"], case["y"], case["input_coord"], case["output_coord"])
+    assert abs(x - case["expected_x"]) <= case["tolerance"]
+    assert abs(y - case["expected_y"]) <= case["tolerance"]
+
+
+@pytest.mark.parametrize("system", sorted(SYSTEMS))
+def test_vectorized_matches_scalar_and_round_trips(system):
+    rng = np.random.default_rng(0)
+    lon = rng.uniform(124.5, 131.9, 10_000)
+    lat = rng.uniform(33.0, 38.6, 10_000)
+
+    x, y = transform(lon, lat, "WGS84", system)
+    sx, sy = transform(lon[123], lat[123], "WGS84", system)
+    assert x.shape == lon.shape
+    assert x[123] == pytest.approx(sx, abs=1e-9) and y[123] == pytest.approx(sy, abs=1e-9)
+
+    back_lon, back_lat = transform(x, y, system, "WGS84")
+    np.testing.assert_allclose(back_lon, lon, atol=1e-7)
+    np.testing.assert_allclose(back_lat, lat, atol=1e-7)
+
+
+def test_unknown_system():
+    with pytest.raises(ValueError):
+        transform(127.0, 37.0, "WGS84", "EPSG:4326")
@@ -0,0 +1,30 @@
+import json
+
+import httpx
+import pytest
+
+from mcp_client import TOOL_ERRORS, KakaoAPIError, SSEEvent, _page_documents, tool_error
+
+
+@pytest.mark.parametrize(
+    "error, want",
+    [
+        (httpx.ConnectError("connection refused"), "Error calling the API: connection refused"),
+        (KakaoAPIError("InvalidArgument: bad x"), "Error calling the API: InvalidArgument: bad x"),
+        (json.JSONDecodeError("Expecting value", "<html>", 0), "Error parsing server response. The response was not valid JSON."),
+        (KeyError("documents"), "Could not parse the API response."),
+    ],
+)
+def test_tool_error_messages(error, want):
+    try:
+        raise error
+    except TOOL_ERRORS as e:
+        assert tool_error(e) == want
+
+
+def test_page_documents_raises_on_kakao_errors():
+    assert _page_documents(SSEEvent("page", None, '{"documents":[{"id":"1"}],"meta":{}}')) == [{"id": "1"}]
+    for event in (SSEEvent("error", None, '{"errorType":"QueueTimeout","message":"busy"}'), SSEEvent("", None, '{"errorType":"InvalidArgument","message":"bad"}')):
+        with pytest.raises(TOOL_ERRORS) as info:
+            _page_documents(event)
+        assert tool_error(info.value).startswith("Error calling the API: ")
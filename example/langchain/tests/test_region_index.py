@@ -0,0 +1,131 @@
+import json
+
+import numpy as np
+import pytest
+
+from kakao_proj import transform
+from region_index import RegionIndex
+
+
+def square(x0, y0, size):
+    return [[x0, y0], [x0 + size, y0], [x0 + size, y0 + size], [x0, y0 + size], [x0, y0]]
+
+
+def feature(code, polygons, name=None):
+    if len(polygons) == 1:
+        geometry = {"type": "Polygon", "coordinates": polygons[0]}
+    else:
+        geometry = {"type": "MultiPolygon", "coordinates": polygons}
+    return {"type": "Feature", "properties": {"adm_cd2": code, "adm_nm": name or f"테스트도 {code}동"}, "geometry": geometry}
+
+
+def write_geojson(path, features):
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Holed polygon A with enclave C, two-part multipolygon M and a 20x20 grid G (several STR levels)."""
+    features = [
+        feature("A", [[square(0, 0, 2), square(0.5, 0.5, 1)]]),
+        feature("C", [[square(0.5, 0.5, 1)]]),
+        feature("M", [[square(2, 0, 1)], [square(5, 5, 1)]]),
+    ]
+    features += [feature(f"G{i:02d}{j:02d}", [[square(10 + i, 10 + j, 1)]]) for i in range(20) for j in range(20)]
+    return RegionIndex.from_spec("H=" + write_geojson(tmp_path / "adm.geojson", features))
+
+
+@pytest.mark.parametrize(
+    "x, y, want",
+    [
+        (0.25, 1, "A"),
+        (1, 1, "C"),  # A의 구멍은 C의 영역
+        (2.5, 0.5, "M"),
+        (5.5, 5.5, "M"),
+        (4, 3, ""),
+        (3.5, 0.5, ""),  # M의 bbox 안이지만 두 조각 사이
+        (17.5, 23.5, "G0713"),
+        (-1, -1, ""),
+        # 짝홀 규칙은 반열린 구간이라 공유 변 위의 점은 오른쪽/위쪽 영역 하나에만 속합니다.
+        (2, 0.5, "M"),
+        (0.5, 1, "C"),
+        (1.5, 1, "A"),
+        (15, 20.5, "G0510"),
+        (15, 20, "G0510"),
+        (30, 25.5, ""),
+        (25.5, 30, ""),
+    ],
+)
+def test_lookup(index, x, y, want):
+    assert index.codes([x], [y], "H")[0] == want
+    docs = index.lookup(x, y)
+    assert [d["code"] for d in docs] == ([want] if want else [])
+
+
+def test_codes_vectorized_matches_lookup(index):
+    rng = np.random.default_rng(7)
+    x = rng.uniform(-1, 31, 5000)
+    y = rng.uniform(-1, 31, 5000)
+    # 격자 꼭짓점과 변 위의 점도 섞습니다.
+    gx, gy = np.meshgrid(np.arange(10, 31, 0.5), np.arange(10, 31, 0.5))
+    x, y = np.concatenate([x, gx.ravel()]), np.concatenate([y, gy.ravel()])
+    codes = index.codes(x, y, "H")
+    for i in range(0, len(x), 97):
+        docs = index.lookup(x[i], y[i])
+        assert codes[i] == (docs[0]["code"] if docs else "")
+    inside = (x >= 10) & (x < 30) & (y >= 10) & (y < 30)
+    expected = np.array([f"G{int(a) - 10:02d}{int(b) - 10:02d}" for a, b in zip(x[inside], y[inside])], dtype=object)
+    assert (codes[inside] == expected).all()
+
+
+def test_region_types_and_document(tmp_path):
+    h = write_geojson(tmp_path / "adm.geojson", [feature("H1", [[square(0, 0, 2)]], "경기도 성남시 분당구 삼평동")])
+    b = write_geojson(tmp_path / "bjd.geojson", [feature("B1", [[square(0, 0, 1)]], "경기도 양평군 양서면 목왕리")])
+    index = RegionIndex.from_spec(f"H={h}, {b}")
+    docs = index.lookup(0.25, 0.75)
+    assert [(d["region_type"], d["code"]) for d in docs] == [("H", "H1"), ("B", "B1")]
+    assert docs[0]["region_2depth_name"] == "성남시 분당구" and docs[0]["region_3depth_name"] == "삼평동"
+    assert docs[1]["region_3depth_name"] == "양서면" and docs[1]["region_4depth_name"] == "목왕리"
+    # x/y는 요청 좌표가 아니라 각 영역의 대표점입니다.
+    assert (docs[0]["x"], docs[0]["y"]) == (1, 1) and (docs[1]["x"], docs[1]["y"]) == (0.5, 0.5)
+    assert [d["code"] for d in index.lookup(1.5, 1.5)] == ["H1"]
+
+
+@pytest.mark.parametrize(
+    "polygons, props, want",
+    [
+        ([[square(2, 4, 2)]], {}, (3, 5)),
+        ([[square(0, 0, 1)], [square(5, 5, 2)]], {}, (6, 6)),  # 가장 큰 폴리곤
+        # ㄷ자 영역과 구멍 난 영역: 무게중심이 영역 밖이면 가운데 수평선의 가장 긴 내부 구간 중점
+        ([[[[0, 0], [3, 0], [3, 1], [1, 1], [1, 2], [3, 2], [3, 3], [0, 3], [0, 0]]]], {}, (0.5, 1.5)),
+        ([[square(0, 0, 4), square(1, 1, 2)]], {}, (0.5, 2)),
+        ([[square(0, 0, 1)]], {"x": 127.1, "y": "37.4"}, (127.1, 37.4)),
+        ([[square(0, 0, 4)]], {"center_x": 1.25, "center_y": 1.75}, (1.25, 1.75)),
+    ],
+)
+def test_representative_point(tmp_path, polygons, props, want):
+    f = feature("R1", polygons)
+    f["properties"].update(props)
+    index = RegionIndex.from_spec("H=" + write_geojson(tmp_path / "adm.geojson", [f]))
+    assert index.regions["H"][0].point == pytest.approx(want)
+
+
+def test_lookup_with_input_coord(tmp_path):
+    path = write_geojson(tmp_path / "adm.geojson", [feature("H1", [[square(127.09, 37.39, 0.02)]])])
+    index = RegionIndex.from_spec(f"H={path}")
+    wx, wy = transform(np.array([127.1, 127.2]), np.array([37.4, 37.4]), "WGS84", "WTM")
+    assert list(index.codes(wx, wy, "H", input_coord="WTM")) == ["H1", ""]
+
+
+def test_shapefile(tmp_path):
+    shapefile = pytest.importorskip("shapefile")
+    path = str(tmp_path / "bjd.shp")
+    with shapefile.Writer(path, shapeType=shapefile.POLYGON) as w:
+        w.field("BJD_CD", "C")
+        w.field("BJD_NM", "C")
+        # pyshp의 외곽 링은 시계 방향, 구멍은 반시계 방향입니다.
+        w.poly([square(0, 0, 2)[::-1], square(0.5, 0.5, 1)])
+        w.record("B1", "테스트도 B1동")
+    index = RegionIndex.from_spec(path)
+    assert list(index.codes([0.25, 1], [1, 1], "B")) == ["B1", ""]